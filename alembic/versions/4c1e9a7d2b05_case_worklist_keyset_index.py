@@ -0,0 +1,49 @@
+"""case urgency, sort_priority and worklist keyset index
+
+Revision ID: 4c1e9a7d2b05
+Revises: 193d77326562
+Create Date: 2026-10-19 10:12:41.208113
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '4c1e9a7d2b05'
+down_revision: Union[str, None] = '193d77326562'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    urgency_enum = postgresql.ENUM('S', 'U', 'F', name='urgencytype', create_type=False)
+    op.add_column('cases', sa.Column('urgency', urgency_enum, nullable=True))
+    op.add_column('cases', sa.Column('sort_priority', sa.Integer(), server_default='2', nullable=False))
+
+    # Срочность берётся из первого символа кода кейса (S/U/F)
+    op.execute(
+        """
+        UPDATE cases
+        SET urgency = substr(case_code, 1, 1)::urgencytype,
+            sort_priority = CASE WHEN substr(case_code, 1, 1) IN ('F', 'U') THEN 1 ELSE 2 END
+        WHERE substr(case_code, 1, 1) IN ('S', 'U', 'F')
+        """
+    )
+
+    op.create_index(
+        'idx_cases_worklist',
+        'cases',
+        ['sort_priority', sa.text('creation_date DESC'), sa.text('id DESC')],
+        unique=False,
+        postgresql_where=sa.text("grossing_status != 'COMPLETED'"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('idx_cases_worklist', table_name='cases')
+    op.drop_column('cases', 'sort_priority')
+    op.drop_column('cases', 'urgency')
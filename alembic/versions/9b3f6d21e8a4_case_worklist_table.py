@@ -0,0 +1,68 @@
+"""case_worklist table of open cases
+
+Revision ID: 9b3f6d21e8a4
+Revises: 4c1e9a7d2b05
+Create Date: 2026-10-19 11:03:27.554210
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9b3f6d21e8a4'
+down_revision: Union[str, None] = '4c1e9a7d2b05'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    urgency_enum = postgresql.ENUM('S', 'U', 'F', name='urgencytype', create_type=False)
+    op.create_table('case_worklist',
+    sa.Column('case_id', sa.String(length=36), nullable=False),
+    sa.Column('sort_priority', sa.Integer(), nullable=False),
+    sa.Column('creation_date', sa.DateTime(), nullable=False),
+    sa.Column('case_code', sa.String(length=250), nullable=True),
+    sa.Column('patient_id', sa.String(length=36), nullable=True),
+    sa.Column('urgency', urgency_enum, nullable=True),
+    sa.ForeignKeyConstraint(['case_id'], ['cases.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('case_id')
+    )
+    op.create_index(
+        'idx_case_worklist_order',
+        'case_worklist',
+        ['sort_priority', sa.text('creation_date DESC'), sa.text('case_id DESC')],
+        unique=False,
+    )
+
+    # Начальное заполнение: F/U - все незавершённые, S - незавершённые с хотя бы одним стеклом
+    op.execute(
+        """
+        INSERT INTO case_worklist (case_id, sort_priority, creation_date, case_code, patient_id, urgency)
+        SELECT c.id, c.sort_priority, c.creation_date, c.case_code, c.patient_id, c.urgency
+        FROM cases c
+        WHERE c.grossing_status != 'COMPLETED'
+          AND c.creation_date IS NOT NULL
+          AND (
+            c.sort_priority = 1
+            OR (
+              c.sort_priority = 2
+              AND EXISTS (
+                SELECT 1
+                FROM samples s
+                JOIN cassettes k ON k.sample_id = s.id
+                JOIN glasses g ON g.cassette_id = k.id
+                WHERE s.case_id = c.id
+              )
+            )
+          )
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('idx_case_worklist_order', table_name='case_worklist')
+    op.drop_table('case_worklist')
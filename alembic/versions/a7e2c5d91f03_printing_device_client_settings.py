@@ -0,0 +1,28 @@
+"""printing_device http client settings
+
+Revision ID: a7e2c5d91f03
+Revises: 9b3f6d21e8a4
+Create Date: 2026-10-19 13:24:08.913042
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a7e2c5d91f03'
+down_revision: Union[str, None] = '9b3f6d21e8a4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('printing_device', sa.Column('max_connections', sa.Integer(), nullable=True))
+    op.add_column('printing_device', sa.Column('timeout_seconds', sa.Float(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('printing_device', 'timeout_seconds')
+    op.drop_column('printing_device', 'max_connections')
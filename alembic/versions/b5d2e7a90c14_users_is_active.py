@@ -0,0 +1,29 @@
+"""users is_active
+
+Revision ID: b5d2e7a90c14
+Revises: f1c4a8e2b6d9
+Create Date: 2026-10-19 18:20:13.504811
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b5d2e7a90c14'
+down_revision: Union[str, None] = 'f1c4a8e2b6d9'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        'users',
+        sa.Column('is_active', sa.Boolean(), server_default='true', nullable=False),
+    )
+
+
+def downgrade() -> None:
+    op.drop_column('users', 'is_active')
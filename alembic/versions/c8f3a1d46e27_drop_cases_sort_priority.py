@@ -0,0 +1,41 @@
+"""drop cases sort_priority and idx_cases_worklist
+
+Revision ID: c8f3a1d46e27
+Revises: b5d2e7a90c14
+Create Date: 2026-10-19 19:05:52.118430
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c8f3a1d46e27'
+down_revision: Union[str, None] = 'b5d2e7a90c14'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Рабочий список читается из case_worklist, приоритет выводится из cases.urgency
+    op.drop_index('idx_cases_worklist', table_name='cases')
+    op.drop_column('cases', 'sort_priority')
+
+
+def downgrade() -> None:
+    op.add_column('cases', sa.Column('sort_priority', sa.Integer(), server_default='2', nullable=False))
+    op.execute(
+        """
+        UPDATE cases
+        SET sort_priority = CASE WHEN urgency IN ('F', 'U') THEN 1 ELSE 2 END
+        """
+    )
+    op.create_index(
+        'idx_cases_worklist',
+        'cases',
+        ['sort_priority', sa.text('creation_date DESC'), sa.text('id DESC')],
+        unique=False,
+        postgresql_where=sa.text("grossing_status != 'COMPLETED'"),
+    )
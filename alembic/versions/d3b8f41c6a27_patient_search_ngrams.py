@@ -0,0 +1,43 @@
+"""patient_search_ngrams inverted index
+
+Revision ID: d3b8f41c6a27
+Revises: a7e2c5d91f03
+Create Date: 2026-10-19 14:02:51.406318
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd3b8f41c6a27'
+down_revision: Union[str, None] = 'a7e2c5d91f03'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('patient_search_ngrams',
+    sa.Column('ngram', sa.String(length=3), nullable=False),
+    sa.Column('patient_id', sa.String(length=36), nullable=False),
+    sa.ForeignKeyConstraint(['patient_id'], ['patients.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('ngram', 'patient_id')
+    )
+    op.create_index(op.f('ix_patient_search_ngrams_patient_id'), 'patient_search_ngrams', ['patient_id'], unique=False)
+
+    # Индекс строится из уже посчитанных search_tokens
+    op.execute(
+        """
+        INSERT INTO patient_search_ngrams (ngram, patient_id)
+        SELECT DISTINCT token, p.id
+        FROM patients p, unnest(string_to_array(p.search_tokens, ' ')) AS token
+        WHERE token <> '' AND length(token) <= 3
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_patient_search_ngrams_patient_id'), table_name='patient_search_ngrams')
+    op.drop_table('patient_search_ngrams')
@@ -0,0 +1,40 @@
+"""user_sessions refresh_token_hash
+
+Revision ID: f1c4a8e2b6d9
+Revises: d3b8f41c6a27
+Create Date: 2026-10-19 15:02:41.377215
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f1c4a8e2b6d9'
+down_revision: Union[str, None] = 'd3b8f41c6a27'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        'user_sessions',
+        sa.Column(
+            'refresh_token_hash',
+            sa.String(length=64),
+            nullable=True,
+            comment='HMAC-SHA256 refresh токена для поиска сессии без расшифровки',
+        ),
+    )
+    op.create_index(
+        'idx_user_sessions_refresh_token_hash', 'user_sessions', ['refresh_token_hash'], unique=False
+    )
+    # Хэши существующих сессий заполняются командой
+    # python -m cor_lab.tools.backfill_refresh_token_hashes (нужны ключи пользователей)
+
+
+def downgrade() -> None:
+    op.drop_index('idx_user_sessions_refresh_token_hash', table_name='user_sessions')
+    op.drop_column('user_sessions', 'refresh_token_hash')
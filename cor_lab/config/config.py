@@ -26,6 +26,7 @@ class Settings(BaseSettings):
     debug: bool = "FALSE"
     reload: bool = "False"
     aes_key: str = "key"
+    refresh_token_hmac_key: str = "REFRESH_TOKEN_HMAC_KEY"
     corid_facility_key: int = "1"
     admin_accounts: list = json.loads(os.getenv("ETERNAL_ACCOUNTS", "[]"))
     redis_host: str = "REDIS_HOST"
@@ -44,6 +45,22 @@ class Settings(BaseSettings):
     allowed_redirect_urls: list = json.loads(os.getenv("ALLOWED_REDIRECT_URLS", "[]"))
     lawyer_accounts: list = json.loads(os.getenv("LAWYER_ACCOUNTS", "[]"))
     allowed_hosts: list = json.loads(os.getenv("ALLOWED_HOSTS", "[]"))
+    print_queue_concurrency: int = 2
+    print_queue_max_attempts: int = 3
+    print_queue_backoff_seconds: float = 1.0
+    print_job_ttl: int = 86400
+    principal_cache_ttl: int = 300
+    principal_cache_max_entries: int = 10000
+    user_key_cache_ttl: int = 60
+    user_key_cache_max_entries: int = 1024
+    crypto_executor_workers: int = 4
+    activity_flush_interval: int = 30
+    rate_limit_sync_interval: float = 1.0
+    rate_limit_sync_batch: int = 5
+    rate_limit_max_entries: int = 100000
+    websocket_registry_ttl: int = 60
+    websocket_send_timeout: float = 5.0
+    websocket_command_queue_size: int = 1000
 
     class Config:
 
@@ -13,6 +13,7 @@ from sqlalchemy import (
     UniqueConstraint,
     func,
     Boolean,
+    Float,
     LargeBinary,
 )
 from sqlalchemy.orm import declarative_base, relationship
@@ -156,6 +157,7 @@ class User(Base):
     unique_cipher_key = Column(
         String(250), nullable=False
     )
+    is_active = Column(Boolean, nullable=False, default=True, server_default="true")
     # Связи
 
     user_records = relationship(
@@ -200,6 +202,11 @@ class UserSession(Base):
         comment="JTI последнего Access токена, выданного для этой сессии",
     )
     refresh_token = Column(LargeBinary, nullable=True)
+    refresh_token_hash = Column(
+        String(64),
+        nullable=True,
+        comment="HMAC-SHA256 refresh токена для поиска сессии без расшифровки",
+    )
     access_token = Column(LargeBinary, nullable=True)
     created_at = Column(DateTime, nullable=False, default=func.now())
     updated_at = Column(
@@ -212,6 +219,7 @@ class UserSession(Base):
     # Индексы
     __table_args__ = (
         Index("idx_user_sessions_user_id", "user_id"),
+        Index("idx_user_sessions_refresh_token_hash", "refresh_token_hash"),
         UniqueConstraint("user_id", "device_info", name="uq_user_device_session"),
     )
 
@@ -394,6 +402,23 @@ class Patient(Base):
         return f"<Patient(id='{self.id}', patient_cor_id='{self.patient_cor_id}')>"
 
 
+class PatientSearchNgram(Base):
+    """
+    Инвертированный индекс поиска пациентов: n-грамма ФИО -> пациент.
+    Строится из search_tokens; первичный ключ (ngram, patient_id) служит
+    индексом для выборки кандидатов по n-граммам запроса.
+    """
+
+    __tablename__ = "patient_search_ngrams"
+    ngram = Column(String(3), primary_key=True)
+    patient_id = Column(
+        String(36),
+        ForeignKey("patients.id", ondelete="CASCADE"),
+        primary_key=True,
+        index=True,
+    )
+
+
 class PatientClinicStatusModel(Base):
     __tablename__ = "clinic_patient_statuses"
     id = Column(String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
@@ -447,6 +472,8 @@ class Case(Base):
     is_printed_cassette = Column(Boolean, nullable=True, default=False)
     is_printed_glass = Column(Boolean, nullable=True, default=False)
     is_printed_qr = Column(Boolean, nullable=True, default=False)
+    # Срочность кейса; приоритет в рабочем списке выводится из неё (case_worklist)
+    urgency = Column(Enum(UrgencyType), nullable=True)
 
     samples = relationship(
         "Sample", back_populates="case", cascade="all, delete-orphan"
@@ -468,6 +495,29 @@ class Case(Base):
     )
 
 
+# Рабочий список открытых кейсов (страницы "Текущие кейсы")
+class CaseWorklistEntry(Base):
+    __tablename__ = "case_worklist"
+
+    case_id = Column(
+        String(36), ForeignKey("cases.id", ondelete="CASCADE"), primary_key=True
+    )
+    sort_priority = Column(Integer, nullable=False)
+    creation_date = Column(DateTime, nullable=False)
+    case_code = Column(String(250), nullable=True)
+    patient_id = Column(String(36), nullable=True)
+    urgency = Column(Enum(UrgencyType), nullable=True)
+
+    __table_args__ = (
+        Index(
+            "idx_case_worklist_order",
+            sort_priority,
+            creation_date.desc(),
+            case_id.desc(),
+        ),
+    )
+
+
 # Банка
 class Sample(Base):
     __tablename__ = "samples"
@@ -626,6 +676,9 @@ class PrintingDevice(Base):
     port = Column(Integer, nullable=True)
     comment = Column(String, nullable=True)
     location = Column(String, nullable=True)
+    # Настройки HTTP-клиента принтера; None - значения по умолчанию
+    max_connections = Column(Integer, nullable=True)
+    timeout_seconds = Column(Float, nullable=True)
 
 
 class DoctorSignature(Base):
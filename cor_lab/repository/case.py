@@ -1,13 +1,27 @@
-import base64
 from enum import Enum
 import re
-from typing import Any, Dict, List, Optional
-from fastapi import APIRouter, HTTPException, Request, UploadFile, status
-from sqlalchemy import and_, func, literal_column, select
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Tuple
+from fastapi import APIRouter, HTTPException, UploadFile, status
+from sqlalchemy import (
+    ARRAY,
+    String,
+    and_,
+    any_,
+    delete,
+    exists,
+    func,
+    inspect,
+    literal,
+    literal_column,
+    select,
+    update,
+)
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
-from cor_lab.repository.cassette import print_cassette_data
-from cor_lab.repository.glass import print_glass_data
+from cor_lab.repository.case_worklist import (
+    fetch_current_cases_page,
+    refresh_case_worklist,
+)
 from cor_lab.repository.lawyer import get_doctor
 from cor_lab.repository.patient import get_patient_by_corid
 from cor_lab.schemas import (
@@ -21,7 +35,6 @@ from cor_lab.schemas import (
     CaseParametersScheema,
     CaseWithOwner,
     CassetteForGlassPage,
-    CassettePrinting,
     CassetteTestForGlassPage,
     DoctorDiagnosisSchema,
     DoctorResponseForSignature,
@@ -29,9 +42,8 @@ from cor_lab.schemas import (
     FirstCaseGlassDetailsSchemaWithOwner,
     FirstCaseReferralDetailsWithOwner,
     FirstCaseTestGlassDetailsSchema,
-    GeneralPrinting,
-    GlassPrinting,
     GlassTestModelScheema,
+    LabelPrintResult,
     LastCaseExcisionDetailsSchemaWithOwner,
     PatientFinalReportPageResponse,
     PatientTestReportPageResponse,
@@ -65,9 +77,6 @@ from cor_lab.schemas import (
 from cor_lab.database import models as db_models
 import uuid
 from datetime import date, datetime
-from cor_lab.services.cipher import decrypt_data
-from loguru import logger
-from cor_lab.config.config import settings
 from string import ascii_uppercase
 
 
@@ -194,6 +203,7 @@ async def create_cases_with_initial_data(
             bank_count=0,
             cassette_count=0,
             glass_count=0,
+            urgency=body.urgency,
         )
         db_case.case_code = await generate_case_code(
             urgency_char, year_short, material_type_char, next_number
@@ -219,6 +229,7 @@ async def create_cases_with_initial_data(
             material_type=body.material_type,
         )
         db.add(db_case_parameters)
+        await refresh_case_worklist(db, [db_case.id])
 
         await db.commit()
         await db.refresh(db_case_parameters)
@@ -314,18 +325,7 @@ async def get_case(db: AsyncSession, case_id: str) -> Optional[Dict[str, Any]]:
         if i == 0 and sample_db:
             await db.refresh(sample_db, attribute_names=["cassette"])
 
-            def sort_cassettes(cassette: db_models.Cassette):
-                match = re.match(r"([A-Z]+)(\d+)", cassette.cassette_number)
-                if match:
-                    letter_part = match.group(1)
-                    number_part = int(match.group(2))
-                    return (letter_part, number_part)
-                return (
-                    cassette.cassette_number,
-                    0,
-                )  # Для случаев, если формат не совпадает
-
-            sorted_cassettes_db = sorted(sample_db.cassette, key=sort_cassettes)
+            sorted_cassettes_db = sorted(sample_db.cassette, key=_cassette_sort_key)
 
             for cassette_db in sorted_cassettes_db:
                 await db.refresh(cassette_db, attribute_names=["glass"])
@@ -475,9 +475,11 @@ async def update_case_parameters(
             )
 
         db_case.case_code = new_case_code
+        db_case.urgency = urgency
         db.add(db_case)
 
     db.add(case_parameters_db)
+    await refresh_case_worklist(db, [case_id])
     await db.commit()
 
     await db.refresh(case_parameters_db)
@@ -514,22 +516,64 @@ async def get_single_case_by_case_code(db: AsyncSession, case_code: str) -> db_m
     return result.scalar_one_or_none()
 
 async def delete_cases(db: AsyncSession, case_ids: List[str]) -> Dict[str, Any]:
-    """Асинхронно удаляет кейс."""
-    deleted_count = 0
-    not_found_ids: List[str] = []
-    for case_id in case_ids:
-        result = await db.execute(
-            select(db_models.Case).where(db_models.Case.id == case_id)
-        )
-        db_case = result.scalar_one_or_none()
+    """
+    Асинхронно удаляет кейсы вместе со всеми зависимыми записями
+    (семплы, кассеты, стёкла, параметры, направления, заключения) в одной транзакции.
+    """
+    target_ids = _any_of(case_ids)
+    case_sample_ids = select(db_models.Sample.id).where(
+        db_models.Sample.case_id == target_ids
+    )
+    case_cassette_ids = select(db_models.Cassette.id).where(
+        db_models.Cassette.sample_id.in_(case_sample_ids)
+    )
+    case_report_ids = select(db_models.Report.id).where(
+        db_models.Report.case_id == target_ids
+    )
+    case_diagnosis_ids = select(db_models.DoctorDiagnosis.id).where(
+        db_models.DoctorDiagnosis.report_id.in_(case_report_ids)
+    )
+    case_referral_ids = select(db_models.Referral.id).where(
+        db_models.Referral.case_id == target_ids
+    )
+
+    dependent_deletes = [
+        delete(db_models.ReportSignature).where(
+            db_models.ReportSignature.diagnosis_entry_id.in_(case_diagnosis_ids)
+        ),
+        delete(db_models.DoctorDiagnosis).where(
+            db_models.DoctorDiagnosis.report_id.in_(case_report_ids)
+        ),
+        delete(db_models.Report).where(db_models.Report.case_id == target_ids),
+        delete(db_models.ReferralAttachment).where(
+            db_models.ReferralAttachment.referral_id.in_(case_referral_ids)
+        ),
+        delete(db_models.Referral).where(db_models.Referral.case_id == target_ids),
+        delete(db_models.CaseParameters).where(
+            db_models.CaseParameters.case_id == target_ids
+        ),
+        delete(db_models.Glass).where(
+            db_models.Glass.cassette_id.in_(case_cassette_ids)
+        ),
+        delete(db_models.Cassette).where(
+            db_models.Cassette.sample_id.in_(case_sample_ids)
+        ),
+        delete(db_models.Sample).where(db_models.Sample.case_id == target_ids),
+    ]
+    for statement in dependent_deletes:
+        await db.execute(statement.execution_options(synchronize_session=False))
 
-        if db_case:
-            await db.delete(db_case)
-            deleted_count += 1
-            await db.commit()
-        else:
-            not_found_ids.append(case_id)
+    deleted_result = await db.execute(
+        delete(db_models.Case)
+        .where(db_models.Case.id == target_ids)
+        .returning(db_models.Case.id)
+        .execution_options(synchronize_session=False)
+    )
+    deleted_ids = set(deleted_result.scalars().all())
+    await db.commit()
 
+    deleted_count = len(deleted_ids)
+    not_found_ids = [case_id for case_id in case_ids if case_id not in deleted_ids]
     response = {
         "deleted_count": deleted_count,
         "message": f"Успешно удалено {deleted_count} кейсов.",
@@ -577,18 +621,9 @@ async def get_patient_first_case_details(
             if i == 0 and sample_db:
                 await db.refresh(sample_db, attribute_names=["cassette"])
 
-                def sort_cassettes(cassette: db_models.Cassette):
-                    match = re.match(r"([A-Z]+)(\d+)", cassette.cassette_number)
-                    if match:
-                        letter_part = match.group(1)
-                        number_part = int(match.group(2))
-                        return (letter_part, number_part)
-                    return (
-                        cassette.cassette_number,
-                        0,
-                    )
-
-                sorted_cassettes_db = sorted(sample_db.cassette, key=sort_cassettes)
+                sorted_cassettes_db = sorted(
+                    sample_db.cassette, key=_cassette_sort_key
+                )
 
                 for cassette_db in sorted_cassettes_db:
                     await db.refresh(cassette_db, attribute_names=["glass"])
@@ -674,6 +709,7 @@ async def update_case_code_suffix(db: AsyncSession, case_id: str, new_suffix: st
         )
 
     db_case.case_code = new_full_case_code
+    await refresh_case_worklist(db, [db_case.id])
     await db.commit()
     await db.refresh(db_case)
 
@@ -965,11 +1001,13 @@ async def get_patient_case_details_for_glass_page(
     current_doctor_id: str,
     router: APIRouter,
     case_id=Optional[str],
+    include_report_details: bool = True,
 ) -> PatientGlassPageResponse:
     """
     Асинхронно получает список всех кейсов пациента и полную детализацию (включая все стёкла)
     для первого кейса, отсортированного по дате создания.
     Используется для вкладки "Стёкла" на странице врача.
+    report_details строится, только если include_report_details.
     """
     is_case_owner = False
     cases_result = await db.execute(
@@ -1015,88 +1053,16 @@ async def get_patient_case_details_for_glass_page(
         last_case_full_info_result = await db.execute(
             select(db_models.Case)
             .where(db_models.Case.id == first_case_id)
-            .options(
-                selectinload(db_models.Case.case_parameters),
-                selectinload(db_models.Case.report).options(
-                    selectinload(db_models.Report.doctor_diagnoses).options(
-                        selectinload(db_models.DoctorDiagnosis.doctor),
-                        selectinload(db_models.DoctorDiagnosis.signature).options(
-                            selectinload(db_models.ReportSignature.doctor),
-                            selectinload(db_models.ReportSignature.doctor_signature),
-                        ),
-                    )
-                ),
-                selectinload(db_models.Case.samples)
-                .selectinload(db_models.Sample.cassette)
-                .selectinload(db_models.Cassette.glass),
-            )
+            .options(*_glass_page_case_options(include_report_details))
         )
         last_case_with_relations = last_case_full_info_result.scalar_one_or_none()
-        patient_db = await get_patient_by_corid(
-            db=db, cor_id=last_case_with_relations.patient_id
-        )
-        referral_db = await get_referral_by_case(
-            db=db, case_id=last_case_with_relations.id
-        )
-
-        report_details = await _format_final_report_response(
-            db=db,
-            db_report=last_case_with_relations.report,
-            db_case_parameters=last_case_with_relations.case_parameters,
-            router=router,
-            patient_db=patient_db,
-            referral_db=referral_db,
-            case_db=last_case_with_relations,
-            current_doctor_id=current_doctor_id,
-        )
-        samples_result = await db.execute(
-            select(db_models.Sample)
-            .where(db_models.Sample.case_id == last_case_with_relations.id)
-            .options(
-                selectinload(db_models.Sample.cassette).selectinload(
-                    db_models.Cassette.glass
-                )
+        if include_report_details:
+            report_details = await _build_glass_page_report_details(
+                db=db, case_db=last_case_with_relations, router=router
             )
-            .order_by(db_models.Sample.sample_number)
+        first_case_samples_schematized = _build_glass_page_samples(
+            last_case_with_relations
         )
-        first_case_samples_db = samples_result.scalars().all()
-
-        first_case_samples_schematized: List[SampleForGlassPage] = []
-
-        for sample_db in first_case_samples_db:
-
-            def sort_cassettes(cassette: db_models.Cassette):
-                match = re.match(r"([A-Z]+)(\d+)", cassette.cassette_number)
-                if match:
-                    letter_part = match.group(1)
-                    number_part = int(match.group(2))
-                    return (letter_part, number_part)
-                return (cassette.cassette_number, 0)
-
-            sorted_cassettes_db = sorted(sample_db.cassette, key=sort_cassettes)
-
-            cassettes_for_sample = []
-            for cassette_db in sorted_cassettes_db:
-                sorted_glasses_db = sorted(
-                    cassette_db.glass, key=lambda glass: glass.glass_number
-                )
-
-                glasses_for_cassette = [
-                    GlassModelScheema.model_validate(glass).model_dump()
-                    for glass in sorted_glasses_db
-                ]
-
-                cassette_schematized = CassetteForGlassPage.model_validate(
-                    cassette_db
-                ).model_dump()
-                cassette_schematized["glasses"] = glasses_for_cassette
-                cassettes_for_sample.append(cassette_schematized)
-
-            sample_schematized = SampleForGlassPage.model_validate(
-                sample_db
-            ).model_dump()
-            sample_schematized["cassettes"] = cassettes_for_sample
-            first_case_samples_schematized.append(sample_schematized)
 
         first_case_details_for_glass = FirstCaseGlassDetailsSchemaWithOwner(
             id=last_case_with_relations.id,
@@ -1129,8 +1095,10 @@ async def get_current_cases_glass_details(
     current_doctor_id: str,
     router: APIRouter,
     case_id=Optional[str],
+    cursor: Optional[str] = None,
     skip: int = 0,
     limit: int = 10,
+    include_report_details: bool = True,
 ) -> PatientGlassPageResponse:
     """
     Получает список "текущих кейсов + стёкла" для страницы "Текущие кейсы" вкладка "Стёкла".
@@ -1142,157 +1110,27 @@ async def get_current_cases_glass_details(
     Сортировка:
     - Сначала кейсы "F"/"U" (по creation_date DESC).
     - Затем кейсы "S" (по creation_date DESC).
+
+    report_details строится, только если include_report_details.
     """
     
     case_id_query = case_id
-    cases_fu_subquery = (
-        select(
-            db_models.Case.id,
-            db_models.Case.case_code,
-            db_models.Case.creation_date,
-            db_models.Case.patient_id,
-            db_models.Case.grossing_status,
-            db_models.Case.bank_count,
-            db_models.Case.cassette_count,
-            db_models.Case.glass_count,
-            db_models.Case.pathohistological_conclusion,
-            db_models.Case.microdescription,
-            db_models.Case.is_printed_cassette,
-            db_models.Case.is_printed_glass,
-            db_models.Case.is_printed_qr,
-            db_models.Case.case_owner,
-            literal_column("1").label("sort_priority"),
-        ).where(
-            and_(
-                func.substr(db_models.Case.case_code, 1, 1).in_(["F", "U"]),
-                db_models.Case.grossing_status
-                != db_models.Grossing_status.COMPLETED.value,
-            )
-        )
-    ).subquery("cases_fu")
-
-    scanned_glass_exists_clause = (
-        select(1)
-        .select_from(db_models.Sample)
-        .join(db_models.Cassette, db_models.Sample.id == db_models.Cassette.sample_id)
-        .join(db_models.Glass, db_models.Cassette.id == db_models.Glass.cassette_id)
-        .where(db_models.Sample.case_id == db_models.Case.id)
-        .exists()
+    current_cases_page = await fetch_current_cases_page(
+        db=db,
+        current_doctor_id=current_doctor_id,
+        cursor=cursor,
+        skip=skip,
+        limit=limit,
     )
+    all_current_cases_raw = current_cases_page.rows
+    current_cases_list = current_cases_page.cases
 
-    cases_s_subquery = (
-        select(
-            db_models.Case.id,
-            db_models.Case.case_code,
-            db_models.Case.creation_date,
-            db_models.Case.patient_id,
-            db_models.Case.grossing_status,
-            db_models.Case.bank_count,
-            db_models.Case.cassette_count,
-            db_models.Case.glass_count,
-            db_models.Case.pathohistological_conclusion,
-            db_models.Case.microdescription,
-            db_models.Case.is_printed_cassette,
-            db_models.Case.is_printed_glass,
-            db_models.Case.is_printed_qr,
-            db_models.Case.case_owner,
-            literal_column("2").label("sort_priority"),
-        ).where(
-            and_(
-                func.substr(db_models.Case.case_code, 1, 1) == "S",
-                db_models.Case.grossing_status
-                != db_models.Grossing_status.COMPLETED.value,
-                scanned_glass_exists_clause,
-            )
-        )
-    ).subquery("cases_s")
-
-    combined_query_for_data = select(
-        cases_fu_subquery.c.id,
-        cases_fu_subquery.c.case_code,
-        cases_fu_subquery.c.creation_date,
-        cases_fu_subquery.c.patient_id,
-        cases_fu_subquery.c.grossing_status,
-        cases_fu_subquery.c.bank_count,
-        cases_fu_subquery.c.cassette_count,
-        cases_fu_subquery.c.glass_count,
-        cases_fu_subquery.c.pathohistological_conclusion,
-        cases_fu_subquery.c.microdescription,
-        cases_fu_subquery.c.sort_priority,
-        cases_fu_subquery.c.is_printed_cassette,
-        cases_fu_subquery.c.is_printed_glass,
-        cases_fu_subquery.c.is_printed_qr,
-        cases_fu_subquery.c.case_owner,
-    ).union_all(
-        select(
-            cases_s_subquery.c.id,
-            cases_s_subquery.c.case_code,
-            cases_s_subquery.c.creation_date,
-            cases_s_subquery.c.patient_id,
-            cases_s_subquery.c.grossing_status,
-            cases_s_subquery.c.bank_count,
-            cases_s_subquery.c.cassette_count,
-            cases_s_subquery.c.glass_count,
-            cases_s_subquery.c.pathohistological_conclusion,
-            cases_s_subquery.c.microdescription,
-            cases_s_subquery.c.sort_priority,
-            cases_s_subquery.c.is_printed_cassette,
-            cases_s_subquery.c.is_printed_glass,
-            cases_s_subquery.c.is_printed_qr,
-            cases_s_subquery.c.case_owner,
-        )
-    )
-
-    final_ordered_query = combined_query_for_data.order_by(
-        combined_query_for_data.c.sort_priority.asc(),
-        combined_query_for_data.c.creation_date.desc(),
-    )
-
-    paginated_results = await db.execute(final_ordered_query.offset(skip).limit(limit))
-    all_current_cases_raw = paginated_results.all()
-
-    current_cases_list: List[CaseModelScheema] = []
     first_case_details_for_glass: Optional[FirstCaseGlassDetailsSchema] = None
     report_details: Optional[FinalReportResponseSchema] = None
     case_owner: Optional[CaseOwnerResponse] = None
     last_case_with_relations: Optional[db_models.Case] = None
     is_case_owner = False
 
-    for row in all_current_cases_raw:
-        if current_doctor_id == row.case_owner:
-            is_case_owner = True
-        case_id = row.id
-        case_code = row.case_code
-        creation_date = row.creation_date
-        patient_id = row.patient_id
-        bank_count = row.bank_count
-        cassette_count = row.cassette_count
-        glass_count = row.glass_count
-        grossing_status = db_models.Grossing_status(row.grossing_status)
-        pathohistological_conclusion = row.pathohistological_conclusion
-        microdescription = row.microdescription
-        is_printed_cassette = row.is_printed_cassette
-        is_printed_glass = row.is_printed_glass
-        is_printed_qr = row.is_printed_qr
-        current_cases_list.append(
-            CaseWithOwner(
-                id=case_id,
-                case_code=case_code,
-                creation_date=creation_date,
-                patient_id=patient_id,
-                grossing_status=grossing_status,
-                bank_count=bank_count,
-                cassette_count=cassette_count,
-                glass_count=glass_count,
-                pathohistological_conclusion=pathohistological_conclusion,
-                microdescription=microdescription,
-                is_printed_cassette=is_printed_cassette,
-                is_printed_glass=is_printed_glass,
-                is_printed_qr=is_printed_qr,
-                is_case_owner = is_case_owner
-            )
-        )
-
     # !!!Детали последнего кейса!!!
     if all_current_cases_raw:
         first_case_db = all_current_cases_raw[0]
@@ -1304,87 +1142,16 @@ async def get_current_cases_glass_details(
         last_case_full_info_result = await db.execute(
             select(db_models.Case)
             .where(db_models.Case.id == first_case_id)
-            .options(
-                selectinload(db_models.Case.case_parameters),
-                selectinload(db_models.Case.report).options(
-                    selectinload(db_models.Report.doctor_diagnoses).options(
-                        selectinload(db_models.DoctorDiagnosis.doctor),
-                        selectinload(db_models.DoctorDiagnosis.signature).options(
-                            selectinload(db_models.ReportSignature.doctor),
-                            selectinload(db_models.ReportSignature.doctor_signature),
-                        ),
-                    )
-                ),
-                selectinload(db_models.Case.samples)
-                .selectinload(db_models.Sample.cassette)
-                .selectinload(db_models.Cassette.glass),
-            )
+            .options(*_glass_page_case_options(include_report_details))
         )
         last_case_with_relations = last_case_full_info_result.scalar_one_or_none()
-        patient_db = await get_patient_by_corid(
-            db=db, cor_id=last_case_with_relations.patient_id
-        )
-        referral_db = await get_referral_by_case(
-            db=db, case_id=last_case_with_relations.id
-        )
-
-        report_details = await _format_final_report_response(
-            db=db,
-            db_report=last_case_with_relations.report,
-            db_case_parameters=last_case_with_relations.case_parameters,
-            router=router,
-            patient_db=patient_db,
-            referral_db=referral_db,
-            case_db=last_case_with_relations,
-            current_doctor_id=current_doctor_id,
-        )
-        samples_result = await db.execute(
-            select(db_models.Sample)
-            .where(db_models.Sample.case_id == last_case_with_relations.id)
-            .options(
-                selectinload(db_models.Sample.cassette).selectinload(
-                    db_models.Cassette.glass
-                )
+        if include_report_details:
+            report_details = await _build_glass_page_report_details(
+                db=db, case_db=last_case_with_relations, router=router
             )
-            .order_by(db_models.Sample.sample_number)
+        first_case_samples_schematized = _build_glass_page_samples(
+            last_case_with_relations
         )
-        first_case_samples_db = samples_result.scalars().all()
-
-        first_case_samples_schematized: List[SampleForGlassPage] = []
-        for sample_db in first_case_samples_db:
-
-            def sort_cassettes(cassette: db_models.Cassette):
-                match = re.match(r"([A-Z]+)(\d+)", cassette.cassette_number)
-                if match:
-                    letter_part = match.group(1)
-                    number_part = int(match.group(2))
-                    return (letter_part, number_part)
-                return (cassette.cassette_number, 0)
-
-            sorted_cassettes_db = sorted(sample_db.cassette, key=sort_cassettes)
-
-            cassettes_for_sample = []
-            for cassette_db in sorted_cassettes_db:
-                sorted_glasses_db = sorted(
-                    cassette_db.glass, key=lambda glass: glass.glass_number
-                )
-
-                glasses_for_cassette = [
-                    GlassModelScheema.model_validate(glass).model_dump()
-                    for glass in sorted_glasses_db
-                ]
-
-                cassette_schematized = CassetteForGlassPage.model_validate(
-                    cassette_db
-                ).model_dump()
-                cassette_schematized["glasses"] = glasses_for_cassette
-                cassettes_for_sample.append(cassette_schematized)
-
-            sample_schematized = SampleForGlassPage.model_validate(
-                sample_db
-            ).model_dump()
-            sample_schematized["cassettes"] = cassettes_for_sample
-            first_case_samples_schematized.append(sample_schematized)
         if current_doctor_id == last_case_with_relations.case_owner:
                 is_case_owner = True
         first_case_details_for_glass = FirstCaseGlassDetailsSchemaWithOwner(
@@ -1410,19 +1177,27 @@ async def get_current_cases_glass_details(
         first_case_details_for_glass=first_case_details_for_glass,
         case_owner=case_owner,
         report_details=report_details,
+        next_cursor=current_cases_page.next_cursor,
     )
 
 
 async def get_single_case_details_for_glass_page(
-    db: AsyncSession, case_id: str, current_doctor_id: str, router: APIRouter
+    db: AsyncSession,
+    case_id: str,
+    current_doctor_id: str,
+    router: APIRouter,
+    include_report_details: bool = True,
 ) -> SingleCaseGlassPageResponse:
     """
     Асинхронно получает список всех кейсов пациента и полную детализацию (включая все стёкла)
     для первого кейса, отсортированного по дате создания.
     Используется для вкладки "Стёкла" на странице врача.
+    report_details строится, только если include_report_details.
     """
     result = await db.execute(
-        select(db_models.Case).where(db_models.Case.id == case_id)
+        select(db_models.Case)
+        .where(db_models.Case.id == case_id)
+        .options(*_glass_page_case_options(include_report_details))
     )
     case_db = result.scalar_one_or_none()
     if not case_db:
@@ -1431,95 +1206,13 @@ async def get_single_case_details_for_glass_page(
     first_case_details_for_glass: Optional[FirstCaseGlassDetailsSchema] = None
     report_details = None
     case_owner: Optional[CaseOwnerResponse] = None
-    last_case_with_relations: Optional[db_models.Case] = None
 
     if case_db:
-        last_case_full_info_result = await db.execute(
-            select(db_models.Case)
-            .where(db_models.Case.id == case_db.id)
-            .options(
-                selectinload(db_models.Case.case_parameters),
-                selectinload(db_models.Case.report).options(
-                    selectinload(db_models.Report.doctor_diagnoses).options(
-                        selectinload(db_models.DoctorDiagnosis.doctor),
-                        selectinload(db_models.DoctorDiagnosis.signature).options(
-                            selectinload(db_models.ReportSignature.doctor),
-                            selectinload(db_models.ReportSignature.doctor_signature),
-                        ),
-                    )
-                ),
-                selectinload(db_models.Case.samples)
-                .selectinload(db_models.Sample.cassette)
-                .selectinload(db_models.Cassette.glass),
-            )
-        )
-        last_case_with_relations = last_case_full_info_result.scalar_one_or_none()
-        patient_db = await get_patient_by_corid(
-            db=db, cor_id=last_case_with_relations.patient_id
-        )
-        referral_db = await get_referral_by_case(
-            db=db, case_id=last_case_with_relations.id
-        )
-
-        report_details = await _format_final_report_response(
-            db=db,
-            db_report=last_case_with_relations.report,
-            db_case_parameters=last_case_with_relations.case_parameters,
-            router=router,
-            patient_db=patient_db,
-            referral_db=referral_db,
-            case_db=last_case_with_relations,
-            current_doctor_id=current_doctor_id,
-        )
-
-        samples_result = await db.execute(
-            select(db_models.Sample)
-            .where(db_models.Sample.case_id == case_db.id)
-            .options(
-                selectinload(db_models.Sample.cassette).selectinload(
-                    db_models.Cassette.glass
-                )
+        if include_report_details:
+            report_details = await _build_glass_page_report_details(
+                db=db, case_db=case_db, router=router
             )
-            .order_by(db_models.Sample.sample_number)
-        )
-        first_case_samples_db = samples_result.scalars().all()
-
-        first_case_samples_schematized: List[SampleForGlassPage] = []
-
-        for sample_db in first_case_samples_db:
-
-            def sort_cassettes(cassette: db_models.Cassette):
-                match = re.match(r"([A-Z]+)(\d+)", cassette.cassette_number)
-                if match:
-                    letter_part = match.group(1)
-                    number_part = int(match.group(2))
-                    return (letter_part, number_part)
-                return (cassette.cassette_number, 0)
-
-            sorted_cassettes_db = sorted(sample_db.cassette, key=sort_cassettes)
-
-            cassettes_for_sample = []
-            for cassette_db in sorted_cassettes_db:
-                sorted_glasses_db = sorted(
-                    cassette_db.glass, key=lambda glass: glass.glass_number
-                )
-
-                glasses_for_cassette = [
-                    GlassModelScheema.model_validate(glass).model_dump()
-                    for glass in sorted_glasses_db
-                ]
-
-                cassette_schematized = CassetteForGlassPage.model_validate(
-                    cassette_db
-                ).model_dump()
-                cassette_schematized["glasses"] = glasses_for_cassette
-                cassettes_for_sample.append(cassette_schematized)
-
-            sample_schematized = SampleForGlassPage.model_validate(
-                sample_db
-            ).model_dump()
-            sample_schematized["cassettes"] = cassettes_for_sample
-            first_case_samples_schematized.append(sample_schematized)
+        first_case_samples_schematized = _build_glass_page_samples(case_db)
 
         first_case_details_for_glass = FirstCaseGlassDetailsSchema(
             id=case_db.id,
@@ -1769,6 +1462,343 @@ async def get_single_case_details_for_excision_page(
     )
 
 
+class CaseReportViews(NamedTuple):
+    """
+    Результат однопроходной сборки отчётов по загруженному графу кейса.
+    """
+
+    draft_report: Optional[ReportResponseSchema]
+    glass_details: FirstCaseTestGlassDetailsSchema
+    final_report: Optional[FinalReportResponseSchema]
+
+
+def _cassette_sort_key(cassette: db_models.Cassette):
+    match = re.match(r"([A-Z]+)(\d+)", cassette.cassette_number)
+    if match:
+        return (match.group(1), int(match.group(2)))
+    return (cassette.cassette_number, 0)
+
+
+def _walk_case_graph(
+    case_db: db_models.Case,
+) -> List[Tuple[db_models.Sample, List[Tuple[db_models.Cassette, List[db_models.Glass]]]]]:
+    """
+    Обходит уже загруженный граф кейса (samples -> cassette -> glass) в порядке
+    отображения: семплы по номеру, кассеты по _cassette_sort_key, стёкла по номеру.
+    """
+    return [
+        (
+            sample_db,
+            [
+                (
+                    cassette_db,
+                    sorted(cassette_db.glass, key=lambda glass: glass.glass_number),
+                )
+                for cassette_db in sorted(sample_db.cassette, key=_cassette_sort_key)
+            ],
+        )
+        for sample_db in sorted(
+            case_db.samples, key=lambda sample: sample.sample_number
+        )
+    ]
+
+
+def _glass_page_case_options(include_report_details: bool) -> List[Any]:
+    """
+    Опции загрузки кейса для вкладки "Стёкла": дерево стёкол всегда,
+    параметры и заключение с подписями - только для report_details.
+    """
+    options: List[Any] = [
+        selectinload(db_models.Case.samples)
+        .selectinload(db_models.Sample.cassette)
+        .selectinload(db_models.Cassette.glass),
+    ]
+    if include_report_details:
+        options += [
+            selectinload(db_models.Case.case_parameters),
+            selectinload(db_models.Case.report).options(
+                selectinload(db_models.Report.doctor_diagnoses).options(
+                    selectinload(db_models.DoctorDiagnosis.doctor),
+                    selectinload(db_models.DoctorDiagnosis.signature).options(
+                        selectinload(db_models.ReportSignature.doctor),
+                        selectinload(db_models.ReportSignature.doctor_signature),
+                    ),
+                )
+            ),
+        ]
+    return options
+
+
+def _build_glass_page_samples(case_db: db_models.Case) -> List[Dict[str, Any]]:
+    """Строит дерево семплов -> кассет -> стёкол вкладки "Стёкла" по загруженному графу."""
+    samples_schematized: List[Dict[str, Any]] = []
+    for sample_db, cassettes in _walk_case_graph(case_db):
+        sample_schematized = SampleForGlassPage.model_validate(sample_db).model_dump()
+        sample_schematized["cassettes"] = []
+        for cassette_db, glasses in cassettes:
+            cassette_schematized = CassetteForGlassPage.model_validate(
+                cassette_db
+            ).model_dump()
+            cassette_schematized["glasses"] = [
+                GlassModelScheema.model_validate(glass).model_dump() for glass in glasses
+            ]
+            sample_schematized["cassettes"].append(cassette_schematized)
+        samples_schematized.append(sample_schematized)
+    return samples_schematized
+
+
+async def _build_glass_page_report_details(
+    db: AsyncSession, case_db: db_models.Case, router: APIRouter
+) -> Optional[FinalReportResponseSchema]:
+    """Финальный отчёт для вкладки "Стёкла" по уже загруженному графу кейса."""
+    patient_db = await get_patient_by_corid(db=db, cor_id=case_db.patient_id)
+    referral_db = await get_referral_by_case(db=db, case_id=case_db.id)
+    views = await assemble_case_report_views(
+        db=db,
+        case_db=case_db,
+        router=router,
+        patient_db=patient_db,
+        referral_db=referral_db,
+    )
+    return views.final_report
+
+
+def _build_doctor_diagnoses_schemas(
+    db_report: db_models.Report, router: APIRouter
+) -> List[DoctorDiagnosisSchema]:
+    """
+    Преобразует уже загруженные диагнозы заключения (вместе с подписями) в схемы.
+    Не выполняет запросов к базе данных.
+    """
+    doctor_diagnoses_schematized: List[DoctorDiagnosisSchema] = []
+    for dd_db in sorted(db_report.doctor_diagnoses, key=lambda x: x.created_at):
+        doctor_data = (
+            DoctorResponseForSignature.model_validate(dd_db.doctor)
+            if dd_db.doctor
+            else None
+        )
+
+        signature_data: Optional[ReportSignatureSchema] = None
+        if dd_db.signature:
+            signer_doctor_data = (
+                DoctorResponseForSignature.model_validate(dd_db.signature.doctor)
+                if dd_db.signature.doctor
+                else None
+            )
+
+            doctor_sig_response: Optional[DoctorSignatureResponse] = None
+            if dd_db.signature.doctor_signature:
+                signature_url = None
+                if dd_db.signature.doctor_signature.signature_scan_data:
+                    signature_url = router.url_path_for(
+                        "get_signature_attachment",
+                        signature_id=dd_db.signature.doctor_signature.id,
+                    )
+
+                doctor_sig_response = DoctorSignatureResponse(
+                    id=dd_db.signature.doctor_signature.id,
+                    doctor_id=dd_db.signature.doctor_signature.doctor_id,
+                    signature_name=dd_db.signature.doctor_signature.signature_name,
+                    signature_scan_data=signature_url,
+                    signature_scan_type=dd_db.signature.doctor_signature.signature_scan_type,
+                    is_default=dd_db.signature.doctor_signature.is_default,
+                    created_at=dd_db.signature.doctor_signature.created_at,
+                )
+            signature_data = ReportSignatureSchema(
+                id=dd_db.signature.id,
+                doctor=signer_doctor_data,
+                signed_at=dd_db.signature.signed_at,
+                doctor_signature=doctor_sig_response,
+            )
+
+        doctor_diagnoses_schematized.append(
+            DoctorDiagnosisSchema(
+                id=dd_db.id,
+                report_id=dd_db.report_id,
+                doctor=doctor_data,
+                created_at=dd_db.created_at,
+                immunohistochemical_profile=dd_db.immunohistochemical_profile,
+                molecular_genetic_profile=dd_db.molecular_genetic_profile,
+                pathomorphological_diagnosis=dd_db.pathomorphological_diagnosis,
+                icd_code=dd_db.icd_code,
+                comment=dd_db.comment,
+                report_macrodescription=dd_db.report_macrodescription,
+                report_microdescription=dd_db.report_microdescription,
+                signature=signature_data,
+            )
+        )
+    return doctor_diagnoses_schematized
+
+
+def _calculate_patient_age(birth_date: Optional[date]) -> Optional[int]:
+    if not birth_date:
+        return None
+    today = date.today()
+    return (
+        today.year
+        - birth_date.year
+        - ((today.month, today.day) < (birth_date.month, birth_date.day))
+    )
+
+
+async def assemble_case_report_views(
+    db: AsyncSession,
+    case_db: db_models.Case,
+    router: APIRouter,
+    patient_db: Optional[db_models.Patient] = None,
+    referral_db: Optional[db_models.Referral] = None,
+) -> CaseReportViews:
+    """
+    Собирает черновик заключения, дерево стёкол и финальный отчёт за один проход
+    по уже загруженному графу кейса (case_parameters, report -> doctor_diagnoses ->
+    signature, samples -> cassette -> glass).
+
+    Прикреплённые стёкла берутся из загруженного графа; отдельный запрос
+    выполняется только для стёкол, которых в графе нет.
+    Финальный отчёт собирается, только если передан patient_db.
+    """
+    db_report = case_db.report
+    if db_report is not None and "doctor_diagnoses" in inspect(db_report).unloaded:
+        await db.refresh(db_report, attribute_names=["doctor_diagnoses"])
+
+    case_params = case_db.case_parameters
+    macro_desc_from_params = case_params.macro_description if case_params else None
+    concatenated_macro_description = (
+        f"{macro_desc_from_params}" if macro_desc_from_params else " "
+    )
+
+    glasses_by_id: Dict[str, db_models.Glass] = {}
+    samples_schematized: List[SampleTestForGlassPage] = []
+    for sample_db, cassettes in _walk_case_graph(case_db):
+        cassettes_for_sample: List[CassetteTestForGlassPage] = []
+        for cassette_db, glasses in cassettes:
+            glasses_for_cassette: List[GlassTestModelScheema] = []
+            for glass in glasses:
+                glasses_by_id[glass.id] = glass
+                glasses_for_cassette.append(
+                    GlassTestModelScheema(
+                        id=glass.id,
+                        glass_number=glass.glass_number,
+                        cassette_id=glass.cassette_id,
+                        staining=glass.staining,
+                    )
+                )
+            cassettes_for_sample.append(
+                CassetteTestForGlassPage(
+                    id=cassette_db.id,
+                    cassette_number=cassette_db.cassette_number,
+                    sample_id=cassette_db.sample_id,
+                    glasses=glasses_for_cassette,
+                )
+            )
+
+        if sample_db.macro_description:
+            concatenated_macro_description += f"| {sample_db.macro_description}"
+        samples_schematized.append(
+            SampleTestForGlassPage(
+                id=sample_db.id,
+                sample_number=sample_db.sample_number,
+                case_id=sample_db.case_id,
+                sample_macro_description=sample_db.macro_description,
+                cassettes=cassettes_for_sample,
+            )
+        )
+
+    glass_details = FirstCaseTestGlassDetailsSchema(
+        id=case_db.id,
+        case_code=case_db.case_code,
+        creation_date=case_db.creation_date,
+        samples=samples_schematized,
+        grossing_status=case_db.grossing_status,
+    )
+
+    doctor_diagnoses_schematized: List[DoctorDiagnosisSchema] = []
+    attached_glasses_db: List[db_models.Glass] = []
+    if db_report is not None:
+        doctor_diagnoses_schematized = _build_doctor_diagnoses_schemas(
+            db_report, router
+        )
+        attached_glass_ids = db_report.attached_glass_ids or []
+        missing_glass_ids = [
+            glass_id for glass_id in attached_glass_ids if glass_id not in glasses_by_id
+        ]
+        if missing_glass_ids:
+            missing_glasses = await db.scalars(
+                select(db_models.Glass).where(db_models.Glass.id.in_(missing_glass_ids))
+            )
+            glasses_by_id.update({glass.id: glass for glass in missing_glasses.all()})
+        attached_glasses_db = [
+            glasses_by_id[glass_id]
+            for glass_id in attached_glass_ids
+            if glass_id in glasses_by_id
+        ]
+    attached_glasses_schematized = [
+        GlassModelScheema.model_validate(glass) for glass in attached_glasses_db
+    ]
+
+    draft_report: Optional[ReportResponseSchema] = None
+    if db_report is not None:
+        draft_report = ReportResponseSchema(
+            id=db_report.id,
+            case_id=db_report.case_id,
+            case_details=case_db,
+            macro_description_from_case_params=macro_desc_from_params,
+            microdescription_from_case=case_db.microdescription,
+            concatenated_macro_description=concatenated_macro_description,
+            doctor_diagnoses=doctor_diagnoses_schematized,
+            attached_glasses=attached_glasses_schematized,
+        )
+
+    final_report: Optional[FinalReportResponseSchema] = None
+    if patient_db is not None:
+        biomaterial_date = (
+            referral_db.biomaterial_date.date()
+            if referral_db and referral_db.biomaterial_date
+            else None
+        )
+        final_report = FinalReportResponseSchema(
+            id=db_report.id if db_report else None,
+            case_id=case_db.id,
+            case_code=case_db.case_code,
+            biopsy_date=biomaterial_date,
+            arrival_date=case_db.creation_date.date(),
+            report_date=case_db.closing_date.date() if case_db.closing_date else None,
+            patient_cor_id=patient_db.patient_cor_id,
+            patient_first_name=patient_db.first_name,
+            patient_surname=patient_db.last_name,
+            patient_middle_name=patient_db.middle_name,
+            patient_sex=patient_db.sex,
+            patient_birth_date=patient_db.birth_date,
+            patient_full_age=_calculate_patient_age(patient_db.birth_date),
+            patient_phone_number=patient_db.phone_number,
+            patient_email=patient_db.email,
+            concatenated_macro_description=concatenated_macro_description,
+            medical_card_number=referral_db.medical_card_number if referral_db else None,
+            medical_institution=referral_db.medical_institution if referral_db else None,
+            medical_department=referral_db.department if referral_db else None,
+            attending_doctor=referral_db.attending_doctor if referral_db else None,
+            clinical_data=referral_db.clinical_data if referral_db else None,
+            clinical_diagnosis=referral_db.clinical_diagnosis if referral_db else None,
+            painting=list(dict.fromkeys(glass.staining for glass in attached_glasses_db)),
+            macroarchive=case_params.macro_archive if case_params else None,
+            decalcification=case_params.decalcification if case_params else None,
+            fixation=case_params.fixation if case_params else None,
+            num_blocks=case_db.cassette_count,
+            containers_recieved=case_db.bank_count,
+            containers_actual=(
+                case_params.container_count_actual if case_params else None
+            ),
+            doctor_diagnoses=doctor_diagnoses_schematized,
+            attached_glasses=attached_glasses_schematized,
+        )
+
+    return CaseReportViews(
+        draft_report=draft_report,
+        glass_details=glass_details,
+        final_report=final_report,
+    )
+
+
 async def _format_report_response(
     db: AsyncSession,
     db_report: db_models.Report,
@@ -1779,6 +1809,8 @@ async def _format_report_response(
     Форматирует объект Report из базы данных в ReportResponseSchema.
     Теперь включает агрегированные диагнозы и их подписи,
     а также корректно обрабатывает перенос полей диагнозов в DoctorDiagnosis.
+    Используется после изменения заключения; для страниц чтения с уже
+    загруженным графом кейса см. assemble_case_report_views.
     """
 
     await db.refresh(
@@ -1816,64 +1848,7 @@ async def _format_report_response(
             GlassModelScheema.model_validate(g) for g in attached_glasses_db
         ]
 
-    doctor_diagnoses_schematized: List[DoctorDiagnosisSchema] = []
-    if db_report:
-        for dd_db in sorted(db_report.doctor_diagnoses, key=lambda x: x.created_at):
-            doctor_data = (
-                DoctorResponseForSignature.model_validate(dd_db.doctor)
-                if dd_db.doctor
-                else None
-            )
-
-            signature_data: Optional[ReportSignatureSchema] = None
-            if dd_db.signature:
-                signer_doctor_data = (
-                    DoctorResponseForSignature.model_validate(dd_db.signature.doctor)
-                    if dd_db.signature.doctor
-                    else None
-                )
-
-                doctor_sig_response: Optional[DoctorSignatureResponse] = None
-                if dd_db.signature.doctor_signature:
-                    signature_url = None
-                    if dd_db.signature.doctor_signature.signature_scan_data:
-                        signature_url = router.url_path_for(
-                            "get_signature_attachment",
-                            signature_id=dd_db.signature.doctor_signature.id,
-                        )
-
-                    doctor_sig_response = DoctorSignatureResponse(
-                        id=dd_db.signature.doctor_signature.id,
-                        doctor_id=dd_db.signature.doctor_signature.doctor_id,
-                        signature_name=dd_db.signature.doctor_signature.signature_name,
-                        signature_scan_data=signature_url,
-                        signature_scan_type=dd_db.signature.doctor_signature.signature_scan_type,
-                        is_default=dd_db.signature.doctor_signature.is_default,
-                        created_at=dd_db.signature.doctor_signature.created_at,
-                    )
-                signature_data = ReportSignatureSchema(
-                    id=dd_db.signature.id,
-                    doctor=signer_doctor_data,
-                    signed_at=dd_db.signature.signed_at,
-                    doctor_signature=doctor_sig_response,
-                )
-
-            doctor_diagnoses_schematized.append(
-                DoctorDiagnosisSchema(
-                    id=dd_db.id,
-                    report_id=dd_db.report_id,
-                    doctor=doctor_data,
-                    created_at=dd_db.created_at,
-                    immunohistochemical_profile=dd_db.immunohistochemical_profile,
-                    molecular_genetic_profile=dd_db.molecular_genetic_profile,
-                    pathomorphological_diagnosis=dd_db.pathomorphological_diagnosis,
-                    icd_code=dd_db.icd_code,
-                    comment=dd_db.comment,
-                    report_macrodescription=dd_db.report_macrodescription,
-                    report_microdescription=dd_db.report_microdescription,
-                    signature=signature_data,
-                )
-            )
+    doctor_diagnoses_schematized = _build_doctor_diagnoses_schemas(db_report, router)
 
     return ReportResponseSchema(
         id=db_report.id,
@@ -1913,12 +1888,10 @@ async def get_report_by_case_id(
         )
     )
     case_db = case_db.scalar_one_or_none()
-    all_samples_for_last_case_schematized: List[SampleTestForGlassPage] = []
     report_details = None
+    first_case_details_for_glass: Optional[FirstCaseTestGlassDetailsSchema] = None
     case_owner: Optional[CaseOwnerResponse] = None
     if case_db:
-        last_case_for_report = CaseModelScheema.model_validate(case_db)
-
         if not case_db.report:
             new_report = db_models.Report(case_id=case_db.id)
             db.add(new_report)
@@ -1926,71 +1899,11 @@ async def get_report_by_case_id(
             await db.refresh(new_report)
             case_db.report = new_report
 
-        report_details = await _format_report_response(
-            db=db, db_report=case_db.report, router=router, case_db=case_db
-        )
-        report_details.concatenated_macro_description = (
-            f"{report_details.macro_description_from_case_params}"
-            if report_details.macro_description_from_case_params
-            else " "
-        )
-
-        for sample_db in case_db.samples:
-
-            def sort_cassettes(cassette: db_models.Cassette):
-                match = re.match(r"([A-Z]+)(\d+)", cassette.cassette_number)
-                if match:
-                    letter_part = match.group(1)
-                    number_part = int(match.group(2))
-                    return (letter_part, number_part)
-                return (cassette.cassette_number, 0)
-
-            sorted_cassettes_db = sorted(sample_db.cassette, key=sort_cassettes)
-
-            cassettes_for_sample: List[CassetteTestForGlassPage] = []
-            for cassette_db in sorted_cassettes_db:
-                sorted_glasses_db = sorted(
-                    cassette_db.glass, key=lambda glass: glass.glass_number
-                )
-                glasses_for_cassette: List[GlassTestModelScheema] = []
-                for glass in sorted_glasses_db:
-                    glass = GlassTestModelScheema(
-                        id=glass.id,
-                        glass_number=glass.glass_number,
-                        cassette_id=glass.cassette_id,
-                        staining=glass.staining,
-                    )
-                    glasses_for_cassette.append(glass)
-
-                cassette_schematized = CassetteTestForGlassPage(
-                    id=cassette_db.id,
-                    cassette_number=cassette_db.cassette_number,
-                    sample_id=cassette_db.sample_id,
-                )
-                cassette_schematized.glasses = glasses_for_cassette
-                cassettes_for_sample.append(cassette_schematized)
-
-            sample_schematized = SampleTestForGlassPage(
-                id=sample_db.id,
-                sample_number=sample_db.sample_number,
-                case_id=sample_db.case_id,
-                sample_macro_description=sample_db.macro_description,
-            )
-            report_details.concatenated_macro_description += (
-                f"| {sample_db.macro_description}"
-                if sample_db.macro_description
-                else ""
-            )
-            sample_schematized.cassettes = cassettes_for_sample
-            all_samples_for_last_case_schematized.append(sample_schematized)
-
-        first_case_details_for_glass = FirstCaseTestGlassDetailsSchema(
-            id=case_db.id,
-            case_code=case_db.case_code,
-            creation_date=case_db.creation_date,
-            samples=all_samples_for_last_case_schematized,
-            grossing_status=case_db.grossing_status,
+        report_views = await assemble_case_report_views(
+            db=db, case_db=case_db, router=router
         )
+        report_details = report_views.draft_report
+        first_case_details_for_glass = report_views.glass_details
     if case_db:
         case_owner = await get_case_owner(
             db=db, case_id=case_db.id, doctor_id=current_doctor_id
@@ -2049,7 +1962,6 @@ async def get_patient_report_page_data(
 
     last_case_for_report: Optional[CaseWithOwner] = None
     report_details: Optional[ReportResponseSchema] = None
-    all_samples_for_last_case_schematized: List[SampleTestForGlassPage] = []
     first_case_details_for_glass: Optional[FirstCaseTestGlassDetailsSchema] = None
     case_owner: Optional[CaseOwnerResponse] = None
 
@@ -2108,74 +2020,11 @@ async def get_patient_report_page_data(
                 await db.refresh(new_report)
                 last_case_with_relations.report = new_report
 
-            report_details = await _format_report_response(
-                db=db,
-                db_report=last_case_with_relations.report,
-                router=router,
-                case_db=last_case_with_relations,
-            )
-            report_details.concatenated_macro_description = (
-                f"{report_details.macro_description_from_case_params}"
-                if report_details.macro_description_from_case_params
-                else " "
-            )
-
-            for sample_db in last_case_with_relations.samples:
-
-                def sort_cassettes(cassette: db_models.Cassette):
-                    match = re.match(r"([A-Z]+)(\d+)", cassette.cassette_number)
-                    if match:
-                        letter_part = match.group(1)
-                        number_part = int(match.group(2))
-                        return (letter_part, number_part)
-                    return (cassette.cassette_number, 0)
-
-                sorted_cassettes_db = sorted(sample_db.cassette, key=sort_cassettes)
-
-                cassettes_for_sample: List[CassetteTestForGlassPage] = []
-                for cassette_db in sorted_cassettes_db:
-                    sorted_glasses_db = sorted(
-                        cassette_db.glass, key=lambda glass: glass.glass_number
-                    )
-                    glasses_for_cassette: List[GlassTestModelScheema] = []
-                    for glass in sorted_glasses_db:
-                        glass = GlassTestModelScheema(
-                            id=glass.id,
-                            glass_number=glass.glass_number,
-                            cassette_id=glass.cassette_id,
-                            staining=glass.staining,
-                        )
-                        glasses_for_cassette.append(glass)
-
-                    cassette_schematized = CassetteTestForGlassPage(
-                        id=cassette_db.id,
-                        cassette_number=cassette_db.cassette_number,
-                        sample_id=cassette_db.sample_id,
-                    )
-                    cassette_schematized.glasses = glasses_for_cassette
-                    cassettes_for_sample.append(cassette_schematized)
-
-                sample_schematized = SampleTestForGlassPage(
-                    id=sample_db.id,
-                    sample_number=sample_db.sample_number,
-                    case_id=sample_db.case_id,
-                    sample_macro_description=sample_db.macro_description,
-                )
-                report_details.concatenated_macro_description += (
-                    f"| {sample_db.macro_description}"
-                    if sample_db.macro_description
-                    else ""
-                )
-                sample_schematized.cassettes = cassettes_for_sample
-                all_samples_for_last_case_schematized.append(sample_schematized)
-
-            first_case_details_for_glass = FirstCaseTestGlassDetailsSchema(
-                id=last_case_with_relations.id,
-                case_code=last_case_with_relations.case_code,
-                creation_date=last_case_with_relations.creation_date,
-                samples=all_samples_for_last_case_schematized,
-                grossing_status=last_case_with_relations.grossing_status,
+            report_views = await assemble_case_report_views(
+                db=db, case_db=last_case_with_relations, router=router
             )
+            report_details = report_views.draft_report
+            first_case_details_for_glass = report_views.glass_details
     if last_case_for_report:
         case_owner = await get_case_owner(
             db=db, case_id=last_case_for_report.id, doctor_id=current_doctor_id
@@ -2541,187 +2390,17 @@ async def _format_final_report_response(
     db_case_parameters: Optional[db_models.CaseParameters],
 ) -> ReportResponseSchema:
     """
-    Форматирует объект db_models.Report в ReportResponseSchema для финального отчета.
-    Эта функция должна быть обновлена для обработки doctor_diagnoses.
+    Форматирует объект db_models.Report в FinalReportResponseSchema для финального отчета.
+    Ожидает кейс с уже загруженным графом (см. assemble_case_report_views).
     """
-    try:
-        decoded_key = base64.b64decode(settings.aes_key)
-        patient_surname = (
-            await decrypt_data(patient_db.encrypted_surname, decoded_key)
-            if patient_db.encrypted_surname
-            else None
-        )
-        patient_first_name = (
-            await decrypt_data(patient_db.encrypted_first_name, decoded_key)
-            if patient_db.encrypted_first_name
-            else None
-        )
-        patient_middle_name = (
-            await decrypt_data(patient_db.encrypted_middle_name, decoded_key)
-            if patient_db.encrypted_middle_name
-            else None
-        )
-    except Exception as e:
-        print(e)
-    user_birth_year = patient_db.birth_date
-    if user_birth_year is None and patient_db.patient_cor_id:
-        cor_id_parts = patient_db.patient_cor_id.split("-")
-        if len(cor_id_parts) > 1:
-            year_part = cor_id_parts[1]
-            numbers = re.findall(r"\d+", year_part)
-            if numbers:
-                try:
-                    user_birth_year = numbers[0]
-                except ValueError:
-                    user_birth_year = None
-
-    patient_age: Optional[int] = None
-    if patient_db.birth_date:
-        today = date.today()
-        patient_age = (
-            today.year
-            - patient_db.birth_date.year
-            - (
-                (today.month, today.day)
-                < (patient_db.birth_date.month, patient_db.birth_date.day)
-            )
-        )
-
-    case_details_schema = None
-    doctor_diagnoses_schematized: List[DoctorDiagnosisSchema] = []
-    # if case_db:
-    #     case_details_schema = CaseModelScheema.model_validate(case_db)
-    if db_report:
-        await db.refresh(db_report, attribute_names=["doctor_diagnoses"])
-
-        doctor_diagnoses_schematized: List[DoctorDiagnosisSchema] = []
-        for dd_db in sorted(db_report.doctor_diagnoses, key=lambda x: x.created_at):
-            doctor_data = (
-                DoctorResponseForSignature.model_validate(dd_db.doctor)
-                if dd_db.doctor
-                else None
-            )
-
-            signature_data: Optional[ReportSignatureSchema] = None
-            if dd_db.signature:
-                signer_doctor_data = (
-                    DoctorResponseForSignature.model_validate(dd_db.signature.doctor)
-                    if dd_db.signature.doctor
-                    else None
-                )
-
-                doctor_sig_response: Optional[DoctorSignatureResponse] = None
-                if dd_db.signature.doctor_signature:
-                    signature_url = None
-                    if dd_db.signature.doctor_signature.signature_scan_data:
-                        signature_url = router.url_path_for(
-                            "get_signature_attachment",
-                            signature_id=dd_db.signature.doctor_signature.id,
-                        )
-
-                    doctor_sig_response = DoctorSignatureResponse(
-                        id=dd_db.signature.doctor_signature.id,
-                        doctor_id=dd_db.signature.doctor_signature.doctor_id,
-                        signature_name=dd_db.signature.doctor_signature.signature_name,
-                        signature_scan_data=signature_url,
-                        signature_scan_type=dd_db.signature.doctor_signature.signature_scan_type,
-                        is_default=dd_db.signature.doctor_signature.is_default,
-                        created_at=dd_db.signature.doctor_signature.created_at,
-                    )
-                signature_data = ReportSignatureSchema(
-                    id=dd_db.signature.id,
-                    doctor=signer_doctor_data,
-                    signed_at=dd_db.signature.signed_at,
-                    doctor_signature=doctor_sig_response,
-                )
-
-            doctor_diagnoses_schematized.append(
-                DoctorDiagnosisSchema(
-                    id=dd_db.id,
-                    report_id=dd_db.report_id,
-                    doctor=doctor_data,
-                    created_at=dd_db.created_at,
-                    immunohistochemical_profile=dd_db.immunohistochemical_profile,
-                    molecular_genetic_profile=dd_db.molecular_genetic_profile,
-                    pathomorphological_diagnosis=dd_db.pathomorphological_diagnosis,
-                    icd_code=dd_db.icd_code,
-                    comment=dd_db.comment,
-                    report_macrodescription=dd_db.report_macrodescription,
-                    report_microdescription=dd_db.report_microdescription,
-                    signature=signature_data,
-                )
-            )
-    if db_report:
-        attached_glass_ids = (
-            db_report.attached_glass_ids
-            if db_report.attached_glass_ids is not None
-            else []
-        )
-    else:
-        attached_glass_ids = []
-    attached_glasses_schemas: List[GlassModelScheema] = []
-    glass_stainings = []
-    if attached_glass_ids:
-        glasses_db = await db.scalars(
-            select(db_models.Glass).where(db_models.Glass.id.in_(attached_glass_ids))
-        )
-        for glass in glasses_db.all():
-            attached_glasses_schemas.append(GlassModelScheema.model_validate(glass))
-            glass_stainings.append(glass.staining)
-    glass_stainings = set(glass_stainings)
-    report = await get_report_by_case_id(
-        db=db, case_id=case_db.id, router=router, current_doctor_id=current_doctor_id
-    )
-    concatenated_macro_description = (
-        report.report_details.concatenated_macro_description
-    )
-    if db_report:
-        report_date_new = (
-            doctor_diagnoses_schematized[0].created_at.date()
-            if db_report.doctor_diagnoses
-            else None
-        )
-    else:
-        report_date_new = None
-    if referral_db:
-        if referral_db.biomaterial_date:
-            biomaterial_date = referral_db.biomaterial_date.date()
-        else:
-            biomaterial_date = None
-
-    return FinalReportResponseSchema(
-        id=db_report.id if db_report else None,
-        case_id=case_db.id,
-        case_code=case_db.case_code,
-        biopsy_date=biomaterial_date if referral_db else None,
-        arrival_date=case_db.creation_date.date() if case_db else None,
-        report_date=case_db.closing_date.date() if case_db.closing_date else None,
-        patient_cor_id=patient_db.patient_cor_id,
-        patient_first_name=patient_first_name,
-        patient_surname=patient_surname,
-        patient_middle_name=patient_middle_name,
-        patient_sex=patient_db.sex,
-        patient_birth_date=patient_db.birth_date,
-        patient_full_age=patient_age,
-        patient_phone_number=patient_db.phone_number,
-        patient_email=patient_db.email,
-        concatenated_macro_description=concatenated_macro_description,
-        medical_card_number=referral_db.medical_card_number if referral_db else None,
-        medical_institution=referral_db.medical_institution if referral_db else None,
-        medical_department=referral_db.department if referral_db else None,
-        attending_doctor=referral_db.attending_doctor if referral_db else None,
-        clinical_data=referral_db.clinical_data if referral_db else None,
-        clinical_diagnosis=referral_db.clinical_diagnosis if referral_db else None,
-        painting=glass_stainings,
-        macroarchive=db_case_parameters.macro_archive,
-        decalcification=db_case_parameters.decalcification,
-        fixation=db_case_parameters.fixation,
-        num_blocks=case_db.cassette_count,
-        containers_recieved=case_db.bank_count,
-        containers_actual=db_case_parameters.container_count_actual,
-        doctor_diagnoses=doctor_diagnoses_schematized,
-        attached_glasses=attached_glasses_schemas,
+    views = await assemble_case_report_views(
+        db=db,
+        case_db=case_db,
+        router=router,
+        patient_db=patient_db,
+        referral_db=referral_db,
     )
+    return views.final_report
 
 
 async def get_final_report_by_case_id(
@@ -2814,6 +2493,7 @@ async def get_current_case_details_for_excision_page(
     db: AsyncSession,
     current_doctor_id: str,
     case_id=Optional[str],
+    cursor: Optional[str] = None,
     skip: int = 0,
     limit: int = 10,
 ) -> PatientExcisionPageResponse:
@@ -2823,154 +2503,21 @@ async def get_current_case_details_for_excision_page(
     Используется для вкладки "Excision" (удаление/макроописание) на странице врача.
     """
     case_id_query = case_id
-    cases_fu_subquery = (
-        select(
-            db_models.Case.id,
-            db_models.Case.case_code,
-            db_models.Case.creation_date,
-            db_models.Case.patient_id,
-            db_models.Case.grossing_status,
-            db_models.Case.bank_count,
-            db_models.Case.cassette_count,
-            db_models.Case.glass_count,
-            db_models.Case.pathohistological_conclusion,
-            db_models.Case.microdescription,
-            db_models.Case.is_printed_cassette,
-            db_models.Case.is_printed_glass,
-            db_models.Case.is_printed_qr,
-            db_models.Case.case_owner,
-            literal_column("1").label("sort_priority"),
-        ).where(
-            and_(
-                func.substr(db_models.Case.case_code, 1, 1).in_(["F", "U"]),
-                db_models.Case.grossing_status
-                != db_models.Grossing_status.COMPLETED.value,
-            )
-        )
-    ).subquery("cases_fu")
-
-    scanned_glass_exists_clause = (
-        select(1)
-        .select_from(db_models.Sample)
-        .join(db_models.Cassette, db_models.Sample.id == db_models.Cassette.sample_id)
-        .join(db_models.Glass, db_models.Cassette.id == db_models.Glass.cassette_id)
-        .where(db_models.Sample.case_id == db_models.Case.id)
-        .exists()
+    current_cases_page = await fetch_current_cases_page(
+        db=db,
+        current_doctor_id=current_doctor_id,
+        cursor=cursor,
+        skip=skip,
+        limit=limit,
     )
+    all_current_cases_raw = current_cases_page.rows
+    current_cases_list = current_cases_page.cases
 
-    cases_s_subquery = (
-        select(
-            db_models.Case.id,
-            db_models.Case.case_code,
-            db_models.Case.creation_date,
-            db_models.Case.patient_id,
-            db_models.Case.grossing_status,
-            db_models.Case.bank_count,
-            db_models.Case.cassette_count,
-            db_models.Case.glass_count,
-            db_models.Case.pathohistological_conclusion,
-            db_models.Case.microdescription,
-            db_models.Case.is_printed_cassette,
-            db_models.Case.is_printed_glass,
-            db_models.Case.is_printed_qr,
-            db_models.Case.case_owner,
-            literal_column("2").label("sort_priority"),
-        ).where(
-            and_(
-                func.substr(db_models.Case.case_code, 1, 1) == "S",
-                db_models.Case.grossing_status
-                != db_models.Grossing_status.COMPLETED.value,
-                scanned_glass_exists_clause,
-            )
-        )
-    ).subquery("cases_s")
-
-    combined_query_for_data = select(
-        cases_fu_subquery.c.id,
-        cases_fu_subquery.c.case_code,
-        cases_fu_subquery.c.creation_date,
-        cases_fu_subquery.c.patient_id,
-        cases_fu_subquery.c.grossing_status,
-        cases_fu_subquery.c.bank_count,
-        cases_fu_subquery.c.cassette_count,
-        cases_fu_subquery.c.glass_count,
-        cases_fu_subquery.c.pathohistological_conclusion,
-        cases_fu_subquery.c.microdescription,
-        cases_fu_subquery.c.is_printed_cassette,
-        cases_fu_subquery.c.is_printed_glass,
-        cases_fu_subquery.c.is_printed_qr,
-        cases_fu_subquery.c.sort_priority,
-        cases_fu_subquery.c.case_owner,
-    ).union_all(
-        select(
-            cases_s_subquery.c.id,
-            cases_s_subquery.c.case_code,
-            cases_s_subquery.c.creation_date,
-            cases_s_subquery.c.patient_id,
-            cases_s_subquery.c.grossing_status,
-            cases_s_subquery.c.bank_count,
-            cases_s_subquery.c.cassette_count,
-            cases_s_subquery.c.glass_count,
-            cases_s_subquery.c.pathohistological_conclusion,
-            cases_s_subquery.c.microdescription,
-            cases_s_subquery.c.is_printed_cassette,
-            cases_s_subquery.c.is_printed_glass,
-            cases_s_subquery.c.is_printed_qr,
-            cases_s_subquery.c.sort_priority,
-            cases_s_subquery.c.case_owner,
-        )
-    )
-
-    final_ordered_query = combined_query_for_data.order_by(
-        combined_query_for_data.c.sort_priority.asc(),
-        combined_query_for_data.c.creation_date.desc(),
-    )
-
-    paginated_results = await db.execute(final_ordered_query.offset(skip).limit(limit))
-    all_current_cases_raw = paginated_results.all()
-
-    current_cases_list: List[CaseModelScheema] = []
     is_case_owner = False
 
-    for row in all_current_cases_raw:
-        case_id = row.id
-        case_code = row.case_code
-        creation_date = row.creation_date
-        patient_id = row.patient_id
-        bank_count = row.bank_count
-        cassette_count = row.cassette_count
-        glass_count = row.glass_count
-        grossing_status = db_models.Grossing_status(row.grossing_status)
-        pathohistological_conclusion = row.pathohistological_conclusion
-        microdescription = row.microdescription
-        is_printed_cassette = row.is_printed_cassette
-        is_printed_glass = row.is_printed_glass
-        is_printed_qr = row.is_printed_qr
-
-        if current_doctor_id == row.case_owner:
-            is_case_owner = True
-
-        current_cases_list.append(
-            CaseWithOwner(
-                id=case_id,
-                case_code=case_code,
-                creation_date=creation_date,
-                patient_id=patient_id,
-                grossing_status=grossing_status,
-                bank_count=bank_count,
-                cassette_count=cassette_count,
-                glass_count=glass_count,
-                pathohistological_conclusion=pathohistological_conclusion,
-                microdescription=microdescription,
-                is_printed_cassette=is_printed_cassette,
-                is_printed_glass=is_printed_glass,
-                is_printed_qr=is_printed_qr,
-                is_case_owner = is_case_owner
-            )
-        )
-
     last_case_details_for_excision: Optional[LastCaseExcisionDetailsSchema] = None
     case_owner: Optional[CaseOwnerResponse] = None
+    last_case_with_relations: Optional[db_models.Case] = None
 
     if all_current_cases_raw:
         last_case_db = all_current_cases_raw[0]
@@ -3037,6 +2584,7 @@ async def get_current_case_details_for_excision_page(
         all_cases=current_cases_list,
         last_case_details_for_excision=last_case_details_for_excision,
         case_owner=case_owner,
+        next_cursor=current_cases_page.next_cursor,
     )
 
 
@@ -3045,6 +2593,7 @@ async def get_current_cases_report_page_data(
     router: APIRouter,
     current_doctor_id: str,
     case_id=Optional[str],
+    cursor: Optional[str] = None,
     skip: int = 0,
     limit: int = 10,
 ) -> PatientTestReportPageResponse:
@@ -3056,160 +2605,23 @@ async def get_current_cases_report_page_data(
     - Все стёкла последнего кейса (для выбора, какие прикрепить).
     """
     case_id_query = case_id
-    cases_fu_subquery = (
-        select(
-            db_models.Case.id,
-            db_models.Case.case_code,
-            db_models.Case.creation_date,
-            db_models.Case.patient_id,
-            db_models.Case.grossing_status,
-            db_models.Case.bank_count,
-            db_models.Case.cassette_count,
-            db_models.Case.glass_count,
-            db_models.Case.pathohistological_conclusion,
-            db_models.Case.microdescription,
-            db_models.Case.case_owner,
-            db_models.Case.is_printed_cassette,
-            db_models.Case.is_printed_glass,
-            db_models.Case.is_printed_qr,
-            db_models.Case.case_owner,
-            literal_column("1").label("sort_priority"),
-        ).where(
-            and_(
-                func.substr(db_models.Case.case_code, 1, 1).in_(["F", "U"]),
-                db_models.Case.grossing_status
-                != db_models.Grossing_status.COMPLETED.value,
-            )
-        )
-    ).subquery("cases_fu")
-
-    scanned_glass_exists_clause = (
-        select(1)
-        .select_from(db_models.Sample)
-        .join(db_models.Cassette, db_models.Sample.id == db_models.Cassette.sample_id)
-        .join(db_models.Glass, db_models.Cassette.id == db_models.Glass.cassette_id)
-        .where(db_models.Sample.case_id == db_models.Case.id)
-        .exists()
-    )
-
-    cases_s_subquery = (
-        select(
-            db_models.Case.id,
-            db_models.Case.case_code,
-            db_models.Case.creation_date,
-            db_models.Case.patient_id,
-            db_models.Case.grossing_status,
-            db_models.Case.bank_count,
-            db_models.Case.cassette_count,
-            db_models.Case.glass_count,
-            db_models.Case.pathohistological_conclusion,
-            db_models.Case.microdescription,
-            db_models.Case.case_owner,
-            db_models.Case.is_printed_cassette,
-            db_models.Case.is_printed_glass,
-            db_models.Case.is_printed_qr,
-            db_models.Case.case_owner,
-            literal_column("2").label("sort_priority"),
-        ).where(
-            and_(
-                func.substr(db_models.Case.case_code, 1, 1) == "S",
-                db_models.Case.grossing_status
-                != db_models.Grossing_status.COMPLETED.value,
-                scanned_glass_exists_clause,
-            )
-        )
-    ).subquery("cases_s")
-
-    combined_query_for_data = select(
-        cases_fu_subquery.c.id,
-        cases_fu_subquery.c.case_code,
-        cases_fu_subquery.c.creation_date,
-        cases_fu_subquery.c.patient_id,
-        cases_fu_subquery.c.grossing_status,
-        cases_fu_subquery.c.bank_count,
-        cases_fu_subquery.c.cassette_count,
-        cases_fu_subquery.c.glass_count,
-        cases_fu_subquery.c.pathohistological_conclusion,
-        cases_fu_subquery.c.microdescription,
-        cases_fu_subquery.c.sort_priority,
-        cases_fu_subquery.c.case_owner,
-        cases_fu_subquery.c.is_printed_cassette,
-        cases_fu_subquery.c.is_printed_glass,
-        cases_fu_subquery.c.is_printed_qr,
-        cases_fu_subquery.c.case_owner,
-    ).union_all(
-        select(
-            cases_s_subquery.c.id,
-            cases_s_subquery.c.case_code,
-            cases_s_subquery.c.creation_date,
-            cases_s_subquery.c.patient_id,
-            cases_s_subquery.c.grossing_status,
-            cases_s_subquery.c.bank_count,
-            cases_s_subquery.c.cassette_count,
-            cases_s_subquery.c.glass_count,
-            cases_s_subquery.c.pathohistological_conclusion,
-            cases_s_subquery.c.microdescription,
-            cases_s_subquery.c.sort_priority,
-            cases_s_subquery.c.case_owner,
-            cases_s_subquery.c.is_printed_cassette,
-            cases_s_subquery.c.is_printed_glass,
-            cases_s_subquery.c.is_printed_qr,
-            cases_s_subquery.c.case_owner,
-        )
+    current_cases_page = await fetch_current_cases_page(
+        db=db,
+        current_doctor_id=current_doctor_id,
+        cursor=cursor,
+        skip=skip,
+        limit=limit,
     )
+    all_current_cases_raw = current_cases_page.rows
+    current_cases_list = current_cases_page.cases
 
-    final_ordered_query = combined_query_for_data.order_by(
-        combined_query_for_data.c.sort_priority.asc(),
-        combined_query_for_data.c.creation_date.desc(),
-    )
-
-    paginated_results = await db.execute(final_ordered_query.offset(skip).limit(limit))
-    all_current_cases_raw = paginated_results.all()
-
-    current_cases_list: List[CaseWithOwner] = []
     is_case_owner = False
 
-    for row in all_current_cases_raw:
-        case_id = row.id
-        case_code = row.case_code
-        creation_date = row.creation_date
-        patient_id = row.patient_id
-        bank_count = row.bank_count
-        cassette_count = row.cassette_count
-        glass_count = row.glass_count
-        grossing_status = db_models.Grossing_status(row.grossing_status)
-        pathohistological_conclusion = row.pathohistological_conclusion
-        microdescription = row.microdescription
-        is_printed_cassette = row.is_printed_cassette
-        is_printed_glass = row.is_printed_glass
-        is_printed_qr = row.is_printed_qr
-        if current_doctor_id == row.case_owner:
-            is_case_owner = True
-
-        current_cases_list.append(
-            CaseWithOwner(
-                id=case_id,
-                case_code=case_code,
-                creation_date=creation_date,
-                patient_id=patient_id,
-                grossing_status=grossing_status,
-                bank_count=bank_count,
-                cassette_count=cassette_count,
-                glass_count=glass_count,
-                pathohistological_conclusion=pathohistological_conclusion,
-                microdescription=microdescription,
-                is_printed_cassette=is_printed_cassette,
-                is_printed_glass=is_printed_glass,
-                is_printed_qr=is_printed_qr,
-                is_case_owner = is_case_owner
-            )
-        )
-
     last_case_for_report: Optional[CaseWithOwner] = None
     report_details: Optional[ReportResponseSchema] = None
-    all_samples_for_last_case_schematized: List[SampleTestForGlassPage] = []
     first_case_details_for_glass: Optional[FirstCaseTestGlassDetailsSchema] = None
     case_owner: Optional[CaseOwnerResponse] = None
+    last_case_with_relations: Optional[db_models.Case] = None
 
     if all_current_cases_raw:
         last_case_db_summary = all_current_cases_raw[0]
@@ -3266,63 +2678,11 @@ async def get_current_cases_report_page_data(
                 await db.refresh(new_report)
                 last_case_with_relations.report = new_report
 
-            report_details = await _format_report_response(
-                db=db,
-                db_report=last_case_with_relations.report,
-                router=router,
-                case_db=last_case_with_relations,
-            )
-
-            for sample_db in last_case_with_relations.samples:
-
-                def sort_cassettes(cassette: db_models.Cassette):
-                    match = re.match(r"([A-Z]+)(\d+)", cassette.cassette_number)
-                    if match:
-                        letter_part = match.group(1)
-                        number_part = int(match.group(2))
-                        return (letter_part, number_part)
-                    return (cassette.cassette_number, 0)
-
-                sorted_cassettes_db = sorted(sample_db.cassette, key=sort_cassettes)
-
-                cassettes_for_sample: List[CassetteTestForGlassPage] = []
-                for cassette_db in sorted_cassettes_db:
-                    sorted_glasses_db = sorted(
-                        cassette_db.glass, key=lambda glass: glass.glass_number
-                    )
-                    glasses_for_cassette: List[GlassTestModelScheema] = []
-                    for glass in sorted_glasses_db:
-                        glass_schematized = GlassTestModelScheema(
-                            id=glass.id,
-                            glass_number=glass.glass_number,
-                            cassette_id=glass.cassette_id,
-                            staining=glass.staining,
-                        )
-                        glasses_for_cassette.append(glass_schematized)
-
-                    cassette_schematized = CassetteTestForGlassPage(
-                        id=cassette_db.id,
-                        cassette_number=cassette_db.cassette_number,
-                        sample_id=cassette_db.sample_id,
-                    )
-                    cassette_schematized.glasses = glasses_for_cassette
-                    cassettes_for_sample.append(cassette_schematized)
-
-                sample_schematized = SampleTestForGlassPage(
-                    id=sample_db.id,
-                    sample_number=sample_db.sample_number,
-                    case_id=sample_db.case_id,
-                )
-                sample_schematized.cassettes = cassettes_for_sample
-                all_samples_for_last_case_schematized.append(sample_schematized)
-
-            first_case_details_for_glass = FirstCaseTestGlassDetailsSchema(
-                id=last_case_with_relations.id,
-                case_code=last_case_with_relations.case_code,
-                creation_date=last_case_with_relations.creation_date,
-                samples=all_samples_for_last_case_schematized,
-                grossing_status=last_case_with_relations.grossing_status,
+            report_views = await assemble_case_report_views(
+                db=db, case_db=last_case_with_relations, router=router
             )
+            report_details = report_views.draft_report
+            first_case_details_for_glass = report_views.glass_details
     if last_case_with_relations:
         case_owner = await get_case_owner(
             db=db, case_id=last_case_with_relations.id, doctor_id=current_doctor_id
@@ -3333,6 +2693,7 @@ async def get_current_cases_report_page_data(
         case_owner=case_owner,
         report_details=report_details,
         all_glasses_for_last_case=first_case_details_for_glass,
+        next_cursor=current_cases_page.next_cursor,
     )
 
 
@@ -3340,6 +2701,7 @@ async def get_current_cases_with_directions(
     db: AsyncSession,
     current_doctor_id=str,
     case_id=Optional[str],
+    cursor: Optional[str] = None,
     skip: int = 0,
     limit: int = 10,
 ) -> PatientCasesWithReferralsResponse:
@@ -3349,154 +2711,22 @@ async def get_current_cases_with_directions(
     Включает ссылки на файлы направлений для первого кейса.
     """
     case_id_query = case_id
-    cases_fu_subquery = (
-        select(
-            db_models.Case.id,
-            db_models.Case.case_code,
-            db_models.Case.creation_date,
-            db_models.Case.patient_id,
-            db_models.Case.grossing_status,
-            db_models.Case.bank_count,
-            db_models.Case.cassette_count,
-            db_models.Case.glass_count,
-            db_models.Case.pathohistological_conclusion,
-            db_models.Case.microdescription,
-            db_models.Case.is_printed_cassette,
-            db_models.Case.is_printed_glass,
-            db_models.Case.is_printed_qr,
-            db_models.Case.case_owner,
-            literal_column("1").label("sort_priority"),
-        ).where(
-            and_(
-                func.substr(db_models.Case.case_code, 1, 1).in_(["F", "U"]),
-                db_models.Case.grossing_status
-                != db_models.Grossing_status.COMPLETED.value,
-            )
-        )
-    ).subquery("cases_fu")
-
-    scanned_glass_exists_clause = (
-        select(1)
-        .select_from(db_models.Sample)
-        .join(db_models.Cassette, db_models.Sample.id == db_models.Cassette.sample_id)
-        .join(db_models.Glass, db_models.Cassette.id == db_models.Glass.cassette_id)
-        .where(db_models.Sample.case_id == db_models.Case.id)
-        .exists()
-    )
-
-    cases_s_subquery = (
-        select(
-            db_models.Case.id,
-            db_models.Case.case_code,
-            db_models.Case.creation_date,
-            db_models.Case.patient_id,
-            db_models.Case.grossing_status,
-            db_models.Case.bank_count,
-            db_models.Case.cassette_count,
-            db_models.Case.glass_count,
-            db_models.Case.pathohistological_conclusion,
-            db_models.Case.microdescription,
-            db_models.Case.is_printed_cassette,
-            db_models.Case.is_printed_glass,
-            db_models.Case.is_printed_qr,
-            db_models.Case.case_owner,
-            literal_column("2").label("sort_priority"),
-        ).where(
-            and_(
-                func.substr(db_models.Case.case_code, 1, 1) == "S",
-                db_models.Case.grossing_status
-                != db_models.Grossing_status.COMPLETED.value,
-                scanned_glass_exists_clause,
-            )
-        )
-    ).subquery("cases_s")
-
-    combined_query_for_data = select(
-        cases_fu_subquery.c.id,
-        cases_fu_subquery.c.case_code,
-        cases_fu_subquery.c.creation_date,
-        cases_fu_subquery.c.patient_id,
-        cases_fu_subquery.c.grossing_status,
-        cases_fu_subquery.c.bank_count,
-        cases_fu_subquery.c.cassette_count,
-        cases_fu_subquery.c.glass_count,
-        cases_fu_subquery.c.pathohistological_conclusion,
-        cases_fu_subquery.c.microdescription,
-        cases_fu_subquery.c.sort_priority,
-        cases_fu_subquery.c.is_printed_cassette,
-        cases_fu_subquery.c.is_printed_glass,
-        cases_fu_subquery.c.is_printed_qr,
-        cases_fu_subquery.c.case_owner,
-    ).union_all(
-        select(
-            cases_s_subquery.c.id,
-            cases_s_subquery.c.case_code,
-            cases_s_subquery.c.creation_date,
-            cases_s_subquery.c.patient_id,
-            cases_s_subquery.c.grossing_status,
-            cases_s_subquery.c.bank_count,
-            cases_s_subquery.c.cassette_count,
-            cases_s_subquery.c.glass_count,
-            cases_s_subquery.c.pathohistological_conclusion,
-            cases_s_subquery.c.microdescription,
-            cases_s_subquery.c.sort_priority,
-            cases_s_subquery.c.is_printed_cassette,
-            cases_s_subquery.c.is_printed_glass,
-            cases_s_subquery.c.is_printed_qr,
-            cases_s_subquery.c.case_owner,
-        )
-    )
-
-    final_ordered_query = combined_query_for_data.order_by(
-        combined_query_for_data.c.sort_priority.asc(),
-        combined_query_for_data.c.creation_date.desc(),
+    current_cases_page = await fetch_current_cases_page(
+        db=db,
+        current_doctor_id=current_doctor_id,
+        cursor=cursor,
+        skip=skip,
+        limit=limit,
     )
+    all_current_cases_raw = current_cases_page.rows
+    current_cases_list = current_cases_page.cases
 
-    paginated_results = await db.execute(final_ordered_query.offset(skip).limit(limit))
-    all_current_cases_raw = paginated_results.all()
-
-    current_cases_list: List[CaseWithOwner] = []
     is_case_owner = False
 
-    for row in all_current_cases_raw:
-        case_id = row.id
-        case_code = row.case_code
-        creation_date = row.creation_date
-        patient_id = row.patient_id
-        bank_count = row.bank_count
-        cassette_count = row.cassette_count
-        glass_count = row.glass_count
-        grossing_status = db_models.Grossing_status(row.grossing_status)
-        pathohistological_conclusion = row.pathohistological_conclusion
-        microdescription = row.microdescription
-        is_printed_cassette = row.is_printed_cassette
-        is_printed_glass = row.is_printed_glass
-        is_printed_qr = row.is_printed_qr
-
-        if current_doctor_id == row.case_owner:
-            is_case_owner = True
-        current_cases_list.append(
-            CaseWithOwner(
-                id=case_id,
-                case_code=case_code,
-                creation_date=creation_date,
-                patient_id=patient_id,
-                grossing_status=grossing_status,
-                bank_count=bank_count,
-                cassette_count=cassette_count,
-                glass_count=glass_count,
-                pathohistological_conclusion=pathohistological_conclusion,
-                microdescription=microdescription,
-                is_printed_cassette=is_printed_cassette,
-                is_printed_glass=is_printed_glass,
-                is_printed_qr=is_printed_qr,
-                is_case_owner = is_case_owner
-            )
-        )
-
     first_case_direction_details: Optional[FirstCaseReferralDetailsSchema] = None
     case_details = None
     case_owner: Optional[CaseOwnerResponse] = None
+    last_case_with_relations: Optional[db_models.Case] = None
 
     if all_current_cases_raw:
         first_case_db = all_current_cases_raw[0]
@@ -3564,9 +2794,10 @@ async def get_current_cases_with_directions(
                 patient_cor_id=last_case_with_relations.patient_id,
                 is_case_owner = is_case_owner
             )
-    if current_doctor_id == last_case_with_relations.case_owner:
+        if last_case_with_relations:
+            if current_doctor_id == last_case_with_relations.case_owner:
                 is_case_owner = True
-    case_details = CaseWithOwner(
+            case_details = CaseWithOwner(
                 id=last_case_with_relations.id,
                 case_code=last_case_with_relations.case_code,
                 creation_date=last_case_with_relations.creation_date,
@@ -3591,6 +2822,7 @@ async def get_current_cases_with_directions(
         case_details=case_details,
         case_owner=case_owner,
         first_case_direction=first_case_direction_details,
+        next_cursor=current_cases_page.next_cursor,
     )
 
 
@@ -3599,6 +2831,7 @@ async def get_current_cases_final_report_page_data(
     router: APIRouter,
     current_doctor_id=str,
     case_id=Optional[str],
+    cursor: Optional[str] = None,
     skip: int = 0,
     limit: int = 10,
 ) -> PatientFinalReportPageResponse:
@@ -3609,141 +2842,23 @@ async def get_current_cases_final_report_page_data(
       и его заключение (если есть). Если заключения нет, оно будет создано.
     - Все стёкла последнего кейса (для выбора, какие прикрепить).
     """
-    cases_fu_subquery = (
-        select(
-            db_models.Case.id,
-            db_models.Case.case_code,
-            db_models.Case.creation_date,
-            db_models.Case.patient_id,
-            db_models.Case.grossing_status,
-            db_models.Case.bank_count,
-            db_models.Case.cassette_count,
-            db_models.Case.glass_count,
-            db_models.Case.pathohistological_conclusion,
-            db_models.Case.microdescription,
-            db_models.Case.is_printed_cassette,
-            db_models.Case.is_printed_glass,
-            db_models.Case.is_printed_qr,
-            db_models.Case.case_owner,
-            literal_column("1").label("sort_priority"),
-        ).where(
-            and_(
-                func.substr(db_models.Case.case_code, 1, 1).in_(["F", "U"]),
-                db_models.Case.grossing_status
-                != db_models.Grossing_status.COMPLETED.value,
-            )
-        )
-    ).subquery("cases_fu")
-
-    scanned_glass_exists_clause = (
-        select(1)
-        .select_from(db_models.Sample)
-        .join(db_models.Cassette, db_models.Sample.id == db_models.Cassette.sample_id)
-        .join(db_models.Glass, db_models.Cassette.id == db_models.Glass.cassette_id)
-        .where(db_models.Sample.case_id == db_models.Case.id)
-        .exists()
-    )
-
-    cases_s_subquery = (
-        select(
-            db_models.Case.id,
-            db_models.Case.case_code,
-            db_models.Case.creation_date,
-            db_models.Case.patient_id,
-            db_models.Case.grossing_status,
-            db_models.Case.bank_count,
-            db_models.Case.cassette_count,
-            db_models.Case.glass_count,
-            db_models.Case.pathohistological_conclusion,
-            db_models.Case.microdescription,
-            db_models.Case.is_printed_cassette,
-            db_models.Case.is_printed_glass,
-            db_models.Case.is_printed_qr,
-            db_models.Case.case_owner,
-            literal_column("2").label("sort_priority"),
-        ).where(
-            and_(
-                func.substr(db_models.Case.case_code, 1, 1) == "S",
-                db_models.Case.grossing_status
-                != db_models.Grossing_status.COMPLETED.value,
-                scanned_glass_exists_clause,
-            )
-        )
-    ).subquery("cases_s")
-
-    combined_query_for_data = select(
-        cases_fu_subquery.c.id,
-        cases_fu_subquery.c.case_code,
-        cases_fu_subquery.c.creation_date,
-        cases_fu_subquery.c.patient_id,
-        cases_fu_subquery.c.grossing_status,
-        cases_fu_subquery.c.bank_count,
-        cases_fu_subquery.c.cassette_count,
-        cases_fu_subquery.c.glass_count,
-        cases_fu_subquery.c.pathohistological_conclusion,
-        cases_fu_subquery.c.microdescription,
-        cases_fu_subquery.c.is_printed_cassette,
-        cases_fu_subquery.c.is_printed_glass,
-        cases_fu_subquery.c.is_printed_qr,
-        cases_fu_subquery.c.sort_priority,
-        cases_fu_subquery.c.case_owner,
-    ).union_all(
-        select(
-            cases_s_subquery.c.id,
-            cases_s_subquery.c.case_code,
-            cases_s_subquery.c.creation_date,
-            cases_s_subquery.c.patient_id,
-            cases_s_subquery.c.grossing_status,
-            cases_s_subquery.c.bank_count,
-            cases_s_subquery.c.cassette_count,
-            cases_s_subquery.c.glass_count,
-            cases_s_subquery.c.pathohistological_conclusion,
-            cases_s_subquery.c.microdescription,
-            cases_s_subquery.c.is_printed_cassette,
-            cases_s_subquery.c.is_printed_glass,
-            cases_s_subquery.c.is_printed_qr,
-            cases_s_subquery.c.sort_priority,
-            cases_s_subquery.c.case_owner,
-        )
-    )
-
-    final_ordered_query = combined_query_for_data.order_by(
-        combined_query_for_data.c.sort_priority.asc(),
-        combined_query_for_data.c.creation_date.desc(),
+    current_cases_page = await fetch_current_cases_page(
+        db=db,
+        current_doctor_id=current_doctor_id,
+        cursor=cursor,
+        skip=skip,
+        limit=limit,
     )
+    all_current_cases_raw = current_cases_page.rows
+    current_cases_list = current_cases_page.cases
 
-    paginated_results = await db.execute(final_ordered_query.offset(skip).limit(limit))
-    all_current_cases_raw = paginated_results.all()
-
-    current_cases_list: List[CaseModelScheema] = []
     last_case_details: Optional[CaseModelScheema] = None
     report_details: Optional[FinalReportResponseSchema] = None
     all_samples_for_last_case_schematized: List[SampleTestForGlassPage] = []
     case_owner: Optional[CaseOwnerResponse] = None
+    last_case_with_relations: Optional[db_models.Case] = None
     is_case_owner = False
 
-    for row in all_current_cases_raw:
-        if current_doctor_id == row.case_owner:
-            is_case_owner = True
-        current_cases_list.append(
-            CaseWithOwner(
-                id=str(row.id),
-                case_code=row.case_code,
-                creation_date=row.creation_date,
-                patient_id=str(row.patient_id),
-                grossing_status=db_models.Grossing_status(row.grossing_status),
-                bank_count=row.bank_count,
-                cassette_count=row.cassette_count,
-                glass_count=row.glass_count,
-                pathohistological_conclusion=row.pathohistological_conclusion,
-                microdescription=row.microdescription,
-                is_printed_cassette=row.is_printed_cassette,
-                is_printed_glass=row.is_printed_glass,
-                is_printed_qr=row.is_printed_qr,
-                is_case_owner = is_case_owner
-            )
-        )
-
     if all_current_cases_raw:
         if case_id:
             first_case_id = case_id
@@ -3827,6 +2942,7 @@ async def get_current_cases_final_report_page_data(
         last_case_details=last_case_details,
         case_owner=case_owner,
         report_details=report_details,
+        next_cursor=current_cases_page.next_cursor,
     )
 
 
@@ -3893,18 +3009,7 @@ async def take_case_ownership(
         if i == 0 and sample_db:
             await db.refresh(sample_db, attribute_names=["cassette"])
 
-            def sort_cassettes(cassette: db_models.Cassette):
-                match = re.match(r"([A-Z]+)(\d+)", cassette.cassette_number)
-                if match:
-                    letter_part = match.group(1)
-                    number_part = int(match.group(2))
-                    return (letter_part, number_part)
-                return (
-                    cassette.cassette_number,
-                    0,
-                )
-
-            sorted_cassettes_db = sorted(sample_db.cassette, key=sort_cassettes)
+            sorted_cassettes_db = sorted(sample_db.cassette, key=_cassette_sort_key)
 
             for cassette_db in sorted_cassettes_db:
                 await db.refresh(cassette_db, attribute_names=["glass"])
@@ -3998,18 +3103,7 @@ async def release_case_ownership(
         if i == 0 and sample_db:
             await db.refresh(sample_db, attribute_names=["cassette"])
 
-            def sort_cassettes(cassette: db_models.Cassette):
-                match = re.match(r"([A-Z]+)(\d+)", cassette.cassette_number)
-                if match:
-                    letter_part = match.group(1)
-                    number_part = int(match.group(2))
-                    return (letter_part, number_part)
-                return (
-                    cassette.cassette_number,
-                    0,
-                )
-
-            sorted_cassettes_db = sorted(sample_db.cassette, key=sort_cassettes)
+            sorted_cassettes_db = sorted(sample_db.cassette, key=_cassette_sort_key)
 
             for cassette_db in sorted_cassettes_db:
                 await db.refresh(cassette_db, attribute_names=["glass"])
@@ -4120,6 +3214,7 @@ async def close_case_service(
     case_to_close.closing_date = datetime.now()
 
     db.add(case_to_close)
+    await refresh_case_worklist(db, [case_to_close.id])
     await db.commit()
     await db.refresh(case_to_close)
 
@@ -4175,100 +3270,40 @@ async def get_case_owner(
 
 
 
-async def print_all_case_glasses(
-    db: AsyncSession, case_id: str, printing: bool, data: GeneralPrinting, request: Request
-) -> Optional[Dict[str, Any]]:
+async def _apply_label_print_results(
+    db: AsyncSession,
+    model,
+    print_results: List[LabelPrintResult],
+    printing: bool,
+    case_id: str,
+    sample_id: Optional[str] = None,
+) -> None:
     """
-    Печатает все стёкла кейса, используя жадную загрузку для всех уровней.
-    Возвращает полную информацию о кейсе в виде Pydantic-схемы.
+    Проставляет is_printed = printing успешно напечатанным стёклам или кассетам
+    одним UPDATE и пересчитывает флаги печати семплов и кейса.
+    Если sample_id не передан, пересчитываются все семплы кейса.
+    Коммит остаётся за вызывающей стороной.
     """
-    case_result = await db.execute(
-        select(db_models.Case)
-        .where(db_models.Case.id == case_id)
-        .options(
-            selectinload(db_models.Case.samples)
-            .selectinload(db_models.Sample.cassette)
-            .selectinload(db_models.Cassette.glass)
-        )
-    )
-    case_db = case_result.scalar_one_or_none()
-    if not case_db:
-        return None
-    case_db.is_printed_glass = printing
-
-    glasses_to_update: List[db_models.Glass] = []
-
-    for sample_db in case_db.samples:
-
-        sample_db.is_printed_glass = printing
-
-        for cassette_db in sample_db.cassette:
-            for glass_db in cassette_db.glass:
-                glasses_to_update.append(glass_db)
-
-    for glass_db in glasses_to_update:
-        glass_data = GlassPrinting(
-            printer_ip=data.printer_ip,
-            model_id=data.model_id,
-            clinic_name=data.clinic_name,
-            hooper=data.hooper,
-            glass_id=glass_db.id,
-            printing=printing
+    printed_ids = [result.uuid for result in print_results if result.printed]
+    if printed_ids:
+        await db.execute(
+            update(model)
+            .where(model.id == _any_of(printed_ids))
+            .values(is_printed=printing)
+            .execution_options(synchronize_session=False)
         )
-        await print_glass_data(db=db, data=glass_data, request=request)
-        glass_db.is_printed = printing
-
-
-    await db.commit()
-    await db.refresh(case_db)
-
-    case_response = await get_case(db=db, case_id=case_id)
-    return case_response
-
-
 
-async def print_all_case_cassette(
-    db: AsyncSession, case_id: str, printing: bool, data: GeneralPrinting, request: Request
-) -> Optional[Dict[str, Any]]:
-    """
-    Печатает все кассеты кейса, используя жадную загрузку для всех уровней.
-    Возвращает полную информацию о кейсе в виде Pydantic-схемы.
-    """
-    case_result = await db.execute(
-        select(db_models.Case)
-        .where(db_models.Case.id == case_id)
-        .options(
-            selectinload(db_models.Case.samples)
-            .selectinload(db_models.Sample.cassette)
-            .selectinload(db_models.Cassette.glass)
-        )
+    if sample_id is not None:
+        sample_ids = [sample_id]
+    else:
+        sample_ids = (
+            await db.scalars(
+                select(db_models.Sample.id).where(db_models.Sample.case_id == case_id)
+            )
+        ).all()
+    await _recompute_ancestor_aggregates(
+        db=db, sample_ids=sample_ids, case_ids=[case_id]
     )
-    case_db = case_result.scalar_one_or_none()
-    if not case_db:
-        return None
-    case_db.is_printed_cassette = printing
-    cassettes_to_update = []
-    for sample_db in case_db.samples:
-        sample_db.is_printed_cassette = printing
-        cassettes_to_update = list(sample_db.cassette) if sample_db.cassette else []
-
-        for cassette_db in cassettes_to_update:
-            cassette_data = CassettePrinting(
-            printer_ip=data.printer_ip,
-            model_id=data.model_id,
-            clinic_name=data.clinic_name,
-            hooper=data.hooper,
-            cassete_id=cassette_db.id,
-            printing=printing
-        )
-            await print_cassette_data(db=db, data=cassette_data, request=request)
-            cassette_db.is_printed = printing
-
-    await db.commit()
-    await db.refresh(case_db)
-
-    case_response = await get_case(db=db, case_id=case_id)
-    return case_response
 
 
 async def print_case_qr(
@@ -4448,3 +3483,99 @@ async def _update_ancestor_statuses_from_cassette(
     await db.refresh(cassette)
     await db.refresh(sample)
     await db.refresh(case)
+
+
+def _any_of(ids: Iterable[str]):
+    """Передаёт список id одним параметром-массивом: `column = ANY(:ids)`."""
+    return any_(literal(list(ids), type_=ARRAY(String(36))))
+
+
+async def _recompute_ancestor_aggregates(
+    db: AsyncSession,
+    cassette_ids: Iterable[str] = (),
+    sample_ids: Iterable[str] = (),
+    case_ids: Iterable[str] = (),
+) -> None:
+    """
+    Пересчитывает счётчики и флаги печати у затронутых предков после массовых
+    изменений: по одному агрегирующему UPDATE на уровень (кассеты -> семплы -> кейсы).
+    Флаг печати равен True, если все дочерние элементы напечатаны (или их нет).
+    Коммит остаётся за вызывающей стороной.
+    """
+    Glass, Cassette, Sample, Case = (
+        db_models.Glass,
+        db_models.Cassette,
+        db_models.Sample,
+        db_models.Case,
+    )
+    cassette_ids, sample_ids, case_ids = set(cassette_ids), set(sample_ids), set(case_ids)
+
+    if cassette_ids:
+        await db.execute(
+            update(Cassette)
+            .where(Cassette.id == _any_of(cassette_ids))
+            .values(
+                glass_count=select(func.count(Glass.id))
+                .where(Glass.cassette_id == Cassette.id)
+                .scalar_subquery()
+            )
+            .execution_options(synchronize_session=False)
+        )
+
+    if sample_ids:
+        await db.execute(
+            update(Sample)
+            .where(Sample.id == _any_of(sample_ids))
+            .values(
+                cassette_count=select(func.count(Cassette.id))
+                .where(Cassette.sample_id == Sample.id)
+                .scalar_subquery(),
+                glass_count=select(func.count(Glass.id))
+                .join(Cassette, Glass.cassette_id == Cassette.id)
+                .where(Cassette.sample_id == Sample.id)
+                .scalar_subquery(),
+                is_printed_cassette=~exists().where(
+                    Cassette.sample_id == Sample.id,
+                    func.coalesce(Cassette.is_printed, False).is_(False),
+                ),
+                is_printed_glass=~exists(
+                    select(1)
+                    .select_from(Glass)
+                    .join(Cassette, Glass.cassette_id == Cassette.id)
+                    .where(
+                        Cassette.sample_id == Sample.id,
+                        func.coalesce(Glass.is_printed, False).is_(False),
+                    )
+                ),
+            )
+            .execution_options(synchronize_session=False)
+        )
+
+    if case_ids:
+        await db.execute(
+            update(Case)
+            .where(Case.id == _any_of(case_ids))
+            .values(
+                bank_count=select(func.count(Sample.id))
+                .where(Sample.case_id == Case.id)
+                .scalar_subquery(),
+                cassette_count=select(func.count(Cassette.id))
+                .join(Sample, Cassette.sample_id == Sample.id)
+                .where(Sample.case_id == Case.id)
+                .scalar_subquery(),
+                glass_count=select(func.count(Glass.id))
+                .join(Cassette, Glass.cassette_id == Cassette.id)
+                .join(Sample, Cassette.sample_id == Sample.id)
+                .where(Sample.case_id == Case.id)
+                .scalar_subquery(),
+                is_printed_cassette=~exists().where(
+                    Sample.case_id == Case.id,
+                    func.coalesce(Sample.is_printed_cassette, False).is_(False),
+                ),
+                is_printed_glass=~exists().where(
+                    Sample.case_id == Case.id,
+                    func.coalesce(Sample.is_printed_glass, False).is_(False),
+                ),
+            )
+            .execution_options(synchronize_session=False)
+        )
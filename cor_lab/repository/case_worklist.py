@@ -0,0 +1,241 @@
+import base64
+import binascii
+import json
+from datetime import datetime
+from typing import Any, Iterable, List, NamedTuple, Optional, Sequence, Tuple
+
+from fastapi import HTTPException, status
+from sqlalchemy import and_, case, delete, insert, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from cor_lab.database import models as db_models
+from cor_lab.schemas import CaseWithOwner
+
+
+URGENT_SORT_PRIORITY = 1
+STANDARD_SORT_PRIORITY = 2
+
+URGENCY_SORT_PRIORITY = {
+    db_models.UrgencyType.F: URGENT_SORT_PRIORITY,
+    db_models.UrgencyType.U: URGENT_SORT_PRIORITY,
+    db_models.UrgencyType.S: STANDARD_SORT_PRIORITY,
+}
+
+
+class CurrentCasesPage(NamedTuple):
+    """
+    Страница рабочего списка текущих кейсов.
+    rows - сырые строки выборки, cases - готовые схемы,
+    next_cursor - курсор следующей страницы (None, если страница последняя).
+    """
+
+    rows: Sequence[Any]
+    cases: List[CaseWithOwner]
+    next_cursor: Optional[str]
+
+
+def _sort_priority_expression():
+    """
+    SQL-выражение приоритета по cases.urgency. Для кейса без срочности
+    (или с неизвестной) - NULL: такой кейс в рабочий список не попадает.
+    """
+    return case(
+        *(
+            (db_models.Case.urgency == urgency, sort_priority)
+            for urgency, sort_priority in URGENCY_SORT_PRIORITY.items()
+        ),
+        else_=None,
+    )
+
+
+def encode_worklist_cursor(
+    sort_priority: int, creation_date: datetime, case_id: str
+) -> str:
+    """Кодирует позицию (sort_priority, creation_date, id) в непрозрачный курсор."""
+    payload = json.dumps(
+        [sort_priority, creation_date.isoformat(), case_id], separators=(",", ":")
+    )
+    return base64.urlsafe_b64encode(payload.encode()).decode()
+
+
+def decode_worklist_cursor(cursor: str) -> Tuple[int, datetime, str]:
+    """
+    Раскодирует курсор рабочего списка.
+    :raises HTTPException 400: если курсор повреждён.
+    """
+    try:
+        sort_priority, creation_date, case_id = json.loads(
+            base64.urlsafe_b64decode(cursor.encode())
+        )
+        return int(sort_priority), datetime.fromisoformat(creation_date), str(case_id)
+    except (binascii.Error, ValueError, TypeError) as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Некорректный курсор пагинации.",
+        ) from e
+
+
+def _current_cases_filter():
+    """
+    Условия включения кейса в рабочий список:
+    - F/U: кейс не завершён.
+    - S: кейс не завершён и есть хотя бы одно отсканированное стекло.
+    """
+    scanned_glass_exists_clause = (
+        select(1)
+        .select_from(db_models.Sample)
+        .join(db_models.Cassette, db_models.Sample.id == db_models.Cassette.sample_id)
+        .join(db_models.Glass, db_models.Cassette.id == db_models.Glass.cassette_id)
+        .where(db_models.Sample.case_id == db_models.Case.id)
+        .exists()
+    )
+    sort_priority = _sort_priority_expression()
+    return and_(
+        db_models.Case.grossing_status != db_models.Grossing_status.COMPLETED,
+        or_(
+            sort_priority == URGENT_SORT_PRIORITY,
+            and_(
+                sort_priority == STANDARD_SORT_PRIORITY,
+                scanned_glass_exists_clause,
+            ),
+        ),
+    )
+
+
+async def refresh_case_worklist(db: AsyncSession, case_ids: Iterable[str]) -> None:
+    """
+    Пересчитывает записи рабочего списка для указанных кейсов одним
+    DELETE и одним INSERT ... SELECT. Вызывается при создании кейса,
+    регистрации/удалении стёкол, смене срочности или кода и закрытии кейса.
+    Коммит остаётся за вызывающей стороной.
+    """
+    case_ids = list({case_id for case_id in case_ids if case_id})
+    if not case_ids:
+        return
+
+    await db.execute(
+        delete(db_models.CaseWorklistEntry).where(
+            db_models.CaseWorklistEntry.case_id.in_(case_ids)
+        )
+    )
+    await db.execute(
+        insert(db_models.CaseWorklistEntry).from_select(
+            [
+                db_models.CaseWorklistEntry.case_id,
+                db_models.CaseWorklistEntry.sort_priority,
+                db_models.CaseWorklistEntry.creation_date,
+                db_models.CaseWorklistEntry.case_code,
+                db_models.CaseWorklistEntry.patient_id,
+                db_models.CaseWorklistEntry.urgency,
+            ],
+            select(
+                db_models.Case.id,
+                _sort_priority_expression(),
+                db_models.Case.creation_date,
+                db_models.Case.case_code,
+                db_models.Case.patient_id,
+                db_models.Case.urgency,
+            ).where(
+                db_models.Case.id.in_(case_ids),
+                # creation_date в рабочем списке обязателен, как и в backfill миграции
+                db_models.Case.creation_date.isnot(None),
+                _current_cases_filter(),
+            ),
+        )
+    )
+
+
+def _after_cursor_clause(sort_priority: int, creation_date: datetime, case_id: str):
+    """Условие "строго после курсора" для порядка (priority ASC, date DESC, id DESC)."""
+    worklist = db_models.CaseWorklistEntry
+    return or_(
+        worklist.sort_priority > sort_priority,
+        and_(
+            worklist.sort_priority == sort_priority,
+            or_(
+                worklist.creation_date < creation_date,
+                and_(
+                    worklist.creation_date == creation_date,
+                    worklist.case_id < case_id,
+                ),
+            ),
+        ),
+    )
+
+
+async def fetch_current_cases_page(
+    db: AsyncSession,
+    current_doctor_id: str,
+    cursor: Optional[str] = None,
+    skip: int = 0,
+    limit: int = 10,
+) -> CurrentCasesPage:
+    """
+    Получает страницу рабочего списка текущих кейсов, общую для всех вкладок
+    страницы "Текущие кейсы".
+
+    Список читается из поддерживаемой таблицы case_worklist в порядке
+    sort_priority ASC, creation_date DESC, case_id DESC (индекс
+    idx_case_worklist_order); часто меняющиеся поля (счётчики, статусы печати,
+    владелец) подтягиваются из cases по первичному ключу.
+    Если передан cursor, skip игнорируется; skip оставлен для старых клиентов.
+    """
+    worklist = db_models.CaseWorklistEntry
+    query = select(
+        worklist.case_id.label("id"),
+        worklist.case_code,
+        worklist.creation_date,
+        worklist.patient_id,
+        worklist.sort_priority,
+        db_models.Case.grossing_status,
+        db_models.Case.bank_count,
+        db_models.Case.cassette_count,
+        db_models.Case.glass_count,
+        db_models.Case.pathohistological_conclusion,
+        db_models.Case.microdescription,
+        db_models.Case.is_printed_cassette,
+        db_models.Case.is_printed_glass,
+        db_models.Case.is_printed_qr,
+        db_models.Case.case_owner,
+    ).join(db_models.Case, db_models.Case.id == worklist.case_id)
+
+    if cursor:
+        query = query.where(_after_cursor_clause(*decode_worklist_cursor(cursor)))
+    elif skip:
+        query = query.offset(skip)
+
+    query = query.order_by(
+        worklist.sort_priority.asc(),
+        worklist.creation_date.desc(),
+        worklist.case_id.desc(),
+    ).limit(limit + 1)
+
+    rows = (await db.execute(query)).all()
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last_row = rows[-1]
+        next_cursor = encode_worklist_cursor(
+            last_row.sort_priority, last_row.creation_date, last_row.id
+        )
+
+    cases = [
+        CaseWithOwner(
+            id=str(row.id),
+            case_code=row.case_code,
+            creation_date=row.creation_date,
+            patient_id=str(row.patient_id),
+            grossing_status=db_models.Grossing_status(row.grossing_status),
+            bank_count=row.bank_count,
+            cassette_count=row.cassette_count,
+            glass_count=row.glass_count,
+            pathohistological_conclusion=row.pathohistological_conclusion,
+            microdescription=row.microdescription,
+            is_printed_cassette=row.is_printed_cassette,
+            is_printed_glass=row.is_printed_glass,
+            is_printed_qr=row.is_printed_qr,
+            is_case_owner=current_doctor_id == row.case_owner,
+        )
+        for row in rows
+    ]
+    return CurrentCasesPage(rows=rows, cases=cases, next_cursor=next_cursor)
@@ -1,5 +1,5 @@
 from fastapi import HTTPException, Request
-from sqlalchemy import select
+from sqlalchemy import delete, select
 from sqlalchemy.ext.asyncio import AsyncSession
 from cor_lab.schemas import (
     CassettePrinting,
@@ -13,6 +13,7 @@ from typing import Any, Dict, List, Optional
 from sqlalchemy.orm import selectinload
 from cor_lab.database import models as db_models
 from cor_lab.repository import case as repository_cases
+from cor_lab.repository.case_worklist import refresh_case_worklist
 from cor_lab.services.glass_and_cassette_printing import print_labels
 
 
@@ -82,6 +83,7 @@ async def create_cassette(
         db_sample.glass_count += 1
         db_case.glass_count += 1
         db_cassette.glass_count += 1
+        await refresh_case_worklist(db, [db_case.id])
         await db.commit()
         await db.refresh(db_glass)
         await repository_cases._update_ancestor_statuses_from_glass(
@@ -127,51 +129,44 @@ async def update_cassette_comment(
 async def delete_cassettes(
     db: AsyncSession, cassettes_ids: List[str]
 ) -> Dict[str, Any]:
-    """Асинхронно удаляет несколько кассет по их ID и корректно обновляет счетчики."""
-    deleted_count = 0
-    not_found_ids: List[str] = []
-
-    for cassette_id in cassettes_ids:
-        result = await db.execute(
-            select(db_models.Cassette)
-            .where(db_models.Cassette.id == cassette_id)
-            .options(selectinload(db_models.Cassette.glass))
+    """
+    Асинхронно удаляет несколько кассет (вместе с их стеклами) в одной транзакции
+    и пересчитывает счетчики и статусы печати затронутых семплов и кейсов.
+    """
+    target_ids = repository_cases._any_of(cassettes_ids)
+    await db.execute(
+        delete(db_models.Glass)
+        .where(db_models.Glass.cassette_id == target_ids)
+        .execution_options(synchronize_session=False)
+    )
+    deleted_result = await db.execute(
+        delete(db_models.Cassette)
+        .where(
+            db_models.Cassette.id == target_ids,
+            db_models.Cassette.sample_id == db_models.Sample.id,
         )
-        db_cassette = result.scalar_one_or_none()
-        if db_cassette:
-
-            sample_result = await db.execute(
-                select(db_models.Sample)
-                .where(db_models.Sample.id == db_cassette.sample_id)
-                .options(selectinload(db_models.Sample.case))
-            )
-            db_sample = sample_result.scalar_one_or_none()
-            if not db_sample:
-                raise ValueError(f"Семпл с ID {db_cassette.sample_id} не найден")
-
-            db_case = await db.get(db_models.Case, db_sample.case_id)
-
-            num_glasses_to_decrement = len(db_cassette.glass)
-            await repository_cases._update_ancestor_statuses_from_cassette(
-                db=db, cassette=db_cassette
-            )
-
-            await db.delete(db_cassette)
-            deleted_count += 1
-
-            db_sample.glass_count -= num_glasses_to_decrement
-            db_sample.cassette_count -= 1
-
-            db_case.glass_count -= num_glasses_to_decrement
-            db_case.cassette_count -= 1
-
-            await db.commit()
+        .returning(
+            db_models.Cassette.id,
+            db_models.Cassette.sample_id,
+            db_models.Sample.case_id,
+        )
+        .execution_options(synchronize_session=False)
+    )
+    deleted_rows = deleted_result.all()
 
-            await db.refresh(db_sample)
-            await db.refresh(db_case)
+    await repository_cases._recompute_ancestor_aggregates(
+        db,
+        sample_ids={row.sample_id for row in deleted_rows},
+        case_ids={row.case_id for row in deleted_rows},
+    )
+    await refresh_case_worklist(db, {row.case_id for row in deleted_rows})
+    await db.commit()
 
-        else:
-            not_found_ids.append(cassette_id)
+    deleted_ids = {row.id for row in deleted_rows}
+    deleted_count = len(deleted_ids)
+    not_found_ids = [
+        cassette_id for cassette_id in cassettes_ids if cassette_id not in deleted_ids
+    ]
 
     response = {"deleted_count": deleted_count}
     if not_found_ids:
@@ -264,33 +259,3 @@ async def print_cassette_data(
     print_result = await print_labels(printer_ip=data.printer_ip, labels_to_print=[label_to_print], request=request)
 
     return print_result
-
-
-
-async def print_cassette_data(
-    data: CassettePrinting, db: AsyncSession, request: Request
-):
-    db_cassette = await get_cassette_full_info(db=db, cassette_id=data.cassete_id)
-    if db_cassette is None:
-        raise HTTPException(status_code=404, detail=f"Кассета с ID {data.cassete_id} не найдена в базе данных")
-
-    clinic_name = data.clinic_name
-    case_code = db_cassette.case_code
-    sample_number=db_cassette.sample_number
-    cassette_number=db_cassette.cassette_number
-    glass_number="-"
-    staining="-"
-    hooper=data.hooper
-    patient_cor_id=db_cassette.patient_cor_id
-        
-    content = f"{clinic_name}|{case_code}|{sample_number}|{cassette_number}|L{glass_number}|{staining}|{hooper}|{patient_cor_id}"
-
-    label_to_print = PrintLabel(
-        model_id=data.model_id, 
-        content=content,
-        uuid=data.cassete_id
-    )
-
-    print_result = await print_labels(printer_ip=data.printer_ip, labels_to_print=[label_to_print], request=request)
-
-    return print_result
\ No newline at end of file
@@ -3,7 +3,8 @@ import datetime
 from datetime import datetime
 from cor_lab.database.models import User
 from loguru import logger
-from cor_lab.database.redis_db import redis_client
+from cor_lab.services.principal_cache import principal_cache
+from cor_lab.services.redis_scripts import allocate_counter
 from sqlalchemy.ext.asyncio import AsyncSession
 from cor_lab.config.config import settings
 from datetime import datetime
@@ -112,6 +113,7 @@ async def create_new_corid(user: User, db: AsyncSession):
     except Exception as e:
         await db.rollback()
         raise e
+    await principal_cache.invalidate_user(user_id=user.id)
 
 
 async def create_only_corid(birth: int, user_sex: str, db: AsyncSession):
@@ -140,11 +142,5 @@ async def get_register_per_day(facility_number):
     date_str = datetime.now().strftime("%Y-%m-%d")  # Текущая дата в формате ГГГГ-ММ-ДД
     register_key = f"register:{facility_number}:{date_str}"
 
-    if await redis_client.exists(register_key):
-        register_number = await redis_client.incr(register_key)
-    else:
-        await redis_client.set(register_key, 1)
-        await redis_client.expire(register_key, 24 * 60 * 60)
-        register_number = 1
-
-    return register_number
+    # INCR и EXPIRE одним скриптом: параллельные регистрации не получат одинаковый номер
+    return await allocate_counter(register_key, 24 * 60 * 60)
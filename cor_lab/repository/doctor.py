@@ -23,6 +23,7 @@ from cor_lab.database.models import (
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from cor_lab.repository.patient import get_patient_by_corid
+from cor_lab.services.principal_cache import principal_cache
 from cor_lab.schemas import (
     DoctorCreate,
     DoctorSignatureResponse,
@@ -61,6 +62,7 @@ async def create_doctor(
 
     await db.commit()
     await db.refresh(doctor)
+    await principal_cache.invalidate_user(cor_id=user.cor_id)
 
     return doctor
 
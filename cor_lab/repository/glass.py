@@ -1,11 +1,12 @@
 from fastapi import HTTPException, Request
-from sqlalchemy import select
+from sqlalchemy import delete, select
 from sqlalchemy.ext.asyncio import AsyncSession
 from cor_lab.schemas import ChangeGlassStaining, Glass as GlassModelScheema, GlassPrinting, GlassResponseForPrinting, PrintLabel
 from typing import Any, Dict, List
 from sqlalchemy.orm import selectinload
 from cor_lab.database import models as db_models
 from cor_lab.repository import case as repository_cases
+from cor_lab.repository.case_worklist import refresh_case_worklist
 from cor_lab.services.glass_and_cassette_printing import print_labels
 
 
@@ -82,6 +83,7 @@ async def create_glass(
         db_sample.glass_count += 1
         db_case.glass_count += 1
 
+    await refresh_case_worklist(db, [db_case.id])
     await db.commit()
 
     await db.refresh(db_cassette)
@@ -98,62 +100,40 @@ async def create_glass(
 
 
 async def delete_glasses(db: AsyncSession, glass_ids: List[str]) -> Dict[str, Any]:
-    """Асинхронно удаляет несколько стекол по их ID."""
-    deleted_count = 0
-    not_found_ids: List[str] = []
-
-    for glass_id in glass_ids:
-        result = await db.execute(
-            select(db_models.Glass).where(db_models.Glass.id == glass_id)
+    """
+    Асинхронно удаляет несколько стекол по их ID одним запросом и пересчитывает
+    счетчики и статусы печати затронутых кассет, семплов и кейсов.
+    """
+    deleted_result = await db.execute(
+        delete(db_models.Glass)
+        .where(
+            db_models.Glass.id == repository_cases._any_of(glass_ids),
+            db_models.Glass.cassette_id == db_models.Cassette.id,
+            db_models.Cassette.sample_id == db_models.Sample.id,
         )
-        db_glass = result.scalar_one_or_none()
-        if db_glass:
-
-            cassette_result = await db.execute(
-                select(db_models.Cassette)
-                .where(db_models.Cassette.id == db_glass.cassette_id)
-                .options(
-                    selectinload(db_models.Cassette.sample).selectinload(
-                        db_models.Sample.case
-                    )
-                )
-            )
-            db_cassette = cassette_result.scalar_one_or_none()
-            if not db_cassette:
-                raise ValueError(f"Касету з ID {db_glass.cassette_id} не знайдено")
-
-            sample_result = await db.execute(
-                select(db_models.Sample)
-                .where(db_models.Sample.id == db_cassette.sample_id)
-                .options(selectinload(db_models.Sample.case))
-            )
-            db_sample = sample_result.scalar_one_or_none()
-            if not db_sample:
-                raise ValueError(f"Семпл с ID {db_cassette.sample_id} не найден")
-
-            db_case_id = db_sample.case_id
-            db_case = await repository_cases.get_single_case(db=db, case_id=db_case_id)
-
-            db_sample = db_sample
-            db_case = db_case
-            await repository_cases._update_ancestor_statuses_from_glass(
-                db=db, glass=db_glass
-            )
-            await db.delete(db_glass)
-            deleted_count += 1
-
-            db_cassette.glass_count -= 1
-            db_sample.glass_count -= 1
-            db_case.glass_count -= 1
-            await db.commit()
-            await db.refresh(db_cassette)
-            await db.refresh(db_sample)
-            await db.refresh(db_case)
-        else:
-            not_found_ids.append(glass_id)
+        .returning(
+            db_models.Glass.id,
+            db_models.Glass.cassette_id,
+            db_models.Cassette.sample_id,
+            db_models.Sample.case_id,
+        )
+        .execution_options(synchronize_session=False)
+    )
+    deleted_rows = deleted_result.all()
 
+    await repository_cases._recompute_ancestor_aggregates(
+        db,
+        cassette_ids={row.cassette_id for row in deleted_rows},
+        sample_ids={row.sample_id for row in deleted_rows},
+        case_ids={row.case_id for row in deleted_rows},
+    )
+    await refresh_case_worklist(db, {row.case_id for row in deleted_rows})
     await db.commit()
 
+    deleted_ids = {row.id for row in deleted_rows}
+    deleted_count = len(deleted_ids)
+    not_found_ids = [glass_id for glass_id in glass_ids if glass_id not in deleted_ids]
+
     response = {"deleted_count": deleted_count}
     if not_found_ids:
         response["not_found_ids"] = not_found_ids
@@ -272,32 +252,3 @@ async def print_glass_data(
     print_result = await print_labels(printer_ip=data.printer_ip, labels_to_print=[label_to_print], request=request)
 
     return print_result
-
-
-async def print_glass_data(
-    data: GlassPrinting, db: AsyncSession, request: Request
-):
-    db_glass = await get_full_glass_info(db, data.glass_id)
-    if db_glass is None:
-        raise HTTPException(status_code=404, detail=f"Стекло с ID {data.glass_id} не найдено в базе данных")
-
-    clinic_name = data.clinic_name
-    case_code = db_glass.case_code
-    sample_number=db_glass.sample_number
-    cassette_number=db_glass.cassette_number
-    glass_number=db_glass.glass_number
-    staining=db_glass.staining
-    hooper=data.hooper
-    patient_cor_id=db_glass.patient_cor_id
-        
-    content = f"{clinic_name}|{case_code}|{sample_number}|{cassette_number}|L{glass_number}|{staining}|{hooper}|{patient_cor_id}"
-
-    label_to_print = PrintLabel(
-        model_id=data.model_id, 
-        content=content,
-        uuid=data.glass_id
-    )
-
-    print_result = await print_labels(printer_ip=data.printer_ip, labels_to_print=[label_to_print], request=request)
-
-    return print_result
\ No newline at end of file
@@ -2,6 +2,7 @@ from cor_lab.database.models import LabAssistant, User
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from cor_lab.schemas import LabAssistantCreate
+from cor_lab.services.redis_service import revoke_user_tokens
 
 
 async def create_lab_assistant(
@@ -23,5 +24,7 @@ async def create_lab_assistant(
 
     await db.commit()
     await db.refresh(lab_assistant)
+    # Новая роль попадёт в токен только после перевыпуска
+    await revoke_user_tokens(user.cor_id)
 
     return lab_assistant
@@ -0,0 +1,125 @@
+from typing import List, Optional
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from cor_lab.database import models as db_models
+from cor_lab.schemas import GeneralPrinting, PrintLabel
+
+
+def build_label_content(
+    data: GeneralPrinting,
+    case_code: str,
+    sample_number: str,
+    cassette_number: str,
+    patient_cor_id: str,
+    glass_number: Optional[int] = None,
+    staining: Optional[db_models.StainingType] = None,
+) -> str:
+    """
+    Формирует строку метки в формате принтера.
+    Для кассеты номер стекла и окраска печатаются как "-".
+    """
+    glass_part = "-" if glass_number is None else glass_number
+    staining_part = "-" if staining is None else getattr(staining, "value", staining)
+    return (
+        f"{data.clinic_name}|{case_code}|{sample_number}|{cassette_number}"
+        f"|L{glass_part}|{staining_part}|{data.hooper}|{patient_cor_id}"
+    )
+
+
+async def collect_glass_labels(
+    db: AsyncSession,
+    data: GeneralPrinting,
+    case_id: Optional[str] = None,
+    sample_id: Optional[str] = None,
+) -> List[PrintLabel]:
+    """
+    Собирает метки всех стёкол кейса или семпла одним запросом
+    glasses -> cassettes -> samples -> cases.
+    """
+    query = (
+        select(
+            db_models.Glass.id,
+            db_models.Glass.glass_number,
+            db_models.Glass.staining,
+            db_models.Cassette.cassette_number,
+            db_models.Sample.sample_number,
+            db_models.Case.case_code,
+            db_models.Case.patient_id,
+        )
+        .join(db_models.Cassette, db_models.Glass.cassette_id == db_models.Cassette.id)
+        .join(db_models.Sample, db_models.Cassette.sample_id == db_models.Sample.id)
+        .join(db_models.Case, db_models.Sample.case_id == db_models.Case.id)
+        .order_by(
+            db_models.Sample.sample_number,
+            db_models.Cassette.cassette_number,
+            db_models.Glass.glass_number,
+        )
+    )
+    if case_id is not None:
+        query = query.where(db_models.Sample.case_id == case_id)
+    if sample_id is not None:
+        query = query.where(db_models.Cassette.sample_id == sample_id)
+
+    rows = (await db.execute(query)).all()
+    return [
+        PrintLabel(
+            model_id=data.model_id,
+            content=build_label_content(
+                data=data,
+                case_code=row.case_code,
+                sample_number=row.sample_number,
+                cassette_number=row.cassette_number,
+                patient_cor_id=row.patient_id,
+                glass_number=row.glass_number,
+                staining=row.staining,
+            ),
+            uuid=row.id,
+        )
+        for row in rows
+    ]
+
+
+async def collect_cassette_labels(
+    db: AsyncSession,
+    data: GeneralPrinting,
+    case_id: Optional[str] = None,
+    sample_id: Optional[str] = None,
+) -> List[PrintLabel]:
+    """
+    Собирает метки всех кассет кейса или семпла одним запросом
+    cassettes -> samples -> cases.
+    """
+    query = (
+        select(
+            db_models.Cassette.id,
+            db_models.Cassette.cassette_number,
+            db_models.Sample.sample_number,
+            db_models.Case.case_code,
+            db_models.Case.patient_id,
+        )
+        .join(db_models.Sample, db_models.Cassette.sample_id == db_models.Sample.id)
+        .join(db_models.Case, db_models.Sample.case_id == db_models.Case.id)
+        .order_by(db_models.Sample.sample_number, db_models.Cassette.cassette_number)
+    )
+    if case_id is not None:
+        query = query.where(db_models.Sample.case_id == case_id)
+    if sample_id is not None:
+        query = query.where(db_models.Cassette.sample_id == sample_id)
+
+    rows = (await db.execute(query)).all()
+    return [
+        PrintLabel(
+            model_id=data.model_id,
+            content=build_label_content(
+                data=data,
+                case_code=row.case_code,
+                sample_number=row.sample_number,
+                cassette_number=row.cassette_number,
+                patient_cor_id=row.patient_id,
+            ),
+            uuid=row.id,
+        )
+        for row in rows
+    ]
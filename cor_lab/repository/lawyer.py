@@ -17,6 +17,7 @@ from sqlalchemy.exc import NoResultFound
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from cor_lab.schemas import LawyerCreate
+from cor_lab.services.redis_service import revoke_user_tokens
 
 
 async def create_lawyer(
@@ -38,6 +39,8 @@ async def create_lawyer(
 
     await db.commit()
     await db.refresh(lawyer)
+    # Новая роль попадёт в токен только после перевыпуска
+    await revoke_user_tokens(user.cor_id)
 
     return lawyer
 
@@ -126,6 +129,7 @@ async def approve_doctor(doctor: Doctor, db: AsyncSession, status: Doctor_Status
     except Exception as e:
         await db.rollback()
         raise e
+    await revoke_user_tokens(doctor.doctor_id)
 
 
 async def delete_doctor_by_doctor_id(db: AsyncSession, doctor_id: str):
@@ -139,6 +143,7 @@ async def delete_doctor_by_doctor_id(db: AsyncSession, doctor_id: str):
 
         await db.delete(doctor)
         await db.commit()
+        await revoke_user_tokens(doctor_id)
     except NoResultFound:
         print("Доктор не найден.")
     except Exception as e:
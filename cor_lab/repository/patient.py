@@ -1,10 +1,14 @@
 import base64
-from typing import Optional
+from datetime import date
+from typing import List, NamedTuple, Optional
 import uuid
 from fastapi import HTTPException, status
-from sqlalchemy import or_, select
+from prometheus_client import Gauge
+from sqlalchemy import delete, event, func, insert, inspect, select
+from sqlalchemy.orm import Session, defer
 from cor_lab.database.models import (
     Patient,
+    PatientSearchNgram,
     DoctorPatientStatus,
     PatientClinicStatus,
     PatientStatus,
@@ -32,6 +36,97 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from cor_lab.services.search_token_generator import get_patient_search_tokens
 
 
+PATIENT_NAME_FIELDS = ("first_name", "last_name", "middle_name")
+_PENDING_SEARCH_INDEX_KEY = "pending_patient_search_index"
+
+PATIENT_SEARCH_COVERAGE = Gauge(
+    "patient_search_index_coverage_ratio",
+    "Share of patients with a name that are present in patient_search_ngrams",
+)
+
+
+def _patient_name_changed(patient: Patient) -> bool:
+    state = inspect(patient)
+    return any(
+        state.attrs[field].history.has_changes() for field in PATIENT_NAME_FIELDS
+    )
+
+
+@event.listens_for(Session, "before_flush")
+def _refresh_patient_search_tokens(session, flush_context, instances):
+    """
+    Пересчитывает search_tokens у новых пациентов и пациентов с изменённым ФИО,
+    чтобы любой путь записи (регистрация, добавление, правка) попадал в поиск.
+    """
+    pending = session.info.setdefault(_PENDING_SEARCH_INDEX_KEY, [])
+    for obj in list(session.new) + list(session.dirty):
+        if not isinstance(obj, Patient):
+            continue
+        is_new = obj in session.new
+        if not is_new and not _patient_name_changed(obj):
+            continue
+        search_tokens = get_patient_search_tokens(
+            first_name=obj.first_name,
+            last_name=obj.last_name,
+            middle_name=obj.middle_name,
+        )
+        if is_new or search_tokens != (obj.search_tokens or ""):
+            obj.search_tokens = search_tokens
+            pending.append(obj)
+
+
+@event.listens_for(Session, "after_flush")
+def _sync_patient_search_ngrams(session, flush_context):
+    """Синхронизирует patient_search_ngrams для пациентов, отмеченных в before_flush."""
+    pending = session.info.pop(_PENDING_SEARCH_INDEX_KEY, None)
+    if not pending:
+        return
+    connection = session.connection()
+    patient_ids = [patient.id for patient in pending]
+    connection.execute(
+        delete(PatientSearchNgram).where(PatientSearchNgram.patient_id.in_(patient_ids))
+    )
+    rows = [
+        {"ngram": ngram, "patient_id": patient.id}
+        for patient in pending
+        for ngram in {token for token in patient.search_tokens.split(" ") if token}
+    ]
+    if rows:
+        connection.execute(insert(PatientSearchNgram), rows)
+
+
+async def get_patient_search_coverage(db: AsyncSession) -> dict:
+    """
+    Покрытие поискового индекса: сколько пациентов с заполненным ФИО
+    имеют строки в patient_search_ngrams. Обновляет метрику Prometheus.
+    """
+    has_name = (
+        func.coalesce(Patient.first_name, "")
+        + func.coalesce(Patient.last_name, "")
+        + func.coalesce(Patient.middle_name, "")
+    ) != ""
+    indexed = (
+        select(PatientSearchNgram.patient_id)
+        .where(PatientSearchNgram.patient_id == Patient.id)
+        .exists()
+    )
+    row = (
+        await db.execute(
+            select(
+                func.count().filter(has_name).label("named"),
+                func.count().filter(has_name, indexed).label("indexed"),
+            ).select_from(Patient)
+        )
+    ).one()
+    coverage = row.indexed / row.named if row.named else 1.0
+    PATIENT_SEARCH_COVERAGE.set(coverage)
+    return {
+        "patients_with_name": row.named,
+        "indexed_patients": row.indexed,
+        "coverage": round(coverage, 4),
+    }
+
+
 async def register_new_patient(
     db: AsyncSession, body: NewPatientRegistration, doctor: Doctor
 ):
@@ -41,7 +136,6 @@ async def register_new_patient(
     # Генерируем временный пароль
     password_settings = PasswordGeneratorSettings()
     temp_password = generate_password(password_settings)
-    hashed_password = auth_service.get_password_hash(temp_password)
 
     user_signup_data = UserModel(
         email=body.email,
@@ -49,7 +143,7 @@ async def register_new_patient(
         birth=body.birth_date.year,
         user_sex=body.sex,
     )
-    hashed_password = auth_service.get_password_hash(temp_password)
+    hashed_password = await auth_service.get_password_hash(temp_password)
     user_signup_data.password = hashed_password
 
     new_user = await repository_person.create_user(user_signup_data, db)
@@ -325,7 +419,6 @@ async def create_patient_and_user_by_email(
 
     password_settings = PasswordGeneratorSettings()
     temp_password = generate_password(password_settings)
-    hashed_password = auth_service.get_password_hash(temp_password)
 
     user_signup_data = UserModel(
         email=patient_data.email,
@@ -333,6 +426,7 @@ async def create_patient_and_user_by_email(
         birth=patient_data.birth_date.year,
         user_sex=patient_data.sex,
     )
+    hashed_password = await auth_service.get_password_hash(temp_password)
     user_signup_data.password = hashed_password
 
     new_user = await repository_person.create_user(user_signup_data, db)
@@ -369,53 +463,91 @@ async def create_standalone_patient(
         send_email=False,
     )
 
-async def find_patient(
-    db: AsyncSession, search_ngrams_joined: str,
-) -> Patient | None: 
-    
-    search_ngrams = search_ngrams_joined.split(' ') 
-    
-    if not search_ngrams:
-        return None 
-
-    conditions = []
-    for ngram in search_ngrams:
-        conditions.append(Patient.search_tokens.ilike(f"%{ngram}%"))
-
-    patient_query = (
-        select(Patient)
-        .where(or_(*conditions))
-    )
-    
-    logger.debug(f"Generated Candidate SQL Query: {patient_query.compile(compile_kwargs={'literal_binds': True})}")
-    pat_exec = await db.execute(patient_query)
-    candidate_patients = pat_exec.scalars().all() 
-    
-    if not candidate_patients:
-        return None 
-
-    patient_scores = []
-    for patient in candidate_patients:
-        score = 0
-        patient_tokens = patient.search_tokens.split(' ') if patient.search_tokens else []
-        
-        for search_ngram in search_ngrams:
+class PatientSearchHit(NamedTuple):
+    """Кандидат поиска пациента: отображаемые поля и доля совпавших n-грамм запроса."""
 
+    patient_id: str
+    patient_cor_id: str
+    last_name: Optional[str]
+    first_name: Optional[str]
+    middle_name: Optional[str]
+    birth_date: Optional[date]
+    score: float
+    search_tokens: str = ""
 
-            if search_ngram in patient.search_tokens: 
-                score += 1
-            
-        patient_scores.append((patient, score))
 
-    patient_scores.sort(key=lambda x: x[1], reverse=True)
+async def search_patients(
+    db: AsyncSession, search_ngrams: List[str], limit: int = 10
+) -> List[PatientSearchHit]:
+    """
+    Ищет пациентов по n-граммам запроса через индекс patient_search_ngrams.
+    Ранжирование выполняется в SQL: по числу совпавших n-грамм, затем по id.
+    Возвращает не более limit кандидатов; score - доля совпавших n-грамм запроса.
+    """
+    ngrams = sorted({ngram for ngram in search_ngrams if ngram})
+    if not ngrams:
+        return []
+
+    matches = (
+        select(
+            PatientSearchNgram.patient_id,
+            func.count().label("matched"),
+        )
+        .where(PatientSearchNgram.ngram.in_(ngrams))
+        .group_by(PatientSearchNgram.patient_id)
+        .order_by(func.count().desc(), PatientSearchNgram.patient_id)
+        .limit(limit)
+        .subquery()
+    )
+    query = (
+        select(
+            Patient.id,
+            Patient.patient_cor_id,
+            Patient.last_name,
+            Patient.first_name,
+            Patient.middle_name,
+            Patient.birth_date,
+            Patient.search_tokens,
+            matches.c.matched,
+        )
+        .join(matches, matches.c.patient_id == Patient.id)
+        .order_by(matches.c.matched.desc(), Patient.id)
+    )
+    rows = (await db.execute(query)).all()
+    return [
+        PatientSearchHit(
+            patient_id=row.id,
+            patient_cor_id=row.patient_cor_id,
+            last_name=row.last_name,
+            first_name=row.first_name,
+            middle_name=row.middle_name,
+            birth_date=row.birth_date,
+            score=round(row.matched / len(ngrams), 4),
+            search_tokens=row.search_tokens or "",
+        )
+        for row in rows
+    ]
 
 
-    most_relevant_patient = patient_scores[0][0] 
-    
-    if patient_scores[0][1] == 0:
+async def find_patient(
+    db: AsyncSession, search_ngrams_joined: str,
+) -> Patient | None:
+    """
+    Возвращает наиболее релевантного пациента по n-граммам запроса
+    (см. search_patients) или None, если совпадений нет.
+    """
+    hits = await search_patients(
+        db=db, search_ngrams=search_ngrams_joined.split(" "), limit=1
+    )
+    if not hits:
         return None
-        
-    return most_relevant_patient
+
+    result = await db.execute(
+        select(Patient)
+        .where(Patient.id == hits[0].patient_id)
+        .options(defer(Patient.photo))
+    )
+    return result.scalar_one_or_none()
 
 
 async def get_single_patient_by_corid(db: AsyncSession, cor_id: str)-> Patient | None:
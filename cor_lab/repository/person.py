@@ -1,10 +1,19 @@
 
 from typing import List
+from sqlalchemy import exists
 from sqlalchemy.future import select
 
 import uuid
 
-from cor_lab.database.models import User, Verification
+from cor_lab.database.models import (
+    Doctor,
+    Doctor_Status,
+    LabAssistant,
+    Lawyer,
+    User,
+    Verification,
+)
+from cor_lab.config.config import settings
 from cor_lab.repository.password_generator import generate_password
 from cor_lab.repository import cor_id as repository_cor_id
 from cor_lab.schemas import (
@@ -13,7 +22,8 @@ from cor_lab.schemas import (
     UserModel,
 )
 from cor_lab.services.auth import auth_service
-from cor_lab.services import roles as role_check
+from cor_lab.services.principal_cache import collect_roles, principal_cache
+from cor_lab.services.redis_service import revoke_user_tokens
 from loguru import logger
 from cor_lab.services.cipher import (
     generate_aes_key,
@@ -50,6 +60,34 @@ async def get_user_by_uuid(uuid: str, db: AsyncSession) -> User | None:
     return user
 
 
+async def get_user_principal_row(uuid: str, db: AsyncSession):
+    """
+    Асинхронно получает пользователя вместе с признаками ролей одним запросом:
+    срез врача (без бинарных полей), лаборанта и наличие записи юриста.
+    """
+    stmt = (
+        select(
+            User,
+            Doctor.id.label("doctor_pk"),
+            Doctor.status.label("doctor_status"),
+            Doctor.first_name.label("doctor_first_name"),
+            Doctor.middle_name.label("doctor_middle_name"),
+            Doctor.last_name.label("doctor_last_name"),
+            LabAssistant.id.label("lab_assistant_pk"),
+            LabAssistant.first_name.label("lab_assistant_first_name"),
+            LabAssistant.surname.label("lab_assistant_surname"),
+            LabAssistant.middle_name.label("lab_assistant_middle_name"),
+            Lawyer.id.label("lawyer_pk"),
+        )
+        .outerjoin(Doctor, Doctor.doctor_id == User.cor_id)
+        .outerjoin(LabAssistant, LabAssistant.lab_assistant_cor_id == User.cor_id)
+        .outerjoin(Lawyer, Lawyer.lawyer_cor_id == User.cor_id)
+        .where(User.id == uuid)
+    )
+    result = await db.execute(stmt)
+    return result.first()
+
+
 async def get_user_by_corid(cor_id: str, db: AsyncSession) -> User | None:
     """
     Асинхронно получает пользователя по его Cor ID.
@@ -162,7 +200,7 @@ async def change_user_password(email: str, password: str, db: AsyncSession) -> N
     """
     user = await get_user_by_email(email, db)
     if user:
-        hashed_password = auth_service.get_password_hash(password)
+        hashed_password = await auth_service.get_password_hash(password)
         user.password = hashed_password
         try:
             await db.commit()
@@ -170,14 +208,27 @@ async def change_user_password(email: str, password: str, db: AsyncSession) -> N
         except Exception as e:
             await db.rollback()
             raise e
+        await principal_cache.invalidate_user(user_id=user.id)
     else:
         logger.warning(f"User with email {email} not found during password change.")
 
 
+def _email_roles(email: str) -> List[str]:
+    """Роли, которые определяются только email (admin, lawyer по списку, cor-int)."""
+    return collect_roles(
+        email,
+        is_lawyer=email in settings.lawyer_accounts,
+        is_approved_doctor=False,
+        is_lab_assistant=False,
+    )
+
+
 async def change_user_email(email: str, current_user, db: AsyncSession) -> None:
     """
     Асинхронно изменяет email пользователя.
+    Если от email зависят роли, выпущенные токены пользователя отзываются.
     """
+    roles_changed = _email_roles(current_user.email) != _email_roles(email)
     current_user.email = email
     try:
         await db.commit()
@@ -185,6 +236,9 @@ async def change_user_email(email: str, current_user, db: AsyncSession) -> None:
     except Exception as e:
         await db.rollback()
         raise e
+    await principal_cache.invalidate_user(user_id=current_user.id)
+    if roles_changed:
+        await revoke_user_tokens(current_user.cor_id or current_user.id)
 
 
 async def add_user_backup_email(
@@ -200,6 +254,7 @@ async def add_user_backup_email(
     except Exception as e:
         await db.rollback()
         raise e
+    await principal_cache.invalidate_user(user_id=current_user.id)
 
 
 async def delete_user_by_email(db: AsyncSession, email: str):
@@ -213,6 +268,9 @@ async def delete_user_by_email(db: AsyncSession, email: str):
 
         await db.delete(user)
         await db.commit()
+        await principal_cache.invalidate_user(user_id=user.id)
+        # Роли в выпущенных токенах больше не действительны
+        await revoke_user_tokens(user.cor_id or user.id)
     except NoResultFound:
         print("Пользователя не найдено.")
     except Exception as e:
@@ -220,26 +278,52 @@ async def delete_user_by_email(db: AsyncSession, email: str):
         print(f"Произошла ошибка при удалении пользователя: {e}")
 
 
-
-async def get_user_roles(email: str, db: AsyncSession) -> List[str]:
-    roles = []
+async def deactivate_user(email: str, db: AsyncSession) -> None:
+    """
+    Асинхронно деактивирует аккаунт пользователя и отзывает его токены.
+    Деактивированный пользователь не может войти или обновить токен.
+    """
     user = await get_user_by_email(email, db)
+    if user is None:
+        logger.warning(f"User with email {email} not found during deactivation.")
+        return
+    user.is_active = False
+    try:
+        await db.commit()
+    except Exception as e:
+        await db.rollback()
+        raise e
+    await principal_cache.invalidate_user(user_id=user.id)
+    await revoke_user_tokens(user.cor_id or user.id)
+
+
 
-    if await role_check.admin_role_checker.is_admin(user=user):
-        roles.append("admin")
-    if await role_check.lawyer_role_checker.is_lawyer(user=user, db=db):
-        roles.append("lawyer")
-    if await role_check.cor_int_role_checker.is_cor_int(user=user):
-        roles.append("cor-int")
-    doctor = await role_check.doctor_role_checker.is_doctor(user=user, db=db)
-    if doctor:
-        roles.append("doctor")
-    lab_assistant = await role_check.lab_assistant_role_checker.is_lab_assistant(
-        user=user, db=db
+async def get_user_roles(email: str, db: AsyncSession) -> List[str]:
+    """
+    Асинхронно получает роли пользователя одним запросом:
+    наличие записей юриста, одобренного врача и лаборанта проверяется через EXISTS.
+    """
+    stmt = select(
+        User.email,
+        exists()
+        .where(Lawyer.lawyer_cor_id == User.cor_id)
+        .label("is_lawyer"),
+        exists()
+        .where(Doctor.doctor_id == User.cor_id, Doctor.status == Doctor_Status.approved)
+        .label("is_approved_doctor"),
+        exists()
+        .where(LabAssistant.lab_assistant_cor_id == User.cor_id)
+        .label("is_lab_assistant"),
+    ).where(User.email == email)
+    row = (await db.execute(stmt)).first()
+    if row is None:
+        return []
+    return collect_roles(
+        row.email,
+        is_lawyer=row.is_lawyer or row.email in settings.lawyer_accounts,
+        is_approved_doctor=row.is_approved_doctor,
+        is_lab_assistant=row.is_lab_assistant,
     )
-    if lab_assistant:
-        roles.append("lab_assistant")
-    return roles
 
 
 async def register_new_user(db: AsyncSession, body: NewUserRegistration):
@@ -249,7 +333,6 @@ async def register_new_user(db: AsyncSession, body: NewUserRegistration):
     # Генерируем временный пароль
     password_settings = PasswordGeneratorSettings()
     temp_password = generate_password(password_settings)
-    hashed_password = auth_service.get_password_hash(temp_password)
 
     user_signup_data = UserModel(
         email=body.email,
@@ -257,7 +340,7 @@ async def register_new_user(db: AsyncSession, body: NewUserRegistration):
         birth=body.birth_date.year,
         user_sex=body.sex,
     )
-    hashed_password = auth_service.get_password_hash(temp_password)
+    hashed_password = await auth_service.get_password_hash(temp_password)
     user_signup_data.password = hashed_password
 
     new_user = await create_user(user_signup_data, db)
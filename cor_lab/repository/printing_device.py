@@ -18,6 +18,8 @@ async def create_printing_device(db: AsyncSession, body: CreatePrintingDevice):
         port=body.port,
         comment=body.comment,
         location=body.location,
+        max_connections=body.max_connections,
+        timeout_seconds=body.timeout_seconds,
     )
     try:
         db.add(db_printing_device)
@@ -89,6 +91,8 @@ async def update_printing_device(
         printing_device.port = body.port
         printing_device.comment = body.comment
         printing_device.location = body.location
+        printing_device.max_connections = body.max_connections
+        printing_device.timeout_seconds = body.timeout_seconds
     try:
         await db.commit()
         await db.refresh(printing_device)
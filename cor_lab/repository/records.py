@@ -4,7 +4,7 @@ from sqlalchemy import and_, select
 
 from cor_lab.database.models import User, Record
 from cor_lab.schemas import CreateRecordModel, UpdateRecordModel
-from cor_lab.services.cipher import encrypt_data, decrypt_data, decrypt_user_key
+from cor_lab.services.cipher import decrypt_batch, decrypt_user_key, encrypt_batch
 
 from sqlalchemy.ext.asyncio import AsyncSession
 
@@ -14,16 +14,16 @@ async def create_record(
 ) -> Record:
     if not user:
         raise Exception("User not found")
+    encrypted_username, encrypted_password = await encrypt_batch(
+        [body.username, body.password],
+        key=await decrypt_user_key(user.unique_cipher_key),
+    )
     new_record = Record(
         record_name=body.record_name,
         user_id=user.id,
         website=body.website,
-        username=await encrypt_data(
-            data=body.username, key=await decrypt_user_key(user.unique_cipher_key)
-        ),
-        password=await encrypt_data(
-            data=body.password, key=await decrypt_user_key(user.unique_cipher_key)
-        ),
+        username=encrypted_username,
+        password=encrypted_password,
         notes=body.notes,
     )
     
@@ -46,12 +46,8 @@ async def get_record_by_id(user: User, db: AsyncSession, record_id: int):
     record = result.scalar_one_or_none()
 
     if record:
-        record.password = await decrypt_data(
-            encrypted_data=record.password,
-            key=await decrypt_user_key(user.unique_cipher_key),
-        )
-        record.username = await decrypt_data(
-            encrypted_data=record.username,
+        record.password, record.username = await decrypt_batch(
+            [record.password, record.username],
             key=await decrypt_user_key(user.unique_cipher_key),
         )
     return record
@@ -69,6 +65,46 @@ async def get_all_user_records(
     return list(records)
 
 
+async def get_decrypted_user_records(
+    db: AsyncSession, user: User, skip: int, limit: int
+) -> List[dict]:
+    """
+    Асинхронно получает страницу записей пользователя с расшифрованными
+    логином и паролем. Ключ пользователя расшифровывается один раз,
+    все поля страницы дешифруются одним вызовом крипто-пула.
+    """
+    stmt = (
+        select(Record)
+        .where(Record.user_id == user.id)
+        .order_by(Record.record_id)
+        .offset(skip)
+        .limit(limit)
+    )
+    result = await db.execute(stmt)
+    records = result.scalars().all()
+    if not records:
+        return []
+
+    decrypted_fields = await decrypt_batch(
+        [field for record in records for field in (record.username, record.password)],
+        key=await decrypt_user_key(user.unique_cipher_key),
+    )
+    return [
+        {
+            "record_id": record.record_id,
+            "record_name": record.record_name,
+            "website": record.website,
+            "username": decrypted_fields[index * 2],
+            "password": decrypted_fields[index * 2 + 1],
+            "notes": record.notes,
+            "is_favorite": record.is_favorite,
+            "created_at": record.created_at,
+            "edited_at": record.edited_at,
+        }
+        for index, record in enumerate(records)
+    ]
+
+
 async def update_record(
     record_id: int, body: UpdateRecordModel, user: User, db: AsyncSession
 ):
@@ -86,11 +122,9 @@ async def update_record(
     if record:
         record.record_name = body.record_name
         record.website = body.website
-        record.username = await encrypt_data(
-            data=body.username, key=await decrypt_user_key(user.unique_cipher_key)
-        )
-        record.password = await encrypt_data(
-            data=body.password, key=await decrypt_user_key(user.unique_cipher_key)
+        record.username, record.password = await encrypt_batch(
+            [body.username, body.password],
+            key=await decrypt_user_key(user.unique_cipher_key),
         )
         record.notes = body.notes
 
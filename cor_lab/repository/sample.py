@@ -1,18 +1,15 @@
 import re
 from string import ascii_uppercase
-from fastapi import Request
-from sqlalchemy import select
+from sqlalchemy import delete, select
 from sqlalchemy.ext.asyncio import AsyncSession
 from cor_lab.repository.case import (
+    _any_of,
+    _recompute_ancestor_aggregates,
     _update_ancestor_statuses_from_cassette,
     _update_ancestor_statuses_from_glass,
 )
-from cor_lab.repository.cassette import print_cassette_data
-from cor_lab.repository.glass import print_glass_data
+from cor_lab.repository.case_worklist import refresh_case_worklist
 from cor_lab.schemas import (
-    CassettePrinting,
-    GeneralPrinting,
-    GlassPrinting,
     Sample as SampleModelScheema,
     Cassette as CassetteModelScheema,
     Glass as GlassModelScheema,
@@ -243,6 +240,7 @@ async def create_sample(
         db.add(db_glass)
         db_case.glass_count += 1
         db_sample.glass_count += 1
+        await refresh_case_worklist(db, [db_case.id])
 
         await db.commit()
         await db.refresh(db_sample)
@@ -316,43 +314,42 @@ async def create_sample(
 
 
 async def delete_samples(db: AsyncSession, samples_ids: List[str]) -> Dict[str, Any]:
-    """Асинхронно удаляет несколько семплов по их ID и корректно обновляет счетчики."""
-    deleted_count = 0
-    not_found_ids: List[str] = []
-
-    for sample_id in samples_ids:
-        result = await db.execute(
-            select(db_models.Sample)
-            .where(db_models.Sample.id == sample_id)
-            .options(
-                selectinload(db_models.Sample.cassette).selectinload(
-                    db_models.Cassette.glass
-                )
-            )
-        )
-        db_sample = result.scalar_one_or_none()
-        if db_sample:
-            db_case = await db.get(db_models.Case, db_sample.case_id)
-            if not db_case:
-                raise ValueError(f"Кейс с ID {db_sample.case_id} не найден")
-
-            num_cassettes_to_decrement = len(db_sample.cassette)
-            num_glasses_to_decrement = sum(
-                len(cassette.glass) for cassette in db_sample.cassette
-            )
-
-            await db.delete(db_sample)
-            deleted_count += 1
-
-            db_case.bank_count -= 1
-            db_case.cassette_count -= num_cassettes_to_decrement
-            db_case.glass_count -= num_glasses_to_decrement
+    """
+    Асинхронно удаляет несколько семплов (вместе с кассетами и стеклами)
+    в одной транзакции и пересчитывает счетчики и статусы печати затронутых кейсов.
+    """
+    target_ids = _any_of(samples_ids)
+    sample_cassette_ids = select(db_models.Cassette.id).where(
+        db_models.Cassette.sample_id == target_ids
+    )
+    await db.execute(
+        delete(db_models.Glass)
+        .where(db_models.Glass.cassette_id.in_(sample_cassette_ids))
+        .execution_options(synchronize_session=False)
+    )
+    await db.execute(
+        delete(db_models.Cassette)
+        .where(db_models.Cassette.sample_id == target_ids)
+        .execution_options(synchronize_session=False)
+    )
+    deleted_result = await db.execute(
+        delete(db_models.Sample)
+        .where(db_models.Sample.id == target_ids)
+        .returning(db_models.Sample.id, db_models.Sample.case_id)
+        .execution_options(synchronize_session=False)
+    )
+    deleted_rows = deleted_result.all()
 
-            await db.commit()
-            await db.refresh(db_case)
+    affected_case_ids = {row.case_id for row in deleted_rows}
+    await _recompute_ancestor_aggregates(db, case_ids=affected_case_ids)
+    await refresh_case_worklist(db, affected_case_ids)
+    await db.commit()
 
-        else:
-            not_found_ids.append(sample_id)
+    deleted_ids = {row.id for row in deleted_rows}
+    deleted_count = len(deleted_ids)
+    not_found_ids = [
+        sample_id for sample_id in samples_ids if sample_id not in deleted_ids
+    ]
 
     response = {"deleted_count": deleted_count}
     if not_found_ids:
@@ -364,140 +361,3 @@ async def delete_samples(db: AsyncSession, samples_ids: List[str]) -> Dict[str,
         response["message"] = f"Успешно удалено {deleted_count} семплов."
 
     return response
-
-
-async def print_all_sample_cassettes(
-    db: AsyncSession, sample_id: str, printing: bool, data: GeneralPrinting, request: Request
-) -> Optional[SampleModelScheema]:
-    """
-    Устанавливает статус 'is_printed' для всех кассет данного образца
-    и для флага 'is_printed_cassette' образца.
-    Возвращает обновленные данные образца в виде Pydantic-схемы.
-    """
-    sample_result = await db.execute(
-        select(db_models.Sample)
-        .where(db_models.Sample.id == sample_id)
-        .options(
-            selectinload(db_models.Sample.cassette).selectinload(
-                db_models.Cassette.glass
-            )
-        )
-    )
-    sample_db = sample_result.scalar_one_or_none()
-
-    if not sample_db:
-        return None
-    sample_db.is_printed_cassette = printing
-    cassettes_to_update = list(sample_db.cassette) if sample_db.cassette else []
-
-    for cassette_db in cassettes_to_update:
-        cassette_data = CassettePrinting(
-            printer_ip=data.printer_ip,
-            model_id=data.model_id,
-            clinic_name=data.clinic_name,
-            hooper=data.hooper,
-            cassete_id=cassette_db.id,
-            printing=printing
-        )
-        await print_cassette_data(db=db, data=cassette_data, request=request)
-
-    for cassette_db in cassettes_to_update:
-        cassette_db.is_printed = printing
-
-    def sort_cassettes(cassette):
-        match = re.match(r"([A-Z]+)(\d+)", cassette.cassette_number)
-        if match:
-            letter_part = match.group(1)
-            number_part = int(match.group(2))
-            return (letter_part, number_part)
-        return (cassette.cassette_number, 0)
-
-    sorted_cassettes_db = sorted(sample_db.cassette, key=sort_cassettes)
-
-    sample_schema = SampleModelScheema.model_validate(sample_db)
-    sample_schema.cassettes = []
-
-    for cassette_db in sorted_cassettes_db:
-        cassette_schema = CassetteModelScheema.model_validate(cassette_db)
-        cassette_schema.glasses = sorted(
-            [
-                GlassModelScheema.model_validate(glass_db)
-                for glass_db in cassette_db.glass
-            ],
-            key=lambda glass_s: glass_s.glass_number,
-        )
-        # await _update_ancestor_statuses_from_cassette(db=db, cassette=cassette_db)
-        # for glass_db in cassette_db.glass:
-        #     await _update_ancestor_statuses_from_glass(db=db, glass=glass_db)
-        sample_schema.cassettes.append(cassette_schema)
-
-    await db.commit()
-    await db.refresh(sample_db)
-    return sample_schema
-
-
-async def print_all_sample_glasses(
-    db: AsyncSession, sample_id: str, printing: bool, data: GeneralPrinting, request: Request
-) -> Optional[SampleModelScheema]:
-    sample_result = await db.execute(
-        select(db_models.Sample)
-        .where(db_models.Sample.id == sample_id)
-        .options(
-            selectinload(db_models.Sample.cassette).selectinload(
-                db_models.Cassette.glass
-            )
-        )
-    )
-    sample_db = sample_result.scalar_one_or_none()
-
-    if not sample_db:
-        return None
-
-    sample_db.is_printed_glass = printing
-
-    glasses_to_update: List[db_models.Glass] = []
-    for cassette_db in sample_db.cassette:
-        glasses_to_update.extend(cassette_db.glass)
-
-    for glass_db in glasses_to_update:
-        glass_data = GlassPrinting(
-            printer_ip=data.printer_ip,
-            model_id=data.model_id,
-            clinic_name=data.clinic_name,
-            hooper=data.hooper,
-            glass_id=glass_db.id,
-            printing=printing
-        )
-        await print_glass_data(db=db, data=glass_data, request=request)
-
-    for glass_db in glasses_to_update:
-        glass_db.is_printed = printing
-    def sort_cassettes(cassette):
-        match = re.match(r"([A-Z]+)(\d+)", cassette.cassette_number)
-        if match:
-            letter_part = match.group(1)
-            number_part = int(match.group(2))
-            return (letter_part, number_part)
-        return (cassette.cassette_number, 0)
-
-    sample_schema = SampleModelScheema.model_validate(sample_db)
-
-    sorted_cassettes_db = sorted(sample_db.cassette, key=sort_cassettes)
-    sample_schema.cassettes = []
-
-    for cassette_db in sorted_cassettes_db:
-        cassette_schema = CassetteModelScheema.model_validate(cassette_db)
-
-        cassette_schema.glasses = sorted(
-            [
-                GlassModelScheema.model_validate(glass_db)
-                for glass_db in cassette_db.glass
-            ],
-            key=lambda glass_s: glass_s.glass_number,
-        )
-        sample_schema.cassettes.append(cassette_schema)
-
-    await db.commit()
-    await db.refresh(sample_db)
-
-    return sample_schema
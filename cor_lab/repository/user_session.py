@@ -1,4 +1,5 @@
 
+import hmac
 from typing import List
 from sqlalchemy import func, and_, select
 from cor_lab.database.models import (
@@ -10,8 +11,10 @@ from cor_lab.schemas import (
 )
 from loguru import logger
 from cor_lab.services.cipher import (
-    encrypt_data,
+    decrypt_data,
+    encrypt_batch,
     decrypt_user_key,
+    hash_refresh_token,
 )
 from sqlalchemy.ext.asyncio import AsyncSession
 
@@ -29,15 +32,16 @@ async def create_user_session(
     result = await db.execute(stmt)
     existing_session = result.scalar_one_or_none()
 
-    encrypted_refresh_token = await encrypt_data(
-        data=body.refresh_token, key=await decrypt_user_key(user.unique_cipher_key)
-    )
-    encrypted_access_token = await encrypt_data(
-        data=body.access_token, key=await decrypt_user_key(user.unique_cipher_key)
+    encrypted_refresh_token, encrypted_access_token = await encrypt_batch(
+        [body.refresh_token, body.access_token],
+        key=await decrypt_user_key(user.unique_cipher_key),
     )
 
+    refresh_token_hash = hash_refresh_token(body.refresh_token)
+
     if existing_session:
         existing_session.refresh_token = encrypted_refresh_token
+        existing_session.refresh_token_hash = refresh_token_hash
         existing_session.jti = body.jti
         existing_session.updated_at = func.now()
         existing_session.access_token = encrypted_access_token
@@ -57,6 +61,7 @@ async def create_user_session(
             ip_address=body.ip_address,
             device_os=body.device_os,
             refresh_token=encrypted_refresh_token,
+            refresh_token_hash=refresh_token_hash,
             jti=body.jti,
             access_token=encrypted_access_token,
         )
@@ -85,6 +90,56 @@ async def get_user_sessions_by_device_info(
     return list(sessions)
 
 
+async def get_session_by_refresh_token(
+    user: User, device_info: str, refresh_token: str, db: AsyncSession
+) -> UserSession | None:
+    """
+    Асинхронно находит сессию пользователя на устройстве по refresh токену.
+
+    Поиск идёт по индексированному HMAC токена. Сессии, созданные до появления
+    refresh_token_hash и ещё не заполненные бэкфиллом, проверяются расшифровкой;
+    при совпадении хэш сохраняется, и следующий поиск уже индексный.
+    """
+    refresh_token_hash = hash_refresh_token(refresh_token)
+    stmt = select(UserSession).where(
+        UserSession.refresh_token_hash == refresh_token_hash,
+        UserSession.user_id == user.cor_id,
+        UserSession.device_info == device_info,
+    )
+    result = await db.execute(stmt)
+    session = result.scalars().first()
+    if session is not None:
+        return session
+
+    stmt = select(UserSession).where(
+        UserSession.user_id == user.cor_id,
+        UserSession.device_info == device_info,
+        UserSession.refresh_token_hash.is_(None),
+        UserSession.refresh_token.is_not(None),
+    )
+    result = await db.execute(stmt)
+    legacy_sessions = result.scalars().all()
+    if not legacy_sessions:
+        return None
+
+    key = await decrypt_user_key(user.unique_cipher_key)
+    for legacy_session in legacy_sessions:
+        try:
+            session_token = await decrypt_data(
+                encrypted_data=legacy_session.refresh_token, key=key
+            )
+        except ValueError:
+            logger.warning(
+                f"Failed to decrypt refresh token for session {legacy_session.id}"
+            )
+            continue
+        if hmac.compare_digest(session_token, refresh_token):
+            legacy_session.refresh_token_hash = refresh_token_hash
+            await db.commit()
+            return legacy_session
+    return None
+
+
 async def update_user_session_jti(db: AsyncSession, session_id: str, new_jti: str):
     """Обновляет JTI для существующей сессии."""
     result = await db.execute(select(UserSession).where(UserSession.id == session_id))
@@ -115,13 +170,14 @@ async def update_session_token(
         )
         result = await db.execute(stmt)
         existing_session = result.scalar_one_or_none()
-        key = await decrypt_user_key(user.unique_cipher_key)
-
         if existing_session and token is not None:
-            encrypted_refresh_token = await encrypt_data(data=token, key=key)
-            encrypted_access_token = await encrypt_data(data=access_token, key=key)
+            encrypted_refresh_token, encrypted_access_token = await encrypt_batch(
+                [token, access_token],
+                key=await decrypt_user_key(user.unique_cipher_key),
+            )
 
             existing_session.refresh_token = encrypted_refresh_token
+            existing_session.refresh_token_hash = hash_refresh_token(token)
             existing_session.jti = jti
             existing_session.updated_at = func.now()
             existing_session.access_token = encrypted_access_token
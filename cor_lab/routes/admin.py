@@ -23,8 +23,9 @@ from cor_lab.schemas import (
     UserRolesResponseForAdmin,
 )
 from cor_lab.repository import person
+from cor_lab.repository.patient import get_patient_search_coverage
 from pydantic import EmailStr
-from cor_lab.database.redis_db import redis_client
+from cor_lab.services.activity_tracker import get_last_activity
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.exc import IntegrityError
 
@@ -56,33 +57,20 @@ async def get_all_users(
     """
 
     list_users = await person.get_users(skip, limit, db)
-    users_list_with_activity = []
-
-    for user in list_users:
-        oid = str(user.id)
-        last_active = None
-        if await redis_client.exists(oid):
-            users_last_activity = await redis_client.get(oid)
-            user_response = UserDb(
-                id=user.id,
-                cor_id=user.cor_id,
-                email=user.email,
-                user_sex=user.user_sex,
-                birth=user.birth,
-                created_at=user.created_at,
-                last_active=users_last_activity,
-            )
-        else:
-            user_response = UserDb(
-                id=user.id,
-                cor_id=user.cor_id,
-                email=user.email,
-                user_sex=user.user_sex,
-                birth=user.birth,
-                created_at=user.created_at,
-            )
-
-        users_list_with_activity.append(user_response)
+    last_activity = await get_last_activity([str(user.id) for user in list_users])
+
+    users_list_with_activity = [
+        UserDb(
+            id=user.id,
+            cor_id=user.cor_id,
+            email=user.email,
+            user_sex=user.user_sex,
+            birth=user.birth,
+            created_at=user.created_at,
+            last_active=last_activity.get(str(user.id)),
+        )
+        for user in list_users
+    ]
 
     return users_list_with_activity
 
@@ -108,14 +96,7 @@ async def get_all_user_info(
     if not user:
         raise HTTPException(status.HTTP_404_NOT_FOUND, "User not found.")
 
-    last_active = None
-    if await redis_client.exists(str(user.id)):
-        users_last_activity_str = await redis_client.get(str(user.id))
-        try:
-            last_active = users_last_activity_str
-        except (ValueError, TypeError) as e:
-            logger.error(f"Error parsing last_active from Redis: {e}")
-            last_active = None
+    last_active = (await get_last_activity([str(user.id)]))[str(user.id)]
 
     full_user_data["user_info"] = UserDb(
         id=user.id,
@@ -212,14 +193,7 @@ async def get_user_data_info(
     if not user:
         raise HTTPException(status.HTTP_404_NOT_FOUND, "User not found.")
 
-    last_active = None
-    if await redis_client.exists(str(user.id)):
-        users_last_activity_str = await redis_client.get(str(user.id))
-        try:
-            last_active = users_last_activity_str
-        except (ValueError, TypeError) as e:
-            logger.error(f"Error parsing last_active from Redis: {e}")
-            last_active = None
+    last_active = (await get_last_activity([str(user.id)]))[str(user.id)]
 
     user_data["user_info"] = UserDb(
         id=user.id,
@@ -541,10 +515,11 @@ async def register_new_user(
 )
 async def get_ws_connections():
     """
-    Возвращает список всех активных WebSocket-соединений, включая их ID и информацию о клиенте.
+    Возвращает список всех активных WebSocket-соединений всех воркеров,
+    включая их ID и информацию о клиенте.
     Требуются права администратора.
     """
-    return websocket_events_manager.get_active_connection_info()
+    return await websocket_events_manager.get_active_connection_info()
 
 
 @router.delete(
@@ -575,3 +550,18 @@ async def disconnect_all_ws_connections():
     """
     await websocket_events_manager.disconnect_all()
     return Response(status_code=status.HTTP_204_NO_CONTENT)
+
+
+@router.get(
+    "/patient_search/coverage",
+    summary="Покрытие поискового индекса пациентов",
+    response_model=Dict,
+    dependencies=[Depends(admin_access)],
+)
+async def patient_search_coverage(db: AsyncSession = Depends(get_db)):
+    """
+    Возвращает долю пациентов с заполненным ФИО, попавших в поисковый индекс.
+    Значение также публикуется метрикой patient_search_index_coverage_ratio.
+    Требуются права администратора.
+    """
+    return await get_patient_search_coverage(db)
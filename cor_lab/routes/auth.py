@@ -15,7 +15,6 @@ from fastapi.security import (
     HTTPBearer,
 )
 from random import randint
-from fastapi_limiter.depends import RateLimiter
 from cor_lab.database.db import get_db
 from cor_lab.schemas import (
     UserModel,
@@ -32,12 +31,14 @@ from cor_lab.repository import person as repository_person
 from cor_lab.repository import user_session as repository_session
 from cor_lab.repository import cor_id as repository_cor_id
 from cor_lab.services.auth import auth_service
+from cor_lab.services.auth_context import get_auth_context
 from cor_lab.services import device_info as di
+from cor_lab.services import redis_scripts
+from cor_lab.services.rate_limiter import HybridRateLimiter
 from cor_lab.services.email import (
     send_email_code,
     send_email_code_forgot_password,
 )
-from cor_lab.services.cipher import decrypt_data, decrypt_user_key, encrypt_data
 from cor_lab.config.config import settings
 from loguru import logger
 from fastapi import UploadFile
@@ -45,7 +46,6 @@ from fastapi import UploadFile
 from datetime import datetime
 
 from sqlalchemy.ext.asyncio import AsyncSession
-from jose import jwt, JWTError
 from cor_lab.database.redis_db import redis_client
 import time
 
@@ -54,6 +54,8 @@ IP_ATTEMPTS_PREFIX = "login:ip_attempts:"
 IP_BLOCKED_PREFIX = "login:ip_blocked:"
 MAX_ATTEMPTS_PER_IP = 15
 BLOCK_DURATION_SECONDS = 15 * 60  # 15 минут в секундах
+# Типы устройств, refresh токен которых привязан к сессии устройства
+MOBILE_DEVICE_TYPES = ("Mobile", "Mobile CorEnergy", "MobileCorEnergy")
 
 
 router = APIRouter(prefix="/auth", tags=["Authorization"])
@@ -66,7 +68,7 @@ ALGORITHM = settings.algorithm
     "/signup",
     response_model=ResponseUser,
     status_code=status.HTTP_201_CREATED,
-    dependencies=[Depends(RateLimiter(times=10, seconds=60))],
+    dependencies=[Depends(HybridRateLimiter(times=10, seconds=60))],
 )
 async def signup(
     body: UserModel,
@@ -89,7 +91,7 @@ async def signup(
         raise HTTPException(
             status_code=status.HTTP_409_CONFLICT, detail="Account already exists"
         )
-    body.password = auth_service.get_password_hash(body.password)
+    body.password = await auth_service.get_password_hash(body.password)
     new_user = await repository_person.create_user(body, db)
     if not new_user.cor_id:
         await repository_cor_id.create_new_corid(new_user, db)
@@ -135,7 +137,7 @@ async def signup(
 @router.post(
     "/login",
     response_model=LoginResponseModel,
-    dependencies=[Depends(RateLimiter(times=10, seconds=60))],
+    dependencies=[Depends(HybridRateLimiter(times=10, seconds=60))],
 )
 async def login(
     request: Request,
@@ -152,41 +154,35 @@ async def login(
     """
     client_ip = request.client.host
 
-    blocked_until_str = await redis_client.get(f"{IP_BLOCKED_PREFIX}{client_ip}")
-    if blocked_until_str:
-        blocked_until_timestamp = float(blocked_until_str)
-        if blocked_until_timestamp > time.time():
-            block_dt = datetime.fromtimestamp(blocked_until_timestamp)
-            logger.warning(f"IP-адрес {client_ip} заблокирован до {block_dt} (Redis).")
-            raise HTTPException(
-                status_code=429,
-                detail=f"IP-адрес заблокирован до {block_dt}",
-            )
-        else:
-            await redis_client.delete(f"{IP_BLOCKED_PREFIX}{client_ip}")
+    blocked_until_timestamp = await redis_scripts.check_block(
+        f"{IP_BLOCKED_PREFIX}{client_ip}", time.time()
+    )
+    if blocked_until_timestamp is not None:
+        block_dt = datetime.fromtimestamp(blocked_until_timestamp)
+        logger.warning(f"IP-адрес {client_ip} заблокирован до {block_dt} (Redis).")
+        raise HTTPException(
+            status_code=429,
+            detail=f"IP-адрес заблокирован до {block_dt}",
+        )
 
     user = await repository_person.get_user_by_email(body.username, db)
 
-    if user is None or not auth_service.verify_password(body.password, user.password):
+    if user is None or not await auth_service.verify_password(body.password, user.password):
         log_message = (
             f"Неудачная попытка входа для пользователя {body.username} с IP {client_ip}: "
             f"{'Пользователь не найден' if user is None else 'Неверный пароль'}"
         )
         logger.warning(log_message)
 
-        current_attempts = await redis_client.incr(f"{IP_ATTEMPTS_PREFIX}{client_ip}")
-        if current_attempts == 1:
-            await redis_client.expire(
-                f"{IP_ATTEMPTS_PREFIX}{client_ip}", BLOCK_DURATION_SECONDS
-            )
+        current_attempts, block_until_timestamp = await redis_scripts.register_failed_attempt(
+            f"{IP_ATTEMPTS_PREFIX}{client_ip}",
+            f"{IP_BLOCKED_PREFIX}{client_ip}",
+            MAX_ATTEMPTS_PER_IP,
+            BLOCK_DURATION_SECONDS,
+            time.time(),
+        )
 
-        if current_attempts >= MAX_ATTEMPTS_PER_IP:
-            block_until_timestamp = time.time() + BLOCK_DURATION_SECONDS
-            await redis_client.set(
-                f"{IP_BLOCKED_PREFIX}{client_ip}",
-                str(block_until_timestamp),
-                ex=BLOCK_DURATION_SECONDS,
-            )
+        if block_until_timestamp is not None:
             block_dt = datetime.fromtimestamp(block_until_timestamp)
             logger.warning(
                 f"Слишком много попыток авторизации с IP-адреса {client_ip}. Блокировка до {block_dt} (Redis)."
@@ -201,8 +197,14 @@ async def login(
             detail="User not found / invalid email or password",
         )
     else:
-        await redis_client.delete(f"{IP_ATTEMPTS_PREFIX}{client_ip}")
-        await redis_client.delete(f"{IP_BLOCKED_PREFIX}{client_ip}")
+        await redis_client.delete(
+            f"{IP_ATTEMPTS_PREFIX}{client_ip}", f"{IP_BLOCKED_PREFIX}{client_ip}"
+        )
+
+    if not user.is_active:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN, detail="Аккаунт деактивирован"
+        )
 
     # Получаем информацию об устройстве
     device_information = di.get_device_info(request)
@@ -269,27 +271,13 @@ async def get_user_device_rate_limit_key(request: Request) -> str:
     """
     Создает уникальный идентификатор для рейт-лимитера на основе user_id и device_info.
     """
-    auth_header = request.headers.get("Authorization")
-    token = None
-    if auth_header and auth_header.startswith("Bearer "):
-        token = auth_header.split(" ")[1]
-    if not token:
+    context = get_auth_context(request)
+    if not context.token:
         return None
-    try:
-        payload = jwt.decode(
-            token,
-            key=auth_service.SECRET_KEY,
-            algorithms=auth_service.ALGORITHM,
-            options={"verify_exp": False},
-        )
-
-        user_id = payload.get("oid")
-    except JWTError as e:
-        logger.debug(f"Failed to decode token for rate limiter key (JWTError): {e}")
-        return None
-    except Exception as e:
-        logger.error(f"Unexpected error in get_user_id_from_token_sync: {e}")
+    if context.claims is None:
+        logger.debug(f"Failed to decode token for rate limiter key (JWTError): {context.error}")
         return None
+    user_id = context.user_id
     device_type = request.headers.get("X-Device-Type", "unknown")
     device_info_str = request.headers.get("X-Device-Info", "unknown")
     if user_id:
@@ -304,7 +292,9 @@ async def get_user_device_rate_limit_key(request: Request) -> str:
     response_model=TokenModel,
     dependencies=[
         Depends(
-            RateLimiter(times=1, seconds=5, identifier=get_user_device_rate_limit_key)
+            HybridRateLimiter(
+                times=1, seconds=5, identifier=get_user_device_rate_limit_key
+            )
         )
     ],
 )
@@ -334,120 +324,48 @@ async def refresh_token(
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="User not found"
         )
+    if not user.is_active:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN, detail="Аккаунт деактивирован"
+        )
 
     # Получаем информацию об устройстве
     device_information = di.get_device_info(request)
-    # Если устройство мобильное, проверяем, есть ли у пользователя сессии на этом устройстве
-    existing_sessions = await repository_session.get_user_sessions_by_device_info(
-        user.cor_id, device_information["device_info"], db
-    )
-    logger.debug(f"Detected device type: {device_information['device_type']}")
-    logger.debug(
-        f"Detected existing_sessions: {device_information["device_info"]} - {existing_sessions}"
-    )
+    device_type = device_information["device_type"]
+    logger.debug(f"Detected device type: {device_type}")
     is_valid_session = False
-    if device_information["device_type"] == "Mobile":
-        # logger.debug(">>> Entered Mobile validation block <<<")
-        if not existing_sessions:
-            logger.debug(
-                f"existing_sessions for mobile device - {existing_sessions}, need master key"
-            )
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Нужен ввод мастер-ключа",
-            )
-        for session in existing_sessions:
-            try:
-                session_token = await decrypt_data(
-                    encrypted_data=session.refresh_token,
-                    key=await decrypt_user_key(user.unique_cipher_key),
-                )
-                # logger.debug(f"Comparing tokens: received={token} vs decrypted_session={session_token}")
-                if session_token == token:
-                    is_valid_session = True
-                    logger.debug(f"Mobile session validation is {is_valid_session}")
-                    break
-            except Exception:
-                logger.warning(
-                    f"Failed to decrypt refresh token for session {session.id}"
-                )
-
-        if not is_valid_session:
-            logger.debug(
-                f"Invalid refresh token for this mobile device. Mobile session validation is {is_valid_session}"
-            )
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Invalid refresh token for this device",
-            )
-    elif device_information["device_type"] == "Mobile CorEnergy":
-        # logger.debug(">>> Entered Mobile CorEnergy validation block <<<")
-        if not existing_sessions:
-            logger.debug(f"Session not found for this device for cor-energy app")
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Session not found for this device",
-            )
-        for session in existing_sessions:
-            try:
-                session_token = await decrypt_data(
-                    encrypted_data=session.refresh_token,
-                    key=await decrypt_user_key(user.unique_cipher_key),
-                )
-                # logger.debug(f"Comparing tokens: received={token} vs decrypted_session={session_token}")
-                if session_token == token:
-                    is_valid_session = True
-                    logger.debug(
-                        f"Mobile cor-energy session validation is {is_valid_session}"
-                    )
-                    break
-            except Exception:
-                logger.warning(
-                    f"Failed to decrypt refresh token for cor-energy session {session.id}"
-                )
-        if not is_valid_session:
-            logger.debug(
-                f"Invalid refresh token for this cor-energy mobile device. Mobile session validation is {is_valid_session}"
-            )
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Invalid refresh token for this device",
-            )
-    elif device_information["device_type"] == "MobileCorEnergy":
-        # logger.debug(">>> Entered Mobile CorEnergy validation block <<<")
-        if not existing_sessions:
-            logger.debug(f"Session not found for this device for cor-energy app")
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Session not found for this device",
+    if device_type in MOBILE_DEVICE_TYPES:
+        # Мобильные сессии проверяются поиском по HMAC refresh токена
+        session = await repository_session.get_session_by_refresh_token(
+            user=user,
+            device_info=device_information["device_info"],
+            refresh_token=token,
+            db=db,
+        )
+        if session is None:
+            existing_sessions = await repository_session.get_user_sessions_by_device_info(
+                user.cor_id, device_information["device_info"], db
             )
-        for session in existing_sessions:
-            try:
-                session_token = await decrypt_data(
-                    encrypted_data=session.refresh_token,
-                    key=await decrypt_user_key(user.unique_cipher_key),
+            if not existing_sessions and device_type == "Mobile":
+                logger.debug("No sessions for mobile device, need master key")
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail="Нужен ввод мастер-ключа",
                 )
-                # logger.debug(f"Comparing tokens: received={token} vs decrypted_session={session_token}")
-                if session_token == token:
-                    is_valid_session = True
-                    logger.debug(
-                        f"Mobile cor-energy session validation is {is_valid_session}"
-                    )
-                    break
-            except Exception:
-                logger.warning(
-                    f"Failed to decrypt refresh token for cor-energy session {session.id}"
+            if not existing_sessions:
+                logger.debug(f"Session not found for this device for {device_type} app")
+                raise HTTPException(
+                    status_code=status.HTTP_401_UNAUTHORIZED,
+                    detail="Session not found for this device",
                 )
-        if not is_valid_session:
-            logger.debug(
-                f"Invalid refresh token for this cor-energy mobile device. Mobile session validation is {is_valid_session}"
-            )
+            logger.debug(f"Invalid refresh token for this {device_type} device")
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="Invalid refresh token for this device",
             )
-    elif device_information["device_type"] == "Desktop":
-        # logger.debug(">>> Entered Desktop validation block <<<")
+        is_valid_session = True
+        logger.debug(f"{device_type} session validation is {is_valid_session}")
+    elif device_type == "Desktop":
         is_valid_session = True
     if is_valid_session:
         # Проверка ролей
@@ -486,7 +404,7 @@ async def refresh_token(
         }
     else:
         logger.debug(
-            f"Invalid refresh token for this device {device_information["device_type"]} {device_information["device_info"]}"
+            f"Invalid refresh token for this device {device_type} {device_information.get('device_info')}"
         )
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -518,7 +436,7 @@ async def verify_access_token(
 
 @router.post(
     "/send_verification_code",
-    dependencies=[Depends(RateLimiter(times=5, seconds=60))],
+    dependencies=[Depends(HybridRateLimiter(times=5, seconds=60))],
 )  # Маршрут проверки почты в случае если это новая регистрация
 async def send_verification_code(
     body: EmailSchema,
@@ -553,7 +471,7 @@ async def send_verification_code(
 
 
 @router.post(
-    "/confirm_email", dependencies=[Depends(RateLimiter(times=10, seconds=60))]
+    "/confirm_email", dependencies=[Depends(HybridRateLimiter(times=10, seconds=60))]
 )
 async def confirm_email(body: VerificationModel, db: AsyncSession = Depends(get_db)):
     """
@@ -590,7 +508,7 @@ async def confirm_email(body: VerificationModel, db: AsyncSession = Depends(get_
 
 @router.post(
     "/forgot_password",
-    dependencies=[Depends(RateLimiter(times=5, seconds=60))],
+    dependencies=[Depends(HybridRateLimiter(times=5, seconds=60))],
 )
 async def forgot_password_send_verification_code(
     body: EmailSchema,
@@ -1,4 +1,4 @@
-from fastapi import APIRouter, Depends, HTTPException, UploadFile, status
+from fastapi import APIRouter, Depends, HTTPException, Request, UploadFile, status
 from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 from cor_lab.database.db import get_db
@@ -12,7 +12,9 @@ from cor_lab.schemas import (
     CaseParametersScheema,
     DeleteCasesRequest,
     DeleteCasesResponse,
+    GeneralPrinting,
     PatientFirstCaseDetailsResponse,
+    PrintJobResponse,
     ReferralAttachmentResponse,
     ReferralCreate,
     ReferralResponse,
@@ -24,6 +26,7 @@ from cor_lab.repository import case as case_service
 from cor_lab.services.access import doctor_access
 from cor_lab.services.auth import auth_service
 from cor_lab.services.document_validation import validate_document_file
+from cor_lab.services.print_queue import enqueue_print_job
 
 router = APIRouter(prefix="/cases", tags=["Cases"])
 
@@ -342,39 +345,61 @@ async def release_case(
 @router.patch(
     "/{case_id}/print_glasses",
     dependencies=[Depends(doctor_access)],
-    response_model=CaseDetailsResponse,
+    response_model=PrintJobResponse,
+    status_code=status.HTTP_202_ACCEPTED,
 )
 async def print_all_case_glasses(
-    case_id: str, printing: bool = False, db: AsyncSession = Depends(get_db)
+    case_id: str,
+    data: GeneralPrinting,
+    request: Request,
+    printing: bool = False,
+    db: AsyncSession = Depends(get_db),
 ):
     """
-    Печатает все стёкла кейса
+    Ставит в очередь печать всех стёкол кейса и возвращает задание печати.
+    Статусы печати проставляются после завершения задания.
     """
-    db_case = await case_service.print_all_case_glasses(
-        db=db, case_id=case_id, printing=printing
+    job = await enqueue_print_job(
+        db=db,
+        data=data,
+        label_kind="glass",
+        printing=printing,
+        request=request,
+        case_id=case_id,
     )
-    if db_case is None:
+    if job is None:
         raise HTTPException(status_code=404, detail="Case not found")
-    return db_case
+    return job
 
 
 @router.patch(
     "/{case_id}/print_cassettes",
     dependencies=[Depends(doctor_access)],
-    response_model=CaseDetailsResponse,
+    response_model=PrintJobResponse,
+    status_code=status.HTTP_202_ACCEPTED,
 )
 async def print_all_case_cassettes(
-    case_id: str, printing: bool = False, db: AsyncSession = Depends(get_db)
+    case_id: str,
+    data: GeneralPrinting,
+    request: Request,
+    printing: bool = False,
+    db: AsyncSession = Depends(get_db),
 ):
     """
-    Печатает все кассеты кейса
+    Ставит в очередь печать всех кассет кейса и возвращает задание печати.
+    Статусы печати проставляются после завершения задания.
     """
-    db_case = await case_service.print_all_case_cassette(
-        db=db, case_id=case_id, printing=printing
+    job = await enqueue_print_job(
+        db=db,
+        data=data,
+        label_kind="cassette",
+        printing=printing,
+        request=request,
+        case_id=case_id,
     )
-    if db_case is None:
+    if job is None:
         raise HTTPException(status_code=404, detail="Case not found")
-    return db_case
+    return job
 
 
 @router.patch(
@@ -40,9 +40,6 @@ from cor_lab.repository.patient import (
     create_patient_and_user_by_email,
     create_patient_linked_to_user,
     create_standalone_patient,
-    find_patient,
-    get_single_patient_by_corid
-
 )
 from cor_lab.schemas import (
     CaseCloseResponse,
@@ -73,6 +70,7 @@ from cor_lab.schemas import (
     SignReportRequest,
     SingleCaseExcisionPageResponse,
     SingleCaseGlassPageResponse,
+    TypeaheadSearchResponse,
     UnifiedSearchResponse,
     UpdateMicrodescription,
     UpdatePathohistologicalConclusion,
@@ -85,11 +83,13 @@ from cor_lab.services.access import doctor_access, lab_assistant_or_doctor_acces
 from cor_lab.services.auth import auth_service
 from cor_lab.services.document_validation import validate_document_file
 from cor_lab.services.image_validation import validate_image_file
+from cor_lab.services.patient_search import typeahead_search
+from cor_lab.services.principal_cache import Principal
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from loguru import logger
 
-from cor_lab.services.search_token_generator import generate_ngrams
+from cor_lab.services.unified_search import resolve_search_query
 
 router = APIRouter(prefix="/doctor", tags=["Doctor"])
 
@@ -405,6 +405,9 @@ async def add_existing_patient_to_doctor(
 async def get_patient_glass_page_data(
     patient_id: str,
     case_id=Query(None, description="Опциональный параметр case_id"),
+    include_report_details: bool = Query(
+        True, description="Строить ли report_details (нужен вкладке заключения)"
+    ),
     user: User = Depends(auth_service.get_current_user),
     db: AsyncSession = Depends(get_db),
 ) -> PatientGlassPageResponse:
@@ -418,6 +421,7 @@ async def get_patient_glass_page_data(
         current_doctor_id=doctor.doctor_id,
         router=router,
         case_id=case_id,
+        include_report_details=include_report_details,
     )
 
     return glass_page_data
@@ -433,6 +437,9 @@ async def get_patient_glass_page_data(
 )
 async def get_single_case_details_for_glass_page(
     case_id: str,
+    include_report_details: bool = Query(
+        True, description="Строить ли report_details (нужен вкладке заключения)"
+    ),
     user: User = Depends(auth_service.get_current_user),
     db: AsyncSession = Depends(get_db),
 ) -> SingleCaseGlassPageResponse:
@@ -441,7 +448,11 @@ async def get_single_case_details_for_glass_page(
     """
     doctor = await get_doctor(doctor_id=user.cor_id, db=db)
     glass_page_data = await case_service.get_single_case_details_for_glass_page(
-        db=db, case_id=case_id, current_doctor_id=doctor.doctor_id, router=router
+        db=db,
+        case_id=case_id,
+        current_doctor_id=doctor.doctor_id,
+        router=router,
+        include_report_details=include_report_details,
     )
 
     return glass_page_data
@@ -898,7 +909,12 @@ async def get_current_cases_report_full_page_data_route(
     db: AsyncSession = Depends(get_db),
     user: User = Depends(auth_service.get_current_user),
     case_id=Query(None, description="Опциональный параметр case_id"),
-    skip: int = Query(0, description="Количество записей для пропуска"),
+    cursor: Optional[str] = Query(
+        None, description="Курсор следующей страницы (next_cursor из предыдущего ответа)"
+    ),
+    skip: int = Query(
+        0, description="Количество записей для пропуска (игнорируется при cursor)"
+    ),
     limit: int = Query(10, description="Максимальное количество записей для возврата"),
 ) -> PatientTestReportPageResponse:
     """
@@ -911,6 +927,7 @@ async def get_current_cases_report_full_page_data_route(
     return await case_service.get_current_cases_report_page_data(
         db=db,
         router=router,
+        cursor=cursor,
         skip=skip,
         limit=limit,
         current_doctor_id=doctor.doctor_id,
@@ -930,7 +947,12 @@ async def get_current_cases_with_directions_for_doctor(
     db: AsyncSession = Depends(get_db),
     user: User = Depends(auth_service.get_current_user),
     case_id=Query(None, description="Опциональный параметр case_id"),
-    skip: int = Query(0, description="Количество записей для пропуска"),
+    cursor: Optional[str] = Query(
+        None, description="Курсор следующей страницы (next_cursor из предыдущего ответа)"
+    ),
+    skip: int = Query(
+        0, description="Количество записей для пропуска (игнорируется при cursor)"
+    ),
     limit: int = Query(10, description="Максимальное количество записей для возврата"),
 ) -> PatientCasesWithReferralsResponse:
     """
@@ -939,6 +961,7 @@ async def get_current_cases_with_directions_for_doctor(
     doctor = await get_doctor(doctor_id=user.cor_id, db=db)
     patient_cases_data = await case_service.get_current_cases_with_directions(
         db=db,
+        cursor=cursor,
         skip=skip,
         limit=limit,
         current_doctor_id=doctor.doctor_id,
@@ -965,7 +988,12 @@ async def get_patient_excision_page_data(
     db: AsyncSession = Depends(get_db),
     user: User = Depends(auth_service.get_current_user),
     case_id=Query(None, description="Опциональный параметр case_id"),
-    skip: int = Query(0, description="Количество записей для пропуска"),
+    cursor: Optional[str] = Query(
+        None, description="Курсор следующей страницы (next_cursor из предыдущего ответа)"
+    ),
+    skip: int = Query(
+        0, description="Количество записей для пропуска (игнорируется при cursor)"
+    ),
     limit: int = Query(10, description="Максимальное количество записей для возврата"),
 ) -> PatientExcisionPageResponse:
     """
@@ -974,6 +1002,7 @@ async def get_patient_excision_page_data(
     doctor = await get_doctor(doctor_id=user.cor_id, db=db)
     excision_page_data = await case_service.get_current_case_details_for_excision_page(
         db=db,
+        cursor=cursor,
         skip=skip,
         limit=limit,
         current_doctor_id=doctor.doctor_id,
@@ -995,8 +1024,16 @@ async def get_current_cases_glass_page_data(
     db: AsyncSession = Depends(get_db),
     user: User = Depends(auth_service.get_current_user),
     case_id=Query(None, description="Опциональный параметр case_id"),
-    skip: int = Query(0, description="Количество записей для пропуска"),
+    cursor: Optional[str] = Query(
+        None, description="Курсор следующей страницы (next_cursor из предыдущего ответа)"
+    ),
+    skip: int = Query(
+        0, description="Количество записей для пропуска (игнорируется при cursor)"
+    ),
     limit: int = Query(10, description="Максимальное количество записей для возврата"),
+    include_report_details: bool = Query(
+        True, description="Строить ли report_details (нужен вкладке заключения)"
+    ),
 ) -> PatientGlassPageResponse:
     """
     Возвращает список всех текущих кейсов и все стёкла первого кейса
@@ -1004,11 +1041,13 @@ async def get_current_cases_glass_page_data(
     doctor = await get_doctor(doctor_id=user.cor_id, db=db)
     glass_page_data = await case_service.get_current_cases_glass_details(
         db=db,
+        cursor=cursor,
         skip=skip,
         limit=limit,
         current_doctor_id=doctor.doctor_id,
         router=router,
         case_id=case_id,
+        include_report_details=include_report_details,
     )
 
     return glass_page_data
@@ -1026,7 +1065,12 @@ async def get_current_cases_final_report_full_page_data_route(
     db: AsyncSession = Depends(get_db),
     user: User = Depends(auth_service.get_current_user),
     case_id=Query(None, description="Опциональный параметр case_id"),
-    skip: int = Query(0, description="Количество записей для пропуска"),
+    cursor: Optional[str] = Query(
+        None, description="Курсор следующей страницы (next_cursor из предыдущего ответа)"
+    ),
+    skip: int = Query(
+        0, description="Количество записей для пропуска (игнорируется при cursor)"
+    ),
     limit: int = Query(10, description="Максимальное количество записей для возврата"),
 ) -> PatientFinalReportPageResponse:
     """
@@ -1036,6 +1080,7 @@ async def get_current_cases_final_report_full_page_data_route(
     return await case_service.get_current_cases_final_report_page_data(
         db=db,
         router=router,
+        cursor=cursor,
         skip=skip,
         limit=limit,
         current_doctor_id=doctor.doctor_id,
@@ -1087,6 +1132,25 @@ async def _get_and_return_patient_overview(db: AsyncSession, patient_cor_id: str
 
 
 
+@router.get(
+    "/search/typeahead",
+    response_model=TypeaheadSearchResponse,
+    dependencies=[Depends(lab_assistant_or_doctor_access)],
+    summary="Подсказки пациентов по ФИО",
+)
+async def typeahead_patient_search(
+    query: str = Query(..., min_length=2, description="Начало ФИО пациента"),
+    limit: int = Query(10, ge=1, le=50),
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Лёгкий поиск для подсказок при вводе: возвращает top-K пациентов
+    (cor_id, ФИО, год рождения, score) без построения обзора.
+    Обзор выбранного пациента строится отдельно через /search по его cor_id.
+    """
+    return await typeahead_search(db=db, query=query, limit=limit)
+
+
 @router.get(
     "/search",
     response_model=UnifiedSearchResponse,
@@ -1094,35 +1158,20 @@ async def _get_and_return_patient_overview(db: AsyncSession, patient_cor_id: str
     summary="Поиск пациента по ФИО или коду кейса",
     description="Поиск может выполняться по ФИО пациента или cor-id (возвращает get_patient_first_case_details) "
                 "или по коду кейса / id кейса (возвращает get_patient_case_details_for_glass_page). "
+                "Тип запроса определяется по его форме, выполняется только соответствующий поиск."
 )
 async def unified_search(
     query: str = Query(..., min_length=2, description="ФИО / cor-id пациента или код / id кейса"),
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(auth_service.get_current_user),
+    principal: Principal = Depends(auth_service.get_current_principal),
 ):
-    doctor = await get_doctor(doctor_id=current_user.cor_id, db=db)
+    doctor = principal.doctor
     if not doctor:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Doctor not found")
 
-    case_db = await case_service.get_single_case(db=db, case_id=query)
-    if case_db:
-        return await _get_and_return_case_details(db, str(case_db.patient_id), str(case_db.id), doctor.doctor_id, router)
-    
-    case_db_by_code = await case_service.get_single_case_by_case_code(db=db, case_code=query)
-    if case_db_by_code:
-        return await _get_and_return_case_details(db, str(case_db_by_code.patient_id), str(case_db_by_code.id), doctor.doctor_id, router)
-
-
-    search_ngrams = generate_ngrams(query, n=2)
-    search_ngrams.extend(generate_ngrams(query, n=3))
-    search_ngrams_joined = " ".join(sorted(list(set(search_ngrams))))
-
-    found_patient_by_cor_id = await get_single_patient_by_corid(db=db, cor_id=query)
-    if found_patient_by_cor_id:
-        return await _get_and_return_patient_overview(db, found_patient_by_cor_id.patient_cor_id)
-    
-    found_patient = await find_patient(db=db, search_ngrams_joined=search_ngrams_joined)
-    if found_patient:
-        return await _get_and_return_patient_overview(db, found_patient.patient_cor_id)
-            
-    raise HTTPException(status_code=404, detail="Patient or Case not found.")
\ No newline at end of file
+    target = await resolve_search_query(db=db, query=query, doctor_cor_id=doctor.doctor_id)
+    if target is None:
+        raise HTTPException(status_code=404, detail="Patient or Case not found.")
+    if target.kind == "case":
+        return await _get_and_return_case_details(db, target.patient_id, target.case_id, doctor.doctor_id, router)
+    return await _get_and_return_patient_overview(db, target.patient_id)
\ No newline at end of file
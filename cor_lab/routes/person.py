@@ -171,7 +171,7 @@ async def change_my_password(
     **Смена пароля в сценарии "Изменить свой пароль"** \n
     """
 
-    if not auth_service.verify_password(body.old_password, current_user.password):
+    if not await auth_service.verify_password(body.old_password, current_user.password):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid old password"
         )
@@ -204,7 +204,7 @@ async def delete_my_account(
             status_code=status.HTTP_404_NOT_FOUND, detail="User not found"
         )
     else:
-        if auth_service.verify_password(body.password, current_user.password):
+        if await auth_service.verify_password(body.password, current_user.password):
             await person.delete_user_by_email(db=db, email=current_user.email)
             logger.info(f"Account for user {current_user.email} was deleted")
             return {"message": f" user {current_user.email} - was deleted"}
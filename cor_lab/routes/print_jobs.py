@@ -0,0 +1,143 @@
+from fastapi import APIRouter, Depends, HTTPException, Request, status
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from cor_lab.database.db import get_db
+from cor_lab.schemas import GeneralPrinting, PrintJobResponse
+from cor_lab.services.access import doctor_access
+from cor_lab.services.print_queue import enqueue_print_job, get_print_job
+
+
+router = APIRouter(prefix="/print_jobs", tags=["Print Jobs"])
+
+
+@router.post(
+    "/cases/{case_id}/glasses",
+    response_model=PrintJobResponse,
+    dependencies=[Depends(doctor_access)],
+    status_code=status.HTTP_202_ACCEPTED,
+)
+async def enqueue_case_glasses(
+    case_id: str,
+    data: GeneralPrinting,
+    request: Request,
+    printing: bool = False,
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Ставит в очередь печать всех стёкол кейса.
+    Статусы печати проставляются после завершения задания.
+    """
+    job = await enqueue_print_job(
+        db=db,
+        data=data,
+        label_kind="glass",
+        printing=printing,
+        request=request,
+        case_id=case_id,
+    )
+    if job is None:
+        raise HTTPException(status_code=404, detail="Case not found")
+    return job
+
+
+@router.post(
+    "/cases/{case_id}/cassettes",
+    response_model=PrintJobResponse,
+    dependencies=[Depends(doctor_access)],
+    status_code=status.HTTP_202_ACCEPTED,
+)
+async def enqueue_case_cassettes(
+    case_id: str,
+    data: GeneralPrinting,
+    request: Request,
+    printing: bool = False,
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Ставит в очередь печать всех кассет кейса.
+    Статусы печати проставляются после завершения задания.
+    """
+    job = await enqueue_print_job(
+        db=db,
+        data=data,
+        label_kind="cassette",
+        printing=printing,
+        request=request,
+        case_id=case_id,
+    )
+    if job is None:
+        raise HTTPException(status_code=404, detail="Case not found")
+    return job
+
+
+@router.post(
+    "/samples/{sample_id}/glasses",
+    response_model=PrintJobResponse,
+    dependencies=[Depends(doctor_access)],
+    status_code=status.HTTP_202_ACCEPTED,
+)
+async def enqueue_sample_glasses(
+    sample_id: str,
+    data: GeneralPrinting,
+    request: Request,
+    printing: bool = False,
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Ставит в очередь печать всех стёкол семпла.
+    Статусы печати проставляются после завершения задания.
+    """
+    job = await enqueue_print_job(
+        db=db,
+        data=data,
+        label_kind="glass",
+        printing=printing,
+        request=request,
+        sample_id=sample_id,
+    )
+    if job is None:
+        raise HTTPException(status_code=404, detail="Sample not found")
+    return job
+
+
+@router.post(
+    "/samples/{sample_id}/cassettes",
+    response_model=PrintJobResponse,
+    dependencies=[Depends(doctor_access)],
+    status_code=status.HTTP_202_ACCEPTED,
+)
+async def enqueue_sample_cassettes(
+    sample_id: str,
+    data: GeneralPrinting,
+    request: Request,
+    printing: bool = False,
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Ставит в очередь печать всех кассет семпла.
+    Статусы печати проставляются после завершения задания.
+    """
+    job = await enqueue_print_job(
+        db=db,
+        data=data,
+        label_kind="cassette",
+        printing=printing,
+        request=request,
+        sample_id=sample_id,
+    )
+    if job is None:
+        raise HTTPException(status_code=404, detail="Sample not found")
+    return job
+
+
+@router.get(
+    "/{job_id}",
+    response_model=PrintJobResponse,
+    dependencies=[Depends(doctor_access)],
+)
+async def read_print_job(job_id: str):
+    """Возвращает состояние задания печати и поэлементный результат."""
+    job = await get_print_job(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Задание печати не найдено")
+    return job
@@ -1,10 +1,15 @@
 import asyncio
 import platform
-from fastapi import APIRouter, HTTPException, Query
-import httpx
+from fastapi import APIRouter, Depends, HTTPException, Query
 from pydantic import BaseModel
 from loguru import logger
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from cor_lab.database import models as db_models
+from cor_lab.database.db import get_db
 from cor_lab.schemas import PrintRequest
+from cor_lab.services.printer_client import printer_client
+from cor_lab.services.printer_health import get_printer_health
 
 
 router = APIRouter(tags=["Printer"])
@@ -26,19 +31,19 @@ class PrintRequest(BaseModel):
 
 @router.post("/print_labels")
 async def print_labels(data: PrintRequest):
-    printer_url = f"http://{data.printer_ip}:8080/task/new"
     try:
-        async with httpx.AsyncClient() as client:
-            # Отправляем только данные меток без IP
-            response = await client.post(
-                printer_url, json={"labels": [label.dict() for label in data.labels]}
+        # Отправляем только данные меток без IP
+        response = await printer_client.post(
+            data.printer_ip,
+            "/task/new",
+            json={"labels": [label.dict() for label in data.labels]},
+        )
+        if response.status_code == 200:
+            return {"success": True, "printer_response": response.text}
+        else:
+            raise HTTPException(
+                status_code=502, detail=f"Printer error: {response.text}"
             )
-            if response.status_code == 200:
-                return {"success": True, "printer_response": response.text}
-            else:
-                raise HTTPException(
-                    status_code=502, detail=f"Printer error: {response.text}"
-                )
     except Exception as e:
         raise HTTPException(
             status_code=500, detail=f"Failed to send to printer: {str(e)}"
@@ -46,21 +51,37 @@ async def print_labels(data: PrintRequest):
 
 
 @router.get("/check_printer")
-async def check_printer(ip: str = Query(..., description="IP-адрес принтера")):
-    url = f"http://{ip}:8080/task"
-    # logger.info(f"[check_printer] Проверка доступности по URL: {url}")
-
-    try:
-        async with httpx.AsyncClient(timeout=2.0) as client:
-            response = await client.get(url)
-            # logger.info(f"[check_printer] Код ответа от принтера: {response.status_code}")
-            return {"available": response.status_code == 200}
-    except Exception as e:
-        # logger.error(f"[check_printer] Ошибка запроса к принтеру: {e}")
-        return {"available": False}
+async def check_printer(
+    ip: str = Query(..., description="IP-адрес принтера"),
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Возвращает доступность принтера из кэша монитора принтеров.
+    Живой опрос выполняет только монитор и только для устройств из справочника:
+    для них до первой проверки доступность неизвестна (available = None),
+    для прочих адресов - 404.
+    """
+    state = await get_printer_health(ip)
+    if state is None:
+        device_id = await db.scalar(
+            select(db_models.PrintingDevice.id)
+            .where(db_models.PrintingDevice.ip_address == ip)
+            .limit(1)
+        )
+        if device_id is None:
+            raise HTTPException(status_code=404, detail="Принтер не найден")
+        return {"available": None, "latency_ms": None, "checked_at": None}
+    return {
+        "available": state["available"],
+        "latency_ms": state["latency_ms"],
+        "checked_at": state["checked_at"],
+    }
 
 
 async def ping_printer(printer_ip: str):
+    state = await get_printer_health(printer_ip)
+    if state is not None:
+        return state["available"]
     try:
         param = "-n" if platform.system().lower() == "windows" else "-c"
         command = ["ping", param, "1", "-w", "1000", printer_ip]
@@ -19,6 +19,7 @@ from cor_lab.repository.printing_device import (
 )
 from loguru import logger
 from cor_lab.services.access import admin_access
+from cor_lab.services.printer_client import printer_client
 
 
 router = APIRouter(prefix="/printing_devices", tags=["Printing Devices"])
@@ -43,7 +44,9 @@ async def create_new_printing_device(
         raise HTTPException(
             status_code=status.HTTP_409_CONFLICT, detail="Device already exists"
         )
-    return await create_printing_device(db=db, body=body)
+    printing_device = await create_printing_device(db=db, body=body)
+    await printer_client.configure_device(printing_device)
+    return printing_device
 
 
 @router.get(
@@ -89,6 +92,7 @@ async def update_printing_device_by_id(
     )
     if not printing_device:
         raise HTTPException(status_code=404, detail="Printing device not found")
+    await printer_client.configure_device(printing_device)
     return printing_device
 
 
@@ -99,5 +103,8 @@ async def delete_printing_device(
     printing_device_id: str, db: AsyncSession = Depends(get_db)
 ):
     """Удаляет устройство печати по его ID."""
+    printing_device = await get_printing_device_by_id(uuid=printing_device_id, db=db)
     result = await delete_printing_device_by_id(uuid=printing_device_id, db=db)
+    if printing_device:
+        await printer_client.remove_device(printing_device)
     return
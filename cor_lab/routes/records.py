@@ -1,10 +1,11 @@
-from fastapi import APIRouter, HTTPException, Depends, status
+from fastapi import APIRouter, HTTPException, Depends, Query, status
 from typing import List
 
 from cor_lab.repository import records as repository_record
 from cor_lab.database.db import get_db
 from cor_lab.schemas import (
     CreateRecordModel,
+    DecryptedRecordResponse,
     RecordResponse,
     UpdateRecordModel,
     MainscreenRecordResponse,
@@ -15,7 +16,7 @@ from cor_lab.services.auth import auth_service
 from loguru import logger
 
 
-from cor_lab.services.cipher import decrypt_data, decrypt_user_key
+from cor_lab.services.cipher import decrypt_batch, decrypt_user_key
 from sqlalchemy.ext.asyncio import AsyncSession
 
 router = APIRouter(prefix="/records", tags=["Records"])
@@ -55,18 +56,12 @@ async def read_records(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Internal server error",
         )
-    decrypted_records = []
-    decrypted_key = await decrypt_user_key(current_user.unique_cipher_key)
-    for record in records:
-        decrypted_username = await decrypt_data(
-            encrypted_data=record.username,
-            key=decrypted_key,
-        )
-        # decrypted_password = await decrypt_data(
-        #     encrypted_data=record.password,
-        #     key=decrypted_key,
-        # )
-        record_response = MainscreenRecordResponse(
+    decrypted_usernames = await decrypt_batch(
+        [record.username for record in records],
+        key=await decrypt_user_key(current_user.unique_cipher_key),
+    )
+    return [
+        MainscreenRecordResponse(
             record_id=record.record_id,
             record_name=record.record_name,
             website=record.website,
@@ -74,8 +69,35 @@ async def read_records(
             password=record.password,
             is_favorite=record.is_favorite,
         )
-        decrypted_records.append(record_response)
-    return decrypted_records
+        for record, decrypted_username in zip(records, decrypted_usernames)
+    ]
+
+
+@router.get(
+    "/decrypted",
+    response_model=List[DecryptedRecordResponse],
+)
+async def read_decrypted_records(
+    skip: int = Query(0, ge=0),
+    limit: int = Query(50, ge=1, le=200),
+    current_user: User = Depends(auth_service.get_current_user),
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    **Get a page of decrypted records. / Получение страницы записей пользователя с расшифрованными логином и паролем** \n
+
+    :param skip: The number of records to skip (for pagination). Default is 0.
+    :type skip: int
+    :param limit: The maximum number of records to retrieve. Default is 50, max 200.
+    :type limit: int
+    :param db: The database session. Dependency on get_db.
+    :type db: AsyncSession, optional
+    :return: A list of DecryptedRecordResponse objects ordered by record_id.
+    :rtype: List[DecryptedRecordResponse]
+    """
+    return await repository_record.get_decrypted_user_records(
+        db=db, user=current_user, skip=skip, limit=limit
+    )
 
 
 @router.get(
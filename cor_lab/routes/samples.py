@@ -6,6 +6,7 @@ from cor_lab.schemas import (
     DeleteSampleRequest,
     DeleteSampleResponse,
     GeneralPrinting,
+    PrintJobResponse,
     Sample,
     SampleCreate,
     UpdateSampleMacrodescription,
@@ -13,6 +14,7 @@ from cor_lab.schemas import (
 from cor_lab.repository import sample as sample_service
 
 from cor_lab.services.access import doctor_access
+from cor_lab.services.print_queue import enqueue_print_job
 
 router = APIRouter(prefix="/samples", tags=["Samples"])
 
@@ -109,8 +111,9 @@ async def delete_samples(
 
 @router.patch(
     "/{sample_id}/print_glasses",
-    response_model=Sample,
+    response_model=PrintJobResponse,
     dependencies=[Depends(doctor_access)],
+    status_code=status.HTTP_202_ACCEPTED,
 )
 async def print_all_sample_glasses(
     sample_id: str,
@@ -120,23 +123,29 @@ async def print_all_sample_glasses(
     db: AsyncSession = Depends(get_db),
 ):
     """
-    Печатает все стёкла семпла
-
+    Ставит в очередь печать всех стёкол семпла и возвращает задание печати.
+    Статусы печати проставляются после завершения задания.
     """
-    db_sample = await sample_service.print_all_sample_glasses(
-        db=db, sample_id=sample_id, printing=printing, data=data, request=request
+    job = await enqueue_print_job(
+        db=db,
+        data=data,
+        label_kind="glass",
+        printing=printing,
+        request=request,
+        sample_id=sample_id,
     )
-    if db_sample is None:
+    if job is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="Sample not found"
         )
-    return db_sample
+    return job
 
 
 @router.patch(
     "/{sample_id}/print_cassettes",
-    response_model=Sample,
+    response_model=PrintJobResponse,
     dependencies=[Depends(doctor_access)],
+    status_code=status.HTTP_202_ACCEPTED,
 )
 async def print_all_sample_cassettes(
     sample_id: str,
@@ -146,14 +155,19 @@ async def print_all_sample_cassettes(
     db: AsyncSession = Depends(get_db),
 ):
     """
-    Печатает все кассеты семпла
-
+    Ставит в очередь печать всех кассет семпла и возвращает задание печати.
+    Статусы печати проставляются после завершения задания.
     """
-    db_sample = await sample_service.print_all_sample_cassettes(
-        db=db, sample_id=sample_id, printing=printing, data=data, request=request
+    job = await enqueue_print_job(
+        db=db,
+        data=data,
+        label_kind="cassette",
+        printing=printing,
+        request=request,
+        sample_id=sample_id,
     )
-    if db_sample is None:
+    if job is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="Sample not found"
         )
-    return db_sample
+    return job
@@ -16,10 +16,10 @@ async def websocket_endpoint(websocket: WebSocket):
         while True:
             await websocket.receive_text()
     except WebSocketDisconnect:
-        websocket_events_manager.disconnect(connection_id)
+        await websocket_events_manager.disconnect(connection_id)
     except Exception as e:
         logger.error(
             f"Unhandled error in WebSocket endpoint for ID {connection_id}: {e}",
             exc_info=True,
         )
-        websocket_events_manager.disconnect(connection_id)
+        await websocket_events_manager.disconnect(connection_id)
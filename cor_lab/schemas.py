@@ -207,6 +207,18 @@ class MainscreenRecordResponse(BaseModel):
         from_attributes = True
 
 
+class DecryptedRecordResponse(BaseModel):
+    record_id: int
+    record_name: str
+    website: Optional[str] = None
+    username: Optional[str] = None
+    password: Optional[str] = None
+    notes: Optional[str] = None
+    is_favorite: Optional[bool] = None
+    created_at: datetime
+    edited_at: datetime
+
+
 class UpdateRecordModel(BaseModel):
     record_name: str = Field(max_length=25)
     website: Optional[str] = None
@@ -944,6 +956,12 @@ class CreatePrintingDevice(BaseModel):
     port: Optional[int] = Field(None, le=65535, description="Порт")
     comment: Optional[str] = Field(None, description="Комментарий")
     location: Optional[str] = Field(None, description="Локация")
+    max_connections: Optional[int] = Field(
+        None, ge=1, le=100, description="Максимум одновременных соединений с принтером"
+    )
+    timeout_seconds: Optional[float] = Field(
+        None, gt=0, le=60, description="Таймаут запроса к принтеру, секунды"
+    )
 
 
 class ResponcePrintingDevice(BaseModel):
@@ -956,6 +974,8 @@ class ResponcePrintingDevice(BaseModel):
     port: Optional[int]
     comment: Optional[str]
     location: Optional[str]
+    max_connections: Optional[int] = None
+    timeout_seconds: Optional[float] = None
 
 
 class UpdatePrintingDevice(BaseModel):
@@ -967,6 +987,12 @@ class UpdatePrintingDevice(BaseModel):
     port: Optional[int] = Field(None, le=65535, description="Порт")
     comment: Optional[str] = Field(None, description="Комментарий")
     location: Optional[str] = Field(None, description="Локация")
+    max_connections: Optional[int] = Field(
+        None, ge=1, le=100, description="Максимум одновременных соединений с принтером"
+    )
+    timeout_seconds: Optional[float] = Field(
+        None, gt=0, le=60, description="Таймаут запроса к принтеру, секунды"
+    )
 
 
 class Label(BaseModel):
@@ -1302,6 +1328,7 @@ class PatientFinalReportPageResponse(BaseModel):
     last_case_details: Optional[Case] = None
     case_owner: Optional[CaseOwnerResponse]
     report_details: Optional[FinalReportResponseSchema]
+    next_cursor: Optional[str] = None
 
     class Config:
         from_attributes = True
@@ -1321,6 +1348,7 @@ class PatientCasesWithReferralsResponse(BaseModel):
     case_details: Optional[Case]
     case_owner: Optional[CaseOwnerResponse]
     first_case_direction: Optional[FirstCaseReferralDetailsSchema] = None
+    next_cursor: Optional[str] = None
 
     class Config:
         from_attributes = True
@@ -1355,6 +1383,7 @@ class PatientGlassPageResponse(BaseModel):
     first_case_details_for_glass: Optional[FirstCaseGlassDetailsSchema] = None
     case_owner: Optional[CaseOwnerResponse]
     report_details: Optional[FinalReportResponseSchema]
+    next_cursor: Optional[str] = None
 
     class Config:
         from_attributes = True
@@ -1420,6 +1449,7 @@ class PatientExcisionPageResponse(BaseModel):
     all_cases: List[Case]
     last_case_details_for_excision: Optional[LastCaseExcisionDetailsSchema] = None
     case_owner: Optional[CaseOwnerResponse]
+    next_cursor: Optional[str] = None
 
     class Config:
         from_attributes = True
@@ -1583,6 +1613,7 @@ class PatientTestReportPageResponse(BaseModel):
     case_owner: Optional[CaseOwnerResponse]
     report_details: Optional[ReportResponseSchema]
     all_glasses_for_last_case: Optional[FirstCaseTestGlassDetailsSchema] = None
+    next_cursor: Optional[str] = None
 
     class Config:
         from_attributes = True
@@ -1639,6 +1670,22 @@ class UnifiedSearchResponse(BaseModel):
     data: SearchResultUnion = Field(discriminator='search_type')
 
 
+class TypeaheadPatient(BaseModel):
+    cor_id: str
+    name: str
+    birth_year: Optional[int] = None
+    score: float
+
+
+class TypeaheadSearchResponse(BaseModel):
+    results: List[TypeaheadPatient] = []
+    partial: bool = Field(
+        False,
+        description="True, если точный поиск не уложился в бюджет времени и результаты "
+        "получены пересчётом кандидатов предыдущего (более короткого) запроса",
+    )
+
+
 class SearchCaseDetailsSimple(BaseModel):
     search_type: Literal["case_details"] = "case_details"
     case_id: str
@@ -1694,4 +1741,26 @@ class PrintLabel(BaseModel):
 class PrintRequest(BaseModel):
     """Модель для запроса на печать."""
     printer_ip: str
-    labels: List[PrintLabel]
\ No newline at end of file
+    labels: List[PrintLabel]
+
+class LabelPrintResult(BaseModel):
+    """Результат печати одной метки в пакетной печати."""
+    uuid: str
+    printed: bool
+    detail: Optional[str] = None
+
+
+class PrintJobResponse(BaseModel):
+    """Состояние задания фоновой печати."""
+    job_id: str
+    status: Literal["queued", "processing", "completed", "failed"]
+    printer_ip: str
+    label_kind: Literal["glass", "cassette"]
+    case_id: str
+    sample_id: Optional[str] = None
+    printing: bool
+    attempts: int = 0
+    created_at: datetime
+    updated_at: datetime
+    results: List[LabelPrintResult] = []
+    skipped: List[LabelPrintResult] = []
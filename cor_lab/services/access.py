@@ -1,46 +1,32 @@
 from fastapi import Depends, HTTPException, status
-from sqlalchemy import select
-from sqlalchemy.ext.asyncio import AsyncSession
 
-from cor_lab.database import db
-from cor_lab.database.models import Doctor, Doctor_Status, Lawyer, User, LabAssistant
+from cor_lab.database.models import User
 from cor_lab.services.auth import auth_service
-from cor_lab.config.config import settings
+from cor_lab.services.principal_cache import Principal
 
 
 class AdminAccess:
+    """Проверка по подписанному claim roles токена, без запроса в БД."""
+
     def __init__(self, email):
         self.email = email
 
-    async def __call__(self, user: User = Depends(auth_service.get_current_user)):
-        if not user.email in settings.admin_accounts:
+    async def __call__(self, claims: dict = Depends(auth_service.get_token_claims)):
+        if "admin" not in claims.get("roles", ()):
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN, detail="Forbidden operation"
             )
 
 
 class LawyerAccess:
+    """Проверка по подписанному claim roles токена, без запроса в БД."""
+
     def __init__(self, email):
         self.email = email
 
-    async def __call__(
-        self,
-        user: User = Depends(auth_service.get_current_user),
-        db: AsyncSession = Depends(db.get_db),
-    ):
-        has_access = False
-        if user.email in settings.admin_accounts:
-            has_access = True
-        if user.email in settings.lawyer_accounts:
-            has_access = True
-
-        query = select(Lawyer).where(Lawyer.lawyer_cor_id == user.cor_id)
-        result = await db.execute(query)
-        lawyer = result.scalar_one_or_none()
-        if lawyer:
-            has_access = True
-
-        if not has_access:
+    async def __call__(self, claims: dict = Depends(auth_service.get_token_claims)):
+        roles = claims.get("roles", ())
+        if "admin" not in roles and "lawyer" not in roles:
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
                 detail="Недостаточно прав для выполнения этой операции.",
@@ -52,19 +38,14 @@ class DoctorAccess:
         self.email = email
 
     async def __call__(
-        self,
-        user: User = Depends(auth_service.get_current_user),
-        db: AsyncSession = Depends(db.get_db),
+        self, principal: Principal = Depends(auth_service.get_current_principal)
     ):
-        query = select(Doctor).where(Doctor.doctor_id == user.cor_id)
-        result = await db.execute(query)
-        doctor = result.scalar_one_or_none()
-        if not doctor or doctor.status != Doctor_Status.approved:
+        if not principal.is_approved_doctor:
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
                 detail="Doctor access required and status is not approved",
             )
-        return doctor
+        return principal.doctor
 
 
 class LabAssistantOrDoctorAccess:
@@ -72,23 +53,13 @@ class LabAssistantOrDoctorAccess:
         self.email = email
 
     async def __call__(
-        self,
-        user: User = Depends(auth_service.get_current_user),
-        db: AsyncSession = Depends(db.get_db),
+        self, principal: Principal = Depends(auth_service.get_current_principal)
     ):
-        lab_assistant_query = select(LabAssistant).where(
-            LabAssistant.lab_assistant_cor_id == user.cor_id
-        )
-        lab_assistant = await db.scalar(lab_assistant_query)
-
-        if lab_assistant:
-            return lab_assistant
-
-        doctor_query = select(Doctor).where(Doctor.doctor_id == user.cor_id)
-        doctor = await db.scalar(doctor_query)
+        if principal.lab_assistant is not None:
+            return principal.lab_assistant
 
-        if doctor and doctor.status == Doctor_Status.approved:
-            return doctor
+        if principal.is_approved_doctor:
+            return principal.doctor
 
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
@@ -0,0 +1,79 @@
+import asyncio
+import time
+from typing import Dict, List, Optional
+
+from loguru import logger
+
+from cor_lab.config.config import settings
+from cor_lab.database.redis_db import redis_client
+
+
+USER_ACTIVITY_KEY = "user_activity"
+ACTIVITY_FLUSH_BATCH_SIZE = 1000
+
+
+class ActivityTracker:
+    """
+    Отметки последней активности пользователей.
+
+    touch() только запоминает время в памяти процесса; раз в interval секунд
+    накопленные отметки пишутся пачкой (pipeline HSET) в хэш user_activity,
+    так что каждый пользователь записывается не чаще одного раза за интервал.
+    """
+
+    def __init__(self, interval: float):
+        self.interval = interval
+        self._pending: Dict[str, float] = {}
+        self._task: Optional[asyncio.Task] = None
+
+    def touch(self, user_id: str) -> None:
+        self._pending[user_id] = time.time()
+
+    async def start(self) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        await self.flush()
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+            await self.flush()
+
+    async def flush(self) -> None:
+        if not self._pending:
+            return
+        pending, self._pending = self._pending, {}
+        items = [(user_id, str(timestamp)) for user_id, timestamp in pending.items()]
+        try:
+            async with redis_client.pipeline(transaction=False) as pipe:
+                for offset in range(0, len(items), ACTIVITY_FLUSH_BATCH_SIZE):
+                    pipe.hset(
+                        USER_ACTIVITY_KEY,
+                        mapping=dict(items[offset : offset + ACTIVITY_FLUSH_BATCH_SIZE]),
+                    )
+                await pipe.execute()
+        except Exception as e:
+            logger.warning(f"Не удалось записать активность пользователей: {e}")
+            # Возвращаем отметки, не перетирая более свежие
+            for user_id, timestamp in pending.items():
+                self._pending.setdefault(user_id, timestamp)
+
+
+activity_tracker = ActivityTracker(interval=settings.activity_flush_interval)
+
+
+async def get_last_activity(user_ids: List[str]) -> Dict[str, Optional[str]]:
+    """
+    Возвращает время последней активности (unix timestamp строкой) для списка
+    пользователей одним HMGET. Для пользователей без записи - None.
+    """
+    if not user_ids:
+        return {}
+    values = await redis_client.hmget(USER_ACTIVITY_KEY, user_ids)
+    return dict(zip(user_ids, values))
@@ -2,7 +2,7 @@ from typing import Optional
 import uuid
 
 from jose import JWTError, jwt
-from fastapi import HTTPException, status, Depends
+from fastapi import HTTPException, Request, status, Depends
 from fastapi.security import OAuth2PasswordBearer
 from passlib.context import CryptContext
 from datetime import timedelta, datetime, timezone
@@ -11,6 +11,9 @@ from cor_lab.database.db import get_db
 from cor_lab.repository import person as repository_users
 from cor_lab.config.config import settings
 from cor_lab.services import redis_service
+from cor_lab.services.auth_context import get_auth_context
+from cor_lab.services.crypto_executor import crypto_executor
+from cor_lab.services.principal_cache import Principal, build_principal, principal_cache
 from loguru import logger
 from cor_lab.services.websocket_events_manager import websocket_events_manager
 
@@ -23,7 +26,7 @@ class Auth:
     ALGORITHM = settings.algorithm
     oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/auth/login")
 
-    def verify_password(self, plain_password, hashed_password):
+    async def verify_password(self, plain_password, hashed_password):
         """
         The verify_password function takes a plain-text password and the hashed version of that password,
             and returns True if they match, False otherwise. This is used to verify that the user's login
@@ -34,9 +37,11 @@ class Auth:
         :param hashed_password: Compare the plain_password parameter to see if they match
         :return: True if the password is correct, and false otherwise
         """
-        return self.pwd_context.verify(plain_password, hashed_password)
+        return await crypto_executor.run(
+            "bcrypt_verify", self.pwd_context.verify, plain_password, hashed_password
+        )
 
-    def get_password_hash(self, password: str):
+    async def get_password_hash(self, password: str):
         """
         The get_password_hash function takes a password as input and returns the hash of that password.
             The function uses the pwd_context object to generate a hash from the given password.
@@ -44,7 +49,7 @@ class Auth:
         :param password: str: Pass the password into the function
         :return: A hash of the password
         """
-        return self.pwd_context.hash(password)
+        return await crypto_executor.run("bcrypt_hash", self.pwd_context.hash, password)
 
     async def create_access_token(
         self, data: dict, expires_delta: Optional[float] = None
@@ -146,26 +151,38 @@ class Auth:
                 detail="Could not validate credentials",
             )
 
-    async def get_current_user(
-        self, token: str = Depends(oauth2_scheme), db: AsyncSession = Depends(get_db)
-    ):
+    async def get_token_claims(
+        self,
+        request: Request = None,
+        token: str = Depends(oauth2_scheme),
+    ) -> dict:
         """
-        Проверяет валидность Access токена и возвращает объект пользователя.
-        Включает проверку на:
+        Проверяет валидность Access токена и возвращает его полезную нагрузку
+        без обращения к БД. Включает проверку на:
         - Истечение срока действия токена
-        - Наличие JTI в черном списке Redis (отзыв токена)
+        - Отзыв токена (JTI в черном списке или отзыв всех токенов пользователя
+          при смене ролей, см. redis_service.revoke_user_tokens)
         - Корректность структуры токена
-        - Существование пользователя в базе данных
 
+        Подпись токена проверяется один раз за запрос в AuthContextMiddleware,
+        отзывы проверяются по локальному набору revocation_set.
+        Роли в claims подписаны и актуальны: при их смене токены пользователя отзываются.
+
+        :param request: Запрос, из которого берётся AuthContext (если передан).
         :param token: Access токен из заголовка "Authorization: Bearer".
-        :param db: Асинхронная сессия базы данных.
-        :return: Объект User, если токен валиден и пользователь существует.
-        :raises HTTPException 401: Если токен невалиден, истёк, отозван или пользователь не найден.
+        :return: Полезная нагрузка токена (oid, corid, roles, jti, exp, ...).
+        :raises HTTPException 401: Если токен невалиден, истёк или отозван.
         """
         try:
-            payload = jwt.decode(
-                token, key=self.SECRET_KEY, algorithms=[self.ALGORITHM]
-            )
+            context = get_auth_context(request) if request is not None else None
+            if context is not None and context.token == token:
+                if context.error is not None:
+                    raise context.error
+                payload = context.claims
+            else:
+                payload = jwt.decode(
+                    token, key=self.SECRET_KEY, algorithms=[self.ALGORITHM]
+                )
 
             exp = payload.get("exp")
             jti = payload.get("jti")
@@ -179,7 +196,14 @@ class Auth:
                     headers={"WWW-Authenticate": "Bearer"},
                 )
 
-            if await redis_service.is_jti_blacklisted(jti):
+            revoked = await redis_service.is_jti_blacklisted(jti)
+            # Отзыв по пользователю ставится по cor_id, а без него - по oid
+            for user_key in (payload.get("corid"), payload.get("oid")):
+                if not revoked:
+                    revoked = await redis_service.is_user_token_revoked(
+                        user_key, payload.get("iat")
+                    )
+            if revoked:
                 logger.warning(f"Revoked token detected with JTI: {jti}")
                 event_data = {
                     "channel": "cor-erp-prod",
@@ -268,8 +292,40 @@ class Auth:
                 headers={"WWW-Authenticate": "Bearer"},
             )
 
-        user = await repository_users.get_user_by_uuid(oid, db)
-        if user is None:
+        return payload
+
+    async def get_current_principal(
+        self,
+        request: Request = None,
+        token: str = Depends(oauth2_scheme),
+        db: AsyncSession = Depends(get_db),
+    ) -> Principal:
+        """
+        Проверяет валидность Access токена (см. get_token_claims) и возвращает
+        Principal пользователя (колонки User, роли, срезы врача и лаборанта).
+
+        Principal кэшируется в памяти процесса по JTI (см. principal_cache):
+        при попадании в кэш БД не опрашивается - отзыв токена и смена
+        ролей сбрасывают запись через Redis pub/sub.
+
+        :param request: Запрос, из которого берётся AuthContext (если передан).
+        :param token: Access токен из заголовка "Authorization: Bearer".
+        :param db: Асинхронная сессия базы данных.
+        :return: Principal, если токен валиден и пользователь существует.
+        :raises HTTPException 401: Если токен невалиден, истёк, отозван или пользователь не найден.
+        """
+        payload = await self.get_token_claims(request=request, token=token)
+        jti = payload["jti"]
+        exp = payload["exp"]
+        oid = payload["oid"]
+
+        cached_principal = principal_cache.get(jti) if principal_cache.subscribed else None
+        if cached_principal is not None and cached_principal.user_id == oid:
+            return cached_principal
+
+        cache_generation = principal_cache.generation
+        principal_row = await repository_users.get_user_principal_row(oid, db)
+        if principal_row is None:
             logger.warning(f"User with OID '{oid}' not found for valid token.")
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
@@ -277,7 +333,28 @@ class Auth:
                 headers={"WWW-Authenticate": "Bearer"},
             )
 
-        return user
+        principal = build_principal(jti, principal_row)
+        if principal_cache.subscribed:
+            principal_cache.put(principal, exp, cache_generation)
+        return principal
+
+    async def get_current_user(
+        self,
+        request: Request = None,
+        token: str = Depends(oauth2_scheme),
+        db: AsyncSession = Depends(get_db),
+    ):
+        """
+        Проверяет валидность Access токена (см. get_current_principal)
+        и возвращает объект пользователя, привязанный к сессии db.
+
+        :param token: Access токен из заголовка "Authorization: Bearer".
+        :param db: Асинхронная сессия базы данных.
+        :return: Объект User, если токен валиден и пользователь существует.
+        :raises HTTPException 401: Если токен невалиден, истёк, отозван или пользователь не найден.
+        """
+        principal = await self.get_current_principal(request=request, token=token, db=db)
+        return await principal.attach_user(db)
 
     async def create_device_jwt(
         self, device_id: str, user_id: str, expires_delta: Optional[float] = None
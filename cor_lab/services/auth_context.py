@@ -0,0 +1,107 @@
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, Optional
+
+from jose import ExpiredSignatureError, JWTError, jwt
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.requests import HTTPConnection
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from cor_lab.config.config import settings
+from cor_lab.services.activity_tracker import activity_tracker
+
+
+AUTH_CONTEXT_STATE_KEY = "auth_context"
+PROCESS_TIME_HEADER = "My-Process-Time"
+
+
+@dataclass(frozen=True)
+class AuthContext:
+    """
+    Результат однократной проверки Bearer токена запроса.
+
+    claims - полезная нагрузка с проверенной подписью (в том числе у истёкшего токена),
+    error - ошибка полной проверки (подпись, формат или истёкший срок).
+    """
+
+    token: Optional[str] = None
+    claims: Optional[Dict[str, Any]] = None
+    error: Optional[JWTError] = None
+
+    @property
+    def user_id(self) -> Optional[str]:
+        return self.claims.get("oid") if self.claims else None
+
+
+def _bearer_token(headers: Headers) -> Optional[str]:
+    authorization = headers.get("Authorization")
+    if not authorization:
+        return None
+    scheme, _, token = authorization.partition(" ")
+    if scheme.lower() != "bearer" or not token:
+        return None
+    return token.strip()
+
+
+def build_auth_context(headers: Headers) -> AuthContext:
+    token = _bearer_token(headers)
+    if token is None:
+        return AuthContext()
+    try:
+        claims = jwt.decode(token, key=settings.secret_key, algorithms=[settings.algorithm])
+        return AuthContext(token=token, claims=claims)
+    except ExpiredSignatureError as e:
+        # Подпись верна, истёк только срок: claims нужны для rate limit и активности
+        claims = jwt.decode(
+            token,
+            key=settings.secret_key,
+            algorithms=[settings.algorithm],
+            options={"verify_exp": False},
+        )
+        return AuthContext(token=token, claims=claims, error=e)
+    except JWTError as e:
+        return AuthContext(token=token, error=e)
+
+
+def get_auth_context(connection: HTTPConnection) -> AuthContext:
+    """
+    Возвращает AuthContext запроса, сохранённый AuthContextMiddleware.
+    Если middleware не подключено, токен проверяется здесь и сохраняется в scope.
+    """
+    state = connection.scope.setdefault("state", {})
+    context = state.get(AUTH_CONTEXT_STATE_KEY)
+    if context is None:
+        context = build_auth_context(connection.headers)
+        state[AUTH_CONTEXT_STATE_KEY] = context
+    return context
+
+
+class AuthContextMiddleware:
+    """
+    ASGI middleware: один раз проверяет Bearer токен и кладёт AuthContext
+    в scope["state"] для зависимостей (get_current_principal, ключи rate limit),
+    отмечает активность пользователя и добавляет заголовок My-Process-Time.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        started_at = time.perf_counter()
+        context = build_auth_context(Headers(scope=scope))
+        scope.setdefault("state", {})[AUTH_CONTEXT_STATE_KEY] = context
+
+        if context.user_id:
+            activity_tracker.touch(context.user_id)
+
+        async def send_with_process_time(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                headers = MutableHeaders(scope=message)
+                headers.append(PROCESS_TIME_HEADER, str(time.perf_counter() - started_at))
+            await send(message)
+
+        await self.app(scope, receive, send_with_process_time)
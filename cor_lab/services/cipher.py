@@ -2,15 +2,36 @@ import asyncio
 from Crypto.Cipher import AES
 from Crypto.Util.Padding import pad, unpad
 import base64
+import hashlib
+import hmac
 import secrets
 from cryptography.fernet import Fernet
 from cryptography.hazmat.primitives.kdf.pbkdf2 import PBKDF2HMAC
 from cryptography.hazmat.backends import default_backend
 from cryptography.hazmat.primitives import hashes
 import os
+import time
+from collections import OrderedDict
 from Crypto.Util.Padding import pad as crypto_pad
-from functools import partial
+from typing import Dict, List, Optional, Sequence, Tuple, Union
+from prometheus_client import Counter
 from cor_lab.config.config import settings
+from cor_lab.services.crypto_executor import crypto_executor
+
+
+USER_KEY_CACHE_REQUESTS = Counter(
+    "user_key_cache_requests_total",
+    "Обращения к кэшу расшифрованных пользовательских ключей",
+    ["result"],
+)
+PBKDF2_DERIVATIONS = Counter(
+    "user_key_pbkdf2_derivations_total",
+    "Выполненные PBKDF2-деривации при расшифровке пользовательских ключей",
+)
+PBKDF2_DERIVATIONS_AVOIDED = Counter(
+    "user_key_pbkdf2_derivations_avoided_total",
+    "PBKDF2-деривации, которых удалось избежать благодаря кэшу ключей",
+)
 
 
 def pad(data: bytes, block_size: int) -> bytes:
@@ -29,6 +50,7 @@ def pad(data: bytes, block_size: int) -> bytes:
 async def encrypt_data(data: bytes, key: bytes) -> bytes:
     """
     Эта асинхронная функция шифрует данные с использованием AES в режиме CBC.
+    Шифрование выполняется в крипто-пуле (crypto_executor).
 
     Параметры:
     data: данные для шифрования (в байтах).
@@ -38,11 +60,13 @@ async def encrypt_data(data: bytes, key: bytes) -> bytes:
     Данные шифруются.
     IV и зашифрованные данные кодируются в Base64 и возвращаются.
     """
+    return await crypto_executor.run("aes_encrypt", _sync_encrypt_data_impl, data, key)
+
 
+def _sync_encrypt_data_impl(data: bytes, key: bytes) -> bytes:
     cipher = AES.new(key, AES.MODE_CBC)
     encrypted_data = cipher.encrypt(pad(data, AES.block_size))
-    encoded_data = base64.b64encode(cipher.iv + encrypted_data)
-    return encoded_data
+    return base64.b64encode(cipher.iv + encrypted_data)
 
 
 def _sync_decrypt_data_impl(encrypted_data: bytes, key: bytes) -> str:
@@ -61,16 +85,81 @@ def _sync_decrypt_data_impl(encrypted_data: bytes, key: bytes) -> str:
 async def decrypt_data(encrypted_data: bytes, key: bytes) -> str:
     """
     Эта асинхронная функция дешифрует данные, зашифрованные функцией encrypt_data.
-    CPU-интенсивные части выполняются в отдельном потоке.
+    CPU-интенсивные части выполняются в крипто-пуле (crypto_executor).
     """
     try:
-        result = await asyncio.to_thread(_sync_decrypt_data_impl, encrypted_data, key)
+        result = await crypto_executor.run(
+            "aes_decrypt", _sync_decrypt_data_impl, encrypted_data, key
+        )
         return result
     except (ValueError, KeyError) as e:
 
         raise ValueError("Decryption failed. Invalid key or corrupted data.") from e
 
 
+def _sync_encrypt_batch_impl(
+    values: Sequence[Optional[Union[bytes, str]]], key: bytes
+) -> List[Optional[bytes]]:
+    return [
+        _sync_encrypt_data_impl(value, key) if value is not None else None
+        for value in values
+    ]
+
+
+def _sync_decrypt_batch_impl(
+    values: Sequence[Optional[bytes]], key: bytes
+) -> List[Optional[str]]:
+    return [
+        _sync_decrypt_data_impl(value, key) if value is not None else None
+        for value in values
+    ]
+
+
+async def encrypt_batch(
+    values: Sequence[Optional[Union[bytes, str]]], key: bytes
+) -> List[Optional[bytes]]:
+    """
+    Шифрует несколько значений одним ключом за один вызов крипто-пула.
+    Порядок результатов совпадает с порядком values, None остаётся None.
+    Ключ расшифровывается вызывающим один раз (decrypt_user_key).
+    """
+    if not values:
+        return []
+    return await crypto_executor.run(
+        "aes_encrypt_batch", _sync_encrypt_batch_impl, list(values), key
+    )
+
+
+async def decrypt_batch(
+    values: Sequence[Optional[bytes]], key: bytes
+) -> List[Optional[str]]:
+    """
+    Дешифрует несколько значений одним ключом за один вызов крипто-пула.
+    Порядок результатов совпадает с порядком values, None остаётся None.
+    """
+    if not values:
+        return []
+    try:
+        return await crypto_executor.run(
+            "aes_decrypt_batch", _sync_decrypt_batch_impl, list(values), key
+        )
+    except (ValueError, KeyError) as e:
+        raise ValueError("Decryption failed. Invalid key or corrupted data.") from e
+
+
+def hash_refresh_token(refresh_token: str) -> str:
+    """
+    Возвращает HMAC-SHA256 refresh токена (hex) на ключе refresh_token_hmac_key.
+    Хранится рядом с зашифрованной копией токена и позволяет найти сессию
+    индексированным равенством, без расшифровки сохранённых токенов.
+    """
+    return hmac.new(
+        settings.refresh_token_hmac_key.encode(),
+        refresh_token.encode(),
+        hashlib.sha256,
+    ).hexdigest()
+
+
 async def generate_aes_key(key_size: int = 16) -> bytes:
     """
     Генерирует новый ключ для AES.
@@ -99,7 +188,7 @@ async def encrypt_user_key(key: bytes) -> str:
         iterations=100000,
         backend=default_backend(),
     )
-    aes_key = await asyncio.to_thread(kdf.derive, settings.aes_key.encode())
+    aes_key = await crypto_executor.run("pbkdf2", kdf.derive, settings.aes_key.encode())
 
     cipher = Fernet(base64.urlsafe_b64encode(aes_key))
     encrypted_key = cipher.encrypt(key)
@@ -124,15 +213,98 @@ def _sync_decrypt_user_key_impl(encrypted_key: str, aes_key_setting: str) -> byt
     return cipher.decrypt(ciphertext)
 
 
-async def decrypt_user_key(encrypted_key: str) -> bytes:
+class _UserKeyCache:
     """
-    Дешифрует зашифрованный пользовательский ключ.
-    CPU-интенсивные части выполняются в отдельном потоке.
+    Кэш расшифрованных пользовательских ключей в памяти процесса (LRU с TTL).
+    Ключ - зашифрованный ключ пользователя (unique_cipher_key), значение хранится
+    в bytearray и затирается нулями при вытеснении или истечении TTL.
+    Вызывающим возвращается копия, поэтому затирание не влияет на ключ,
+    который ещё используется в запросе.
     """
+
+    def __init__(self, ttl: int, max_entries: int):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Tuple[float, bytearray]]" = OrderedDict()
+        self.in_flight: Dict[str, "asyncio.Task[bytes]"] = {}
+
+    def get(self, encrypted_key: str) -> Optional[bytes]:
+        entry = self._entries.get(encrypted_key)
+        if entry is None:
+            return None
+        expires_at, user_key = entry
+        if expires_at < time.monotonic():
+            self._evict(encrypted_key)
+            return None
+        self._entries.move_to_end(encrypted_key)
+        return bytes(user_key)
+
+    def put(self, encrypted_key: str, user_key: bytes) -> None:
+        self._evict(encrypted_key)
+        self._entries[encrypted_key] = (time.monotonic() + self.ttl, bytearray(user_key))
+        while len(self._entries) > self.max_entries:
+            self._evict(next(iter(self._entries)))
+
+    def _evict(self, encrypted_key: str) -> None:
+        entry = self._entries.pop(encrypted_key, None)
+        if entry is not None:
+            user_key = entry[1]
+            user_key[:] = bytes(len(user_key))
+
+    def clear(self) -> None:
+        for encrypted_key in list(self._entries):
+            self._evict(encrypted_key)
+
+
+_user_key_cache = _UserKeyCache(
+    ttl=settings.user_key_cache_ttl, max_entries=settings.user_key_cache_max_entries
+)
+
+
+async def _derive_user_key(encrypted_key: str) -> bytes:
+    """Общая для всех ожидающих задача PBKDF2: кладёт результат в кэш."""
     try:
-        result = await asyncio.to_thread(
-            partial(_sync_decrypt_user_key_impl, encrypted_key, settings.aes_key)
+        PBKDF2_DERIVATIONS.inc()
+        user_key = await crypto_executor.run(
+            "pbkdf2", _sync_decrypt_user_key_impl, encrypted_key, settings.aes_key
         )
-        return result
     except Exception as e:
         raise ValueError("Decryption failed. Invalid key or corrupted data.") from e
+    else:
+        _user_key_cache.put(encrypted_key, user_key)
+        return user_key
+    finally:
+        _user_key_cache.in_flight.pop(encrypted_key, None)
+
+
+def _consume_task_exception(task: "asyncio.Task[bytes]") -> None:
+    # Если все ожидающие отменены, исключение задачи никто не заберёт
+    if not task.cancelled():
+        task.exception()
+
+
+async def decrypt_user_key(encrypted_key: str) -> bytes:
+    """
+    Дешифрует зашифрованный пользовательский ключ.
+    CPU-интенсивные части выполняются в крипто-пуле (crypto_executor).
+    Результат кэшируется на user_key_cache_ttl секунд; одновременные запросы
+    одного и того же ключа ждут одну общую задачу PBKDF2. Задача не
+    принадлежит ни одному запросу: отмена любого из них (в том числе
+    первого) не отменяет вычисление для остальных.
+    """
+    user_key = _user_key_cache.get(encrypted_key)
+    if user_key is not None:
+        USER_KEY_CACHE_REQUESTS.labels(result="hit").inc()
+        PBKDF2_DERIVATIONS_AVOIDED.inc()
+        return user_key
+
+    in_flight = _user_key_cache.in_flight.get(encrypted_key)
+    if in_flight is not None:
+        USER_KEY_CACHE_REQUESTS.labels(result="coalesced").inc()
+        PBKDF2_DERIVATIONS_AVOIDED.inc()
+    else:
+        USER_KEY_CACHE_REQUESTS.labels(result="miss").inc()
+        in_flight = asyncio.create_task(_derive_user_key(encrypted_key))
+        in_flight.add_done_callback(_consume_task_exception)
+        _user_key_cache.in_flight[encrypted_key] = in_flight
+    return bytes(await asyncio.shield(in_flight))
@@ -0,0 +1,84 @@
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Optional, TypeVar
+
+from prometheus_client import Gauge, Histogram
+
+from cor_lab.config.config import settings
+
+
+T = TypeVar("T")
+
+CRYPTO_QUEUE_DEPTH = Gauge(
+    "crypto_executor_queue_depth",
+    "Криптографические операции, ожидающие свободного потока",
+)
+CRYPTO_WAIT_SECONDS = Histogram(
+    "crypto_executor_wait_seconds",
+    "Время ожидания операции в очереди крипто-пула",
+    ["operation"],
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5),
+)
+CRYPTO_DURATION_SECONDS = Histogram(
+    "crypto_executor_duration_seconds",
+    "Время выполнения операции в крипто-пуле",
+    ["operation"],
+    buckets=(0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.25, 0.5, 1.0),
+)
+
+
+class CryptoExecutor:
+    """
+    Отдельный пул потоков для CPU-ёмкой криптографии (bcrypt, PBKDF2, AES).
+    Не делит потоки с пулом по умолчанию (asyncio.to_thread), поэтому
+    всплеск логинов не блокирует прочие фоновые операции, и наоборот.
+    bcrypt, OpenSSL (PBKDF2) и AES отпускают GIL, так что потоки работают параллельно.
+    """
+
+    def __init__(self, max_workers: int):
+        self.max_workers = max_workers
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.max_workers, thread_name_prefix="crypto"
+            )
+        return self._executor
+
+    async def run(self, operation: str, func: Callable[..., T], *args: Any) -> T:
+        """Выполняет func(*args) в крипто-пуле; operation - метка для метрик."""
+        submitted_at = time.perf_counter()
+        CRYPTO_QUEUE_DEPTH.inc()
+
+        def _timed_call() -> T:
+            started_at = time.perf_counter()
+            CRYPTO_QUEUE_DEPTH.dec()
+            CRYPTO_WAIT_SECONDS.labels(operation=operation).observe(
+                started_at - submitted_at
+            )
+            try:
+                return func(*args)
+            finally:
+                CRYPTO_DURATION_SECONDS.labels(operation=operation).observe(
+                    time.perf_counter() - started_at
+                )
+
+        future = self._get_executor().submit(_timed_call)
+        try:
+            return await asyncio.wrap_future(future)
+        except asyncio.CancelledError:
+            # Операция ещё в очереди - снимаем её, чтобы не считать в глубине очереди
+            if future.cancel():
+                CRYPTO_QUEUE_DEPTH.dec()
+            raise
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+crypto_executor = CryptoExecutor(max_workers=settings.crypto_executor_workers)
+
@@ -1,39 +1,51 @@
-from typing import List
+from typing import List, Optional
 
 from fastapi import HTTPException, Request, status
 import httpx
 from loguru import logger
 
-from cor_lab.schemas import PrintLabel
+from cor_lab.schemas import LabelPrintResult, PrintLabel
+from cor_lab.services.printer_client import PRINTER_PORT, printer_client
 
 
-PRINTER_BASE_URL = "http://{printer_ip}:8080/task/new"
+PRINT_TASK_PATH = "/task/new"
+PRINTER_BASE_URL = f"http://{{printer_ip}}:{PRINTER_PORT}{PRINT_TASK_PATH}"
+PRINT_BATCH_SIZE = 50
+DRY_RUN_BASE_URL = "http://dev-corid.cor-medical.ua/"
 
-async def print_labels(printer_ip: str, labels_to_print: List[PrintLabel], request: Request):
+
+def is_dry_run_request(request: Optional[Request]) -> bool:
+    """Запросы с тестового стенда печатают "вхолостую", без обращения к принтеру."""
+    return request is not None and str(request.base_url) == DRY_RUN_BASE_URL
+
+
+async def print_labels(
+    printer_ip: str,
+    labels_to_print: List[PrintLabel],
+    request: Optional[Request] = None,
+    dry_run: bool = False,
+):
     """
     Отправляет запрос на печать меток на принтер.
-
+    request может отсутствовать при печати из фоновой очереди; в этом случае
+    признак тестовой печати передаётся через dry_run.
     """
-    logger.debug(request.base_url)
-    if request.base_url == "http://dev-corid.cor-medical.ua/":
+    if dry_run or is_dry_run_request(request):
         logger.debug("Тестовая печать успешна")
         return {"success": True, "printer_response": "Делаем вид что принтер напечатал"}
     printer_url = PRINTER_BASE_URL.format(printer_ip=printer_ip)
     try:
-        async with httpx.AsyncClient() as client:
-            labels_data = [label.dict() for label in labels_to_print]
-            
-            logger.debug(f"Отправка на принтер {printer_url}: {labels_data}") 
-
-            response = await client.post(
-                printer_url,
-                json={"labels": labels_data},
-                timeout=10
-            )
-            response.raise_for_status()
+        labels_data = [label.dict() for label in labels_to_print]
+
+        logger.debug(f"Отправка на принтер {printer_url}: {labels_data}")
+
+        response = await printer_client.post(
+            printer_ip, PRINT_TASK_PATH, json={"labels": labels_data}
+        )
+        response.raise_for_status()
 
-            logger.debug(f"Статус ответа принтера: {response.status_code}, тело: {response.text}")
-            return {"success": True, "printer_response": response.text}
+        logger.debug(f"Статус ответа принтера: {response.status_code}, тело: {response.text}")
+        return {"success": True, "printer_response": response.text}
 
     except httpx.HTTPStatusError as e:
         logger.error(f"Произошла HTTP ошибка: {e.response.text}")
@@ -51,4 +63,39 @@ async def print_labels(printer_ip: str, labels_to_print: List[PrintLabel], reque
         logger.error(f"Произошла непредвиденная ошибка: {e}")
         raise HTTPException(
             status_code=503, detail=f"Не удалось отправить на принтер: {str(e)}"
-        )
\ No newline at end of file
+        )
+
+
+async def print_labels_batch(
+    printer_ip: str,
+    labels_to_print: List[PrintLabel],
+    request: Optional[Request] = None,
+    chunk_size: int = PRINT_BATCH_SIZE,
+    dry_run: bool = False,
+) -> List[LabelPrintResult]:
+    """
+    Отправляет метки на принтер пачками по chunk_size штук (по одному запросу на пачку).
+    Ошибка одной пачки не прерывает печать остальных: статус возвращается
+    для каждой метки отдельно, в порядке labels_to_print.
+    """
+    results: List[LabelPrintResult] = []
+    for start in range(0, len(labels_to_print), chunk_size):
+        chunk = labels_to_print[start : start + chunk_size]
+        detail: Optional[str] = None
+        try:
+            await print_labels(
+                printer_ip=printer_ip,
+                labels_to_print=chunk,
+                request=request,
+                dry_run=dry_run,
+            )
+        except HTTPException as e:
+            detail = str(e.detail)
+            logger.warning(
+                f"Пачка из {len(chunk)} меток не напечатана на {printer_ip}: {detail}"
+            )
+        results.extend(
+            LabelPrintResult(uuid=label.uuid, printed=detail is None, detail=detail)
+            for label in chunk
+        )
+    return results
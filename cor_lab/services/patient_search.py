@@ -0,0 +1,194 @@
+import re
+import time
+from collections import OrderedDict
+from typing import List, NamedTuple, Optional, Tuple
+
+from loguru import logger
+from sqlalchemy import text
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from cor_lab.repository.patient import PatientSearchHit, search_patients
+from cor_lab.schemas import TypeaheadPatient, TypeaheadSearchResponse
+from cor_lab.services.search_token_generator import generate_ngrams
+
+
+TYPEAHEAD_POOL_SIZE = 50
+TYPEAHEAD_LATENCY_BUDGET_MS = 150
+TYPEAHEAD_CACHE_TTL_SECONDS = 30
+TYPEAHEAD_CACHE_MAX_ENTRIES = 1024
+
+
+class _CachedPool(NamedTuple):
+    """
+    Пул кандидатов запроса. truncated - пул обрезан по лимиту,
+    т.е. в нём могут быть не все пациенты с общими n-граммами.
+    """
+
+    hits: List[PatientSearchHit]
+    truncated: bool
+
+
+class _TypeaheadPoolCache:
+    """
+    Кэш кандидатов последних запросов в памяти процесса (LRU с TTL).
+    Ключ - нормализованный текст запроса, значение - пул кандидатов с их n-граммами,
+    по которому можно пересчитать ранжирование для более длинного запроса.
+    """
+
+    def __init__(self, ttl: int, max_entries: int):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Tuple[float, _CachedPool]]" = OrderedDict()
+
+    def get(self, key: str) -> Optional[_CachedPool]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, pool = entry
+        if expires_at < time.monotonic():
+            self._entries.pop(key, None)
+            return None
+        self._entries.move_to_end(key)
+        return pool
+
+    def longest_prefix(self, key: str) -> Optional[Tuple[str, _CachedPool]]:
+        """Возвращает (префикс, пул) самого длинного закэшированного префикса key."""
+        for length in range(len(key) - 1, 1, -1):
+            pool = self.get(key[:length])
+            if pool is not None:
+                return key[:length], pool
+        return None
+
+    def put(self, key: str, pool: _CachedPool) -> None:
+        self._entries[key] = (time.monotonic() + self.ttl, pool)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+
+_pool_cache = _TypeaheadPoolCache(
+    ttl=TYPEAHEAD_CACHE_TTL_SECONDS, max_entries=TYPEAHEAD_CACHE_MAX_ENTRIES
+)
+
+
+def _normalize_query(query: str) -> str:
+    return re.sub(r"[^a-zа-я0-9]", "", query.lower())
+
+
+def _query_ngrams(query: str) -> List[str]:
+    return sorted(set(generate_ngrams(query, n=2) + generate_ngrams(query, n=3)))
+
+
+def _rescore_pool(
+    pool: List[PatientSearchHit], ngrams: List[str]
+) -> List[PatientSearchHit]:
+    """Пересчитывает score кандидатов пула для нового набора n-грамм без запроса в БД."""
+    query_ngrams = set(ngrams)
+    rescored = []
+    for hit in pool:
+        matched = len(query_ngrams & set(hit.search_tokens.split(" ")))
+        if matched:
+            rescored.append(hit._replace(score=round(matched / len(query_ngrams), 4)))
+    rescored.sort(key=lambda hit: (-hit.score, hit.patient_id))
+    return rescored
+
+
+def _rescore_prefix_pool(
+    prefix: str, pool: _CachedPool, ngrams: List[str], limit: int
+) -> Optional[List[PatientSearchHit]]:
+    """
+    Ранжирует запрос по полному (не обрезанному) пулу его префикса без запроса в БД.
+    Пациента вне пула объединяют с запросом только n-граммы, которых нет
+    у префикса, поэтому его score не выше их доли. Если top-limit пула
+    строго выше этой границы, результат точный; иначе - None (нужен SQL).
+    """
+    if pool.truncated:
+        return None
+    new_ngram_count = len(set(ngrams) - set(_query_ngrams(prefix)))
+    rescored = _rescore_pool(pool.hits, ngrams)
+    top = rescored[:limit]
+    if new_ngram_count:
+        bound = round(new_ngram_count / len(ngrams), 4)
+        if len(top) < limit or top[-1].score <= bound:
+            return None
+    return rescored
+
+
+def _to_response(
+    hits: List[PatientSearchHit], limit: int, partial: bool = False
+) -> TypeaheadSearchResponse:
+    return TypeaheadSearchResponse(
+        results=[
+            TypeaheadPatient(
+                cor_id=hit.patient_cor_id,
+                name=" ".join(
+                    part
+                    for part in (hit.last_name, hit.first_name, hit.middle_name)
+                    if part
+                ),
+                birth_year=hit.birth_date.year if hit.birth_date else None,
+                score=hit.score,
+            )
+            for hit in hits[:limit]
+        ],
+        partial=partial,
+    )
+
+
+async def typeahead_search(
+    db: AsyncSession,
+    query: str,
+    limit: int = 10,
+    latency_budget_ms: int = TYPEAHEAD_LATENCY_BUDGET_MS,
+) -> TypeaheadSearchResponse:
+    """
+    Подсказки пациентов по мере ввода: top-K по индексу n-грамм.
+
+    Повтор того же запроса отдаётся из кэша. Если закэширован полный
+    (не обрезанный лимитом) пул префикса запроса и его пересчёт заведомо
+    точен (см. _rescore_prefix_pool), БД не запрашивается. Точный поиск выполняется
+    с statement_timeout = latency_budget_ms; если он не уложился в бюджет,
+    результат строится пересчётом кандидатов самого длинного закэшированного
+    префикса запроса (partial=True).
+    """
+    normalized_query = _normalize_query(query)
+    ngrams = _query_ngrams(normalized_query)
+    if not ngrams:
+        return TypeaheadSearchResponse()
+
+    cached_pool = _pool_cache.get(normalized_query)
+    if cached_pool is not None:
+        return _to_response(cached_pool.hits, limit)
+
+    prefix_entry = _pool_cache.longest_prefix(normalized_query)
+    if prefix_entry is not None:
+        hits = _rescore_prefix_pool(*prefix_entry, ngrams=ngrams, limit=limit)
+        if hits is not None:
+            return _to_response(hits, limit)
+
+    pool_limit = max(limit, TYPEAHEAD_POOL_SIZE)
+    try:
+        await db.execute(
+            text(f"SET LOCAL statement_timeout = {int(latency_budget_ms)}")
+        )
+        pool = await search_patients(db=db, search_ngrams=ngrams, limit=pool_limit)
+    except DBAPIError as e:
+        await db.rollback()
+        logger.warning(
+            f"Поиск пациентов не уложился в {latency_budget_ms} мс: {e.orig}"
+        )
+        if prefix_entry is None:
+            return TypeaheadSearchResponse(partial=True)
+        _, prefix_pool = prefix_entry
+        return _to_response(
+            _rescore_pool(prefix_pool.hits, ngrams), limit, partial=True
+        )
+    finally:
+        if db.in_transaction():
+            await db.rollback()
+
+    _pool_cache.put(
+        normalized_query, _CachedPool(hits=pool, truncated=len(pool) >= pool_limit)
+    )
+    return _to_response(pool, limit)
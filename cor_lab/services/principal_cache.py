@@ -0,0 +1,274 @@
+import asyncio
+import json
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from loguru import logger
+from sqlalchemy import inspect as sa_inspect
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import make_transient_to_detached
+
+from cor_lab.config.config import settings
+from cor_lab.database.models import Doctor_Status, User
+from cor_lab.database.redis_db import redis_client
+
+
+PRINCIPAL_INVALIDATION_CHANNEL = "principal_cache:invalidate"
+PRINCIPAL_LISTENER_RETRY_SECONDS = 1.0
+
+
+@dataclass(frozen=True)
+class DoctorPrincipal:
+    """Срез врача без бинарных полей (фото, сканы)."""
+
+    id: str
+    doctor_id: str
+    status: Doctor_Status
+    first_name: Optional[str] = None
+    middle_name: Optional[str] = None
+    last_name: Optional[str] = None
+
+
+@dataclass(frozen=True)
+class LabAssistantPrincipal:
+    id: str
+    lab_assistant_cor_id: str
+    first_name: Optional[str] = None
+    surname: Optional[str] = None
+    middle_name: Optional[str] = None
+
+
+@dataclass(frozen=True)
+class Principal:
+    """
+    Аутентифицированный пользователь access-токена: значения колонок User,
+    роли и срезы врача / лаборанта.
+    """
+
+    jti: str
+    user_columns: Dict[str, Any]
+    roles: Tuple[str, ...]
+    doctor: Optional[DoctorPrincipal] = None
+    lab_assistant: Optional[LabAssistantPrincipal] = None
+    is_lawyer: bool = False
+
+    @property
+    def user_id(self) -> str:
+        return self.user_columns["id"]
+
+    @property
+    def cor_id(self) -> Optional[str]:
+        return self.user_columns["cor_id"]
+
+    @property
+    def email(self) -> str:
+        return self.user_columns["email"]
+
+    @property
+    def is_approved_doctor(self) -> bool:
+        return self.doctor is not None and self.doctor.status == Doctor_Status.approved
+
+    async def attach_user(self, db: AsyncSession) -> User:
+        """
+        Возвращает объект User, привязанный к сессии db, без запроса в БД.
+        Изменения объекта сохраняются обычным commit.
+        """
+        user = User(**self.user_columns)
+        make_transient_to_detached(user)
+        return await db.merge(user, load=False)
+
+
+def collect_roles(
+    email: str, is_lawyer: bool, is_approved_doctor: bool, is_lab_assistant: bool
+) -> List[str]:
+    """Список ролей пользователя в порядке, в котором они попадают в токен."""
+    roles = []
+    if email in settings.admin_accounts:
+        roles.append("admin")
+    if is_lawyer:
+        roles.append("lawyer")
+    if email.endswith("@cor-int.com"):
+        roles.append("cor-int")
+    if is_approved_doctor:
+        roles.append("doctor")
+    if is_lab_assistant:
+        roles.append("lab_assistant")
+    return roles
+
+
+def build_principal(jti: str, row: Any) -> Principal:
+    """Строит Principal из строки repository.person.get_user_principal_row."""
+    user_columns = {
+        attr.key: getattr(row.User, attr.key)
+        for attr in sa_inspect(User).column_attrs
+    }
+    doctor = (
+        DoctorPrincipal(
+            id=row.doctor_pk,
+            doctor_id=row.User.cor_id,
+            status=row.doctor_status,
+            first_name=row.doctor_first_name,
+            middle_name=row.doctor_middle_name,
+            last_name=row.doctor_last_name,
+        )
+        if row.doctor_pk
+        else None
+    )
+    lab_assistant = (
+        LabAssistantPrincipal(
+            id=row.lab_assistant_pk,
+            lab_assistant_cor_id=row.User.cor_id,
+            first_name=row.lab_assistant_first_name,
+            surname=row.lab_assistant_surname,
+            middle_name=row.lab_assistant_middle_name,
+        )
+        if row.lab_assistant_pk
+        else None
+    )
+    email = user_columns["email"]
+    is_lawyer = bool(row.lawyer_pk) or email in settings.lawyer_accounts
+    roles = collect_roles(
+        email,
+        is_lawyer=is_lawyer,
+        is_approved_doctor=doctor is not None and doctor.status == Doctor_Status.approved,
+        is_lab_assistant=lab_assistant is not None,
+    )
+
+    return Principal(
+        jti=jti,
+        user_columns=user_columns,
+        roles=tuple(roles),
+        doctor=doctor,
+        lab_assistant=lab_assistant,
+        is_lawyer=is_lawyer,
+    )
+
+
+@dataclass
+class _CacheEntry:
+    principal: Principal
+    expires_at: float = field(default=0.0)
+
+
+class PrincipalCache:
+    """
+    Кэш Principal в памяти процесса по jti access-токена (LRU).
+    Запись живёт не дольше токена и не дольше ttl; инвалидация
+    по jti или по пользователю рассылается всем воркерам через Redis pub/sub.
+    Пока подписка не активна (subscribed = False), кэш не используется.
+    """
+
+    def __init__(self, ttl: int, max_entries: int):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, _CacheEntry]" = OrderedDict()
+        self._jtis_by_user: Dict[str, Set[str]] = {}
+        self._listener_task: Optional[asyncio.Task] = None
+        # Растёт при каждой инвалидации: Principal, загруженный до неё, не кэшируется
+        self.generation = 0
+        self.subscribed = False
+
+    def get(self, jti: str) -> Optional[Principal]:
+        entry = self._entries.get(jti)
+        if entry is None:
+            return None
+        if entry.expires_at < time.time():
+            self._evict(jti)
+            return None
+        self._entries.move_to_end(jti)
+        return entry.principal
+
+    def put(self, principal: Principal, token_expires_at: float, generation: int) -> None:
+        if generation != self.generation:
+            return
+        expires_at = min(token_expires_at, time.time() + self.ttl)
+        self._entries[principal.jti] = _CacheEntry(principal, expires_at)
+        self._entries.move_to_end(principal.jti)
+        for user_key in (principal.user_id, principal.cor_id):
+            if user_key:
+                self._jtis_by_user.setdefault(user_key, set()).add(principal.jti)
+        while len(self._entries) > self.max_entries:
+            self._evict(next(iter(self._entries)))
+
+    def _evict(self, jti: str) -> None:
+        entry = self._entries.pop(jti, None)
+        if entry is None:
+            return
+        for user_key in (entry.principal.user_id, entry.principal.cor_id):
+            jtis = self._jtis_by_user.get(user_key)
+            if jtis is not None:
+                jtis.discard(jti)
+                if not jtis:
+                    del self._jtis_by_user[user_key]
+
+    def _apply_invalidation(self, message: Dict[str, Any]) -> None:
+        self.generation += 1
+        if message.get("jti"):
+            self._evict(message["jti"])
+        user_key = message.get("cor_id") or message.get("user_id")
+        if user_key:
+            for jti in list(self._jtis_by_user.get(user_key, ())):
+                self._evict(jti)
+
+    def clear(self) -> None:
+        self.generation += 1
+        self._entries.clear()
+        self._jtis_by_user.clear()
+
+    async def _publish(self, message: Dict[str, Any]) -> None:
+        self._apply_invalidation(message)
+        try:
+            await redis_client.publish(PRINCIPAL_INVALIDATION_CHANNEL, json.dumps(message))
+        except Exception as e:
+            logger.error(f"Не удалось разослать инвалидацию кэша пользователей: {e}")
+
+    async def invalidate_jti(self, jti: str) -> None:
+        await self._publish({"jti": jti})
+
+    async def invalidate_user(
+        self, cor_id: Optional[str] = None, user_id: Optional[str] = None
+    ) -> None:
+        """Сбрасывает все закэшированные токены пользователя (смена ролей, статуса, данных)."""
+        if cor_id:
+            await self._publish({"cor_id": cor_id})
+        if user_id:
+            await self._publish({"user_id": user_id})
+
+    async def start(self) -> None:
+        if self._listener_task is None or self._listener_task.done():
+            self._listener_task = asyncio.create_task(self._listen())
+
+    async def stop(self) -> None:
+        if self._listener_task is not None:
+            self._listener_task.cancel()
+            await asyncio.gather(self._listener_task, return_exceptions=True)
+            self._listener_task = None
+        self.subscribed = False
+
+    async def _listen(self) -> None:
+        while True:
+            pubsub = redis_client.pubsub()
+            try:
+                await pubsub.subscribe(PRINCIPAL_INVALIDATION_CHANNEL)
+                # Сообщения, пропущенные без подписки, не восстановить - кэш сбрасывается
+                self.clear()
+                self.subscribed = True
+                async for message in pubsub.listen():
+                    if message.get("type") == "message":
+                        self._apply_invalidation(json.loads(message["data"]))
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Подписка на инвалидацию кэша пользователей потеряна: {e}")
+            finally:
+                self.subscribed = False
+                await pubsub.aclose()
+            await asyncio.sleep(PRINCIPAL_LISTENER_RETRY_SECONDS)
+
+
+principal_cache = PrincipalCache(
+    ttl=settings.principal_cache_ttl,
+    max_entries=settings.principal_cache_max_entries,
+)
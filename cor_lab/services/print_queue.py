@@ -0,0 +1,469 @@
+import asyncio
+import json
+import random
+import time
+import uuid
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Literal, Optional
+
+from fastapi import Request
+from loguru import logger
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from cor_lab.config.config import settings
+from cor_lab.database import models as db_models
+from cor_lab.database.db import async_session_maker
+from cor_lab.database.redis_db import redis_client
+from cor_lab.repository.case import _apply_label_print_results
+from cor_lab.repository.label_printing import (
+    collect_cassette_labels,
+    collect_glass_labels,
+)
+from cor_lab.schemas import (
+    GeneralPrinting,
+    LabelPrintResult,
+    PrintJobResponse,
+    PrintLabel,
+)
+from cor_lab.services.glass_and_cassette_printing import (
+    is_dry_run_request,
+    print_labels_batch,
+)
+from cor_lab.services.redis_scripts import claim_queue_item
+
+
+PRINT_JOB_KEY = "print_job:{job_id}"
+PRINT_QUEUE_KEY = "print_queue:{printer_ip}"
+PRINT_LABEL_KEY = "print_label:{label_uuid}"
+PRINT_QUEUE_PRINTERS_KEY = "print_queue:printers"
+# Взятые задания: ZSET с score = срок аренды (unix time)
+PRINT_QUEUE_LEASES_KEY = "print_queue:leases"
+# Занятые слоты принтера во всём кластере: ZSET job_id -> срок аренды
+PRINT_QUEUE_SLOTS_KEY = "print_queue:slots:{printer_ip}"
+# Список processing из прежней версии очереди, разбирается при старте
+LEGACY_PRINT_QUEUE_PROCESSING_KEY = "print_queue:processing"
+
+PRINT_JOB_LEASE_SECONDS = 300
+PRINT_QUEUE_POLL_INTERVAL = 1.0
+
+LABEL_KIND_MODELS = {
+    "glass": db_models.Glass,
+    "cassette": db_models.Cassette,
+}
+LABEL_KIND_COLLECTORS = {
+    "glass": collect_glass_labels,
+    "cassette": collect_cassette_labels,
+}
+
+
+def _now() -> datetime:
+    return datetime.utcnow()
+
+
+async def _load_job(job_id: str) -> Optional[Dict[str, Any]]:
+    raw_job = await redis_client.get(PRINT_JOB_KEY.format(job_id=job_id))
+    return json.loads(raw_job) if raw_job else None
+
+
+async def _save_job(job: Dict[str, Any]) -> None:
+    job["updated_at"] = _now().isoformat()
+    await redis_client.set(
+        PRINT_JOB_KEY.format(job_id=job["job_id"]),
+        json.dumps(job),
+        ex=settings.print_job_ttl,
+    )
+
+
+async def _release_label_keys(job: Dict[str, Any]) -> None:
+    """Освобождает ключи идемпотентности меток завершённого задания."""
+    if job["labels"]:
+        await redis_client.delete(
+            *[PRINT_LABEL_KEY.format(label_uuid=label["uuid"]) for label in job["labels"]]
+        )
+
+
+def _job_response(job: Dict[str, Any]) -> PrintJobResponse:
+    return PrintJobResponse(
+        **{
+            key: value
+            for key, value in job.items()
+            if key in PrintJobResponse.model_fields
+        }
+    )
+
+
+async def get_print_job(job_id: str) -> Optional[PrintJobResponse]:
+    """Возвращает состояние задания печати или None, если задание не найдено или устарело."""
+    job = await _load_job(job_id)
+    return _job_response(job) if job else None
+
+
+async def enqueue_print_job(
+    db: AsyncSession,
+    data: GeneralPrinting,
+    label_kind: Literal["glass", "cassette"],
+    printing: bool,
+    request: Optional[Request] = None,
+    case_id: Optional[str] = None,
+    sample_id: Optional[str] = None,
+) -> Optional[PrintJobResponse]:
+    """
+    Ставит в очередь печать всех стёкол или кассет кейса (или семпла).
+
+    Метки собираются сразу, одним запросом, и сохраняются в задании, так что
+    сессия БД освобождается до начала печати. Ключ идемпотентности - uuid метки:
+    метка, уже стоящая в другом незавершённом задании, повторно не ставится
+    и попадает в skipped.
+    Возвращает None, если кейс или семпл не найден.
+    """
+    if sample_id is not None:
+        case_id = await db.scalar(
+            select(db_models.Sample.case_id).where(db_models.Sample.id == sample_id)
+        )
+    elif case_id is not None:
+        case_id = await db.scalar(
+            select(db_models.Case.id).where(db_models.Case.id == case_id)
+        )
+    if case_id is None:
+        return None
+
+    collect_labels = LABEL_KIND_COLLECTORS[label_kind]
+    labels = await collect_labels(
+        db=db,
+        data=data,
+        case_id=None if sample_id is not None else case_id,
+        sample_id=sample_id,
+    )
+
+    job_id = str(uuid.uuid4())
+    async with redis_client.pipeline(transaction=False) as pipe:
+        for label in labels:
+            pipe.set(
+                PRINT_LABEL_KEY.format(label_uuid=label.uuid),
+                job_id,
+                nx=True,
+                ex=settings.print_job_ttl,
+            )
+            pipe.get(PRINT_LABEL_KEY.format(label_uuid=label.uuid))
+        claims = await pipe.execute()
+
+    accepted_labels: List[PrintLabel] = []
+    skipped: List[LabelPrintResult] = []
+    for index, label in enumerate(labels):
+        claimed, owner_job_id = claims[2 * index], claims[2 * index + 1]
+        if claimed:
+            accepted_labels.append(label)
+        else:
+            skipped.append(
+                LabelPrintResult(
+                    uuid=label.uuid,
+                    printed=False,
+                    detail=f"Метка уже стоит в очереди печати (задание {owner_job_id})",
+                )
+            )
+
+    created_at = _now().isoformat()
+    job = {
+        "job_id": job_id,
+        "status": "queued",
+        "printer_ip": data.printer_ip,
+        "label_kind": label_kind,
+        "case_id": case_id,
+        "sample_id": sample_id,
+        "printing": printing,
+        "dry_run": is_dry_run_request(request),
+        "attempts": 0,
+        "created_at": created_at,
+        "updated_at": created_at,
+        "lease_until": None,
+        "labels": [label.model_dump() for label in accepted_labels],
+        "results": [],
+        "skipped": [result.model_dump() for result in skipped],
+    }
+    async with redis_client.pipeline(transaction=True) as pipe:
+        pipe.set(
+            PRINT_JOB_KEY.format(job_id=job_id), json.dumps(job), ex=settings.print_job_ttl
+        )
+        pipe.lpush(PRINT_QUEUE_KEY.format(printer_ip=data.printer_ip), job_id)
+        pipe.sadd(PRINT_QUEUE_PRINTERS_KEY, data.printer_ip)
+        await pipe.execute()
+
+    logger.debug(
+        f"Задание печати {job_id} поставлено в очередь {data.printer_ip}: "
+        f"{len(accepted_labels)} меток, пропущено {len(skipped)}"
+    )
+    return _job_response(job)
+
+
+class PrintQueueWorker:
+    """
+    Фоновый обработчик очереди печати.
+
+    Для каждого принтера с заданиями запускается отдельная задача, которая
+    разбирает его очередь. Задание забирается Lua-скриптом вместе с арендой
+    (ZSET print_queue:leases) и слотом принтера, так что одновременно на один
+    принтер печатается не больше concurrency заданий во всём кластере.
+    Задания с истёкшей арендой (упавший воркер) возвращаются в очередь.
+    """
+
+    def __init__(
+        self,
+        concurrency: int = settings.print_queue_concurrency,
+        max_attempts: int = settings.print_queue_max_attempts,
+        backoff_seconds: float = settings.print_queue_backoff_seconds,
+    ):
+        self.concurrency = concurrency
+        self.max_attempts = max_attempts
+        self.backoff_seconds = backoff_seconds
+        self._dispatcher: Optional[asyncio.Task] = None
+        self._printer_tasks: Dict[str, asyncio.Task] = {}
+
+    async def start(self) -> None:
+        if self._dispatcher is None or self._dispatcher.done():
+            await self._requeue_legacy_processing()
+            self._dispatcher = asyncio.create_task(self._dispatch_loop())
+            logger.info("Очередь печати запущена")
+
+    async def _requeue_legacy_processing(self) -> None:
+        """Возвращает в очереди задания из списка processing прежней версии."""
+        while True:
+            job_id = await redis_client.rpop(LEGACY_PRINT_QUEUE_PROCESSING_KEY)
+            if job_id is None:
+                return
+            job = await _load_job(job_id)
+            if job is None or job["status"] in ("completed", "failed"):
+                continue
+            await redis_client.rpush(
+                PRINT_QUEUE_KEY.format(printer_ip=job["printer_ip"]), job_id
+            )
+
+    async def stop(self) -> None:
+        tasks = list(self._printer_tasks.values())
+        if self._dispatcher is not None:
+            tasks.append(self._dispatcher)
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._dispatcher = None
+        self._printer_tasks.clear()
+        logger.info("Очередь печати остановлена")
+
+    async def _dispatch_loop(self) -> None:
+        while True:
+            try:
+                await self._requeue_expired_jobs()
+                for printer_ip in await redis_client.smembers(PRINT_QUEUE_PRINTERS_KEY):
+                    task = self._printer_tasks.get(printer_ip)
+                    if task is None or task.done():
+                        self._printer_tasks[printer_ip] = asyncio.create_task(
+                            self._drain_printer(printer_ip)
+                        )
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Ошибка диспетчера очереди печати: {e}")
+            await asyncio.sleep(PRINT_QUEUE_POLL_INTERVAL)
+
+    async def _drain_printer(self, printer_ip: str) -> None:
+        """Разбирает очередь одного принтера, пока в ней есть задания."""
+        in_flight = set()
+        queue_key = PRINT_QUEUE_KEY.format(printer_ip=printer_ip)
+        slots_key = PRINT_QUEUE_SLOTS_KEY.format(printer_ip=printer_ip)
+
+        while True:
+            job_id, _ = await claim_queue_item(
+                queue_key,
+                PRINT_QUEUE_LEASES_KEY,
+                slots_key,
+                self.concurrency,
+                PRINT_JOB_LEASE_SECONDS,
+                time.time(),
+            )
+            if job_id is not None:
+                task = asyncio.create_task(self._run_job(job_id))
+                in_flight.add(task)
+                task.add_done_callback(in_flight.discard)
+                continue
+            # Очередь пуста или слоты заняты: ждём свои задания,
+            # а без них диспетчер перезапустит разбор на следующем шаге
+            if not in_flight:
+                return
+            await asyncio.wait(in_flight, return_when=asyncio.FIRST_COMPLETED)
+
+    async def _requeue_expired_jobs(self) -> None:
+        """Возвращает в очередь задания, аренда которых истекла."""
+        expired = await redis_client.zrangebyscore(
+            PRINT_QUEUE_LEASES_KEY, "-inf", time.time()
+        )
+        for job_id in expired:
+            # Только один воркер успешно удалит аренду
+            if not await redis_client.zrem(PRINT_QUEUE_LEASES_KEY, job_id):
+                continue
+            job = await _load_job(job_id)
+            if job is None or job["status"] in ("completed", "failed"):
+                continue
+            job["status"] = "queued"
+            job["lease_until"] = None
+            await _save_job(job)
+            async with redis_client.pipeline(transaction=True) as pipe:
+                pipe.zrem(PRINT_QUEUE_SLOTS_KEY.format(printer_ip=job["printer_ip"]), job_id)
+                pipe.rpush(PRINT_QUEUE_KEY.format(printer_ip=job["printer_ip"]), job_id)
+                await pipe.execute()
+            logger.warning(f"Задание печати {job_id} возвращено в очередь")
+
+    async def _renew_lease(self, job: Dict[str, Any]) -> None:
+        deadline = time.time() + PRINT_JOB_LEASE_SECONDS
+        job["lease_until"] = datetime.utcfromtimestamp(deadline).isoformat()
+        async with redis_client.pipeline(transaction=True) as pipe:
+            # XX: аренду, уже отобранную _requeue_expired_jobs, не восстанавливаем
+            pipe.zadd(PRINT_QUEUE_LEASES_KEY, {job["job_id"]: deadline}, xx=True)
+            pipe.zadd(
+                PRINT_QUEUE_SLOTS_KEY.format(printer_ip=job["printer_ip"]),
+                {job["job_id"]: deadline},
+                xx=True,
+            )
+            await pipe.execute()
+
+    async def _release(self, job_id: str, printer_ip: Optional[str]) -> None:
+        async with redis_client.pipeline(transaction=True) as pipe:
+            pipe.zrem(PRINT_QUEUE_LEASES_KEY, job_id)
+            if printer_ip is not None:
+                pipe.zrem(PRINT_QUEUE_SLOTS_KEY.format(printer_ip=printer_ip), job_id)
+            await pipe.execute()
+
+    async def _run_job(self, job_id: str) -> None:
+        """
+        Печатает метки задания, повторяя неудачные с экспоненциальной задержкой.
+        Уже напечатанные метки при повторе (в том числе после перезапуска) не
+        отправляются. При ошибке задание сразу возвращается в очередь через
+        _retry_failed_job; по истечении аренды возвращаются только задания
+        упавших воркеров.
+        """
+        job = await _load_job(job_id)
+        if job is None or job["status"] in ("completed", "failed"):
+            await self._release(job_id, job["printer_ip"] if job else None)
+            return
+        try:
+            job["status"] = "processing"
+            await self._renew_lease(job)
+            await _save_job(job)
+
+            labels = [PrintLabel(**label) for label in job["labels"]]
+            results: Dict[str, Dict[str, Any]] = {
+                result["uuid"]: result for result in job["results"]
+            }
+            retrying = False
+            while job["attempts"] < self.max_attempts:
+                pending = [
+                    label
+                    for label in labels
+                    if not results.get(label.uuid, {}).get("printed")
+                ]
+                if not pending:
+                    break
+                # После возврата в очередь задержка уже выдержана в _retry_failed_job
+                if retrying:
+                    await asyncio.sleep(self._backoff_delay(job["attempts"]))
+                retrying = True
+                batch_results = await print_labels_batch(
+                    printer_ip=job["printer_ip"],
+                    labels_to_print=pending,
+                    dry_run=job["dry_run"],
+                )
+                for result in batch_results:
+                    results[result.uuid] = result.model_dump()
+                job["attempts"] += 1
+                job["results"] = [
+                    results[label.uuid] for label in labels if label.uuid in results
+                ]
+                await self._renew_lease(job)
+                await _save_job(job)
+
+            await self._complete_job(job)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"Ошибка обработки задания печати {job_id}: {e}")
+            await self._retry_failed_job(job)
+            return
+        await self._release(job_id, job["printer_ip"])
+
+    def _backoff_delay(self, attempts: int) -> float:
+        delay = self.backoff_seconds * 2 ** (attempts - 1)
+        return delay + random.uniform(0, self.backoff_seconds)
+
+    async def _retry_failed_job(self, job: Dict[str, Any]) -> None:
+        """
+        Сохраняет задание после ошибки, сразу освобождает слот принтера и
+        возвращает задание в очередь после задержки. На время задержки аренда
+        продлевается, чтобы при падении воркера задание вернул
+        _requeue_expired_jobs. Задание, исчерпавшее попытки, помечается failed.
+        """
+        job_id, printer_ip = job["job_id"], job["printer_ip"]
+        try:
+            if job["status"] in ("completed", "failed"):
+                # Итог уже сохранён, ошибка при освобождении ключей
+                await self._release(job_id, printer_ip)
+                return
+            job["attempts"] += 1
+            job["lease_until"] = None
+            if job["attempts"] >= self.max_attempts:
+                job["status"] = "failed"
+                await _save_job(job)
+                await self._release(job_id, printer_ip)
+                await _release_label_keys(job)
+                logger.warning(f"Задание печати {job_id} не выполнено: попытки исчерпаны")
+                return
+
+            delay = self._backoff_delay(job["attempts"])
+            job["status"] = "queued"
+            await _save_job(job)
+            async with redis_client.pipeline(transaction=True) as pipe:
+                pipe.zrem(PRINT_QUEUE_SLOTS_KEY.format(printer_ip=printer_ip), job_id)
+                pipe.zadd(
+                    PRINT_QUEUE_LEASES_KEY,
+                    {job_id: time.time() + delay + PRINT_JOB_LEASE_SECONDS},
+                    xx=True,
+                )
+                await pipe.execute()
+
+            await asyncio.sleep(delay)
+            # Аренду мог уже отобрать _requeue_expired_jobs - тогда задание в очереди
+            if await redis_client.zrem(PRINT_QUEUE_LEASES_KEY, job_id):
+                await redis_client.rpush(PRINT_QUEUE_KEY.format(printer_ip=printer_ip), job_id)
+                logger.warning(f"Задание печати {job_id} возвращено в очередь после ошибки")
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            # Задание вернётся в очередь по истечении аренды
+            logger.error(f"Не удалось вернуть задание печати {job_id} в очередь: {e}")
+
+    async def _complete_job(self, job: Dict[str, Any]) -> None:
+        """
+        Проставляет статусы печати в БД по итогам задания и освобождает
+        ключи идемпотентности меток.
+        """
+        print_results = [LabelPrintResult(**result) for result in job["results"]]
+        async with async_session_maker() as db:
+            await _apply_label_print_results(
+                db=db,
+                model=LABEL_KIND_MODELS[job["label_kind"]],
+                print_results=print_results,
+                printing=job["printing"],
+                case_id=job["case_id"],
+                sample_id=job["sample_id"],
+            )
+            await db.commit()
+
+        all_printed = len(print_results) == len(job["labels"]) and all(
+            result.printed for result in print_results
+        )
+        job["status"] = "completed" if all_printed else "failed"
+        job["lease_until"] = None
+        await _save_job(job)
+        await _release_label_keys(job)
+        logger.debug(f"Задание печати {job['job_id']} завершено: {job['status']}")
+
+
+print_queue_worker = PrintQueueWorker()
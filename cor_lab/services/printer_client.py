@@ -0,0 +1,236 @@
+import asyncio
+import json
+import time
+from typing import Dict, Optional, Tuple
+
+import httpx
+from loguru import logger
+from prometheus_client import Counter, Histogram
+from sqlalchemy import select
+
+from cor_lab.database import models as db_models
+from cor_lab.database.db import async_session_maker
+from cor_lab.database.redis_db import redis_client
+
+
+PRINTER_PORT = 8080
+PRINTER_DEVICES_CHANNEL = "printer_client:devices"
+PRINTER_DEVICES_LISTENER_RETRY_SECONDS = 1.0
+DEFAULT_MAX_CONNECTIONS = 4
+DEFAULT_TIMEOUT_SECONDS = 10.0
+KEEPALIVE_EXPIRY_SECONDS = 30.0
+
+PRINTER_REQUEST_LATENCY = Histogram(
+    "printer_request_latency_seconds",
+    "Latency of HTTP requests to label printers",
+    ["printer_ip", "endpoint"],
+)
+PRINTER_REQUEST_ERRORS = Counter(
+    "printer_request_errors_total",
+    "Failed HTTP requests to label printers",
+    ["printer_ip", "endpoint", "error"],
+)
+
+
+UNREGISTERED_PRINTER_LABEL = "unregistered"
+
+
+class PrinterClientPool:
+    """
+    HTTP-клиенты принтеров на время жизни приложения.
+
+    Пул держится только для устройств из справочника PrintingDevice: на каждое
+    свой httpx.AsyncClient с keep-alive, лимит соединений, таймаут и порт берутся
+    из строки устройства. Запросы к адресам не из справочника идут через
+    одноразовый клиент, а в метриках помечаются как "unregistered", так что
+    ни число клиентов, ни число меток не зависят от входных данных.
+    Клиенты создаются при старте и закрываются при остановке приложения.
+    Изменения устройств рассылаются всем воркерам через Redis pub/sub:
+    получатель перечитывает строку PrintingDevice и пересоздаёт или удаляет клиент.
+    """
+
+    def __init__(self):
+        self._clients: Dict[str, httpx.AsyncClient] = {}
+        self._client_settings: Dict[str, Tuple[int, float, int]] = {}
+        self._ip_by_device: Dict[str, str] = {}
+        self._listener_task: Optional[asyncio.Task] = None
+
+    async def start(self) -> None:
+        """Создаёт клиенты для всех устройств печати из БД и подписывается на их изменения."""
+        await self._load_devices()
+        logger.info(f"HTTP-клиенты принтеров созданы: {len(self._clients)}")
+        if self._listener_task is None or self._listener_task.done():
+            self._listener_task = asyncio.create_task(self._listen())
+
+    async def close(self) -> None:
+        if self._listener_task is not None:
+            self._listener_task.cancel()
+            await asyncio.gather(self._listener_task, return_exceptions=True)
+            self._listener_task = None
+        clients = list(self._clients.values())
+        self._clients.clear()
+        self._client_settings.clear()
+        self._ip_by_device.clear()
+        await asyncio.gather(
+            *(client.aclose() for client in clients), return_exceptions=True
+        )
+
+    async def _load_devices(self) -> None:
+        """Приводит клиенты в соответствие со всеми устройствами печати из БД."""
+        try:
+            async with async_session_maker() as db:
+                devices = (
+                    await db.scalars(select(db_models.PrintingDevice))
+                ).all()
+        except Exception as e:
+            logger.error(f"Не удалось загрузить устройства печати: {e}")
+            return
+        for device_id in set(self._ip_by_device) - {device.id for device in devices}:
+            await self._drop_device(device_id)
+        for device in devices:
+            await self._apply_device(device)
+
+    async def configure_device(self, device: db_models.PrintingDevice) -> None:
+        """Создаёт или пересоздаёт клиент принтера во всех воркерах при изменении его настроек."""
+        await self._apply_device(device)
+        await self._publish(device.id)
+
+    async def remove_device(self, device: db_models.PrintingDevice) -> None:
+        """Удаляет клиент принтера во всех воркерах."""
+        await self._drop_device(device.id)
+        await self._publish(device.id)
+
+    async def _publish(self, device_id: str) -> None:
+        try:
+            await redis_client.publish(
+                PRINTER_DEVICES_CHANNEL, json.dumps({"device_id": device_id})
+            )
+        except Exception as e:
+            logger.error(f"Не удалось разослать изменение устройства печати: {e}")
+
+    async def _sync_device(self, device_id: str) -> None:
+        """Перечитывает устройство из БД: пересоздаёт его клиент или удаляет, если строки нет."""
+        async with async_session_maker() as db:
+            device = await db.get(db_models.PrintingDevice, device_id)
+        if device is None:
+            await self._drop_device(device_id)
+        else:
+            await self._apply_device(device)
+
+    async def _apply_device(self, device: db_models.PrintingDevice) -> None:
+        old_ip = self._ip_by_device.get(device.id)
+        if old_ip is not None and old_ip != device.ip_address:
+            await self._remove_ip(old_ip)
+        self._ip_by_device[device.id] = device.ip_address
+
+        client_settings = (
+            device.max_connections or DEFAULT_MAX_CONNECTIONS,
+            device.timeout_seconds or DEFAULT_TIMEOUT_SECONDS,
+            device.port or PRINTER_PORT,
+        )
+        if self._client_settings.get(device.ip_address) == client_settings:
+            return
+        old_client = self._clients.pop(device.ip_address, None)
+        self._clients[device.ip_address] = self._create_client(*client_settings[:2])
+        self._client_settings[device.ip_address] = client_settings
+        if old_client is not None:
+            await old_client.aclose()
+
+    async def _drop_device(self, device_id: str) -> None:
+        ip_address = self._ip_by_device.pop(device_id, None)
+        if ip_address is not None:
+            await self._remove_ip(ip_address)
+
+    async def _listen(self) -> None:
+        while True:
+            pubsub = redis_client.pubsub()
+            try:
+                await pubsub.subscribe(PRINTER_DEVICES_CHANNEL)
+                # Изменения, пропущенные без подписки, не восстановить - устройства перечитываются
+                await self._load_devices()
+                async for message in pubsub.listen():
+                    if message.get("type") == "message":
+                        await self._sync_device(json.loads(message["data"])["device_id"])
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Подписка на изменения устройств печати потеряна: {e}")
+            finally:
+                await pubsub.aclose()
+            await asyncio.sleep(PRINTER_DEVICES_LISTENER_RETRY_SECONDS)
+
+    async def _remove_ip(self, ip_address: str) -> None:
+        self._client_settings.pop(ip_address, None)
+        client = self._clients.pop(ip_address, None)
+        if client is not None:
+            await client.aclose()
+
+    def is_registered(self, printer_ip: str) -> bool:
+        return printer_ip in self._clients
+
+    @staticmethod
+    def _create_client(max_connections: int, timeout_seconds: float) -> httpx.AsyncClient:
+        return httpx.AsyncClient(
+            limits=httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=max_connections,
+                keepalive_expiry=KEEPALIVE_EXPIRY_SECONDS,
+            ),
+            timeout=httpx.Timeout(timeout_seconds),
+        )
+
+    async def request(
+        self,
+        method: str,
+        printer_ip: str,
+        path: str,
+        timeout: Optional[float] = None,
+        port: Optional[int] = None,
+        **kwargs,
+    ) -> httpx.Response:
+        """
+        Выполняет запрос к принтеру и пишет метрики задержки и ошибок.
+        timeout переопределяет таймаут устройства (например, для быстрых проверок),
+        port - порт устройства (например, прочитанный из PrintingDevice).
+        """
+        if timeout is not None:
+            kwargs["timeout"] = timeout
+        client = self._clients.get(printer_ip)
+        if client is not None:
+            port = port or self._client_settings[printer_ip][2]
+            printer_label = printer_ip
+        else:
+            port = port or PRINTER_PORT
+            printer_label = UNREGISTERED_PRINTER_LABEL
+        url = f"http://{printer_ip}:{port}{path}"
+
+        started_at = time.perf_counter()
+        try:
+            if client is not None:
+                response = await client.request(method, url, **kwargs)
+            else:
+                async with self._create_client(
+                    1, DEFAULT_TIMEOUT_SECONDS
+                ) as one_off_client:
+                    response = await one_off_client.request(method, url, **kwargs)
+        except httpx.HTTPError as e:
+            PRINTER_REQUEST_ERRORS.labels(printer_label, path, type(e).__name__).inc()
+            raise
+        finally:
+            PRINTER_REQUEST_LATENCY.labels(printer_label, path).observe(
+                time.perf_counter() - started_at
+            )
+        if response.is_error:
+            PRINTER_REQUEST_ERRORS.labels(
+                printer_label, path, f"http_{response.status_code}"
+            ).inc()
+        return response
+
+    async def get(self, printer_ip: str, path: str, **kwargs) -> httpx.Response:
+        return await self.request("GET", printer_ip, path, **kwargs)
+
+    async def post(self, printer_ip: str, path: str, **kwargs) -> httpx.Response:
+        return await self.request("POST", printer_ip, path, **kwargs)
+
+
+printer_client = PrinterClientPool()
@@ -0,0 +1,155 @@
+import asyncio
+import json
+import random
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+
+from loguru import logger
+from sqlalchemy import select
+
+from cor_lab.database import models as db_models
+from cor_lab.database.db import async_session_maker
+from cor_lab.database.redis_db import redis_client
+from cor_lab.services.printer_client import printer_client
+from cor_lab.services.websocket_events_manager import websocket_events_manager
+
+
+PRINTER_HEALTH_KEY = "printer_health:{printer_ip}"
+PRINTER_HEALTH_LOCK_KEY = "printer_health:lock"
+
+PRINTER_HEALTH_INTERVAL_SECONDS = 15
+PRINTER_HEALTH_CONCURRENCY = 8
+PRINTER_HEALTH_PROBE_TIMEOUT = 2.0
+# Состояние считается устаревшим, если монитор не обновлял его три интервала
+PRINTER_HEALTH_TTL_SECONDS = PRINTER_HEALTH_INTERVAL_SECONDS * 3
+
+
+async def get_printer_health(printer_ip: str) -> Optional[Dict[str, Any]]:
+    """Возвращает закэшированное состояние принтера или None, если его нет в кэше."""
+    raw_state = await redis_client.get(PRINTER_HEALTH_KEY.format(printer_ip=printer_ip))
+    return json.loads(raw_state) if raw_state else None
+
+
+async def probe_printer(printer_ip: str, port: Optional[int] = None) -> Dict[str, Any]:
+    """
+    Живая проверка принтера запросом GET /task на порт устройства.
+    Сохраняет результат в кэш и, если доступность изменилась, рассылает
+    событие printer_status_changed по websocket.
+    """
+    started_at = time.perf_counter()
+    try:
+        response = await printer_client.get(
+            printer_ip, "/task", timeout=PRINTER_HEALTH_PROBE_TIMEOUT, port=port
+        )
+        available = response.status_code == 200
+    except Exception:
+        available = False
+    latency_ms = round((time.perf_counter() - started_at) * 1000, 1)
+
+    previous_state = await get_printer_health(printer_ip)
+    now = datetime.now(timezone.utc)
+    state = {
+        "printer_ip": printer_ip,
+        "available": available,
+        "latency_ms": latency_ms if available else None,
+        "checked_at": now.isoformat(),
+        "changed_at": (
+            previous_state["changed_at"]
+            if previous_state and previous_state["available"] == available
+            else now.isoformat()
+        ),
+    }
+    await redis_client.set(
+        PRINTER_HEALTH_KEY.format(printer_ip=printer_ip),
+        json.dumps(state),
+        ex=PRINTER_HEALTH_TTL_SECONDS,
+    )
+
+    if previous_state is not None and previous_state["available"] != available:
+        logger.info(
+            f"Принтер {printer_ip} {'доступен' if available else 'недоступен'}"
+        )
+        await websocket_events_manager.broadcast_event(
+            {
+                "channel": "cor-erp-prod",
+                "event_type": "printer_status_changed",
+                "printer_ip": printer_ip,
+                "available": available,
+                "latency_ms": state["latency_ms"],
+                "timestamp": now.timestamp(),
+            }
+        )
+    return state
+
+
+class PrinterHealthMonitor:
+    """
+    Фоновый монитор доступности принтеров.
+
+    Раз в интервал один из воркеров (по Redis-блокировке) опрашивает все
+    PrintingDevice с ограниченным параллелизмом; старты проверок размазаны
+    случайной задержкой, чтобы не опрашивать все принтеры одновременно.
+    """
+
+    def __init__(
+        self,
+        interval: int = PRINTER_HEALTH_INTERVAL_SECONDS,
+        concurrency: int = PRINTER_HEALTH_CONCURRENCY,
+    ):
+        self.interval = interval
+        self.concurrency = concurrency
+        self._task: Optional[asyncio.Task] = None
+
+    async def start(self) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+            logger.info("Монитор принтеров запущен")
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                # Опрос выполняет только воркер, захвативший блокировку на интервал
+                if await redis_client.set(
+                    PRINTER_HEALTH_LOCK_KEY, "1", nx=True, ex=self.interval
+                ):
+                    await self.check_all()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Ошибка монитора принтеров: {e}")
+            await asyncio.sleep(self.interval + random.uniform(0, self.interval * 0.1))
+
+    async def check_all(self) -> List[Dict[str, Any]]:
+        # Адреса и порты читаются из БД на каждом цикле, а не из пула клиентов воркера
+        async with async_session_maker() as db:
+            devices = (
+                await db.execute(
+                    select(
+                        db_models.PrintingDevice.ip_address,
+                        db_models.PrintingDevice.port,
+                    )
+                )
+            ).all()
+        ports: Dict[str, Optional[int]] = {}
+        for printer_ip, port in devices:
+            ports[printer_ip] = ports.get(printer_ip) or port
+
+        semaphore = asyncio.Semaphore(self.concurrency)
+        jitter_window = self.interval * 0.5
+
+        async def _probe(printer_ip: str, port: Optional[int]) -> Dict[str, Any]:
+            await asyncio.sleep(random.uniform(0, jitter_window))
+            async with semaphore:
+                return await probe_printer(printer_ip, port)
+
+        return await asyncio.gather(*(_probe(ip, port) for ip, port in ports.items()))
+
+
+printer_health_monitor = PrinterHealthMonitor()
@@ -0,0 +1,200 @@
+import asyncio
+import math
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Awaitable, Callable, List, Optional, Tuple
+
+from fastapi import HTTPException, Request, status
+from loguru import logger
+from prometheus_client import Counter
+
+from cor_lab.config.config import settings
+from cor_lab.database.redis_db import redis_client
+
+
+RATE_LIMIT_KEY_PREFIX = "rate_limit:"
+
+RATE_LIMIT_DECISIONS = Counter(
+    "rate_limit_decisions_total",
+    "Решения локального rate limiter",
+    ["result"],
+)
+
+Identifier = Callable[[Request], Awaitable[Optional[str]]]
+
+
+async def client_host_identifier(request: Request) -> str:
+    return request.client.host
+
+
+@dataclass
+class _Bucket:
+    times: int
+    seconds: int
+    tokens: float
+    updated_at: float
+    last_hit: float
+    # Пропущенные локально запросы, ещё не отправленные в Redis
+    pending: int = 0
+    # Окно Redis и уже учтённые в нём свои и чужие запросы
+    window: int = -1
+    own_hits: int = 0
+    remote_hits: int = 0
+
+    def refill(self, now: float) -> None:
+        rate = self.times / self.seconds
+        self.tokens = min(float(self.times), self.tokens + (now - self.updated_at) * rate)
+        self.updated_at = now
+
+
+class RateLimitStore:
+    """
+    Token bucket в памяти процесса с пакетной сверкой через Redis.
+
+    Решение по запросу принимается локально, без обращения к Redis.
+    Раз в sync_interval секунд (или сразу, когда у ключа накопилось sync_batch
+    пропущенных запросов) воркер одним pipeline добавляет свои запросы в общий
+    счётчик окна (INCRBY) и получает в ответ суммарное число запросов всех
+    воркеров; чужие запросы списываются из локального bucket. Сверх лимита
+    каждый воркер может пропустить примерно столько запросов, сколько придёт
+    к нему между двумя сверками - это и есть допуск, задаваемый настройками.
+    Если Redis недоступен, лимит продолжает действовать локально.
+    """
+
+    def __init__(self, sync_interval: float, sync_batch: int, max_entries: int):
+        self.sync_interval = sync_interval
+        self.sync_batch = sync_batch
+        self.max_entries = max_entries
+        self.identifier: Identifier = client_host_identifier
+        self._buckets: "OrderedDict[str, _Bucket]" = OrderedDict()
+        self._wakeup = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+
+    def acquire(self, key: str, times: int, seconds: int) -> float:
+        """Забирает токен. Возвращает 0, если запрос разрешён, иначе секунды до появления токена."""
+        now = time.monotonic()
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            bucket = _Bucket(times=times, seconds=seconds, tokens=float(times), updated_at=now, last_hit=now)
+            self._buckets[key] = bucket
+            if len(self._buckets) > self.max_entries:
+                self._evict()
+        else:
+            self._buckets.move_to_end(key)
+            bucket.refill(now)
+        bucket.last_hit = now
+
+        if bucket.tokens < 1:
+            RATE_LIMIT_DECISIONS.labels(result="rejected").inc()
+            return (1 - bucket.tokens) * seconds / times
+
+        bucket.tokens -= 1
+        bucket.pending += 1
+        if bucket.pending >= self.sync_batch:
+            self._wakeup.set()
+        RATE_LIMIT_DECISIONS.labels(result="allowed").inc()
+        return 0.0
+
+    def _evict(self) -> None:
+        # Сначала вытесняем bucket'ы без неотправленных запросов
+        for key, bucket in self._buckets.items():
+            if bucket.pending == 0:
+                del self._buckets[key]
+                return
+        self._buckets.popitem(last=False)
+
+    async def start(self, identifier: Optional[Identifier] = None) -> None:
+        if identifier is not None:
+            self.identifier = identifier
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        await self.sync()
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.sync_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            await self.sync()
+
+    async def sync(self) -> None:
+        now = time.monotonic()
+        now_wall = time.time()
+        batch: List[Tuple[str, _Bucket, int, int]] = []
+        for key, bucket in list(self._buckets.items()):
+            if bucket.pending == 0 and now - bucket.last_hit >= bucket.seconds:
+                # За время простоя bucket всё равно наполнился бы полностью
+                del self._buckets[key]
+                continue
+            window = int(now_wall // bucket.seconds)
+            batch.append((key, bucket, bucket.pending, window))
+            bucket.pending = 0
+        if not batch:
+            return
+
+        try:
+            async with redis_client.pipeline(transaction=False) as pipe:
+                for key, bucket, taken, window in batch:
+                    redis_key = f"{RATE_LIMIT_KEY_PREFIX}{key}:{window}"
+                    pipe.incrby(redis_key, taken)
+                    pipe.expire(redis_key, bucket.seconds * 2)
+                results = await pipe.execute()
+        except Exception as e:
+            logger.warning(f"Не удалось сверить rate limit с Redis: {e}")
+            for _, bucket, taken, _ in batch:
+                bucket.pending += taken
+            return
+
+        for (_, bucket, taken, window), total in zip(batch, results[::2]):
+            if bucket.window != window:
+                bucket.window = window
+                bucket.own_hits = 0
+                bucket.remote_hits = 0
+            bucket.own_hits += taken
+            remote_hits = int(total) - bucket.own_hits
+            if remote_hits > bucket.remote_hits:
+                bucket.refill(now)
+                bucket.tokens = max(0.0, bucket.tokens - (remote_hits - bucket.remote_hits))
+                bucket.remote_hits = remote_hits
+
+
+rate_limit_store = RateLimitStore(
+    sync_interval=settings.rate_limit_sync_interval,
+    sync_batch=settings.rate_limit_sync_batch,
+    max_entries=settings.rate_limit_max_entries,
+)
+
+
+class HybridRateLimiter:
+    """
+    Зависимость FastAPI с тем же интерфейсом, что у fastapi_limiter.RateLimiter:
+    не больше times запросов за seconds секунд на идентификатор в пределах маршрута.
+    Без identifier используется идентификатор, переданный в rate_limit_store.start().
+    """
+
+    def __init__(self, times: int, seconds: int, identifier: Optional[Identifier] = None):
+        self.times = times
+        self.seconds = seconds
+        self.identifier = identifier
+
+    async def __call__(self, request: Request) -> None:
+        identifier = self.identifier or rate_limit_store.identifier
+        route = request.scope.get("route")
+        path = route.path if route is not None else request.url.path
+        key = f"{self.times}/{self.seconds}:{path}:{await identifier(request)}"
+        retry_after = rate_limit_store.acquire(key, self.times, self.seconds)
+        if retry_after:
+            raise HTTPException(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                detail="Too Many Requests",
+                headers={"Retry-After": str(math.ceil(retry_after))},
+            )
@@ -0,0 +1,136 @@
+from typing import Optional, Tuple
+
+from loguru import logger
+
+from cor_lab.database.redis_db import redis_client
+
+
+# Возвращает время окончания блокировки, если она ещё действует;
+# просроченное значение удаляет.
+# KEYS[1] - ключ блокировки, ARGV[1] - текущее время (unix)
+_CHECK_BLOCK_LUA = """
+local blocked_until = redis.call('GET', KEYS[1])
+if not blocked_until then
+    return false
+end
+if tonumber(blocked_until) > tonumber(ARGV[1]) then
+    return blocked_until
+end
+redis.call('DEL', KEYS[1])
+return false
+"""
+
+# Считает неудачную попытку и при достижении порога ставит блокировку.
+# KEYS[1] - счётчик попыток, KEYS[2] - ключ блокировки
+# ARGV[1] - порог попыток, ARGV[2] - длительность блокировки (с), ARGV[3] - текущее время
+# Возвращает {число попыток, время окончания блокировки или ""}
+_REGISTER_FAILURE_LUA = """
+local attempts = redis.call('INCR', KEYS[1])
+if attempts == 1 then
+    redis.call('EXPIRE', KEYS[1], ARGV[2])
+end
+if attempts >= tonumber(ARGV[1]) then
+    local blocked_until = tostring(tonumber(ARGV[3]) + tonumber(ARGV[2]))
+    redis.call('SET', KEYS[2], blocked_until, 'EX', ARGV[2])
+    return {attempts, blocked_until}
+end
+return {attempts, ''}
+"""
+
+# Выдаёт следующий номер счётчика; при создании ключа ставит срок жизни.
+# KEYS[1] - ключ счётчика, ARGV[1] - срок жизни (с)
+_ALLOCATE_COUNTER_LUA = """
+local value = redis.call('INCR', KEYS[1])
+if value == 1 then
+    redis.call('EXPIRE', KEYS[1], ARGV[1])
+end
+return value
+"""
+
+# Забирает элемент очереди, если у получателя есть свободный слот, и сразу
+# выдаёт ему аренду: элемент не бывает в processing без срока.
+# KEYS[1] - очередь (LIST), KEYS[2] - аренды (ZSET, score - срок),
+# KEYS[3] - занятые слоты получателя (ZSET, score - срок)
+# ARGV[1] - число слотов, ARGV[2] - срок аренды (с), ARGV[3] - текущее время
+# Возвращает элемент, 0 - все слоты заняты, nil - очередь пуста
+_CLAIM_QUEUE_ITEM_LUA = """
+local now = tonumber(ARGV[3])
+redis.call('ZREMRANGEBYSCORE', KEYS[3], '-inf', now)
+if redis.call('ZCARD', KEYS[3]) >= tonumber(ARGV[1]) then
+    return 0
+end
+local item = redis.call('RPOP', KEYS[1])
+if not item then
+    return false
+end
+local deadline = now + tonumber(ARGV[2])
+redis.call('ZADD', KEYS[2], deadline, item)
+redis.call('ZADD', KEYS[3], deadline, item)
+return item
+"""
+
+# register_script вызывает EVALSHA и сам загружает скрипт при NOSCRIPT
+_check_block_script = redis_client.register_script(_CHECK_BLOCK_LUA)
+_register_failure_script = redis_client.register_script(_REGISTER_FAILURE_LUA)
+_allocate_counter_script = redis_client.register_script(_ALLOCATE_COUNTER_LUA)
+_claim_queue_item_script = redis_client.register_script(_CLAIM_QUEUE_ITEM_LUA)
+
+
+async def load_scripts() -> None:
+    """Загружает скрипты в Redis при старте, чтобы первые вызовы шли сразу через EVALSHA."""
+    for script in (
+        _check_block_script,
+        _register_failure_script,
+        _allocate_counter_script,
+        _claim_queue_item_script,
+    ):
+        script.sha = await redis_client.script_load(script.script)
+    logger.info("Lua-скрипты Redis загружены")
+
+
+async def check_block(blocked_key: str, now: float) -> Optional[float]:
+    """Возвращает время окончания действующей блокировки или None."""
+    blocked_until = await _check_block_script(keys=[blocked_key], args=[now])
+    return float(blocked_until) if blocked_until else None
+
+
+async def register_failed_attempt(
+    attempts_key: str,
+    blocked_key: str,
+    max_attempts: int,
+    block_seconds: int,
+    now: float,
+) -> Tuple[int, Optional[float]]:
+    """
+    Атомарно учитывает неудачную попытку.
+    Возвращает (число попыток, время окончания блокировки или None).
+    """
+    attempts, blocked_until = await _register_failure_script(
+        keys=[attempts_key, blocked_key], args=[max_attempts, block_seconds, now]
+    )
+    return int(attempts), float(blocked_until) if blocked_until else None
+
+
+async def allocate_counter(counter_key: str, ttl_seconds: int) -> int:
+    """Атомарно выдаёт следующий номер счётчика (начиная с 1)."""
+    return int(await _allocate_counter_script(keys=[counter_key], args=[ttl_seconds]))
+
+
+async def claim_queue_item(
+    queue_key: str,
+    leases_key: str,
+    slots_key: str,
+    slots: int,
+    lease_seconds: int,
+    now: float,
+) -> Tuple[Optional[str], bool]:
+    """
+    Атомарно забирает элемент очереди вместе с арендой и слотом.
+    Возвращает (элемент или None, все ли слоты заняты).
+    """
+    item = await _claim_queue_item_script(
+        keys=[queue_key, leases_key, slots_key], args=[slots, lease_seconds, now]
+    )
+    if item == 0:
+        return None, True
+    return item, False
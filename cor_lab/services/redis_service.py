@@ -1,17 +1,81 @@
+import json
+import time
+from typing import Optional
+
+from cor_lab.config.config import settings
 from cor_lab.database.redis_db import redis_client
+from cor_lab.services.principal_cache import principal_cache
+from cor_lab.services.revocation import (
+    BLACKLIST_KEY_PREFIX,
+    REVOCATION_CHANNEL,
+    USER_REVOCATION_KEY_PREFIX,
+    revocation_set,
+)
 
 from datetime import timedelta
 
 
 async def add_jti_to_blacklist(jti: str, expires_delta: timedelta):
     """
-    Добавляет JTI в черный список Redis с установленным сроком жизни.
+    Добавляет JTI в черный список Redis с установленным сроком жизни,
+    рассылает отзыв всем воркерам (канал jti_revocations)
+    и сбрасывает закэшированный Principal токена.
     """
-    await redis_client.setex(f"blacklist:{jti}", int(expires_delta.total_seconds()), 1)
+    ttl_seconds = int(expires_delta.total_seconds())
+    expires_at = time.time() + ttl_seconds
+    await redis_client.setex(f"{BLACKLIST_KEY_PREFIX}{jti}", ttl_seconds, 1)
+    revocation_set.add(jti, expires_at)
+    await redis_client.publish(
+        REVOCATION_CHANNEL, json.dumps({"jti": jti, "expires_at": expires_at})
+    )
+    await principal_cache.invalidate_jti(jti)
 
 
 async def is_jti_blacklisted(jti: str) -> bool:
     """
-    Проверяет, находится ли JTI в черном списке Redis.
+    Проверяет, находится ли JTI в черном списке.
+    Пока подписка на отзывы активна - по локальному набору, иначе запросом в Redis.
+    """
+    if revocation_set.ready:
+        return revocation_set.contains(jti)
+    return await redis_client.exists(f"{BLACKLIST_KEY_PREFIX}{jti}")
+
+
+async def revoke_user_tokens(cor_id: str) -> None:
+    """
+    Отзывает все access-токены пользователя, выпущенные до этого момента
+    (роли в токене устарели), рассылает отзыв всем воркерам
+    и сбрасывает закэшированные Principal пользователя.
+    Клиент получает 401 и обновляет токен уже с актуальными ролями.
+    Для пользователя без cor_id передаётся его id (claim oid).
+    """
+    # Отзыв хранится, пока может жить самый долгий access-токен
+    ttl_seconds = max(
+        settings.access_token_expiration, int(settings.eternal_token_expiration * 3600)
+    )
+    revoked_before = int(time.time())
+    expires_at = time.time() + ttl_seconds
+    await redis_client.setex(
+        f"{USER_REVOCATION_KEY_PREFIX}{cor_id}", ttl_seconds, revoked_before
+    )
+    revocation_set.add_user(cor_id, revoked_before, expires_at)
+    await redis_client.publish(
+        REVOCATION_CHANNEL,
+        json.dumps(
+            {"cor_id": cor_id, "revoked_before": revoked_before, "expires_at": expires_at}
+        ),
+    )
+    await principal_cache.invalidate_user(cor_id=cor_id)
+
+
+async def is_user_token_revoked(cor_id: Optional[str], issued_at: Optional[int]) -> bool:
+    """
+    Проверяет, отозваны ли токены пользователя, выпущенные в момент issued_at.
+    Пока подписка на отзывы активна - по локальному набору, иначе запросом в Redis.
     """
-    return await redis_client.exists(f"blacklist:{jti}")
+    if not cor_id or issued_at is None:
+        return False
+    if revocation_set.ready:
+        return revocation_set.is_user_revoked(cor_id, issued_at)
+    revoked_before = await redis_client.get(f"{USER_REVOCATION_KEY_PREFIX}{cor_id}")
+    return revoked_before is not None and issued_at < int(revoked_before)
@@ -0,0 +1,176 @@
+import asyncio
+import json
+import math
+import time
+from typing import Dict, Optional, Tuple
+
+from loguru import logger
+
+from cor_lab.database.redis_db import redis_client
+
+
+BLACKLIST_KEY_PREFIX = "blacklist:"
+USER_REVOCATION_KEY_PREFIX = "revoked_user:"
+REVOCATION_CHANNEL = "jti_revocations"
+REVOCATION_LISTENER_RETRY_SECONDS = 1.0
+REVOCATION_SEED_SCAN_COUNT = 1000
+REVOCATION_PRUNE_EVERY = 1024
+
+
+class RevocationSet:
+    """
+    Отозванные JTI и отзывы по пользователю в памяти процесса.
+
+    При подписке на канал jti_revocations набор засевается из ключей
+    blacklist:* и revoked_user:* в Redis, дальше пополняется сообщениями
+    add_jti_to_blacklist и revoke_user_tokens. Отзыв по пользователю (смена ролей)
+    делает недействительными его access-токены, выпущенные раньше отзыва.
+    Пока подписка не активна (ready = False), проверка идёт напрямую в Redis.
+    """
+
+    def __init__(self):
+        self._revoked: Dict[str, float] = {}
+        # cor_id -> (отозваны токены с iat меньше этого значения, срок хранения отзыва)
+        self._revoked_users: Dict[str, Tuple[int, float]] = {}
+        self._listener_task: Optional[asyncio.Task] = None
+        self.ready = False
+
+    def add(self, jti: str, expires_at: float) -> None:
+        self._revoked[jti] = max(expires_at, self._revoked.get(jti, 0.0))
+        if len(self._revoked) % REVOCATION_PRUNE_EVERY == 0:
+            self._prune()
+
+    def contains(self, jti: str) -> bool:
+        expires_at = self._revoked.get(jti)
+        if expires_at is None:
+            return False
+        if expires_at < time.time():
+            self._revoked.pop(jti, None)
+            return False
+        return True
+
+    def add_user(self, cor_id: str, revoked_before: int, expires_at: float) -> None:
+        current = self._revoked_users.get(cor_id)
+        if current is None or current[0] <= revoked_before:
+            self._revoked_users[cor_id] = (revoked_before, expires_at)
+
+    def is_user_revoked(self, cor_id: str, issued_at: int) -> bool:
+        entry = self._revoked_users.get(cor_id)
+        if entry is None:
+            return False
+        revoked_before, expires_at = entry
+        if expires_at < time.time():
+            self._revoked_users.pop(cor_id, None)
+            return False
+        return issued_at < revoked_before
+
+    def _prune(self) -> None:
+        now = time.time()
+        for jti in [jti for jti, expires_at in self._revoked.items() if expires_at < now]:
+            del self._revoked[jti]
+        for cor_id in [
+            cor_id
+            for cor_id, (_, expires_at) in self._revoked_users.items()
+            if expires_at < now
+        ]:
+            del self._revoked_users[cor_id]
+
+    async def _seed(self) -> None:
+        revoked: Dict[str, float] = {}
+        now = time.time()
+        cursor = 0
+        while True:
+            cursor, keys = await redis_client.scan(
+                cursor, match=f"{BLACKLIST_KEY_PREFIX}*", count=REVOCATION_SEED_SCAN_COUNT
+            )
+            if keys:
+                async with redis_client.pipeline(transaction=False) as pipe:
+                    for key in keys:
+                        pipe.ttl(key)
+                    ttls = await pipe.execute()
+                for key, ttl in zip(keys, ttls):
+                    # -2: ключ уже истёк, -1: ключ без срока жизни
+                    if ttl == -2:
+                        continue
+                    jti = key[len(BLACKLIST_KEY_PREFIX) :]
+                    revoked[jti] = now + ttl if ttl >= 0 else math.inf
+            if cursor == 0:
+                break
+        # Сообщения, пришедшие во время засева, уже в self._revoked - объединяем
+        for jti, expires_at in revoked.items():
+            self.add(jti, expires_at)
+
+        revoked_users = 0
+        cursor = 0
+        while True:
+            cursor, keys = await redis_client.scan(
+                cursor, match=f"{USER_REVOCATION_KEY_PREFIX}*", count=REVOCATION_SEED_SCAN_COUNT
+            )
+            if keys:
+                async with redis_client.pipeline(transaction=False) as pipe:
+                    for key in keys:
+                        pipe.get(key)
+                        pipe.ttl(key)
+                    values = await pipe.execute()
+                for key, revoked_before, ttl in zip(keys, values[::2], values[1::2]):
+                    if revoked_before is None or ttl == -2:
+                        continue
+                    cor_id = key[len(USER_REVOCATION_KEY_PREFIX) :]
+                    expires_at = now + ttl if ttl >= 0 else math.inf
+                    self.add_user(cor_id, int(revoked_before), expires_at)
+                    revoked_users += 1
+            if cursor == 0:
+                break
+        logger.info(
+            f"Загружено отозванных токенов: {len(revoked)}, отзывов по пользователю: {revoked_users}"
+        )
+
+    async def start(self) -> None:
+        if self._listener_task is None or self._listener_task.done():
+            self._listener_task = asyncio.create_task(self._listen())
+
+    async def stop(self) -> None:
+        if self._listener_task is not None:
+            self._listener_task.cancel()
+            await asyncio.gather(self._listener_task, return_exceptions=True)
+            self._listener_task = None
+        self.ready = False
+
+    async def _listen(self) -> None:
+        while True:
+            pubsub = redis_client.pubsub()
+            try:
+                # Сначала подписка, потом засев: отзыв между ними не потеряется
+                await pubsub.subscribe(REVOCATION_CHANNEL)
+                listener = asyncio.create_task(self._consume(pubsub))
+                try:
+                    await self._seed()
+                    self.ready = True
+                    await listener
+                finally:
+                    listener.cancel()
+                    await asyncio.gather(listener, return_exceptions=True)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Подписка на отзыв токенов потеряна: {e}")
+            finally:
+                self.ready = False
+                await pubsub.aclose()
+            await asyncio.sleep(REVOCATION_LISTENER_RETRY_SECONDS)
+
+    async def _consume(self, pubsub) -> None:
+        async for message in pubsub.listen():
+            if message.get("type") == "message":
+                revocation = json.loads(message["data"])
+                if "jti" in revocation:
+                    self.add(revocation["jti"], revocation["expires_at"])
+                else:
+                    self.add_user(
+                        revocation["cor_id"],
+                        revocation["revoked_before"],
+                        revocation["expires_at"],
+                    )
+
+
+revocation_set = RevocationSet()
@@ -0,0 +1,127 @@
+import json
+import re
+from enum import Enum
+from typing import NamedTuple, Optional
+
+from loguru import logger
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from cor_lab.config.config import settings
+from cor_lab.database import models as db_models
+from cor_lab.database.redis_db import redis_client
+from cor_lab.repository.patient import search_patients
+from cor_lab.services.search_token_generator import generate_ngrams
+
+
+UNIFIED_SEARCH_CACHE_KEY = "unified_search:{doctor_cor_id}:{query}"
+UNIFIED_SEARCH_CACHE_TTL_SECONDS = 60
+
+_UUID_RE = re.compile(
+    r"^[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}$", re.IGNORECASE
+)
+# Формат generate_case_code: срочность (S/U/F), год (2 цифры),
+# первая буква типа материала, порядковый номер (5 цифр)
+_CASE_CODE_RE = re.compile(r"^[SUF]\d{2}[^\W\d_]\d{5}$")
+# cor_id: номер в алфавите corid_charset, дефис, год рождения и пол
+_COR_ID_RE = re.compile(
+    rf"^[{re.escape(settings.corid_charset)}]+-\d{{4}}[A-Za-z]$"
+)
+
+
+class SearchQueryKind(str, Enum):
+    CASE_ID = "case_id"
+    CASE_CODE = "case_code"
+    COR_ID = "cor_id"
+    NAME = "name"
+
+
+class SearchTarget(NamedTuple):
+    """
+    Результат разрешения запроса. Для kind="case" patient_id - id пациента кейса,
+    для kind="patient" - cor_id пациента.
+    """
+
+    kind: str
+    patient_id: str
+    case_id: Optional[str] = None
+
+
+def classify_search_query(query: str) -> SearchQueryKind:
+    """Определяет тип запроса по его форме, без обращения к БД."""
+    query = query.strip()
+    if _UUID_RE.match(query):
+        return SearchQueryKind.CASE_ID
+    if _CASE_CODE_RE.match(query.upper()):
+        return SearchQueryKind.CASE_CODE
+    if _COR_ID_RE.match(query):
+        return SearchQueryKind.COR_ID
+    return SearchQueryKind.NAME
+
+
+async def _lookup(
+    db: AsyncSession, query: str, kind: SearchQueryKind
+) -> Optional[SearchTarget]:
+    """Выполняет только тот поиск, который соответствует типу запроса."""
+    if kind in (SearchQueryKind.CASE_ID, SearchQueryKind.CASE_CODE):
+        condition = (
+            db_models.Case.id == query
+            if kind == SearchQueryKind.CASE_ID
+            else db_models.Case.case_code == query.upper()
+        )
+        row = (
+            await db.execute(
+                select(db_models.Case.id, db_models.Case.patient_id).where(condition)
+            )
+        ).first()
+        if row is None:
+            return None
+        return SearchTarget(kind="case", patient_id=str(row.patient_id), case_id=str(row.id))
+
+    # cor_id, заданный при создании пациента, может не совпадать с форматом
+    # _COR_ID_RE, поэтому точное совпадение проверяется и для запроса-имени
+    patient_cor_id = await db.scalar(
+        select(db_models.Patient.patient_cor_id).where(
+            db_models.Patient.patient_cor_id == query
+        )
+    )
+    if patient_cor_id:
+        return SearchTarget(kind="patient", patient_id=patient_cor_id)
+    if kind == SearchQueryKind.COR_ID:
+        return None
+
+    search_ngrams = sorted(set(generate_ngrams(query, n=2) + generate_ngrams(query, n=3)))
+    if not search_ngrams:
+        return None
+    hits = await search_patients(db=db, search_ngrams=search_ngrams, limit=1)
+    return SearchTarget(kind="patient", patient_id=hits[0].patient_cor_id) if hits else None
+
+
+async def resolve_search_query(
+    db: AsyncSession, query: str, doctor_cor_id: str
+) -> Optional[SearchTarget]:
+    """
+    Разрешает запрос unified_search в кейс или пациента.
+    Успешные разрешения кэшируются в Redis на UNIFIED_SEARCH_CACHE_TTL_SECONDS
+    отдельно для каждого врача.
+    """
+    query = query.strip()
+    cache_key = UNIFIED_SEARCH_CACHE_KEY.format(doctor_cor_id=doctor_cor_id, query=query)
+    try:
+        cached_target = await redis_client.get(cache_key)
+    except Exception as e:
+        logger.warning(f"Кэш поиска недоступен: {e}")
+        cached_target = None
+    if cached_target:
+        return SearchTarget(*json.loads(cached_target))
+
+    kind = classify_search_query(query)
+    target = await _lookup(db=db, query=query, kind=kind)
+    if target is not None:
+        try:
+            await redis_client.set(
+                cache_key, json.dumps(list(target)), ex=UNIFIED_SEARCH_CACHE_TTL_SECONDS
+            )
+        except Exception as e:
+            logger.warning(f"Не удалось сохранить результат поиска в кэш: {e}")
+    return target
@@ -1,5 +1,6 @@
+import asyncio
 from datetime import datetime, timezone
-from typing import List, Dict
+from typing import List, Dict, Optional
 import uuid
 from fastapi import WebSocket, WebSocketDisconnect, status
 import json
@@ -8,6 +9,14 @@ from fastapi.websockets import WebSocketState
 
 from loguru import logger
 
+from cor_lab.config.config import settings
+from cor_lab.database.redis_db import redis_client
+
+
+WEBSOCKET_EVENTS_CHANNEL = "websocket_events"
+WEBSOCKET_REGISTRY_KEY_PREFIX = "ws_connections:"
+WEBSOCKET_LISTENER_RETRY_SECONDS = 1.0
+
 
 def get_websocket_client_ip(websocket: WebSocket) -> str:
     """
@@ -36,13 +45,178 @@ def get_websocket_client_ip(websocket: WebSocket) -> str:
 class WebSocketEventsManager:
     """
     Управляет активными WebSocket-подключениями и рассылкой событий.
+
+    active_connections - соединения этого воркера. События, отключения и сброс
+    соединений публикуются в канал Redis websocket_events: каждый воркер
+    подписан на него один раз и применяет команду к своим соединениям.
+    Реестр соединений воркера зеркалируется в хэш ws_connections:<worker_id>
+    со сроком жизни registry_ttl, который продлевается, пока воркер жив, -
+    по этим хэшам админка видит соединения всех воркеров.
+    Пока подписка не активна (subscribed = False), всё выполняется локально.
+
+    Подписчик только читает канал и кладёт команды в локальную очередь
+    (не больше command_queue_size, при переполнении команда отбрасывается);
+    применяет их отдельная задача. Рассылка идёт всем соединениям параллельно,
+    каждая отправка ограничена send_timeout: медленный клиент отключается
+    и не задерживает остальных.
     """
 
-    def __init__(self):
+    def __init__(
+        self, registry_ttl: int, send_timeout: float, command_queue_size: int
+    ):
 
         self.active_connections: Dict[str, Dict] = {}
+        self.registry_ttl = registry_ttl
+        self.send_timeout = send_timeout
+        self.worker_id = uuid.uuid4().hex
+        self.subscribed = False
+        self._commands: "asyncio.Queue[Dict]" = asyncio.Queue(
+            maxsize=command_queue_size
+        )
+        self._listener_task: Optional[asyncio.Task] = None
+        self._dispatcher_task: Optional[asyncio.Task] = None
+        self._heartbeat_task: Optional[asyncio.Task] = None
         logger.info("WebSocketEventsManager initialized.")
 
+    @property
+    def _registry_key(self) -> str:
+        return f"{WEBSOCKET_REGISTRY_KEY_PREFIX}{self.worker_id}"
+
+    async def start(self) -> None:
+        if self._listener_task is None or self._listener_task.done():
+            self._listener_task = asyncio.create_task(self._listen())
+        if self._dispatcher_task is None or self._dispatcher_task.done():
+            self._dispatcher_task = asyncio.create_task(self._dispatch())
+        if self._heartbeat_task is None or self._heartbeat_task.done():
+            self._heartbeat_task = asyncio.create_task(self._heartbeat())
+
+    async def stop(self) -> None:
+        for task in (self._listener_task, self._dispatcher_task, self._heartbeat_task):
+            if task is not None:
+                task.cancel()
+                await asyncio.gather(task, return_exceptions=True)
+        self._listener_task = None
+        self._dispatcher_task = None
+        self._heartbeat_task = None
+        self.subscribed = False
+        try:
+            await redis_client.delete(self._registry_key)
+        except Exception as e:
+            logger.warning(f"Не удалось удалить реестр WebSocket-соединений воркера: {e}")
+
+    async def _listen(self) -> None:
+        while True:
+            pubsub = redis_client.pubsub()
+            try:
+                await pubsub.subscribe(WEBSOCKET_EVENTS_CHANNEL)
+                self.subscribed = True
+                async for message in pubsub.listen():
+                    if message.get("type") == "message":
+                        self._enqueue(json.loads(message["data"]))
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Подписка на события WebSocket потеряна: {e}")
+            finally:
+                self.subscribed = False
+                await pubsub.aclose()
+            await asyncio.sleep(WEBSOCKET_LISTENER_RETRY_SECONDS)
+
+    def _enqueue(self, command: Dict) -> None:
+        try:
+            self._commands.put_nowait(command)
+        except asyncio.QueueFull:
+            logger.warning(
+                f"Очередь команд WebSocket переполнена, команда {command.get('type')} отброшена"
+            )
+
+    async def _dispatch(self) -> None:
+        while True:
+            command = await self._commands.get()
+            try:
+                await self._apply_command(command)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Ошибка применения команды WebSocket: {e}", exc_info=True)
+
+    async def _apply_command(self, command: Dict) -> None:
+        command_type = command.get("type")
+        if command_type == "event":
+            await self._broadcast_local(command["message"])
+        elif command_type == "disconnect":
+            if command["connection_id"] in self.active_connections:
+                await self._disconnect_local(command["connection_id"])
+        elif command_type == "disconnect_all":
+            await self._disconnect_all_local()
+
+    async def _publish(self, command: Dict) -> bool:
+        """Публикует команду всем воркерам. False - выполнить её нужно локально."""
+        if not self.subscribed:
+            return False
+        try:
+            await redis_client.publish(WEBSOCKET_EVENTS_CHANNEL, json.dumps(command))
+            return True
+        except Exception as e:
+            logger.warning(f"Не удалось опубликовать команду WebSocket в Redis: {e}")
+            return False
+
+    async def _heartbeat(self) -> None:
+        while True:
+            await asyncio.sleep(self.registry_ttl / 3)
+            try:
+                if self.active_connections:
+                    await self._mirror_registry()
+            except Exception as e:
+                logger.warning(f"Не удалось продлить реестр WebSocket-соединений: {e}")
+
+    async def _mirror_registry(self) -> None:
+        # Полная перезапись хэша восстанавливает реестр и после потери ключа в Redis
+        async with redis_client.pipeline(transaction=True) as pipe:
+            pipe.delete(self._registry_key)
+            pipe.hset(
+                self._registry_key,
+                mapping={
+                    conn_id: json.dumps(self._connection_info(conn_id, conn_data))
+                    for conn_id, conn_data in self.active_connections.items()
+                },
+            )
+            pipe.expire(self._registry_key, self.registry_ttl)
+            await pipe.execute()
+
+    def _connection_info(self, conn_id: str, conn_data: Dict) -> Dict:
+        client = conn_data["websocket"].client
+        return {
+            "connection_id": conn_id,
+            "client_host": conn_data["ip"],
+            "client_port": client.port if client else None,
+            "connected_at": conn_data["connected_at"],
+            "worker_id": self.worker_id,
+        }
+
+    async def _register(self, connection_id: str) -> None:
+        conn_data = self.active_connections[connection_id]
+        try:
+            async with redis_client.pipeline(transaction=False) as pipe:
+                pipe.hset(
+                    self._registry_key,
+                    connection_id,
+                    json.dumps(self._connection_info(connection_id, conn_data)),
+                )
+                pipe.expire(self._registry_key, self.registry_ttl)
+                await pipe.execute()
+        except Exception as e:
+            logger.warning(f"Не удалось записать WebSocket-соединение {connection_id} в Redis: {e}")
+
+    async def _unregister(self, connection_id: str) -> Optional[Dict]:
+        conn_data = self.active_connections.pop(connection_id, None)
+        if conn_data is not None:
+            try:
+                await redis_client.hdel(self._registry_key, connection_id)
+            except Exception as e:
+                logger.warning(f"Не удалось удалить WebSocket-соединение {connection_id} из Redis: {e}")
+        return conn_data
+
     async def connect(self, websocket: WebSocket) -> str:
         """
         Устанавливает новое WebSocket-соединение и присваивает ему уникальный ID,
@@ -58,6 +232,7 @@ class WebSocketEventsManager:
             "ip": client_ip,
             "connected_at": datetime.now(timezone.utc).isoformat(),
         }
+        await self._register(connection_id)
         logger.info(
             f"WebSocket connected from {client_ip} with ID: {connection_id}. Total active: {len(self.active_connections)}"
         )
@@ -65,9 +240,15 @@ class WebSocketEventsManager:
 
     async def disconnect(self, connection_id: str):
         """
-        Закрывает WebSocket-соединение по его ID.
+        Закрывает WebSocket-соединение по его ID на любом воркере.
         """
-        conn_data = self.active_connections.pop(connection_id, None)
+        if connection_id in self.active_connections or not await self._publish(
+            {"type": "disconnect", "connection_id": connection_id}
+        ):
+            await self._disconnect_local(connection_id)
+
+    async def _disconnect_local(self, connection_id: str):
+        conn_data = await self._unregister(connection_id)
         if conn_data:
             websocket = conn_data["websocket"]
             client_ip = conn_data["ip"]
@@ -103,8 +284,12 @@ class WebSocketEventsManager:
 
     async def disconnect_all(self):
         """
-        Отключает все активные WebSocket-соединения.
+        Отключает все активные WebSocket-соединения на всех воркерах.
         """
+        if not await self._publish({"type": "disconnect_all"}):
+            await self._disconnect_all_local()
+
+    async def _disconnect_all_local(self):
         connection_ids_to_disconnect = list(self.active_connections.keys())
         logger.info(
             f"Initiating disconnection of {len(connection_ids_to_disconnect)} active WebSocket connections."
@@ -136,7 +321,7 @@ class WebSocketEventsManager:
                         exc_info=True,
                     )
                 finally:
-                    self.active_connections.pop(connection_id, None)
+                    await self._unregister(connection_id)
             else:
                 logger.warning(
                     f"WebSocket with ID {connection_id} already removed from active_connections during disconnect_all."
@@ -178,63 +363,96 @@ class WebSocketEventsManager:
                 f"Attempted to disconnect non-existent WebSocket (internal) with ID: {connection_id}"
             )
 
-    def get_active_connection_info(self) -> List[Dict]:
+    async def get_active_connection_info(self) -> List[Dict]:
         """
-        Возвращает информацию обо всех активных соединениях.
+        Возвращает информацию обо всех активных соединениях всех воркеров.
+        Если Redis недоступен - только о соединениях этого воркера.
         """
-        info = []
-        for conn_id, conn_data in self.active_connections.items():
-            info.append(
-                {
-                    "connection_id": conn_id,
-                    "client_host": conn_data["ip"],
-                    "client_port": conn_data["websocket"].client.port,
-                    "connected_at": conn_data["connected_at"],
-                }
-            )
-        return info
+        try:
+            registry_keys = [
+                key
+                async for key in redis_client.scan_iter(
+                    match=f"{WEBSOCKET_REGISTRY_KEY_PREFIX}*"
+                )
+            ]
+            async with redis_client.pipeline(transaction=False) as pipe:
+                for key in registry_keys:
+                    pipe.hvals(key)
+                registries = await pipe.execute()
+        except Exception as e:
+            logger.warning(f"Не удалось прочитать реестр WebSocket-соединений из Redis: {e}")
+            return [
+                self._connection_info(conn_id, conn_data)
+                for conn_id, conn_data in self.active_connections.items()
+            ]
+        return [json.loads(value) for values in registries for value in values]
 
     async def broadcast_event(self, event_data: Dict):
         """
-        Рассылает событие всем активным WebSocket-подключениям.
+        Рассылает событие всем активным WebSocket-подключениям всех воркеров.
         """
         message = json.dumps(event_data)
-        connections_to_check = list(self.active_connections.keys())
-        for connection_id in connections_to_check:
-            conn_data = self.active_connections.get(connection_id)
-            if not conn_data:
-                continue
+        if not await self._publish({"type": "event", "message": message}):
+            await self._broadcast_local(message)
 
-            connection = conn_data["websocket"]
-            client_ip = conn_data["ip"]
+    async def _broadcast_local(self, message: str):
+        await asyncio.gather(
+            *(
+                self._send_to(connection_id, message)
+                for connection_id in list(self.active_connections.keys())
+            )
+        )
+        logger.info(
+            f"Broadcast complete. Total active connections after cleanup: {len(self.active_connections)}"
+        )
 
-            if connection.client_state != WebSocketState.CONNECTED:
-                logger.warning(
-                    f"Skipping disconnected/closing WebSocket ID {connection_id} from {client_ip}. State: {connection.client_state}"
-                )
-                self.active_connections.pop(connection_id, None)
-                continue
+    async def _send_to(self, connection_id: str, message: str) -> None:
+        conn_data = self.active_connections.get(connection_id)
+        if not conn_data:
+            return
+
+        connection = conn_data["websocket"]
+        client_ip = conn_data["ip"]
+
+        if connection.client_state != WebSocketState.CONNECTED:
+            logger.warning(
+                f"Skipping disconnected/closing WebSocket ID {connection_id} from {client_ip}. State: {connection.client_state}"
+            )
+            await self._unregister(connection_id)
+            return
 
+        try:
+            await asyncio.wait_for(connection.send_text(message), self.send_timeout)
+            logger.debug(f"Event sent to {client_ip}: {message}")
+        except asyncio.TimeoutError:
+            logger.warning(
+                f"WebSocket {client_ip} did not accept event within {self.send_timeout}s. Disconnecting."
+            )
+            await self._unregister(connection_id)
             try:
-                await connection.send_text(message)
-                logger.debug(f"Event sent to {client_ip}: {message}")
-            except WebSocketDisconnect:
-                logger.warning(
-                    f"WebSocket disconnected during broadcast: {client_ip}. Removing from list."
+                await asyncio.wait_for(
+                    connection.close(code=status.WS_1000_NORMAL_CLOSURE),
+                    self.send_timeout,
                 )
-                self.active_connections.pop(connection_id, None)
-            except RuntimeError as e:
-                logger.warning(
-                    f"RuntimeError sending to WebSocket {client_ip}: {e}. Removing."
-                )
-                self.active_connections.pop(connection_id, None)
             except Exception as e:
-                logger.error(f"Error sending event to {client_ip}: {e}", exc_info=True)
-                self.active_connections.pop(connection_id, None)
-
-        logger.info(
-            f"Broadcast complete. Total active connections after cleanup: {len(self.active_connections)}"
-        )
+                logger.warning(f"Error closing slow WebSocket {connection_id} ({client_ip}): {e}")
+        except WebSocketDisconnect:
+            logger.warning(
+                f"WebSocket disconnected during broadcast: {client_ip}. Removing from list."
+            )
+            await self._unregister(connection_id)
+        except RuntimeError as e:
+            logger.warning(
+                f"RuntimeError sending to WebSocket {client_ip}: {e}. Removing."
+            )
+            await self._unregister(connection_id)
+        except Exception as e:
+            logger.error(f"Error sending event to {client_ip}: {e}", exc_info=True)
+            await self._unregister(connection_id)
 
 
-websocket_events_manager = WebSocketEventsManager()
+websocket_events_manager = WebSocketEventsManager(
+    registry_ttl=settings.websocket_registry_ttl,
+    send_timeout=settings.websocket_send_timeout,
+    command_queue_size=settings.websocket_command_queue_size,
+)
@@ -0,0 +1,91 @@
+"""
+Пересчёт search_tokens и индекса patient_search_ngrams для всех пациентов.
+
+Пациенты читаются потоково (серверный курсор) и обрабатываются пачками:
+на пачку - один bulk UPDATE изменившихся search_tokens, пересборка строк
+индекса и коммит. До и после печатается покрытие индекса.
+
+    python -m cor_lab.tools.backfill_patient_search --chunk-size 1000
+"""
+
+import argparse
+import asyncio
+import time
+
+from sqlalchemy import delete, insert, select, update
+
+from cor_lab.database.db import async_session_maker
+from cor_lab.database.models import Patient, PatientSearchNgram
+from cor_lab.repository.patient import get_patient_search_coverage
+from cor_lab.services.search_token_generator import get_patient_search_tokens
+
+
+async def backfill(chunk_size: int) -> None:
+    async with async_session_maker() as db:
+        print(f"Покрытие до: {await get_patient_search_coverage(db)}")
+
+    processed = changed = 0
+    started_at = time.perf_counter()
+    async with async_session_maker() as read_db, async_session_maker() as write_db:
+        result = await read_db.stream(
+            select(
+                Patient.id,
+                Patient.first_name,
+                Patient.last_name,
+                Patient.middle_name,
+                Patient.search_tokens,
+            )
+            .order_by(Patient.id)
+            .execution_options(yield_per=chunk_size)
+        )
+        async for chunk in result.partitions(chunk_size):
+            tokens_by_patient = {
+                row.id: get_patient_search_tokens(
+                    first_name=row.first_name,
+                    last_name=row.last_name,
+                    middle_name=row.middle_name,
+                )
+                for row in chunk
+            }
+            changed_rows = [
+                {"id": row.id, "search_tokens": tokens_by_patient[row.id]}
+                for row in chunk
+                if tokens_by_patient[row.id] != (row.search_tokens or "")
+            ]
+            if changed_rows:
+                await write_db.execute(update(Patient), changed_rows)
+
+            await write_db.execute(
+                delete(PatientSearchNgram).where(
+                    PatientSearchNgram.patient_id.in_(list(tokens_by_patient))
+                )
+            )
+            index_rows = [
+                {"ngram": ngram, "patient_id": patient_id}
+                for patient_id, search_tokens in tokens_by_patient.items()
+                for ngram in {token for token in search_tokens.split(" ") if token}
+            ]
+            if index_rows:
+                await write_db.execute(insert(PatientSearchNgram), index_rows)
+            await write_db.commit()
+
+            processed += len(chunk)
+            changed += len(changed_rows)
+            print(
+                f"Обработано {processed}, обновлено токенов {changed} "
+                f"({time.perf_counter() - started_at:.1f} с)"
+            )
+
+    async with async_session_maker() as db:
+        print(f"Покрытие после: {await get_patient_search_coverage(db)}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Пересчёт поискового индекса пациентов")
+    parser.add_argument("--chunk-size", type=int, default=1000)
+    args = parser.parse_args()
+    asyncio.run(backfill(args.chunk_size))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""
+Заполнение user_sessions.refresh_token_hash для сессий, созданных до его появления.
+
+Сессии без хэша читаются потоково, refresh токен расшифровывается ключом
+пользователя, HMAC сохраняется пачкой на чанк. Сессии, токен которых
+не расшифровывается, пропускаются (они будут отклонены при обновлении токена).
+
+    python -m cor_lab.tools.backfill_refresh_token_hashes --chunk-size 500
+"""
+
+import argparse
+import asyncio
+import time
+
+from sqlalchemy import select, update
+
+from cor_lab.database.db import async_session_maker
+from cor_lab.database.models import User, UserSession
+from cor_lab.services.cipher import decrypt_data, decrypt_user_key, hash_refresh_token
+
+
+async def backfill(chunk_size: int) -> None:
+    processed = filled = failed = 0
+    started_at = time.perf_counter()
+    async with async_session_maker() as read_db, async_session_maker() as write_db:
+        result = await read_db.stream(
+            select(UserSession.id, UserSession.refresh_token, User.unique_cipher_key)
+            .join(User, User.cor_id == UserSession.user_id)
+            .where(
+                UserSession.refresh_token_hash.is_(None),
+                UserSession.refresh_token.is_not(None),
+            )
+            .order_by(UserSession.user_id)
+            .execution_options(yield_per=chunk_size)
+        )
+        async for chunk in result.partitions(chunk_size):
+            hashed_rows = []
+            for row in chunk:
+                try:
+                    refresh_token = await decrypt_data(
+                        encrypted_data=row.refresh_token,
+                        key=await decrypt_user_key(row.unique_cipher_key),
+                    )
+                except ValueError:
+                    failed += 1
+                    continue
+                hashed_rows.append(
+                    {"id": row.id, "refresh_token_hash": hash_refresh_token(refresh_token)}
+                )
+            if hashed_rows:
+                await write_db.execute(update(UserSession), hashed_rows)
+                await write_db.commit()
+
+            processed += len(chunk)
+            filled += len(hashed_rows)
+            print(
+                f"Обработано {processed}, заполнено {filled}, не расшифровано {failed} "
+                f"({time.perf_counter() - started_at:.1f} с)"
+            )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Заполнение HMAC refresh токенов сессий")
+    parser.add_argument("--chunk-size", type=int, default=500)
+    args = parser.parse_args()
+    asyncio.run(backfill(args.chunk_size))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""
+Бенчмарк задержки event loop при параллельных логинах.
+
+Имитирует N одновременных логинов (bcrypt-проверка пароля + расшифровка
+ключа пользователя) и параллельно измеряет, насколько опаздывает тикер,
+который просыпается каждые --tick-ms миллисекунд. Опоздание тикера - это
+время, на которое event loop был заблокирован для всех остальных запросов.
+
+Режимы: inline - криптография прямо в event loop (как было для bcrypt),
+executor - через крипто-пул (services/crypto_executor).
+
+    python -m cor_lab.tools.crypto_benchmark --logins 50
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+from typing import List
+
+from cor_lab.config.config import settings
+from cor_lab.services.auth import auth_service
+from cor_lab.services.cipher import (
+    _sync_decrypt_user_key_impl,
+    decrypt_user_key,
+    encrypt_user_key,
+    generate_aes_key,
+)
+from cor_lab.services.crypto_executor import crypto_executor
+
+
+async def _ticker(tick_ms: float, lags: List[float], stop: asyncio.Event) -> None:
+    interval = tick_ms / 1000
+    while not stop.is_set():
+        expected_at = time.perf_counter() + interval
+        await asyncio.sleep(interval)
+        lags.append(max(0.0, time.perf_counter() - expected_at) * 1000)
+
+
+async def _inline_login(password: str, password_hash: str, wrapped_key: str) -> None:
+    auth_service.pwd_context.verify(password, password_hash)
+    _sync_decrypt_user_key_impl(wrapped_key, settings.aes_key)
+
+
+async def _executor_login(password: str, password_hash: str, wrapped_key: str) -> None:
+    await auth_service.verify_password(password, password_hash)
+    await decrypt_user_key(wrapped_key)
+
+
+async def run_mode(mode: str, logins: int, tick_ms: float) -> None:
+    password = "benchmark-password"
+    password_hash = await auth_service.get_password_hash(password)
+    # Отдельный ключ на каждый логин, чтобы кэш ключей не скрывал PBKDF2
+    wrapped_keys = [
+        await encrypt_user_key(await generate_aes_key()) for _ in range(logins)
+    ]
+    login = _inline_login if mode == "inline" else _executor_login
+
+    lags: List[float] = []
+    stop = asyncio.Event()
+    ticker = asyncio.create_task(_ticker(tick_ms, lags, stop))
+    started_at = time.perf_counter()
+    await asyncio.gather(
+        *(login(password, password_hash, wrapped_key) for wrapped_key in wrapped_keys)
+    )
+    elapsed = time.perf_counter() - started_at
+    stop.set()
+    await ticker
+
+    lags.sort()
+    p99 = lags[int(len(lags) * 0.99) - 1] if len(lags) >= 100 else lags[-1]
+    print(
+        f"{mode:<10}{logins:>8}{elapsed:>12.2f}{logins / elapsed:>12.1f}"
+        f"{statistics.median(lags):>12.1f}{p99:>12.1f}{lags[-1]:>12.1f}"
+    )
+
+
+async def _run(args: argparse.Namespace) -> None:
+    print(
+        f"{'mode':<10}{'logins':>8}{'total, s':>12}{'logins/s':>12}"
+        f"{'lag p50':>12}{'lag p99':>12}{'lag max':>12}  (lag, мс)"
+    )
+    try:
+        for mode in ("inline", "executor"):
+            await run_mode(mode, args.logins, args.tick_ms)
+    finally:
+        crypto_executor.shutdown()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Задержка event loop при логинах")
+    parser.add_argument("--logins", type=int, default=50)
+    parser.add_argument("--tick-ms", type=float, default=5.0)
+    args = parser.parse_args()
+    asyncio.run(_run(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,217 @@
+"""
+Бенчмарк печати меток против имитатора принтера (cor_lab.tools.printer_simulator).
+
+Режим labels - пропускная способность отправки меток (меток/с) для типичных
+размеров кейса: поштучная отправка (как было до пакетной печати) против пакетной.
+
+    python -m cor_lab.tools.print_benchmark labels --printer-ip 127.0.0.1
+
+Режим case - полное время печати всех стёкол синтетического кейса заданного
+размера (семплы x кассеты x стёкла) в настроенной БД теми же шагами, что
+выполняет воркер очереди печати: сбор меток, пакетная отправка и проставление
+is_printed. Кейс создаётся во внешней транзакции, которая в конце
+откатывается: коммиты фиксируют лишь точки сохранения, реальные кейсы
+и их флаги is_printed не затрагиваются:
+
+    python -m cor_lab.tools.print_benchmark case --printer-ip 127.0.0.1 \
+        --samples 4 --cassettes 3 --glasses 2
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+import uuid
+from typing import Dict, List
+
+from cor_lab.schemas import GeneralPrinting, PrintLabel
+from cor_lab.services.glass_and_cassette_printing import (
+    PRINT_BATCH_SIZE,
+    print_labels_batch,
+)
+from cor_lab.services.printer_client import printer_client
+
+
+# Число стёкол: семплы x кассеты x стёкла
+CASE_SIZES: Dict[str, int] = {
+    "small (2x2x1)": 4,
+    "typical (4x3x2)": 24,
+    "large (10x4x3)": 120,
+    "xl (20x5x3)": 300,
+}
+
+
+def _synthetic_labels(count: int) -> List[PrintLabel]:
+    return [
+        PrintLabel(
+            model_id=1,
+            content=f"BENCH|S2510001|A|A{index % 9 + 1}|L{index % 3 + 1}|H&E|1|BENCHCORID",
+            uuid=str(uuid.uuid4()),
+        )
+        for index in range(count)
+    ]
+
+
+async def _timed_send(printer_ip: str, labels: List[PrintLabel], chunk_size: int) -> float:
+    started_at = time.perf_counter()
+    results = await print_labels_batch(
+        printer_ip=printer_ip, labels_to_print=labels, chunk_size=chunk_size
+    )
+    elapsed = time.perf_counter() - started_at
+    failed = sum(1 for result in results if not result.printed)
+    if failed:
+        print(f"    ! не напечатано меток: {failed}")
+    return elapsed
+
+
+async def bench_labels(printer_ip: str, repeat: int, chunk_size: int) -> None:
+    print(f"{'case size':<18}{'mode':<12}{'median, s':>12}{'labels/s':>12}")
+    for size_name, label_count in CASE_SIZES.items():
+        for mode, mode_chunk_size in (("per-label", 1), ("batched", chunk_size)):
+            timings = [
+                await _timed_send(printer_ip, _synthetic_labels(label_count), mode_chunk_size)
+                for _ in range(repeat)
+            ]
+            median = statistics.median(timings)
+            print(
+                f"{size_name:<18}{mode:<12}{median:>12.3f}{label_count / median:>12.1f}"
+            )
+
+
+def _sample_number(index: int) -> str:
+    """A..Z, затем AA, AB, ... - как номера банок в кейсе."""
+    number = ""
+    index += 1
+    while index:
+        index, remainder = divmod(index - 1, 26)
+        number = chr(ord("A") + remainder) + number
+    return number
+
+
+async def _create_synthetic_case(
+    db, samples: int, cassettes: int, glasses: int
+) -> str:
+    """Создаёт кейс samples x cassettes x glasses стёкол и возвращает его id."""
+    from cor_lab.database import models as db_models
+
+    case_db = db_models.Case(
+        id=str(uuid.uuid4()),
+        patient_id="BENCHCORID",
+        case_code=f"BENCH{uuid.uuid4().hex[:12].upper()}",
+        bank_count=samples,
+        cassette_count=samples * cassettes,
+        glass_count=samples * cassettes * glasses,
+    )
+    db.add(case_db)
+    for sample_index in range(samples):
+        sample_number = _sample_number(sample_index)
+        sample_db = db_models.Sample(
+            id=str(uuid.uuid4()),
+            case_id=case_db.id,
+            sample_number=sample_number,
+            cassette_count=cassettes,
+            glass_count=cassettes * glasses,
+        )
+        db.add(sample_db)
+        for cassette_index in range(1, cassettes + 1):
+            cassette_db = db_models.Cassette(
+                id=str(uuid.uuid4()),
+                sample_id=sample_db.id,
+                cassette_number=f"{sample_number}{cassette_index}",
+                glass_count=glasses,
+            )
+            db.add(cassette_db)
+            db.add_all(
+                db_models.Glass(
+                    id=str(uuid.uuid4()),
+                    cassette_id=cassette_db.id,
+                    glass_number=glass_number,
+                    staining=db_models.StainingType.HE,
+                )
+                for glass_number in range(1, glasses + 1)
+            )
+    await db.flush()
+    return case_db.id
+
+
+async def bench_case(
+    printer_ip: str, samples: int, cassettes: int, glasses: int, repeat: int
+) -> None:
+    from sqlalchemy.ext.asyncio import AsyncSession
+
+    from cor_lab.database.db import engine
+    from cor_lab.database.models import Glass
+    from cor_lab.repository.case import _apply_label_print_results
+    from cor_lab.repository.label_printing import collect_glass_labels
+
+    data = GeneralPrinting(
+        printer_ip=printer_ip, model_id=1, clinic_name="BENCH", hooper="1"
+    )
+    timings = []
+    async with engine.connect() as connection:
+        transaction = await connection.begin()
+        try:
+            # commit() фиксирует только точку сохранения; всё созданное
+            # откатывается вместе с transaction
+            async with AsyncSession(
+                bind=connection,
+                expire_on_commit=False,
+                join_transaction_mode="create_savepoint",
+            ) as db:
+                case_id = await _create_synthetic_case(db, samples, cassettes, glasses)
+                for _ in range(repeat):
+                    started_at = time.perf_counter()
+                    labels_to_print = await collect_glass_labels(
+                        db=db, data=data, case_id=case_id
+                    )
+                    print_results = await print_labels_batch(
+                        printer_ip=printer_ip, labels_to_print=labels_to_print
+                    )
+                    await _apply_label_print_results(
+                        db=db,
+                        model=Glass,
+                        print_results=print_results,
+                        printing=True,
+                        case_id=case_id,
+                    )
+                    await db.commit()
+                    timings.append(time.perf_counter() - started_at)
+        finally:
+            await transaction.rollback()
+    labels = len(print_results)
+    median = statistics.median(timings)
+    print(
+        f"печать стёкол кейса ({samples}x{cassettes}x{glasses}): {labels} стёкол, "
+        f"медиана {median:.3f} с, {labels / median if median else 0:.1f} меток/с"
+    )
+
+
+async def _run(args: argparse.Namespace) -> None:
+    try:
+        if args.mode == "labels":
+            await bench_labels(args.printer_ip, args.repeat, args.chunk_size)
+        else:
+            await bench_case(
+                args.printer_ip, args.samples, args.cassettes, args.glasses, args.repeat
+            )
+    finally:
+        await printer_client.close()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Бенчмарк печати меток")
+    parser.add_argument("mode", choices=["labels", "case"])
+    parser.add_argument("--printer-ip", default="127.0.0.1")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--chunk-size", type=int, default=PRINT_BATCH_SIZE)
+    parser.add_argument("--samples", type=int, default=4)
+    parser.add_argument("--cassettes", type=int, default=3)
+    parser.add_argument("--glasses", type=int, default=2)
+    args = parser.parse_args()
+    if min(args.samples, args.cassettes, args.glasses, args.repeat) < 1:
+        parser.error("--samples, --cassettes, --glasses и --repeat должны быть >= 1")
+    asyncio.run(_run(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+"""
+Локальный имитатор принтера меток для нагрузочных проверок печати.
+
+Реализует тот же API, что и принтер: POST /task/new принимает {"labels": [...]},
+GET /task отвечает 200, пока принтер "доступен". Задержка и доля ошибок
+настраиваются параметрами запуска.
+
+Запуск (принтер ожидается на порту 8080, см. services/printer_client.PRINTER_PORT):
+
+    python -m cor_lab.tools.printer_simulator --host 127.0.0.1 --latency-ms 80 --failure-rate 0.05
+
+Для имитации нескольких принтеров можно запустить несколько экземпляров
+на разных loopback-адресах (127.0.0.2, 127.0.0.3, ...).
+"""
+
+import argparse
+import asyncio
+import random
+from dataclasses import dataclass, field
+from typing import Any, Dict, List
+
+import uvicorn
+from fastapi import FastAPI
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+
+
+class SimulatedLabel(BaseModel):
+    model_id: int
+    content: str
+    uuid: str
+
+
+class SimulatedTask(BaseModel):
+    labels: List[SimulatedLabel]
+
+
+@dataclass
+class SimulatorConfig:
+    latency_ms: float = 50.0
+    per_label_ms: float = 5.0
+    jitter_ms: float = 10.0
+    failure_rate: float = 0.0
+
+
+@dataclass
+class SimulatorStats:
+    tasks: int = 0
+    failed_tasks: int = 0
+    labels_printed: int = 0
+    printed_uuids: Dict[str, int] = field(default_factory=dict)
+
+
+def create_simulator_app(config: SimulatorConfig) -> FastAPI:
+    app = FastAPI(title="Printer simulator")
+    stats = SimulatorStats()
+
+    @app.post("/task/new")
+    async def new_task(task: SimulatedTask):
+        delay_ms = (
+            config.latency_ms
+            + config.per_label_ms * len(task.labels)
+            + random.uniform(0, config.jitter_ms)
+        )
+        await asyncio.sleep(delay_ms / 1000)
+        stats.tasks += 1
+        if random.random() < config.failure_rate:
+            stats.failed_tasks += 1
+            return JSONResponse(status_code=500, content={"error": "Simulated failure"})
+
+        for label in task.labels:
+            stats.printed_uuids[label.uuid] = stats.printed_uuids.get(label.uuid, 0) + 1
+        stats.labels_printed += len(task.labels)
+        return {"status": "ok", "printed": len(task.labels)}
+
+    @app.get("/task")
+    async def task_status() -> Dict[str, Any]:
+        duplicates = sum(1 for count in stats.printed_uuids.values() if count > 1)
+        return {
+            "tasks": stats.tasks,
+            "failed_tasks": stats.failed_tasks,
+            "labels_printed": stats.labels_printed,
+            "duplicate_labels": duplicates,
+        }
+
+    @app.post("/task/reset")
+    async def reset_stats():
+        stats.tasks = stats.failed_tasks = stats.labels_printed = 0
+        stats.printed_uuids.clear()
+        return {"status": "ok"}
+
+    return app
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Имитатор принтера меток")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--latency-ms", type=float, default=50.0)
+    parser.add_argument("--per-label-ms", type=float, default=5.0)
+    parser.add_argument("--jitter-ms", type=float, default=10.0)
+    parser.add_argument("--failure-rate", type=float, default=0.0)
+    args = parser.parse_args()
+
+    config = SimulatorConfig(
+        latency_ms=args.latency_ms,
+        per_label_ms=args.per_label_ms,
+        jitter_ms=args.jitter_ms,
+        failure_rate=args.failure_rate,
+    )
+    uvicorn.run(create_simulator_app(config), host=args.host, port=args.port)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,3 @@
-import time
 import uvicorn
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import text
@@ -13,10 +12,8 @@ from prometheus_fastapi_instrumentator import PrometheusFastApiInstrumentator
 from starlette.middleware.trustedhost import TrustedHostMiddleware
 
 
-from fastapi_limiter import FastAPILimiter
 
 from cor_lab.database.db import get_db
-from cor_lab.database.redis_db import redis_client
 
 from cor_lab.routes import (
     auth,
@@ -33,16 +30,26 @@ from cor_lab.routes import (
     dicom_router,
     printing_device,
     printer,
+    print_jobs,
     websocket_events,
     svs_router,
     lab_assistants,
 )
 from cor_lab.config.config import settings
 from loguru import logger
-from cor_lab.services.auth import auth_service
+from cor_lab.services.activity_tracker import activity_tracker
+from cor_lab.services.auth_context import AuthContextMiddleware
+from cor_lab.services.crypto_executor import crypto_executor
+from cor_lab.services.principal_cache import principal_cache
+from cor_lab.services.rate_limiter import rate_limit_store
+from cor_lab.services.revocation import revocation_set
+from cor_lab.services.print_queue import print_queue_worker
+from cor_lab.services.printer_client import printer_client
+from cor_lab.services.printer_health import printer_health_monitor
+from cor_lab.services.websocket_events_manager import websocket_events_manager
+from cor_lab.services.redis_scripts import load_scripts
 from fastapi.responses import JSONResponse
 from collections import defaultdict
-from jose import JWTError, jwt
 
 from cor_lab.services.logger import setup_logging
 
@@ -196,36 +203,8 @@ async def healthchecker(db: AsyncSession = Depends(get_db)):
 app.add_middleware(TrustedHostMiddleware, allowed_hosts=settings.allowed_hosts)
 
 
-# Middleware для добавления заголовка времени обработки
-@app.middleware("http")
-async def add_process_time_header(request: Request, call_next):
-    start_time = time.time()
-    response = await call_next(request)
-    process_time = time.time() - start_time
-    response.headers["My-Process-Time"] = str(process_time)
-    return response
-
-
-# Middleware для фиксирования активных пользователей
-@app.middleware("http")
-async def track_active_users(request: Request, call_next):
-    user_token = request.headers.get("Authorization")
-    if user_token:
-        token_parts = user_token.split(" ")
-        if len(token_parts) >= 2:
-            try:
-                decoded_token = jwt.decode(
-                    token_parts[1],
-                    options={"verify_signature": False},
-                    key=auth_service.SECRET_KEY,
-                    algorithms=[auth_service.ALGORITHM],
-                )
-                oid = decoded_token.get("oid")
-                await redis_client.set(oid, time.time())
-            except JWTError:
-                pass
-    response = await call_next(request)
-    return response
+# Проверка токена, отметка активности и заголовок времени обработки
+app.add_middleware(AuthContextMiddleware)
 
 
 async def custom_identifier(request: Request) -> str:
@@ -236,13 +215,30 @@ async def custom_identifier(request: Request) -> str:
 @app.on_event("startup")
 async def startup():
     logger.info("------------- STARTUP --------------")
-    await FastAPILimiter.init(redis_client, identifier=custom_identifier)
+    await rate_limit_store.start(identifier=custom_identifier)
+    await load_scripts()
+    await revocation_set.start()
+    await principal_cache.start()
+    await activity_tracker.start()
+    await websocket_events_manager.start()
+    await printer_client.start()
+    await print_queue_worker.start()
+    await printer_health_monitor.start()
 
 
 
 @app.on_event("shutdown")
 async def shutdown_event():
     logger.info("------------- SHUTDOWN --------------")
+    await printer_health_monitor.stop()
+    await print_queue_worker.stop()
+    await printer_client.close()
+    await websocket_events_manager.stop()
+    await principal_cache.stop()
+    await revocation_set.stop()
+    await activity_tracker.stop()
+    await rate_limit_store.stop()
+    crypto_executor.shutdown()
 
 
 
@@ -264,6 +260,7 @@ app.include_router(dicom_router.router, prefix="/api")
 app.include_router(svs_router.router, prefix="/api")
 app.include_router(printing_device.router, prefix="/api")
 app.include_router(printer.router, prefix="/api")
+app.include_router(print_jobs.router, prefix="/api")
 app.include_router(websocket_events.router, prefix="/api")
 app.include_router(lab_assistants.router, prefix="/api")
 
@@ -0,0 +1,142 @@
+"""
+Минимальный Redis в памяти для тестов сервисов: строки, списки и ZSET
+с тем же видом значений, что у redis_client (decode_responses=True).
+Поддерживает только команды, которые используют тестируемые сервисы.
+"""
+
+import math
+from typing import Any, Dict, List
+
+
+def _score(value) -> float:
+    if value in ("-inf", "+inf", "inf"):
+        return -math.inf if value == "-inf" else math.inf
+    return float(value)
+
+
+class FakeRedis:
+    def __init__(self):
+        self.strings: Dict[str, str] = {}
+        self.lists: Dict[str, List[str]] = {}
+        self.zsets: Dict[str, Dict[str, float]] = {}
+        self.ttls: Dict[str, int] = {}
+
+    # --- строки ---
+
+    async def get(self, key: str):
+        return self.strings.get(key)
+
+    async def set(self, key: str, value, ex=None, nx=False):
+        if nx and key in self.strings:
+            return None
+        self.strings[key] = str(value)
+        if ex is not None:
+            self.ttls[key] = int(ex)
+        return True
+
+    async def setex(self, key: str, seconds: int, value):
+        return await self.set(key, value, ex=seconds)
+
+    async def incrby(self, key: str, amount: int) -> int:
+        value = int(self.strings.get(key, 0)) + int(amount)
+        self.strings[key] = str(value)
+        return value
+
+    async def expire(self, key: str, seconds: int) -> bool:
+        self.ttls[key] = int(seconds)
+        return True
+
+    async def delete(self, *keys: str) -> int:
+        deleted = 0
+        for key in keys:
+            for store in (self.strings, self.lists, self.zsets):
+                if store.pop(key, None) is not None:
+                    deleted += 1
+        return deleted
+
+    # --- списки ---
+
+    async def lpush(self, key: str, *values) -> int:
+        items = self.lists.setdefault(key, [])
+        for value in values:
+            items.insert(0, str(value))
+        return len(items)
+
+    async def rpush(self, key: str, *values) -> int:
+        items = self.lists.setdefault(key, [])
+        items.extend(str(value) for value in values)
+        return len(items)
+
+    async def rpop(self, key: str):
+        items = self.lists.get(key)
+        return items.pop() if items else None
+
+    # --- ZSET ---
+
+    async def zadd(self, key: str, mapping: Dict[str, float], xx=False) -> int:
+        zset = self.zsets.setdefault(key, {})
+        added = 0
+        for member, score in mapping.items():
+            if xx and member not in zset:
+                continue
+            added += member not in zset
+            zset[member] = float(score)
+        return added
+
+    async def zrem(self, key: str, *members: str) -> int:
+        zset = self.zsets.get(key, {})
+        return sum(zset.pop(member, None) is not None for member in members)
+
+    async def zcard(self, key: str) -> int:
+        return len(self.zsets.get(key, {}))
+
+    async def zrangebyscore(self, key: str, min_score, max_score) -> List[str]:
+        low, high = _score(min_score), _score(max_score)
+        zset = self.zsets.get(key, {})
+        return [
+            member
+            for member, score in sorted(zset.items(), key=lambda item: item[1])
+            if low <= score <= high
+        ]
+
+    async def zremrangebyscore(self, key: str, min_score, max_score) -> int:
+        members = await self.zrangebyscore(key, min_score, max_score)
+        return await self.zrem(key, *members)
+
+    def pipeline(self, transaction: bool = True) -> "FakePipeline":
+        return FakePipeline(self)
+
+
+class FakePipeline:
+    """Накапливает команды и выполняет их по порядку в execute()."""
+
+    def __init__(self, redis: FakeRedis):
+        self._redis = redis
+        self._commands: List[Any] = []
+
+    async def __aenter__(self) -> "FakePipeline":
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        self._commands.clear()
+
+    def __getattr__(self, name: str):
+        command = getattr(self._redis, name)
+
+        def queue(*args, **kwargs):
+            self._commands.append((command, args, kwargs))
+            return self
+
+        return queue
+
+    async def execute(self) -> List[Any]:
+        commands, self._commands = self._commands, []
+        return [await command(*args, **kwargs) for command, args, kwargs in commands]
+
+
+class FailingPipeline(FakePipeline):
+    """Pipeline, у которого execute() падает, как при недоступном Redis."""
+
+    async def execute(self) -> List[Any]:
+        self._commands.clear()
+        raise ConnectionError("Redis недоступен")
@@ -0,0 +1,39 @@
+import base64
+import unittest
+from datetime import datetime
+
+from fastapi import HTTPException
+
+from cor_lab.repository.case_worklist import (
+    decode_worklist_cursor,
+    encode_worklist_cursor,
+)
+
+
+class WorklistCursorTest(unittest.TestCase):
+    def test_round_trip(self):
+        creation_date = datetime(2025, 3, 14, 9, 26, 53, 589793)
+
+        cursor = encode_worklist_cursor(2, creation_date, "case-1")
+
+        self.assertEqual(decode_worklist_cursor(cursor), (2, creation_date, "case-1"))
+
+    def test_cursor_is_url_safe(self):
+        cursor = encode_worklist_cursor(1, datetime(2025, 1, 1), "a" * 36)
+
+        self.assertRegex(cursor, r"^[A-Za-z0-9_=-]+$")
+
+    def test_corrupted_cursor_is_rejected_with_400(self):
+        for cursor in (
+            "not base64!",
+            base64.urlsafe_b64encode(b"{}").decode(),
+            base64.urlsafe_b64encode(b'[1, "yesterday", "case-1"]').decode(),
+        ):
+            with self.subTest(cursor=cursor):
+                with self.assertRaises(HTTPException) as raised:
+                    decode_worklist_cursor(cursor)
+                self.assertEqual(raised.exception.status_code, 400)
+
+
+if __name__ == "__main__":
+    unittest.main()
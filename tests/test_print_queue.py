@@ -0,0 +1,232 @@
+"""
+Тесты очереди печати на настоящем Redis: захват заданий идёт через тот же
+Lua-скрипт, что и в работе. Адрес берётся из TEST_REDIS_URL (по умолчанию
+отдельная база 15 локального Redis), база очищается перед каждым тестом.
+Без доступного Redis тесты пропускаются.
+"""
+
+import asyncio
+import json
+import os
+import time
+import unittest
+from unittest.mock import patch
+
+from redis.asyncio import Redis
+
+from cor_lab.services import print_queue, redis_scripts
+from cor_lab.services.print_queue import (
+    PRINT_JOB_KEY,
+    PRINT_LABEL_KEY,
+    PRINT_QUEUE_KEY,
+    PRINT_QUEUE_LEASES_KEY,
+    PRINT_QUEUE_SLOTS_KEY,
+    PrintQueueWorker,
+)
+from cor_lab.services.redis_scripts import claim_queue_item
+
+
+TEST_REDIS_URL = os.environ.get("TEST_REDIS_URL", "redis://localhost:6379/15")
+PRINTER_IP = "10.0.0.7"
+QUEUE_KEY = PRINT_QUEUE_KEY.format(printer_ip=PRINTER_IP)
+SLOTS_KEY = PRINT_QUEUE_SLOTS_KEY.format(printer_ip=PRINTER_IP)
+
+
+class PrintQueueTest(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.redis = Redis.from_url(TEST_REDIS_URL, decode_responses=True)
+        self.addAsyncCleanup(self.redis.aclose)
+        try:
+            await self.redis.ping()
+        except Exception as e:
+            raise unittest.SkipTest(f"Redis недоступен ({TEST_REDIS_URL}): {e}")
+        await self.redis.flushdb()
+
+        for target, name, value in (
+            (print_queue, "redis_client", self.redis),
+            (
+                redis_scripts,
+                "_claim_queue_item_script",
+                self.redis.register_script(redis_scripts._CLAIM_QUEUE_ITEM_LUA),
+            ),
+        ):
+            patcher = patch.object(target, name, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.worker = PrintQueueWorker(concurrency=2, max_attempts=1, backoff_seconds=0)
+
+    async def _put_job(self, job_id: str, status: str = "queued") -> None:
+        await self.redis.set(
+            PRINT_JOB_KEY.format(job_id=job_id),
+            json.dumps({"job_id": job_id, "status": status, "printer_ip": PRINTER_IP}),
+        )
+
+    async def _job(self, job_id: str) -> dict:
+        return json.loads(await self.redis.get(PRINT_JOB_KEY.format(job_id=job_id)))
+
+    async def _members(self, key: str) -> set:
+        return set(await self.redis.zrange(key, 0, -1))
+
+    async def test_claim_takes_item_with_lease_and_slot(self):
+        await self.redis.lpush(QUEUE_KEY, "job-1")
+
+        item, busy = await claim_queue_item(
+            QUEUE_KEY, PRINT_QUEUE_LEASES_KEY, SLOTS_KEY, 1, 300, 1000
+        )
+
+        self.assertEqual((item, busy), ("job-1", False))
+        self.assertEqual(await self.redis.zscore(PRINT_QUEUE_LEASES_KEY, "job-1"), 1300)
+        self.assertEqual(await self.redis.zscore(SLOTS_KEY, "job-1"), 1300)
+
+    async def test_claim_reports_busy_slots_and_frees_expired_ones(self):
+        await self.redis.lpush(QUEUE_KEY, "job-2")
+        await self.redis.zadd(SLOTS_KEY, {"job-1": 1500})
+
+        self.assertEqual(
+            await claim_queue_item(QUEUE_KEY, PRINT_QUEUE_LEASES_KEY, SLOTS_KEY, 1, 300, 1000),
+            (None, True),
+        )
+        self.assertEqual(
+            await claim_queue_item(QUEUE_KEY, PRINT_QUEUE_LEASES_KEY, SLOTS_KEY, 1, 300, 2000),
+            ("job-2", False),
+        )
+        self.assertEqual(await self._members(SLOTS_KEY), {"job-2"})
+
+    async def test_claim_on_empty_queue(self):
+        self.assertEqual(
+            await claim_queue_item(QUEUE_KEY, PRINT_QUEUE_LEASES_KEY, SLOTS_KEY, 1, 300, 1000),
+            (None, False),
+        )
+
+    async def test_drain_claims_no_more_than_concurrency_jobs(self):
+        for job_id in ("job-1", "job-2", "job-3"):
+            await self.redis.lpush(QUEUE_KEY, job_id)
+        started = []
+        release = asyncio.Event()
+
+        async def run_job(job_id):
+            started.append(job_id)
+            await release.wait()
+
+        with patch.object(self.worker, "_run_job", side_effect=run_job):
+            drain = asyncio.create_task(self.worker._drain_printer(PRINTER_IP))
+            for _ in range(100):
+                if len(started) == 2:
+                    break
+                await asyncio.sleep(0.01)
+            await asyncio.sleep(0.05)
+
+            self.assertEqual(started, ["job-1", "job-2"])
+            self.assertEqual(await self._members(PRINT_QUEUE_LEASES_KEY), {"job-1", "job-2"})
+            self.assertEqual(await self.redis.lrange(QUEUE_KEY, 0, -1), ["job-3"])
+
+            # Слот освобождается только через _release; без него третье задание ждёт
+            await self.redis.zrem(SLOTS_KEY, "job-1")
+            release.set()
+            await asyncio.wait_for(drain, timeout=1)
+
+        self.assertEqual(started, ["job-1", "job-2", "job-3"])
+
+    async def test_expired_lease_is_requeued_and_slot_released(self):
+        await self._put_job("job-1", status="processing")
+        await self.redis.zadd(PRINT_QUEUE_LEASES_KEY, {"job-1": 1.0})
+        await self.redis.zadd(SLOTS_KEY, {"job-1": 1.0})
+
+        await self.worker._requeue_expired_jobs()
+
+        self.assertEqual(await self.redis.lrange(QUEUE_KEY, 0, -1), ["job-1"])
+        self.assertEqual(await self._members(PRINT_QUEUE_LEASES_KEY), set())
+        self.assertEqual(await self._members(SLOTS_KEY), set())
+        job = await self._job("job-1")
+        self.assertEqual(job["status"], "queued")
+        self.assertIsNone(job["lease_until"])
+
+    async def test_live_lease_is_not_requeued(self):
+        await self._put_job("job-1", status="processing")
+        await self.redis.zadd(PRINT_QUEUE_LEASES_KEY, {"job-1": 2**40})
+
+        await self.worker._requeue_expired_jobs()
+
+        self.assertEqual(await self.redis.llen(QUEUE_KEY), 0)
+        self.assertEqual(await self._members(PRINT_QUEUE_LEASES_KEY), {"job-1"})
+
+    async def test_finished_job_with_expired_lease_is_not_requeued(self):
+        await self._put_job("job-1", status="completed")
+        await self.redis.zadd(PRINT_QUEUE_LEASES_KEY, {"job-1": 1.0})
+
+        await self.worker._requeue_expired_jobs()
+
+        self.assertEqual(await self.redis.llen(QUEUE_KEY), 0)
+        self.assertEqual(await self._members(PRINT_QUEUE_LEASES_KEY), set())
+
+    async def test_expired_lease_is_requeued_once_by_concurrent_workers(self):
+        await self._put_job("job-1", status="processing")
+        await self.redis.zadd(PRINT_QUEUE_LEASES_KEY, {"job-1": 1.0})
+        other_worker = PrintQueueWorker(concurrency=2, max_attempts=1, backoff_seconds=0)
+        # Второй воркер прочитал истёкшие аренды до того, как первый их разобрал
+        stale_expired = await self.redis.zrangebyscore(PRINT_QUEUE_LEASES_KEY, "-inf", 2.0)
+
+        await self.worker._requeue_expired_jobs()
+        with patch.object(self.redis, "zrangebyscore", return_value=stale_expired):
+            await other_worker._requeue_expired_jobs()
+
+        self.assertEqual(await self.redis.lrange(QUEUE_KEY, 0, -1), ["job-1"])
+
+    async def test_renew_lease_does_not_restore_requeued_lease(self):
+        await self._put_job("job-1", status="processing")
+        job = await self._job("job-1")
+
+        await self.worker._renew_lease(job)
+
+        self.assertEqual(await self._members(PRINT_QUEUE_LEASES_KEY), set())
+        self.assertEqual(await self._members(SLOTS_KEY), set())
+
+    async def _claim_failing_job(self, worker: PrintQueueWorker) -> None:
+        await self.redis.set(
+            PRINT_JOB_KEY.format(job_id="job-1"),
+            json.dumps(
+                {
+                    "job_id": "job-1",
+                    "status": "queued",
+                    "printer_ip": PRINTER_IP,
+                    "dry_run": True,
+                    "attempts": 0,
+                    "lease_until": None,
+                    "labels": [{"model_id": 1, "content": "BENCH", "uuid": "label-1"}],
+                    "results": [],
+                }
+            ),
+        )
+        await self.redis.set(PRINT_LABEL_KEY.format(label_uuid="label-1"), "job-1")
+        await self.redis.lpush(QUEUE_KEY, "job-1")
+        await claim_queue_item(
+            QUEUE_KEY, PRINT_QUEUE_LEASES_KEY, SLOTS_KEY, worker.concurrency, 300, time.time()
+        )
+        with patch.object(
+            print_queue, "print_labels_batch", side_effect=ConnectionError("принтер недоступен")
+        ):
+            await worker._run_job("job-1")
+
+    async def test_failed_job_is_requeued_without_waiting_for_lease(self):
+        worker = PrintQueueWorker(concurrency=2, max_attempts=3, backoff_seconds=0)
+
+        await self._claim_failing_job(worker)
+
+        self.assertEqual(await self.redis.lrange(QUEUE_KEY, 0, -1), ["job-1"])
+        self.assertEqual(await self._members(PRINT_QUEUE_LEASES_KEY), set())
+        self.assertEqual(await self._members(SLOTS_KEY), set())
+        job = await self._job("job-1")
+        self.assertEqual((job["status"], job["attempts"]), ("queued", 1))
+
+    async def test_failed_job_without_attempts_left_is_marked_failed(self):
+        await self._claim_failing_job(self.worker)
+
+        self.assertEqual(await self.redis.llen(QUEUE_KEY), 0)
+        self.assertEqual(await self._members(PRINT_QUEUE_LEASES_KEY), set())
+        self.assertEqual(await self._members(SLOTS_KEY), set())
+        self.assertEqual((await self._job("job-1"))["status"], "failed")
+        self.assertIsNone(await self.redis.get(PRINT_LABEL_KEY.format(label_uuid="label-1")))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,127 @@
+import unittest
+from unittest.mock import patch
+
+from cor_lab.services import rate_limiter
+from cor_lab.services.rate_limiter import RATE_LIMIT_KEY_PREFIX, RateLimitStore
+from tests.fake_redis import FailingPipeline, FakeRedis
+
+
+class _Clock:
+    """Подменяет модуль time в rate_limiter, не трогая часы event loop."""
+
+    def __init__(self, now: float = 1_700_000_000.0):
+        self.now = now
+
+    def monotonic(self) -> float:
+        return self.now
+
+    def time(self) -> float:
+        return self.now
+
+    def advance(self, seconds: float) -> None:
+        self.now += seconds
+
+
+class RateLimitStoreTest(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.clock = _Clock()
+        self.redis = FakeRedis()
+        for name, value in (("time", self.clock), ("redis_client", self.redis)):
+            patcher = patch.object(rate_limiter, name, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.store = RateLimitStore(sync_interval=1.0, sync_batch=100, max_entries=10)
+
+    def _window_key(self, key: str, seconds: int) -> str:
+        return f"{RATE_LIMIT_KEY_PREFIX}{key}:{int(self.clock.now // seconds)}"
+
+    def test_acquire_allows_up_to_times_then_rejects(self):
+        for _ in range(3):
+            self.assertEqual(self.store.acquire("login:1.2.3.4", 3, 60), 0.0)
+
+        retry_after = self.store.acquire("login:1.2.3.4", 3, 60)
+        self.assertAlmostEqual(retry_after, 20.0)
+
+    def test_acquire_refills_over_time(self):
+        for _ in range(3):
+            self.store.acquire("login:1.2.3.4", 3, 60)
+        self.clock.advance(20)
+
+        self.assertEqual(self.store.acquire("login:1.2.3.4", 3, 60), 0.0)
+        self.assertGreater(self.store.acquire("login:1.2.3.4", 3, 60), 0.0)
+
+    def test_keys_are_limited_independently(self):
+        self.store.acquire("login:a", 1, 60)
+
+        self.assertGreater(self.store.acquire("login:a", 1, 60), 0.0)
+        self.assertEqual(self.store.acquire("login:b", 1, 60), 0.0)
+
+    def test_evicts_oldest_bucket_without_pending_hits_first(self):
+        store = RateLimitStore(sync_interval=1.0, sync_batch=100, max_entries=2)
+        store.acquire("a", 5, 60)
+        store.acquire("b", 5, 60)
+        store._buckets["b"].pending = 0
+
+        store.acquire("c", 5, 60)
+
+        self.assertEqual(list(store._buckets), ["a", "c"])
+
+    async def test_sync_pushes_pending_hits_to_redis(self):
+        self.store.acquire("login:a", 5, 60)
+        self.store.acquire("login:a", 5, 60)
+
+        await self.store.sync()
+
+        self.assertEqual(self.redis.strings[self._window_key("login:a", 60)], "2")
+        self.assertEqual(self.store._buckets["login:a"].pending, 0)
+
+    async def test_sync_subtracts_remote_hits_from_bucket(self):
+        self.store.acquire("login:a", 5, 60)
+        # Три запроса того же окна пропустили другие воркеры
+        await self.redis.incrby(self._window_key("login:a", 60), 3)
+
+        await self.store.sync()
+
+        bucket = self.store._buckets["login:a"]
+        self.assertEqual(bucket.remote_hits, 3)
+        self.assertAlmostEqual(bucket.tokens, 1.0)
+        self.assertEqual(self.store.acquire("login:a", 5, 60), 0.0)
+        self.assertGreater(self.store.acquire("login:a", 5, 60), 0.0)
+
+    async def test_sync_counts_remote_hits_once(self):
+        self.store.acquire("login:a", 5, 60)
+        await self.redis.incrby(self._window_key("login:a", 60), 2)
+        await self.store.sync()
+        self.store.acquire("login:a", 5, 60)
+
+        await self.store.sync()
+
+        bucket = self.store._buckets["login:a"]
+        self.assertEqual(bucket.own_hits, 2)
+        self.assertEqual(bucket.remote_hits, 2)
+        self.assertAlmostEqual(bucket.tokens, 1.0)
+
+    async def test_sync_keeps_pending_hits_when_redis_fails(self):
+        self.store.acquire("login:a", 5, 60)
+        self.store.acquire("login:a", 5, 60)
+
+        with patch.object(
+            self.redis, "pipeline", side_effect=lambda transaction=True: FailingPipeline(self.redis)
+        ):
+            await self.store.sync()
+
+        self.assertEqual(self.store._buckets["login:a"].pending, 2)
+        self.assertEqual(self.redis.strings, {})
+
+    async def test_sync_drops_idle_buckets(self):
+        self.store.acquire("login:a", 5, 60)
+        await self.store.sync()
+        self.clock.advance(60)
+
+        await self.store.sync()
+
+        self.assertNotIn("login:a", self.store._buckets)
+
+
+if __name__ == "__main__":
+    unittest.main()
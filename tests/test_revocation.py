@@ -0,0 +1,76 @@
+import json
+import time
+import unittest
+
+from cor_lab.services.revocation import RevocationSet
+
+
+class _FakePubSub:
+    def __init__(self, messages):
+        self._messages = messages
+
+    async def listen(self):
+        for message in self._messages:
+            yield message
+
+
+class RevocationSetTest(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.revocations = RevocationSet()
+
+    def test_contains_revoked_jti_until_it_expires(self):
+        self.revocations.add("live", time.time() + 60)
+        self.revocations.add("expired", time.time() - 1)
+
+        self.assertTrue(self.revocations.contains("live"))
+        self.assertFalse(self.revocations.contains("expired"))
+        self.assertFalse(self.revocations.contains("unknown"))
+
+    def test_add_keeps_latest_expiry(self):
+        self.revocations.add("jti", time.time() + 60)
+        self.revocations.add("jti", time.time() - 1)
+
+        self.assertTrue(self.revocations.contains("jti"))
+
+    def test_user_revocation_applies_to_tokens_issued_before_it(self):
+        self.revocations.add_user("cor-1", revoked_before=1000, expires_at=time.time() + 60)
+
+        self.assertTrue(self.revocations.is_user_revoked("cor-1", issued_at=999))
+        self.assertFalse(self.revocations.is_user_revoked("cor-1", issued_at=1000))
+        self.assertFalse(self.revocations.is_user_revoked("cor-2", issued_at=999))
+
+    def test_older_user_revocation_does_not_override_newer(self):
+        self.revocations.add_user("cor-1", revoked_before=2000, expires_at=time.time() + 60)
+        self.revocations.add_user("cor-1", revoked_before=1000, expires_at=time.time() + 60)
+
+        self.assertTrue(self.revocations.is_user_revoked("cor-1", issued_at=1500))
+
+    def test_expired_user_revocation_is_dropped(self):
+        self.revocations.add_user("cor-1", revoked_before=1000, expires_at=time.time() - 1)
+
+        self.assertFalse(self.revocations.is_user_revoked("cor-1", issued_at=999))
+        self.assertNotIn("cor-1", self.revocations._revoked_users)
+
+    async def test_consume_applies_jti_and_user_messages(self):
+        expires_at = time.time() + 60
+        pubsub = _FakePubSub(
+            [
+                {"type": "subscribe", "data": 1},
+                {"type": "message", "data": json.dumps({"jti": "jti-1", "expires_at": expires_at})},
+                {
+                    "type": "message",
+                    "data": json.dumps(
+                        {"cor_id": "cor-1", "revoked_before": 1000, "expires_at": expires_at}
+                    ),
+                },
+            ]
+        )
+
+        await self.revocations._consume(pubsub)
+
+        self.assertTrue(self.revocations.contains("jti-1"))
+        self.assertTrue(self.revocations.is_user_revoked("cor-1", issued_at=999))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,28 @@
+import unittest
+
+from cor_lab.services.unified_search import SearchQueryKind, classify_search_query
+
+
+class ClassifySearchQueryTest(unittest.TestCase):
+    def test_case_id(self):
+        self.assertEqual(
+            classify_search_query("3f2b8c1e-9a4d-4c2b-8e7f-1a2b3c4d5e6f"),
+            SearchQueryKind.CASE_ID,
+        )
+
+    def test_case_code_in_any_case_and_with_spaces(self):
+        for query in ("S25B00017", "u25b00017", "  F24C12345 "):
+            with self.subTest(query=query):
+                self.assertEqual(classify_search_query(query), SearchQueryKind.CASE_CODE)
+
+    def test_cor_id(self):
+        self.assertEqual(classify_search_query("1A2B3-1985M"), SearchQueryKind.COR_ID)
+
+    def test_name(self):
+        for query in ("Иванов Иван", "ivanov", "S25B0001", "1A2B3-85M"):
+            with self.subTest(query=query):
+                self.assertEqual(classify_search_query(query), SearchQueryKind.NAME)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,135 @@
+import asyncio
+import unittest
+from unittest.mock import patch
+
+from cor_lab.services import cipher
+from cor_lab.services.cipher import _UserKeyCache, decrypt_user_key
+
+
+class _Clock:
+    """Подменяет модуль time в cipher, не трогая часы event loop."""
+
+    def __init__(self, now: float = 1000.0):
+        self.now = now
+
+    def monotonic(self) -> float:
+        return self.now
+
+
+class UserKeyCacheTest(unittest.TestCase):
+    def setUp(self):
+        self.clock = _Clock()
+        patcher = patch.object(cipher, "time", self.clock)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_returns_cached_copy(self):
+        cache = _UserKeyCache(ttl=60, max_entries=10)
+        cache.put("encrypted", b"secret")
+
+        user_key = cache.get("encrypted")
+
+        self.assertEqual(user_key, b"secret")
+        self.assertIsInstance(user_key, bytes)
+
+    def test_entry_expires_after_ttl(self):
+        cache = _UserKeyCache(ttl=60, max_entries=10)
+        cache.put("encrypted", b"secret")
+        self.clock.now += 61
+
+        self.assertIsNone(cache.get("encrypted"))
+        self.assertNotIn("encrypted", cache._entries)
+
+    def test_evicts_least_recently_used(self):
+        cache = _UserKeyCache(ttl=60, max_entries=2)
+        cache.put("a", b"key-a")
+        cache.put("b", b"key-b")
+        cache.get("a")
+
+        cache.put("c", b"key-c")
+
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual(cache.get("a"), b"key-a")
+        self.assertEqual(cache.get("c"), b"key-c")
+
+    def test_eviction_wipes_stored_key_but_not_returned_copy(self):
+        cache = _UserKeyCache(ttl=60, max_entries=10)
+        cache.put("encrypted", b"secret")
+        stored = cache._entries["encrypted"][1]
+        returned = cache.get("encrypted")
+
+        cache.clear()
+
+        self.assertEqual(stored, bytearray(len(b"secret")))
+        self.assertEqual(returned, b"secret")
+
+
+class _BlockingExecutor:
+    """crypto_executor, который держит PBKDF2, пока тест не отпустит release."""
+
+    def __init__(self, result: bytes = b"user-key"):
+        self.result = result
+        self.calls = 0
+        self.release = asyncio.Event()
+
+    async def run(self, operation, func, *args):
+        self.calls += 1
+        await self.release.wait()
+        if isinstance(self.result, Exception):
+            raise self.result
+        return self.result
+
+
+class DecryptUserKeyTest(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.cache = _UserKeyCache(ttl=60, max_entries=10)
+        self.executor = _BlockingExecutor()
+        for name, value in (
+            ("_user_key_cache", self.cache),
+            ("crypto_executor", self.executor),
+        ):
+            patcher = patch.object(cipher, name, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    async def test_concurrent_requests_share_one_derivation(self):
+        first = asyncio.create_task(decrypt_user_key("encrypted"))
+        second = asyncio.create_task(decrypt_user_key("encrypted"))
+        await asyncio.sleep(0)
+        self.executor.release.set()
+
+        self.assertEqual(await asyncio.gather(first, second), [b"user-key"] * 2)
+        self.assertEqual(self.executor.calls, 1)
+        self.assertEqual(self.cache.in_flight, {})
+        self.assertEqual(self.cache.get("encrypted"), b"user-key")
+
+    async def test_cancelling_initiator_does_not_cancel_waiters(self):
+        initiator = asyncio.create_task(decrypt_user_key("encrypted"))
+        await asyncio.sleep(0)
+        waiter = asyncio.create_task(decrypt_user_key("encrypted"))
+        await asyncio.sleep(0)
+
+        initiator.cancel()
+        await asyncio.gather(initiator, return_exceptions=True)
+        self.executor.release.set()
+
+        self.assertTrue(initiator.cancelled())
+        self.assertEqual(await waiter, b"user-key")
+        self.assertEqual(self.executor.calls, 1)
+
+    async def test_failure_is_reported_to_every_waiter(self):
+        self.executor.result = RuntimeError("bad padding")
+        first = asyncio.create_task(decrypt_user_key("encrypted"))
+        second = asyncio.create_task(decrypt_user_key("encrypted"))
+        await asyncio.sleep(0)
+        self.executor.release.set()
+
+        results = await asyncio.gather(first, second, return_exceptions=True)
+
+        self.assertTrue(all(isinstance(result, ValueError) for result in results))
+        self.assertEqual(self.cache.in_flight, {})
+        self.assertIsNone(self.cache.get("encrypted"))
+
+
+if __name__ == "__main__":
+    unittest.main()